@@ -21,11 +21,13 @@ import logging
 from django.conf import settings
 from django.db.models import signals
 from django.dispatch import receiver
+from django.utils.timezone import now
 
 import creme.persons.constants as persons_constants
 from creme.creme_core.models import Relation
 from creme.persons import get_organisation_model
 
+from . import get_activity_model
 from .constants import (
     REL_OBJ_PART_2_ACTIVITY,
     REL_SUB_ACTIVITY_SUBJECT,
@@ -36,6 +38,7 @@ from .utils import is_auto_orga_subject_enabled
 
 logger = logging.getLogger(__name__)
 Organisation = get_organisation_model()
+Activity = get_activity_model()
 
 
 @receiver(signals.post_delete, sender=Relation)
@@ -117,3 +120,31 @@ def _transfer_default_calendar(sender, instance, **kwargs):
     #     different from the original default Calendar (ie: the default Calendar
     #     of this User can change 'silently').
     Calendar.objects.filter(user=instance, is_default=True).update(is_default=False)
+
+
+@receiver(signals.m2m_changed, sender=Activity.calendars.through)
+def _update_modified_on_calendars_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # NB: the calendar feed (see views.calendar.ActivitiesData) uses the
+    #     modification date to detect the changes of calendar.
+    if action == 'pre_clear':
+        # NB: "pk_set" is None with "calendar.activities.clear()", so we
+        #     retrieve the activities before they are removed.
+        if reverse:
+            instance._cleared_activity_ids = [
+                *Activity.objects.filter(calendars=instance.id).values_list('id', flat=True),
+            ]
+
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        activity_ids = [instance.id]
+    elif action == 'post_clear':
+        activity_ids = instance.__dict__.pop('_cleared_activity_ids', None)
+    else:
+        activity_ids = pk_set
+
+    if activity_ids:
+        Activity.objects.filter(id__in=activity_ids).update(modified=now())
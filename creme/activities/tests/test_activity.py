@@ -52,7 +52,11 @@ from ..forms.activity import (
 )
 from ..forms.fields import ActivityTypeField
 from ..models import ActivitySubType, ActivityType, Calendar, Status
-from ..utils import check_activity_collisions
+from ..utils import (
+    ActivitySlot,
+    check_activity_collisions,
+    find_activity_collisions,
+)
 from .base import (
     Activity,
     Contact,
@@ -2285,6 +2289,106 @@ class ActivityTestCase(_ActivitiesTestCase):
             busy=False, participants=[c1, c2],
         )
 
+    @skipIfCustomContact
+    def test_collision02(self):
+        "Several slots checked at once ; one query."
+        user = self.login()
+
+        create_dt = self.create_datetime
+        create_activity = partial(
+            Activity.objects.create, user=user, type_id=constants.ACTIVITYTYPE_MEETING,
+        )
+        act01 = create_activity(
+            title='meet01',
+            start=create_dt(year=2010, month=10, day=1, hour=12, minute=0),
+            end=create_dt(year=2010, month=10, day=1, hour=13, minute=0),
+        )
+        act02 = create_activity(
+            title='meet02',
+            start=create_dt(year=2010, month=10, day=2, hour=14, minute=0),
+            end=create_dt(year=2010, month=10, day=2, hour=15, minute=0),
+        )
+        act03 = create_activity(
+            title='meet03',
+            start=create_dt(year=2010, month=10, day=2, hour=14, minute=30),
+            end=create_dt(year=2010, month=10, day=2, hour=16, minute=0),
+        )
+        # Deleted
+        act04 = create_activity(
+            title='meet04', is_deleted=True,
+            start=create_dt(year=2010, month=10, day=3, hour=10, minute=0),
+            end=create_dt(year=2010, month=10, day=3, hour=11, minute=0),
+        )
+
+        create_contact = partial(Contact.objects.create, user=user)
+        c1 = create_contact(first_name='first_name1', last_name='last_name1')
+        c2 = create_contact(first_name='first_name2', last_name='last_name2')
+        c3 = create_contact(first_name='first_name3', last_name='last_name3')
+
+        create_rel = partial(
+            Relation.objects.create, user=user, type_id=constants.REL_SUB_PART_2_ACTIVITY,
+        )
+        create_rel(subject_entity=c1, object_entity=act01)
+        create_rel(subject_entity=c2, object_entity=act01)
+        create_rel(subject_entity=c1, object_entity=act02)
+        create_rel(subject_entity=c2, object_entity=act03)
+        create_rel(subject_entity=c3, object_entity=act04)
+
+        with self.assertNumQueries(1):
+            collisions = find_activity_collisions([
+                ActivitySlot(
+                    start=create_dt(year=2010, month=10, day=1, hour=12, minute=30),
+                    end=create_dt(year=2010, month=10, day=1, hour=14, minute=0),
+                    participants=[c1, c2, c3],
+                ),
+                ActivitySlot(
+                    start=create_dt(year=2010, month=10, day=2, hour=14, minute=45),
+                    end=create_dt(year=2010, month=10, day=2, hour=15, minute=30),
+                    participants=[c1, c2],
+                    exclude_activity_id=act02.id,
+                ),
+                # No collision
+                ActivitySlot(
+                    start=create_dt(year=2010, month=10, day=3, hour=10, minute=0),
+                    end=create_dt(year=2010, month=10, day=3, hour=11, minute=0),
+                    participants=[c1, c2, c3],
+                ),
+                # No start => ignored
+                ActivitySlot(start=None, end=None, participants=[c1]),
+            ])
+
+        self.assertEqual(4, len(collisions))
+        self.assertDictEqual({c1.id: act01, c2.id: act01}, collisions[0])
+        self.assertDictEqual({c2.id: act03}, collisions[1])
+        self.assertDictEqual({}, collisions[2])
+        self.assertDictEqual({}, collisions[3])
+
+        with self.assertNumQueries(0):
+            self.assertListEqual([{}], find_activity_collisions([
+                ActivitySlot(start=None, end=None, participants=[c1]),
+            ]))
+
+        # ---
+        self.assertListEqual(
+            [
+                _(
+                    '{participant} already participates to the activity '
+                    '«{activity}» between {start} and {end}.'
+                ).format(
+                    participant=c2,
+                    activity=act03,
+                    start='14:45:00',
+                    end='15:30:00',
+                ),
+            ],
+            check_activity_collisions(
+                activity_start=create_dt(year=2010, month=10, day=2, hour=14, minute=45),
+                activity_end=create_dt(year=2010, month=10, day=2, hour=15, minute=30),
+                participants=[c1, c2],
+                exclude_activity_id=act02.id,
+            ),
+        )
+
     def test_listviews(self):
         user = self.login()
         self.assertFalse(Activity.objects.all())
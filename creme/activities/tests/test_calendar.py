@@ -6,10 +6,11 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.sessions.models import Session
 from django.core.exceptions import ValidationError
 from django.core.management import call_command
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils.html import escape
-from django.utils.timezone import get_current_timezone, make_naive
+from django.utils.timezone import get_current_timezone, make_naive, now
 from django.utils.translation import gettext as _
 from parameterized import parameterized
 
@@ -30,6 +31,7 @@ from ..management.commands.activities_create_default_calendars import (
 )
 from ..models import Calendar
 from ..utils import get_last_day_of_a_month
+from ..views.calendar import ActivitiesData
 from .base import _ActivitiesTestCase, skipIfCustomActivity
 
 Activity = get_activity_model()
@@ -1075,6 +1077,241 @@ class CalendarTestCase(_ActivitiesTestCase):
             [(d['id'], d['calendar']) for d in response.json()],
         )
 
+    @skipIfCustomActivity
+    def test_activities_data_etag(self):
+        user = self.login()
+        cal = Calendar.objects.get_default_calendar(user)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        act = Activity.objects.create(
+            user=user, type_id=constants.ACTIVITYTYPE_TASK, title='Act#1',
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act.calendars.set([cal])
+
+        url = reverse('activities__calendars_activities')
+        data = {'calendar_id': [str(cal.id)], 'start': int(start.timestamp())}
+        response1 = self.assertGET200(url, data=data)
+        etag = response1.get('ETag')
+        self.assertTrue(etag)
+        self.assertIn('no-cache', response1.get('Cache-Control', ''))
+
+        response2 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response2.status_code)
+        self.assertFalse(response2.content)
+
+        # Other window
+        response3 = self.client.get(
+            url, data={**data, 'start': int((start + timedelta(days=1)).timestamp())},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(200, response3.status_code)
+
+        # Activity modified
+        act.title = 'Act#1 (edited)'
+        act.save()
+        response4 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response4.status_code)
+        self.assertEqual('Act#1 (edited)', response4.json()[0]['title'])
+        self.assertNotEqual(etag, response4.get('ETag'))
+
+        # Calendar modified
+        etag = response4.get('ETag')
+        cal.color = '0000FF'
+        cal.save()
+        response5 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response5.status_code)
+        self.assertEqual('#0000FF', response5.json()[0]['color'])
+
+    @skipIfCustomActivity
+    def test_activities_data_queries(self):
+        "The number of queries does not depend on the number of activities."
+        user = self.login()
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.create(user=user, name='Other Cal #1', is_custom=True)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_TASK,
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        create(title='Act#0').calendars.set([cal1])
+
+        url = reverse('activities__calendars_activities')
+        data = {'calendar_id': [str(cal1.id), str(cal2.id)], 'start': int(start.timestamp())}
+        self.assertGET200(url, data=data)  # The selected calendars are stored in the session
+
+        with CaptureQueriesContext(connection) as ctxt1:
+            self.assertGET200(url, data=data)
+
+        for i in range(1, 6):
+            create(title=f'Act#{i}', type_id=constants.ACTIVITYTYPE_MEETING).calendars.set(
+                [cal1, cal2]
+            )
+
+        with CaptureQueriesContext(connection) as ctxt2:
+            response = self.assertGET200(url, data=data)
+
+        self.assertEqual(11, len(response.json()))
+        self.assertEqual(len(ctxt1), len(ctxt2))
+
+    @skipIfCustomActivity
+    def test_activities_data_editable(self):
+        "Credentials are retrieved in bulk."
+        user = self.login(is_superuser=False, allowed_apps=['activities'])
+        other_user = self.other_user
+        cal = Calendar.objects.get_default_calendar(user)
+
+        create_sc = partial(
+            SetCredentials.objects.create,
+            role=self.role, ctype=Activity,
+        )
+        create_sc(
+            value=EntityCredentials.VIEW | EntityCredentials.CHANGE,
+            set_type=SetCredentials.ESET_OWN,
+        )
+        create_sc(value=EntityCredentials.VIEW, set_type=SetCredentials.ESET_ALL)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        create = partial(
+            Activity.objects.create,
+            type_id=constants.ACTIVITYTYPE_TASK,
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act1 = create(user=user, title='Act#1')
+        act2 = create(user=other_user, title='Act#2')
+
+        for act in (act1, act2):
+            act.calendars.set([cal])
+
+        response = self._get_cal_activities([cal], start=int(start.timestamp()))
+        self.assertDictEqual(
+            {act1.id: True, act2.id: False},
+            {d['id']: d['editable'] for d in response.json()},
+        )
+
+    @skipIfCustomActivity
+    @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=True)
+    def test_activities_data_changed_since(self):
+        user = self.login()
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.get_default_calendar(self.other_user)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_TASK,
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act1 = create(title='Act#1')
+        act2 = create(title='Act#2')
+        act3 = create(title='Act#3')
+        act1.calendars.set([cal1])
+        act2.calendars.set([cal1])
+        act3.calendars.set([cal2])
+
+        url = reverse('activities__calendars_activities')
+        data = {
+            'calendar_id': [str(cal1.id), str(cal2.id)],
+            'start': int(start.timestamp()),
+            'changed_since': (now() - timedelta(hours=1)).timestamp(),
+        }
+        response1 = self.assertGET200(url, data=data)
+        content1 = response1.json()
+        self.assertIsInstance(content1, dict)
+        self.assertCountEqual(
+            [act1.id, act2.id, act3.id], [d['id'] for d in content1['events']],
+        )
+        self.assertListEqual(
+            sorted([[act1.id, cal1.id], [act2.id, cal1.id], [act3.id, cal2.id]]),
+            content1['keys'],
+        )
+
+        timestamp = content1.get('timestamp')
+        self.assertIsInstance(timestamp, float)
+
+        # ---
+        act1.title = 'Act#1 (edited)'
+        act1.save()
+
+        act2.calendars.set([cal2])  # Calendar changed
+        act3.trash()
+
+        response2 = self.assertGET200(url, data={**data, 'changed_since': timestamp})
+        content2 = response2.json()
+        self.assertListEqual(
+            [(act1.id, cal1.id, 'Act#1 (edited)'), (act2.id, cal2.id, 'Act#2')],
+            sorted((d['id'], d['calendar'], d['title']) for d in content2['events']),
+        )
+        self.assertListEqual(
+            sorted([[act1.id, cal1.id], [act2.id, cal2.id]]),
+            content2['keys'],
+        )
+
+        # ---
+        # NB: the returned timestamp has a safety margin
+        self.assertLess(
+            content2['timestamp'],
+            (now() - ActivitiesData.timestamp_margin + timedelta(seconds=1)).timestamp(),
+        )
+        Activity.objects.filter(id__in=[act1.id, act2.id]).update(
+            modified=now() - 2 * ActivitiesData.timestamp_margin,
+        )
+        response3 = self.assertGET200(
+            url, data={**data, 'changed_since': content2['timestamp']},
+        )
+        content3 = response3.json()
+        self.assertListEqual([], content3['events'])
+        self.assertEqual(2, len(content3['keys']))
+
+    def test_calendars_change_update_modified(self):
+        user = self.login()
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.get_default_calendar(self.other_user)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_TASK,
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act1 = create(title='Act#1')
+        act2 = create(title='Act#2')
+        act3 = create(title='Act#3')
+
+        past = now() - timedelta(days=1)
+        accessor = Activity._meta.get_field('calendars').remote_field.get_accessor_name()
+
+        def assertModified(*activities):
+            modified_ids = {
+                *Activity.objects.filter(modified__gt=past).values_list('id', flat=True),
+            }
+            self.assertSetEqual({a.id for a in activities}, modified_ids)
+            Activity.objects.update(modified=past)
+
+        Activity.objects.update(modified=past)
+        act1.calendars.add(cal1)
+        assertModified(act1)
+
+        getattr(cal1, accessor).add(act2, act3)
+        assertModified(act2, act3)
+
+        getattr(cal1, accessor).remove(act3)
+        assertModified(act3)
+
+        act3.calendars.set([cal2])
+        assertModified(act3)
+
+        getattr(cal1, accessor).clear()
+        assertModified(act1, act2)
+
+        act3.calendars.clear()
+        assertModified(act3)
+
+        getattr(cal2, accessor).clear()  # No activity
+        assertModified()
+
     @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=False)
     def test_selected_calendars_in_session(self):
         user = self.login()
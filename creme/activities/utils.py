@@ -16,14 +16,20 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-from django.db.models.query_utils import Q
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, NamedTuple, Sequence
+
+from django.db.models import F
 from django.utils.timezone import localtime
 from django.utils.translation import gettext as _
 
-from creme.creme_core.models import Relation, SettingValue
+from creme.creme_core.models import CremeEntity, SettingValue
 
 from . import get_activity_model
-from .constants import FLOATING_TIME, NARROW, REL_SUB_PART_2_ACTIVITY
+from .constants import FLOATING_TIME, NARROW, REL_OBJ_PART_2_ACTIVITY
 from .setting_keys import auto_subjects_key
 
 
@@ -39,46 +45,104 @@ def get_last_day_of_a_month(date):
     return last_day
 
 
+class ActivitySlot(NamedTuple):
+    "Candidate period for an activity (see find_activity_collisions())."
+    start: datetime
+    end: datetime
+    # Participants (Contacts)
+    participants: Sequence[CremeEntity]
+    # ID of an activity which is ignored (e.g. the activity which is edited)
+    exclude_activity_id: int | None = None
+
+
+def find_activity_collisions(slots: Iterable[ActivitySlot],
+                             busy: bool = True,
+                             ) -> list[dict[int, CremeEntity]]:
+    """Search the activities which collide with some slots.
+    The activities of all the participants of all the slots are retrieved
+    with one query (the slots can be checked together, e.g. by a scheduling
+    assistant or an import).
+    @param slots: Slots to check ; the slots without start are ignored.
+    @param busy: If False, only the busy activities are colliding.
+    @return: A list with one dictionary per slot (same order) ;
+             the dictionaries are <ID of participant: colliding Activity>.
+    """
+    slots = [*slots]
+    collisions = [{} for __ in slots]
+    checked_slots = [
+        (slot, slot_collisions)
+        for slot, slot_collisions in zip(slots, collisions)
+        if slot.start
+    ]
+    participant_ids = {
+        participant.id
+        for slot, __ in checked_slots
+        for participant in slot.participants
+    }
+
+    if not participant_ids:
+        return collisions
+
+    # NB: the activities of the period which contains all the slots are
+    #     retrieved, then the collisions are searched in Python.
+    activities_per_participant = defaultdict(list)
+    busy_args = {} if busy else {'busy': True}
+    for activity in get_activity_model().objects.filter(
+        relations__type=REL_OBJ_PART_2_ACTIVITY,
+        relations__object_entity__in=participant_ids,
+    ).filter(
+        end__gt=min(slot.start for slot, __ in checked_slots),
+        start__lt=max(slot.end for slot, __ in checked_slots),
+        is_deleted=False,
+        floating_type__in=(NARROW, FLOATING_TIME),
+        **busy_args
+    ).annotate(
+        participant_id=F('relations__object_entity'),
+    ).order_by('-start', 'id'):
+        activities_per_participant[activity.participant_id].append(activity)
+
+    for slot, slot_collisions in checked_slots:
+        start = slot.start
+        end = slot.end
+        exclude_id = slot.exclude_activity_id
+
+        for participant in slot.participants:
+            for activity in activities_per_participant.get(participant.id, ()):
+                if activity.id != exclude_id and activity.end > start and activity.start < end:
+                    slot_collisions[participant.id] = activity
+                    break
+
+    return collisions
+
+
 def check_activity_collisions(
         activity_start,
         activity_end,
         participants,
         busy=True,
         exclude_activity_id=None):
+    """Get the collisions of a future activity with the activities of its participants.
+    @return: A list of messages (one per participant with a collision).
+    """
     if not activity_start:
         return
 
-    collision_test = ~(Q(end__lte=activity_start) | Q(start__gte=activity_end))
+    participants = [*participants]
+    colliding_activities = find_activity_collisions(
+        [
+            ActivitySlot(
+                start=activity_start,
+                end=activity_end,
+                participants=participants,
+                exclude_activity_id=exclude_activity_id,
+            ),
+        ],
+        busy=busy,
+    )[0]
     collisions = []
 
     for participant in participants:
-        # Find activities of participant
-        activity_req = Relation.objects.filter(
-            subject_entity=participant.id, type=REL_SUB_PART_2_ACTIVITY,
-        )
-
-        # Exclude current activity if asked
-        if exclude_activity_id is not None:
-            activity_req = activity_req.exclude(object_entity=exclude_activity_id)
-
-        # Get id of activities of participant
-        activity_ids = activity_req.values_list('object_entity__id', flat=True)
-
-        # Do collision request
-        # TODO: can be done with less queries ?
-        #           Activity.objects.filter(
-        #               relations__object_entity=participant.id,
-        #               relations__object_entity__type=REL_OBJ_PART_2_ACTIVITY,
-        #           ).filter(collision_test)
-        busy_args = {} if busy else {'busy': True}
-        # TODO: test is_deleted=True
-        colliding_activity = get_activity_model().objects.filter(
-            collision_test,
-            is_deleted=False,
-            pk__in=activity_ids,
-            floating_type__in=(NARROW, FLOATING_TIME),
-            **busy_args
-        ).first()
+        colliding_activity = colliding_activities.get(participant.id)
 
         if colliding_activity is not None:
             collision_start = max(
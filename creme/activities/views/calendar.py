@@ -16,22 +16,31 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+import json
 import logging
 from collections import defaultdict
-from copy import copy
 from datetime import datetime, timedelta
 from functools import partial
+from hashlib import sha1
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
-from django.db.models import Prefetch, Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
 from django.db.transaction import atomic
 from django.http import HttpResponse
 from django.shortcuts import render
 from django.urls import reverse
-from django.utils.timezone import get_current_timezone, make_naive, now
-from django.utils.translation import gettext
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.timezone import (
+    get_current_timezone,
+    get_current_timezone_name,
+    make_naive,
+    now,
+)
+from django.utils.translation import get_language, gettext
 from django.utils.translation import gettext_lazy as _
 
 from creme.creme_core.core.exceptions import ConflictError
@@ -50,6 +59,9 @@ from ..utils import check_activity_collisions, get_last_day_of_a_month
 logger = logging.getLogger(__name__)
 Activity = get_activity_model()
 
+# Used to build the URLs of the activities without calling reverse() for each one
+_ACTIVITY_ID_PLACEHOLDER = 1234567890
+
 
 def _js_timestamp_to_datetime(timestamp):
     "@raise ValueError"
@@ -197,9 +209,27 @@ class CalendarsMixin:
 
 
 class ActivitiesData(CalendarsMixin, generic.CheckedView):
+    """Get the activities of some calendars in a window of time, as JSON.
+
+    The response has an ETag (built from the displayed data), so the browser
+    gets an empty "304 Not Modified" response when the window has not changed.
+
+    When the GET argument "changed_since" (timestamp) is given, the response
+    is a dictionary:
+        - "events": the activities modified since this date.
+        - "keys": pairs (activity ID, calendar ID) of all the activities of
+          the window ; so the client can remove the events which are not
+          displayed anymore (deleted activity, calendar changed...).
+        - "timestamp": the date of the server, to use in the next request.
+          Notice that this date is moved back by <timestamp_margin>, so an
+          activity which is modified while the response is built is sent
+          again in the next response, instead of being missed.
+    """
     response_class = CremeJsonResponse
     start_arg = 'start'
     end_arg = 'end'
+    changed_since_arg = 'changed_since'
+    timestamp_margin = timedelta(seconds=10)
 
     # Example of possible format (NB: "activity" is passed in the context)
     # label = '[{activity.status}] {activity.title}'
@@ -207,26 +237,68 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
     calendar_ids_session_key = CalendarView.calendar_ids_session_key
 
     def get(self, request, *args, **kwargs):
-        return self.response_class(
-            self.get_activities_data(request),
-            safe=False,  # Result is not a dictionary
+        calendars = [*self.get_calendars(request)]
+        self.save_calendar_ids(request, [cal.id for cal in calendars])
+
+        start = self.get_start(request)
+        end   = self.get_end(request=request, start=start)
+        changed_since = self._get_datetime(request=request, key=self.changed_since_arg)
+        # NB: the queries are not in a transaction with the modifications; the
+        #     margin avoids missing an activity modified during the request.
+        timestamp = now() - self.timestamp_margin
+
+        activities = self.get_activities(
+            user=request.user, calendars=calendars, start=start, end=end,
         )
+        rows = self.get_activities_rows(activities=activities, calendars=calendars)
+        editable_ids = self.get_editable_ids(user=request.user, activities=activities)
+
+        etag = self.get_etag(
+            calendars=calendars, start=start, end=end,
+            changed_since=changed_since,
+            rows=rows, editable_ids=editable_ids,
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        calendars_per_activity = defaultdict(list)
+        for activity_id, calendar_id, modified in rows:
+            if changed_since is None or modified > changed_since:
+                calendars_per_activity[activity_id].append(calendar_id)
+
+        events = self.get_events(
+            calendars=calendars,
+            calendars_per_activity=calendars_per_activity,
+            editable_ids=editable_ids,
+        )
+
+        if changed_since is None:
+            response = self.response_class(events, safe=False)  # Result is not a dictionary
+        else:
+            response = self.response_class({
+                'events': events,
+                'keys': [[activity_id, calendar_id] for activity_id, calendar_id, __ in rows],
+                'timestamp': timestamp.timestamp(),
+            })
+
+        response['ETag'] = etag
+        # NB: the browser must revalidate the response with the ETag.
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return response
 
     def get_activity_label(self, activity):
         return self.label.format(activity=activity)
 
-    def _activity_2_dict(self, activity, user):
-        "Returns a 'jsonifiable' dictionary."
-        tz = get_current_timezone()
+    def _activity_2_base_dict(self, *, activity, url_pattern, editable, tz):
+        "Information which does not depend on the calendar."
         start = make_naive(activity.start, tz)
         end = make_naive(activity.end, tz)
 
         if activity.is_all_day:
             end = datetime(year=end.year, month=end.month, day=end.day) + timedelta(days=1)
 
-        # NB: _get_one_activity_per_calendar() adds this 'attribute'
-        calendar = activity.calendar
-
         return {
             'id':    activity.id,
             'title': self.get_activity_label(activity),
@@ -235,14 +307,25 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             'end':    end.isoformat(),
             'allDay': activity.is_all_day,
 
-            'url': reverse('activities__view_activity_popup', args=(activity.id,)),
+            'url': url_pattern.format(activity.id),
+
+            'editable': editable,
+            'type':     activity.type.name,
+        }
 
+    @staticmethod
+    def _calendar_dict(calendar):
+        return {
             'color':    f'#{calendar.get_color}',
-            'editable': user.has_perm_to_change(activity),
             'calendar': calendar.id,
-            'type':     activity.type.name,
         }
 
+    @staticmethod
+    def _url_pattern():
+        return reverse(
+            'activities__view_activity_popup', args=(_ACTIVITY_ID_PLACEHOLDER,),
+        ).replace(str(_ACTIVITY_ID_PLACEHOLDER), '{}')
+
     @staticmethod
     def _get_datetime(*, request, key):
         timestamp = request.GET.get(key)
@@ -253,49 +336,83 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             except Exception:
                 logger.exception('ActivitiesData._get_datetime(key=%s)', key)
 
-    @staticmethod
-    def _get_one_activity_per_calendar(activities):
-        for activity in activities:
-            # "concerned_calendars" is added by get_activities_data()
-            for calendar in activity.concerned_calendars:
-                copied = copy(activity)
-                copied.calendar = calendar
-                yield copied
-
-    def get_activities_data(self, request):
-        user = request.user
-
-        calendar_ids = [cal.id for cal in self.get_calendars(request)]
-        self.save_calendar_ids(request, calendar_ids)
-
-        start = self.get_start(request)
-        end   = self.get_end(request=request, start=start)
-
+    def get_activities(self, *, user, calendars, start, end):
+        "Get the QuerySet of the activities (not retrieved)."
         # TODO: label when no calendar related to the participant of an unavailability
-        activities = EntityCredentials.filter(
+        return EntityCredentials.filter(
             user,
             Activity.objects
                     .filter(is_deleted=False)
                     .filter(self.get_date_q(start=start, end=end))
-                    .filter(calendars__in=calendar_ids)
+                    .filter(calendars__in=[cal.id for cal in calendars])
                     .distinct()
-            # NB: we already filter by calendars ; maybe a future Django version
-            #     will allow us to annotate the calendar ID directly
-            #     (distinct() would have to be removed of course)
-                    .prefetch_related(Prefetch(
-                        'calendars',
-                        queryset=Calendar.objects.filter(id__in=calendar_ids),
-                        to_attr='concerned_calendars',
-                    ))
         )
 
-        activity_2_dict = partial(self._activity_2_dict, user=user)
-
+    @staticmethod
+    def get_activities_rows(*, activities, calendars):
+        """Get the activities linked to the calendars.
+        @return: List of tuples (activity ID, calendar ID, activity modification date).
+        """
         return [
-            activity_2_dict(activity=a)
-            for a in self._get_one_activity_per_calendar(activities)
+            *Activity.calendars.through.objects.filter(
+                calendar__in=[cal.id for cal in calendars],
+                activity__in=activities.values('id'),
+            ).order_by('activity_id', 'calendar_id').values_list(
+                'activity_id', 'calendar_id', 'activity__modified',
+            )
         ]
 
+    @staticmethod
+    def get_editable_ids(*, user, activities):
+        "Get the IDs of the activities which can be changed by the user (one query)."
+        return {
+            *EntityCredentials.filter(
+                user, activities, perm=EntityCredentials.CHANGE,
+            ).values_list('id', flat=True)
+        }
+
+    def get_etag(self, *, calendars, start, end, changed_since, rows, editable_ids):
+        data = json.dumps(
+            [
+                [[cal.id, cal.get_color] for cal in calendars],
+                start, end, changed_since,
+                get_current_timezone_name(), get_language(),
+                rows, sorted(editable_ids),
+            ],
+            cls=DjangoJSONEncoder,
+        )
+
+        return quote_etag(sha1(data.encode()).hexdigest())
+
+    def get_events(self, *, calendars, calendars_per_activity, editable_ids):
+        """Get the 'jsonifiable' dictionaries of the activities ; there is one
+        dictionary per couple (activity, calendar).
+        @param calendars_per_activity: Dictionary <activity ID: list of calendar IDs>
+               (only these activities are retrieved).
+        """
+        if not calendars_per_activity:
+            return []
+
+        calendar_dicts = {cal.id: self._calendar_dict(cal) for cal in calendars}
+        base_2_dict = partial(
+            self._activity_2_base_dict,
+            url_pattern=self._url_pattern(), tz=get_current_timezone(),
+        )
+        events = []
+
+        # NB: the activities have already been filtered (credentials, dates...)
+        for activity in Activity.objects.filter(
+            id__in=calendars_per_activity.keys(),
+        ).select_related('type'):
+            activity_dict = base_2_dict(
+                activity=activity, editable=(activity.id in editable_ids),
+            )
+
+            for calendar_id in calendars_per_activity[activity.id]:
+                events.append({**activity_dict, **calendar_dicts[calendar_id]})
+
+        return events
+
     @staticmethod
     def get_date_q(start, end):
         return Q(start__range=(start, end)) | Q(end__gt=start, start__lt=end)
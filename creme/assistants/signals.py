@@ -21,6 +21,7 @@ import logging
 from django.db.models.signals import post_save
 from django.dispatch.dispatcher import receiver
 
+from creme.creme_core.core.bulk_save import bulk_save_receivers
 from creme.creme_core.core.entity_cell import CELLS_MAP
 from creme.creme_core.models import CremeEntity
 from creme.creme_core.utils import update_model_instance
@@ -40,22 +41,20 @@ def _refresh_alert_reminder_job(sender, instance, **kwargs):
         reminder_type.refresh_job()
 
 
-@receiver(post_save)
-def _update_alert_trigger_date(sender, instance, **kwargs):
-    # NB: "@receiver(post_save, sender=CremeEntity)" does not work
-    #     (the signal is sent for final class & strict class comparison is done)
-    if not isinstance(instance, CremeEntity):
-        return
+def _update_trigger_dates(model, entities):
+    "Update the trigger dates of the Alerts which depend on fields of some entities."
+    entities = {entity.id: entity for entity in entities}
 
     for alert in Alert.objects.filter(
-        entity_id=instance.id,
+        entity_id__in=entities.keys(),
         trigger_offset__has_key='cell',
         is_validated=False,
     ):
+        alert.real_entity = entities[alert.entity_id]
         offset_dict = alert.trigger_offset
 
         cell = CELLS_MAP.build_cell_from_dict(
-            model=type(instance),
+            model=model,
             dict_cell=offset_dict['cell'],
         )
         if cell is None:
@@ -90,3 +89,21 @@ def _update_alert_trigger_date(sender, instance, **kwargs):
                 cell=cell, sign=sign, period=period,
             ),
         )
+
+
+@receiver(post_save)
+def _update_alert_trigger_date(sender, instance, **kwargs):
+    # NB: "@receiver(post_save, sender=CremeEntity)" does not work
+    #     (the signal is sent for final class & strict class comparison is done)
+    if isinstance(instance, CremeEntity):
+        _update_trigger_dates(type(instance), [instance])
+
+
+def _update_alert_trigger_dates_in_bulk(model, instances):
+    if issubclass(model, CremeEntity):
+        _update_trigger_dates(model, instances)
+
+
+bulk_save_receivers.register(
+    _update_alert_trigger_date, _update_alert_trigger_dates_in_bulk,
+)
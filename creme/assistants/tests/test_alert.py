@@ -13,6 +13,7 @@ from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.translation import gettext as _
 
+from creme.creme_core.core.batch_process import BatchAction
 from creme.creme_core.core.entity_cell import (
     EntityCellFunctionField,
     EntityCellRegularField,
@@ -20,6 +21,7 @@ from creme.creme_core.core.entity_cell import (
 from creme.creme_core.core.function_field import function_field_registry
 # Should be a test queue
 from creme.creme_core.core.job import get_queue
+from creme.creme_core.creme_jobs import batch_process_type
 from creme.creme_core.forms.listview import TextLVSWidget
 from creme.creme_core.models import (
     BrickDetailviewLocation,
@@ -30,6 +32,7 @@ from creme.creme_core.models import (
     FakeContact,
     FakeOrganisation,
     FieldsConfig,
+    Job,
 )
 from creme.creme_core.tests.forms.base import FieldTestCase
 from creme.creme_core.tests.views.base import BrickTestCaseMixin
@@ -821,6 +824,48 @@ class AlertTestCase(BrickTestCaseMixin, AssistantsTestCase):
         entity.save()  # NB: the field 'modified' is updated
         self.assertEqual(trigger_date, self.refresh(alert).trigger_date)
 
+    def test_offset_signal_batch_process(self):
+        "The entities are saved in bulk by the batch process job."
+        entity = self.entity
+        alert = Alert.objects.create(
+            user=self.user,
+            real_entity=entity,
+            title='Title',
+            trigger_date=self.create_datetime(
+                year=2022, month=5, day=10, hour=0, minute=0,
+            ),
+            trigger_offset={
+                'cell': {'type': 'regular_field', 'value': 'modified'},
+                'sign': 1,
+                'period': {'type': DaysPeriod.name, 'value': 1},
+            },
+        )
+
+        actions = [
+            {'field_name': 'last_name', 'operator_name': 'upper', 'value': ''},
+        ]
+        self.assertTrue(batch_process_type._can_bulk_update(
+            FakeContact,
+            [BatchAction(FakeContact, **action) for action in actions],
+        ))
+
+        job = Job.objects.create(
+            type_id=batch_process_type.id,
+            user=self.user,
+            data={
+                'ctype': ContentType.objects.get_for_model(FakeContact).id,
+                'actions': actions,
+            },
+        )
+        batch_process_type.execute(job)
+
+        entity = self.refresh(entity)
+        self.assertEqual(entity.last_name.upper(), entity.last_name)
+        self.assertDatetimesAlmostEqual(
+            entity.modified + relativedelta(days=1),
+            self.refresh(alert).trigger_date,
+        )
+
     def test_function_field01(self):
         funf = function_field_registry.get(CremeEntity, 'assistants-get_alerts')
         self.assertIsNotNone(funf)
@@ -0,0 +1,261 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.utils.html import format_html
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
+
+from creme.creme_core.creme_jobs.base import JobProgress, JobType
+from creme.creme_core.models import (
+    EntityCredentials,
+    EntityFilter,
+    EntityJobResult,
+    FileRef,
+    Job,
+)
+from creme.creme_core.utils.file_handling import FileCreator
+from creme.creme_core.utils.secure_filename import secure_filename
+
+from .exporters import BillingExportEngineManager
+from .exporters.cache import export_content, get_export_cache
+from .models import ExporterConfigItem
+
+logger = logging.getLogger(__name__)
+
+
+def _export_documents(model_label, engine_id, flavour_id, user_id, entity_ids):
+    """Export some documents ; this function is run by the worker processes
+    (so its arguments & its result are simple values).
+    @return: List of tuples (entity_id, file_name, file_content, error_message) ;
+             the file's information are None if there is an error message.
+    """
+    model = apps.get_model(model_label)
+    user = get_user_model().objects.get(id=user_id)
+    exporter = BillingExportEngineManager().exporter(
+        engine_id=engine_id, flavour_id=flavour_id, model=model,
+    )
+    cache = get_export_cache()
+    results = []
+
+    for entity in model.objects.filter(id__in=entity_ids).order_by('id'):
+        try:
+            name, content = export_content(
+                exporter=exporter, entity=entity, user=user, cache=cache,
+            )
+        except Exception as e:
+            logger.exception('BatchExport: error with the document id=%s', entity.id)
+            results.append((entity.id, None, None, str(e)))
+        else:
+            results.append((entity.id, name, content, None))
+
+    return results
+
+
+class _BatchExportType(JobType):
+    id = JobType.generate_id('billing', 'batch_export')
+    verbose_name = _('Export of billing documents')
+    periodic = JobType.NOT_PERIODIC
+
+    # Number of documents exported at once by a worker
+    chunk_size = 16
+
+    def _get_efilter(self, job_data, raise_exception=True):
+        efilter = None
+        efilter_id = job_data.get('efilter')
+
+        if efilter_id:
+            try:
+                efilter = EntityFilter.objects.get(id=efilter_id)
+            except EntityFilter.DoesNotExist as e:
+                if raise_exception:
+                    raise self.Error(gettext('The filter does not exist anymore')) from e
+
+        return efilter
+
+    def _get_model(self, job_data):
+        return ContentType.objects.get_for_id(job_data['ctype']).model_class()
+
+    @staticmethod
+    def _save_data(job, data):
+        job.data = data
+
+        # NB: Job.save() would send a refresh message to the job manager.
+        Job.objects.filter(id=job.id).update(data=data)
+
+    def _iter_exports(self, *, model, engine_id, flavour_id, user, entity_ids):
+        "Generator of lists of results (see _export_documents())."
+        chunk_size = self.chunk_size
+        args_list = [
+            (
+                model._meta.label, engine_id, flavour_id, user.id,
+                entity_ids[i:i + chunk_size],
+            ) for i in range(0, len(entity_ids), chunk_size)
+        ]
+        workers = min(settings.BILLING_EXPORT_WORKERS, len(args_list))
+
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            # NB: the forked processes must not share the connections of the
+            #     current process ; new connections are opened when needed.
+            connections.close_all()
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('fork'),
+            ) as executor:
+                yield from executor.map(_export_documents, *zip(*args_list))
+        else:
+            for args in args_list:
+                yield _export_documents(*args)
+
+    def _execute(self, job):
+        job_data = job.data
+        model = self._get_model(job_data)
+        ctype = ContentType.objects.get_for_model(model)
+
+        config_item = ExporterConfigItem.objects.filter(content_type=ctype).first()
+        engine_id = config_item.engine_id if config_item else None
+        if not engine_id or BillingExportEngineManager().exporter(
+            engine_id=engine_id, flavour_id=config_item.flavour_id, model=model,
+        ) is None:
+            raise self.Error(gettext(
+                'The exporter is not configured ; '
+                'go to the configuration of the app «Billing».'
+            ))
+
+        entities = EntityCredentials.filter(
+            job.user, model.objects.filter(is_deleted=False), EntityCredentials.VIEW,
+        )
+        efilter = self._get_efilter(job_data)
+        if efilter is not None:
+            entities = efilter.filter(entities)
+
+        entity_ids = [*entities.order_by('id').values_list('id', flat=True)]
+        job_data['total'] = len(entity_ids)
+        job_data['processed'] = 0
+        self._save_data(job, job_data)
+
+        zip_basename = secure_filename(f'{model._meta.verbose_name_plural}.zip')
+        zip_path = FileCreator(
+            dir_path=path.join(settings.MEDIA_ROOT, 'billing'),
+            name=zip_basename,
+        ).create()
+        file_ref = FileRef.objects.create(
+            user=job.user,
+            filedata=f'billing/{path.basename(zip_path)}',
+            basename=zip_basename,
+        )
+
+        names = set()
+        with ZipFile(zip_path, 'w', compression=ZIP_DEFLATED) as zip_file:
+            for results in self._iter_exports(
+                model=model,
+                engine_id=engine_id,
+                flavour_id=config_item.flavour_id,
+                user=job.user,
+                entity_ids=entity_ids,
+            ):
+                for entity_id, name, content, error in results:
+                    if error is not None:
+                        EntityJobResult.objects.create(
+                            job=job,
+                            entity_ctype=ctype,
+                            entity_id=entity_id,
+                            messages=[
+                                gettext('The document cannot be exported'),
+                                gettext('Original error: {}').format(error),
+                            ],
+                        )
+                        continue
+
+                    if name in names:
+                        name = f'{entity_id}_{name}'
+                    names.add(name)
+
+                    zip_file.writestr(name, content)
+
+                job_data['processed'] += len(results)
+                self._save_data(job, job_data)
+
+        job_data['file_ref'] = file_ref.id
+        self._save_data(job, job_data)
+
+    def progress(self, job):
+        data = job.data or {}
+        total = data.get('total')
+        processed = data.get('processed', 0)
+
+        return JobProgress(
+            percentage=min(100, processed * 100 // total) if total else None,
+            label=ngettext(
+                '{count} document has been processed.',
+                '{count} documents have been processed.',
+                processed
+            ).format(count=processed),
+        )
+
+    @property
+    def results_bricks(self):
+        from creme.creme_core.bricks import EntityJobErrorsBrick
+        return [EntityJobErrorsBrick()]
+
+    def get_description(self, job):
+        try:
+            job_data = job.data
+            desc = [
+                gettext('Entity type: {}').format(
+                    self._get_model(job_data)._meta.verbose_name
+                ),
+            ]
+
+            efilter = self._get_efilter(job_data, raise_exception=False)
+            if efilter is not None:
+                desc.append(gettext('Filter: {}').format(efilter))
+        except Exception:
+            logger.exception('Error in _BatchExportType.get_description')
+            desc = ['?']
+
+        return desc
+
+    def get_stats(self, job):
+        stats = []
+        file_ref = FileRef.objects.filter(id=(job.data or {}).get('file_ref')).first()
+
+        if file_ref is not None:
+            stats.append(format_html(
+                '<a href="{url}">{label}</a>',
+                url=file_ref.get_download_absolute_url(),
+                label=gettext('Download the file «{}»').format(file_ref.basename),
+            ))
+
+        return stats
+
+
+batch_export_type = _BatchExportType()
+jobs = (batch_export_type,)
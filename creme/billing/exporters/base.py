@@ -100,6 +100,14 @@ class BillingExporter:
             f'{self.engine.id}{self.ID_SEPARATOR}{self.flavour.as_id()}'
         )
 
+    @property
+    def template_paths(self) -> list[str]:
+        """Get the paths of the templates used to generate the files.
+        The modification of these templates invalidates the cached files
+        (see <creme.billing.exporters.cache.ExportCache>).
+        """
+        return []
+
     @property
     def screenshots(self) -> Iterator[str]:
         """Get resources paths to screenshots.
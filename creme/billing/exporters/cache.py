@@ -0,0 +1,405 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from __future__ import annotations
+
+import json
+import logging
+import mimetypes
+import os
+from contextlib import suppress
+from hashlib import sha256
+from os import path
+from shutil import copyfile, copyfileobj, rmtree
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.models import model_to_dict
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils.translation import get_language
+
+from creme import persons
+from creme.creme_core.models import CremeEntity, FileRef
+from creme.creme_core.utils.file_handling import FileCreator
+
+from .. import constants
+from ..models import PaymentInformation
+
+if TYPE_CHECKING:
+    from .base import BillingExporter
+
+logger = logging.getLogger(__name__)
+
+
+class CachedFile(NamedTuple):
+    path: str
+    basename: str
+    content_type: str
+    # Is the file returned by the exporter as a HttpResponse (or as a FileRef)?
+    as_response: bool
+
+
+class ExportCache:
+    """Cache for the files generated by the exporters of billing documents.
+
+    The files are content-addressed: the key of a file is a hash of
+        - the exporter (engine, flavour & templates, with their modification dates).
+        - the document, its lines, its source/target & the entities linked to
+          its lines/credit notes (IDs & modification dates).
+        - the addresses & the payment information used by the document (values).
+        - the language.
+    So a document which has been modified gets a new key (the old file is not
+    used anymore).
+    The files are stored in "MEDIA_ROOT/billing/cache/<ID of the document>/" ;
+    when a file is stored, the other files of the document are removed.
+
+    Notice that the changes in the small auxiliary models (e.g. currencies,
+    statuses) are not detected ; use a new <version> to invalidate all the files.
+    """
+    version = 1
+
+    # Types of relation which link the document to the entities used by the
+    # exports (from the point of view of these entities).
+    related_rtypes = [
+        constants.REL_OBJ_BILL_ISSUED,
+        constants.REL_OBJ_BILL_RECEIVED,
+        constants.REL_OBJ_HAS_LINE,
+        constants.REL_SUB_CREDIT_NOTE_APPLIED,
+        constants.REL_OBJ_CREDIT_NOTE_APPLIED,
+    ]
+
+    def __init__(self, dir_path: str | None = None):
+        """Constructor.
+        @param dir_path: Directory where the files are stored ;
+               <None> means "MEDIA_ROOT/billing/cache".
+        """
+        self.dir_path = (
+            path.join(settings.MEDIA_ROOT, 'billing', 'cache')
+            if dir_path is None else
+            dir_path
+        )
+
+    @staticmethod
+    def _templates_data(exporter: BillingExporter) -> list:
+        data = []
+
+        for template_path in exporter.template_paths:
+            origin_name = get_template(template_path).origin.name
+
+            try:
+                mtime = path.getmtime(origin_name)
+            except (OSError, TypeError):
+                mtime = None
+
+            data.append([template_path, mtime])
+
+        return data
+
+    def _documents_data(self, entity: CremeEntity) -> list:
+        related = [
+            *CremeEntity.objects.filter(
+                relations__type__in=self.related_rtypes,
+                relations__object_entity=entity.id,
+            ).values_list('relations__type', 'id', 'modified'),
+        ]
+        line_ids = [
+            entity_id
+            for rtype_id, entity_id, __ in related
+            if rtype_id == constants.REL_OBJ_HAS_LINE
+        ]
+        if line_ids:
+            related.extend(
+                CremeEntity.objects.filter(
+                    relations__type=constants.REL_OBJ_LINE_RELATED_ITEM,
+                    relations__object_entity__in=line_ids,
+                ).values_list('relations__type', 'id', 'modified')
+            )
+
+        related.sort(key=lambda t: (t[0], t[1]))
+
+        return [
+            entity._meta.label, entity.id, entity.modified,
+            related,
+        ]
+
+    @staticmethod
+    def _auxiliary_data(entity: CremeEntity) -> list:
+        source = entity.source
+        target = entity.target
+        address_ids = {
+            entity.billing_address_id, entity.shipping_address_id,
+            getattr(source, 'billing_address_id', None),
+            getattr(source, 'shipping_address_id', None),
+            getattr(target, 'billing_address_id', None),
+            getattr(target, 'shipping_address_id', None),
+        }
+        address_ids.discard(None)
+
+        addresses = [
+            model_to_dict(address)
+            for address in persons.get_address_model().objects.filter(
+                id__in=address_ids,
+            ).order_by('id')
+        ] if address_ids else []
+
+        payment_info_id = entity.payment_info_id
+        payment_info = model_to_dict(
+            PaymentInformation.objects.get(id=payment_info_id)
+        ) if payment_info_id else None
+
+        return [addresses, payment_info]
+
+    def build_key(self, exporter: BillingExporter, entity: CremeEntity) -> str:
+        "Build the key of the file generated by an exporter for a document."
+        key_data = json.dumps(
+            [
+                self.version,
+                exporter.id,
+                self._templates_data(exporter),
+                self._documents_data(entity),
+                self._auxiliary_data(entity),
+                get_language(),
+            ],
+            cls=DjangoJSONEncoder,
+        )
+
+        return sha256(key_data.encode()).hexdigest()
+
+    def _entity_dir_path(self, entity_id: int) -> str:
+        return path.join(self.dir_path, str(entity_id))
+
+    def get(self, entity: CremeEntity, key: str) -> CachedFile | None:
+        "Get the cached file of a document, or None if there is no file for this key."
+        file_path = path.join(self._entity_dir_path(entity.id), key)
+
+        try:
+            with open(f'{file_path}.json', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not path.exists(file_path):
+            return None
+
+        return CachedFile(
+            path=file_path,
+            basename=meta['basename'],
+            content_type=meta['content_type'],
+            as_response=meta['as_response'],
+        )
+
+    def set(self, entity: CremeEntity, key: str, *,
+            src_path: str | None = None,
+            content: bytes | None = None,
+            basename: str,
+            content_type: str | None = None,
+            as_response: bool = False,
+            ) -> CachedFile:
+        """Store a file in the cache (the other files of the document are removed).
+        @param src_path: Path of the file to copy ; give it, or give <content>.
+        @param content: Content of the file.
+        @param basename: Name of the file for the users.
+        @param content_type: MIME type ; <None> means "guessed from the basename".
+        @param as_response: Is the file returned as a HttpResponse (see CachedFile).
+        """
+        dir_path = self._entity_dir_path(entity.id)
+        os.makedirs(dir_path, exist_ok=True)
+
+        file_path = path.join(dir_path, key)
+        meta = {
+            'basename': basename,
+            'content_type': (
+                content_type
+                or mimetypes.guess_type(basename)[0]
+                or 'application/octet-stream'
+            ),
+            'as_response': as_response,
+        }
+
+        self._write(dir_path, file_path, src_path=src_path, content=content)
+        self._write(dir_path, f'{file_path}.json', content=json.dumps(meta).encode())
+
+        for name in os.listdir(dir_path):
+            if name not in (key, f'{key}.json') and not name.startswith('tmp'):
+                try:
+                    os.remove(path.join(dir_path, name))
+                except OSError as e:
+                    logger.warning('ExportCache: cannot remove an old file (%s)', e)
+
+        return CachedFile(path=file_path, **meta)
+
+    @staticmethod
+    def _write(dir_path: str, final_path: str, *,
+               src_path: str | None = None,
+               content: bytes | None = None,
+               ) -> None:
+        # NB: the file is written in a temporary file which is renamed, so a
+        #     concurrent reader never gets a partial file.
+        with NamedTemporaryFile(dir=dir_path, prefix='tmp', delete=False) as tmp_file:
+            if content is None:
+                with open(src_path, 'rb') as src_file:
+                    copyfileobj(src_file, tmp_file)
+            else:
+                tmp_file.write(content)
+
+        os.replace(tmp_file.name, final_path)
+
+    def _store(self,
+               entity: CremeEntity,
+               key: str,
+               result: FileRef | HttpResponse,
+               ) -> CachedFile:
+        "Store the result of <BillingExporter.export()>."
+        if isinstance(result, HttpResponse):
+            return self.set(
+                entity, key,
+                content=result.content,
+                basename=_response_basename(result, entity),
+                content_type=result.get('Content-Type'),
+                as_response=True,
+            )
+
+        return self.set(
+            entity, key,
+            src_path=result.filedata.path,
+            basename=result.basename,
+        )
+
+    def clear(self, entity_id: int) -> None:
+        "Remove the cached files of a document."
+        rmtree(self._entity_dir_path(entity_id), ignore_errors=True)
+
+    def render(self, exporter: BillingExporter, entity: CremeEntity, user) -> CachedFile:
+        """Get the cached file of a document, or export the document & store
+        the generated file.
+        """
+        key = self.build_key(exporter=exporter, entity=entity)
+        cached = self.get(entity, key)
+
+        if cached is None:
+            cached = self._store(
+                entity, key, exporter.export(entity=entity, user=user),
+            )
+
+        return cached
+
+    def export(self,
+               exporter: BillingExporter,
+               entity: CremeEntity,
+               user,
+               ) -> FileRef | HttpResponse:
+        """Version of <BillingExporter.export()> which uses the cache.
+        @return: A FileRef (the user gets a copy of the cached file), or
+                 a HttpResponse (like the exporter).
+        """
+        key = self.build_key(exporter=exporter, entity=entity)
+        cached = self.get(entity, key)
+
+        if cached is not None:
+            try:
+                return self._cached_result(cached, user)
+            except OSError as e:
+                # NB: the file has been removed by a concurrent call to set()
+                #     => we export the document again.
+                logger.warning('ExportCache: the cached file cannot be read (%s)', e)
+
+        result = exporter.export(entity=entity, user=user)
+
+        try:
+            self._store(entity, key, result)
+        except OSError as e:
+            logger.warning('ExportCache: the file cannot be stored (%s)', e)
+
+        return result
+
+    @staticmethod
+    def _cached_result(cached: CachedFile, user) -> FileRef | HttpResponse:
+        "Build the result of <export()> from a cached file (OSError can be raised)."
+        if cached.as_response:
+            with open(cached.path, 'rb') as f:
+                return HttpResponse(f.read(), headers={
+                    'Content-Type': cached.content_type,
+                    'Content-Disposition': f'attachment; filename="{cached.basename}"',
+                })
+
+        # NB: the FileRef does not reference the cached file, because the
+        #     temporary files are removed by the job "temp_files_cleaner".
+        final_path = FileCreator(
+            dir_path=path.join(settings.MEDIA_ROOT, 'billing'),
+            name=cached.basename,
+        ).create()
+
+        try:
+            copyfile(cached.path, final_path)
+        except OSError:
+            with suppress(OSError):
+                os.remove(final_path)
+
+            raise
+
+        return FileRef.objects.create(
+            user=user,
+            filedata=f'billing/{path.basename(final_path)}',
+            basename=cached.basename,
+        )
+
+
+def _response_basename(response: HttpResponse, entity: CremeEntity) -> str:
+    disposition = response.get('Content-Disposition', '')
+    __, sep, filename = disposition.partition('filename=')
+
+    return filename.strip('"') if sep else f'{entity._meta.verbose_name}_{entity.id}'
+
+
+def export_content(exporter: BillingExporter,
+                   entity: CremeEntity,
+                   user,
+                   cache: ExportCache | None = None,
+                   ) -> tuple[str, bytes]:
+    """Export a document & get the generated file.
+    @param cache: Cache used to avoid the generation of an up-to-date file ;
+           <None> means "no cache".
+    @return: Tuple (name of the file, content of the file).
+    """
+    if cache is not None:
+        cached = cache.render(exporter=exporter, entity=entity, user=user)
+
+        try:
+            with open(cached.path, 'rb') as f:
+                return cached.basename, f.read()
+        except OSError as e:
+            # NB: the file has been removed by a concurrent call to set()
+            logger.warning('export_content(): the cached file cannot be read (%s)', e)
+
+    result = exporter.export(entity=entity, user=user)
+    if isinstance(result, HttpResponse):
+        return _response_basename(result, entity), result.content
+
+    with result.filedata.open('rb') as f:
+        return result.basename, f.read()
+
+
+def get_export_cache() -> ExportCache | None:
+    """Get the cache for the files generated by the exporters.
+    @return An ExportCache instance, or None if the cache is disabled
+            (see settings.BILLING_EXPORT_CACHE).
+    """
+    return ExportCache() if settings.BILLING_EXPORT_CACHE else None
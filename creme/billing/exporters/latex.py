@@ -111,6 +111,10 @@ class LatexExporter(ContextMixin, base.BillingExporter):
             basename=pdf_basename,
         )
 
+    @property
+    def template_paths(self):
+        return [self.template_path]
+
     @property
     def screenshots(self):
         yield from self._screenshots
@@ -84,6 +84,10 @@ class WeasyprintExporter(ContextMixin, base.BillingExporter):
 
         return file_ref
 
+    @property
+    def template_paths(self):
+        return [self.html_template_path, self.css_template_path]
+
     @property
     def screenshots(self):
         yield from self._screenshots
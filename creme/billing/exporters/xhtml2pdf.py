@@ -65,6 +65,10 @@ class Xhtml2pdfExporter(ContextMixin, base.BillingExporter):
 
         return response
 
+    @property
+    def template_paths(self):
+        return [self.template_path]
+
     @property
     def screenshots(self):
         yield from self._screenshots
@@ -114,8 +114,11 @@ class BaseCustomForm(CremeEntityForm):
         if self.old_user_id and self.old_user_id != self.cleaned_data['user'].id:
             # Do not use queryset.update() to call the CremeEntity.save() method
             # TODO: change with future Credentials system ??
-            for line in instance.iter_all_lines():
-                line.user = instance.user
-                line.save()
+            # NB: the document is saved just after (the totals are updated)
+            with instance.deferred_totals(save=False):
+                for line in instance.iter_all_lines():
+                    line.user = instance.user
+                    line._related_document = instance
+                    line.save()
 
         return super().save(*args, **kwargs)
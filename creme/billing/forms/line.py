@@ -78,10 +78,11 @@ class _LineMultipleAddForm(core_forms.CremeForm):
             vat_value=cdata['vat'],
         )
 
-        for item in cdata['items']:
-            create_item(
-                related_item=item, unit_price=item.unit_price, unit=item.unit,
-            )
+        with self.billing_document.deferred_totals():
+            for item in cdata['items']:
+                create_item(
+                    related_item=item, unit_price=item.unit_price, unit=item.unit,
+                )
 
 
 class ProductLineMultipleAddForm(_LineMultipleAddForm):
@@ -183,6 +184,10 @@ class LineEditForm(core_forms.CremeModelForm):
         # handle add on the fly client side js
         if not instance.pk:
             instance.related_document = self.related_document
+        elif self.related_document is not None:
+            # NB: avoid a query & use the deferring of totals of this instance
+            #     (see views.line.multi_save_lines())
+            instance._related_document = self.related_document
 
         return super().save(*args, **kwargs)
 
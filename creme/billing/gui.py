@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2019-2020  Hybird
+#    Copyright (C) 2019-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -17,10 +17,14 @@
 ################################################################################
 
 from creme import recurrents
-from creme.creme_core.gui.listview import CreationButton
+from creme.creme_core.gui.listview import CreationButton, ListViewButton
 
 
 # TODO: limit generator to billing models ?
 class GeneratorCreationButton(CreationButton):
     def get_model(self, lv_context):
         return recurrents.get_rgenerator_model()
+
+
+class BatchExportButton(ListViewButton):
+    template_name = 'billing/listview/buttons/batch-export.html'
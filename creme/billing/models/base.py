@@ -19,9 +19,12 @@
 from __future__ import annotations
 
 import logging
+from contextlib import contextmanager
 # import warnings
 from datetime import date
+from decimal import Decimal
 from functools import partial
+from typing import Iterable
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -134,6 +137,7 @@ class Base(CremeEntity):
     _target = None
     _target_rel = None
     _creditnotes_cache = None
+    _lines_totals_cache = None
 
     class Meta:
         abstract = True
@@ -144,6 +148,7 @@ class Base(CremeEntity):
         super().__init__(*args, **kwargs)
         self._lines_cache = {}  # Key: Line class ; Value: Lines instances (list)
         self._address_auto_copy = True
+        self._totals_deferred = False
 
     def __str__(self):
         return self.name
@@ -179,6 +184,7 @@ class Base(CremeEntity):
     def invalidate_cache(self):
         self._lines_cache.clear()
         self._creditnotes_cache = None
+        self._lines_totals_cache = None
 
     @property
     def source(self):
@@ -295,25 +301,126 @@ class Base(CremeEntity):
         for line_cls in lines_registry:
             yield from self.get_lines(line_cls)
 
+    def _get_lines_totals(self) -> tuple[Decimal, Decimal]:
+        """Get the sums of the prices of the lines (without VAT, with VAT).
+        Only the needed fields are retrieved (one query per class of line ;
+        the Line instances are not built). The prices are still computed &
+        rounded line by line in Python, like Line.get_price_exclusive_of_tax()
+        & Line.get_price_inclusive_of_tax() do.
+        """
+        totals = self._lines_totals_cache
+
+        if totals is None:
+            from ..registry import lines_registry
+
+            total_no_vat = total_vat = DEFAULT_DECIMAL
+            discount = self.discount
+
+            if self.id:
+                for line_cls in lines_registry:
+                    compute_price = partial(
+                        line_cls.compute_price_exclusive_of_tax,
+                        document_discount=discount,
+                    )
+                    compute_price_with_vat = line_cls.compute_price_inclusive_of_tax
+
+                    for quantity, unit_price, line_discount, discount_unit, vat in \
+                            line_cls.objects.filter(
+                                relations__object_entity=self.id,
+                                relations__type=REL_OBJ_HAS_LINE,
+                            ).values_list(
+                                'quantity', 'unit_price', 'discount', 'discount_unit',
+                                'vat_value__value',
+                            ):
+                        price = compute_price(
+                            quantity=quantity,
+                            unit_price=unit_price,
+                            discount=line_discount,
+                            discount_unit=discount_unit,
+                        )
+                        total_no_vat += price
+                        total_vat += compute_price_with_vat(price, vat)
+
+            self._lines_totals_cache = totals = (total_no_vat, total_vat)
+
+        return totals
+
     def _get_lines_total_n_creditnotes_total(self):
         creditnotes_total = sum(
             credit_note.total_no_vat for credit_note in self.get_credit_notes()
         )
-        lines_total = sum(
-            line.get_price_exclusive_of_tax(self) for line in self.iter_all_lines()
-        )
 
-        return lines_total, creditnotes_total
+        return self._get_lines_totals()[0], creditnotes_total
 
     def _get_lines_total_n_creditnotes_total_with_tax(self):
         creditnotes_total = sum(
             credit_note.total_vat for credit_note in self.get_credit_notes()
         )
-        lines_total_with_tax = sum(
-            line.get_price_inclusive_of_tax(self) for line in self.iter_all_lines()
-        )
 
-        return lines_total_with_tax, creditnotes_total
+        return self._get_lines_totals()[1], creditnotes_total
+
+    @property
+    def totals_deferred(self) -> bool:
+        "Are the updates of the totals deferred? (see deferred_totals())."
+        return self._totals_deferred
+
+    @contextmanager
+    def deferred_totals(self, save: bool = True):
+        """Context manager which defers the update of the totals when lines
+        are saved ; the document is saved (so the totals are computed) once,
+        at the end.
+        @param save: If False, the document is not saved at the end (i.e. the
+               caller saves it itself).
+
+        Example:
+            with invoice.deferred_totals():
+                for line in lines:
+                    line.related_document = invoice  # (new lines)
+                    line.save()
+
+        Notice that the lines must use this instance of document as
+        "related_document" (see save_lines()).
+        """
+        previous = self._totals_deferred
+        self._totals_deferred = True
+
+        try:
+            with atomic():
+                yield self
+
+                if save and not previous:
+                    self._totals_deferred = False
+                    self.save()
+        finally:
+            self._totals_deferred = previous
+
+    def save_lines(self, lines: Iterable) -> None:
+        """Save some lines (new or existing ones) of the document ; the totals
+        are updated once.
+        @param lines: Instances of Line ; the existing lines must be related
+               to this document.
+        """
+        lines = [*lines]
+        existing_ids = [line.id for line in lines if line.pk]
+
+        if existing_ids:
+            related_ids = {
+                *Relation.objects.filter(
+                    subject_entity__in=existing_ids,
+                    type=REL_OBJ_HAS_LINE,
+                    object_entity=self.id,
+                ).values_list('subject_entity_id', flat=True)
+            }
+            if len(related_ids) != len({*existing_ids}):
+                raise ValueError(
+                    f'Base.save_lines(): some lines are not related to "{self}"'
+                )
+
+        with self.deferred_totals():
+            for line in lines:
+                # NB: avoid a query per line & use the flag of this instance
+                line._related_document = self
+                line.save()
 
     def _get_total(self):
         lines_total, creditnotes_total = self._get_lines_total_n_creditnotes_total()
@@ -366,8 +473,9 @@ class Base(CremeEntity):
     def _post_clone(self, source):
         source.invalidate_cache()
 
-        for line in source.iter_all_lines():
-            line.clone(self)
+        with self.deferred_totals():
+            for line in source.iter_all_lines():
+                line.clone(self)
 
     # TODO: factorise with persons ??
     def _post_save_clone(self, source):
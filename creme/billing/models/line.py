@@ -33,9 +33,6 @@ from ..utils import round_to_2
 logger = logging.getLogger(__name__)
 
 
-# TODO: use a smart workflow engine to update the BillingModel only once when
-#  several lines are edited for the moment when have to re-save the model manually.
-
 class Line(CremeEntity):
     class Discount(models.IntegerChoices):
         PERCENT     = 1, _('Percent'),
@@ -147,38 +144,66 @@ class Line(CremeEntity):
     def get_absolute_url(self):
         return self.get_related_entity().get_absolute_url()
 
-    def get_price_inclusive_of_tax(self, document=None):
-        total_ht = self.get_price_exclusive_of_tax(document)
-        vat_value = self.vat_value
-        vat = (total_ht * vat_value.value / 100) if vat_value else 0
-        return round_to_2(total_ht + vat)
-
-    def get_raw_price(self):
-        return round_to_2(self.quantity * self.unit_price)
-
-    def get_price_exclusive_of_tax(self, document=None):
-        line_discount   = self.discount
-        unit_price_line = self.unit_price
-        discount_unit   = self.discount_unit
-        Discount = self.Discount
+    @staticmethod
+    def compute_price_exclusive_of_tax(*,
+                                       quantity,
+                                       unit_price,
+                                       discount,
+                                       discount_unit,
+                                       document_discount=None):
+        """Compute the price of a line (without VAT) from its field values.
+        Hint: it is used to compute the totals of a document without building
+        the Line instances (see Base._get_lines_totals()).
+        """
+        Discount = Line.Discount
 
         if discount_unit == Discount.PERCENT:
-            total_after_first_discount = self.quantity * (
-                unit_price_line - (unit_price_line * line_discount / 100)
+            total_after_first_discount = quantity * (
+                unit_price - (unit_price * discount / 100)
             )
         elif discount_unit == Discount.LINE_AMOUNT:
-            total_after_first_discount = self.quantity * unit_price_line - line_discount
+            total_after_first_discount = quantity * unit_price - discount
         else:  # ITEM_AMOUNT
-            total_after_first_discount = self.quantity * (unit_price_line - line_discount)
+            total_after_first_discount = quantity * (unit_price - discount)
 
-        document     = document if document else self.related_document
-        doc_discount = document.discount if document else None
         total_exclusive_of_tax = total_after_first_discount
-        if doc_discount:
-            total_exclusive_of_tax -= total_after_first_discount * doc_discount / 100
+        if document_discount:
+            total_exclusive_of_tax -= total_after_first_discount * document_discount / 100
 
         return round_to_2(total_exclusive_of_tax)
 
+    @staticmethod
+    def compute_price_inclusive_of_tax(price_exclusive_of_tax, vat):
+        """Compute the price of a line (with VAT).
+        @param price_exclusive_of_tax: see compute_price_exclusive_of_tax().
+        @param vat: Value of the VAT (Decimal, e.g. "20.00" for 20%) ; can be None.
+        """
+        tax = (price_exclusive_of_tax * vat / 100) if vat else 0
+
+        return round_to_2(price_exclusive_of_tax + tax)
+
+    def get_price_inclusive_of_tax(self, document=None):
+        vat_value = self.vat_value
+
+        return self.compute_price_inclusive_of_tax(
+            self.get_price_exclusive_of_tax(document),
+            vat_value.value if vat_value else None,
+        )
+
+    def get_raw_price(self):
+        return round_to_2(self.quantity * self.unit_price)
+
+    def get_price_exclusive_of_tax(self, document=None):
+        document = document if document else self.related_document
+
+        return self.compute_price_exclusive_of_tax(
+            quantity=self.quantity,
+            unit_price=self.unit_price,
+            discount=self.discount,
+            discount_unit=self.discount_unit,
+            document_discount=document.discount if document else None,
+        )
+
     def get_related_entity(self):  # For generic views & delete
         return self.related_document
 
@@ -264,6 +289,8 @@ class Line(CremeEntity):
         else:
             super().save(*args, **kwargs)
 
-        # TODO: problem, if several lines are added/edited at once, lots of
-        #  useless queries (workflow engine ??)
-        self.related_document.save()  # Update totals
+        # NB: when several lines are saved at once, the totals are updated
+        #     only at the end (see Base.deferred_totals()).
+        document = self.related_document
+        if not document.totals_deferred:
+            document.save()  # Update totals
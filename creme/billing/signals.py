@@ -24,10 +24,12 @@ from django.dispatch import receiver
 
 import creme.creme_core.signals as core_signals
 from creme import billing, persons
+from creme.creme_core.core.bulk_save import bulk_save_receivers
 from creme.creme_core.models import Relation
 from creme.persons import workflow
 
 from . import constants
+from .exporters.cache import get_export_cache
 from .models import ConfigBillingAlgo, SimpleBillingAlgo
 
 Organisation = persons.get_organisation_model()
@@ -60,6 +62,9 @@ def set_simple_conf_billing(sender, instance, **kwargs):
         )
 
 
+bulk_save_receivers.register_fields(set_simple_conf_billing, fields=['is_managed'])
+
+
 @receiver(core_signals.pre_merge_related)
 def handle_merge_organisations(sender, other_entity, **kwargs):
     # TODO: change 'pre_merge_related' to have sender=Organisation & arguments "entity1/entity2"
@@ -137,6 +142,19 @@ def manage_line_deletion(sender, instance, **kwargs):
         instance.real_object.save()
 
 
+@receiver(signals.post_delete, sender=billing.get_credit_note_model())
+@receiver(signals.post_delete, sender=Invoice)
+@receiver(signals.post_delete, sender=Quote)
+@receiver(signals.post_delete, sender=billing.get_sales_order_model())
+@receiver(signals.post_delete, sender=billing.get_template_base_model())
+def clear_export_cache(sender, instance, **kwargs):
+    "The exported files of a deleted document are useless."
+    cache = get_export_cache()
+
+    if cache is not None:
+        cache.clear(instance.id)
+
+
 _WORKFLOWS = {
     Invoice: workflow.transform_target_into_customer,
     Quote: workflow.transform_target_into_prospect,
@@ -5,6 +5,8 @@ from json import dumps as json_dump
 from pathlib import Path
 from shutil import which
 from unittest import skipIf
+from unittest.mock import patch
+from zipfile import ZipFile
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
@@ -14,7 +16,9 @@ from django.utils.formats import date_format
 from django.utils.translation import gettext as _
 
 from creme.billing.bricks import BillingExportersBrick
+from creme.billing.creme_jobs import batch_export_type
 from creme.billing.exporters import BillingExportEngineManager, ExporterFlavour
+from creme.billing.exporters.cache import ExportCache, get_export_cache
 from creme.billing.exporters.latex import LatexExportEngine, LatexExporter
 from creme.billing.exporters.xls import XLSExportEngine, XLSExporter
 from creme.billing.models import (
@@ -24,7 +28,18 @@ from creme.billing.models import (
     SettlementTerms,
 )
 from creme.creme_core.auth.entity_credentials import EntityCredentials
-from creme.creme_core.models import FileRef, SetCredentials, Vat
+from creme.creme_core.core.entity_filter import operators
+from creme.creme_core.core.entity_filter.condition_handler import (
+    RegularFieldConditionHandler,
+)
+from creme.creme_core.models import (
+    EntityFilter,
+    EntityJobResult,
+    FileRef,
+    Job,
+    SetCredentials,
+    Vat,
+)
 from creme.creme_core.tests.forms.base import FieldTestCase
 from creme.creme_core.tests.views.base import BrickTestCaseMixin
 from creme.creme_core.utils.xlrd_utils import XlrdReader
@@ -1548,3 +1563,355 @@ class ExportTestCase(BrickTestCaseMixin, _BillingTestCase):
             content_type=invoice.entity_type,
         ).update(engine_id=LatexExportEngine.id)
         self.assertGET403(self._build_export_url(invoice))
+
+    def _configure_xls(self, model):
+        ExporterConfigItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+        ).update(engine_id=XLSExportEngine.id)
+
+    def _export_fileref(self, entity):
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+
+        response = self.assertGET200(self._build_export_url(entity), follow=True)
+        b''.join(response.streaming_content)
+
+        filerefs = FileRef.objects.exclude(id__in=existing_fileref_ids)
+        self.assertEqual(1, len(filerefs))
+
+        return filerefs[0]
+
+    @skipIfCustomInvoice
+    @skipIfCustomProductLine
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'],
+        BILLING_EXPORT_CACHE=True,
+    )
+    def test_export_cache01(self):
+        "Exporter which returns a FileRef."
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('My Invoice', discount=0)[0]
+        self._configure_xls(Invoice)
+
+        create_line = partial(
+            ProductLine.objects.create,
+            user=user, related_document=invoice,
+        )
+        create_line(on_the_fly_item='Fly 10', unit_price=Decimal('10'))
+
+        fileref1 = self._export_fileref(invoice)
+        cache_dir = Path(ExportCache().dir_path, str(invoice.id))
+        cached_names1 = {p.name for p in cache_dir.iterdir()}
+        self.assertEqual(2, len(cached_names1))
+
+        # Cache is used ---
+        with patch.object(XLSExporter, 'export', side_effect=AssertionError):
+            fileref2 = self._export_fileref(invoice)
+
+        self.assertTrue(fileref2.temporary)
+        self.assertEqual(user, fileref2.user)
+        self.assertEqual(fileref1.basename, fileref2.basename)
+
+        path1 = Path(fileref1.filedata.path)
+        path2 = Path(fileref2.filedata.path)
+        self.assertNotEqual(path1, path2)
+        self.assertEqual(Path(settings.MEDIA_ROOT, 'billing'), path2.parent)
+        self.assertEqual(path1.read_bytes(), path2.read_bytes())
+
+        # Cached file removed by a concurrent export ---
+        get_cached = ExportCache.get
+
+        def get_n_remove(this, entity, key):
+            cached = get_cached(this, entity, key)
+            Path(cached.path).unlink()
+
+            return cached
+
+        billing_names = {p.name for p in path2.parent.iterdir()}
+
+        with patch.object(ExportCache, 'get', get_n_remove):
+            fileref3 = self._export_fileref(invoice)
+
+        path3 = Path(fileref3.filedata.path)
+        self.assertEqual(fileref1.basename, fileref3.basename)
+        self.assertTrue(path3.read_bytes())
+        self.assertSetEqual(
+            {*billing_names, path3.name}, {p.name for p in path3.parent.iterdir()},
+        )
+        self.assertSetEqual(cached_names1, {p.name for p in cache_dir.iterdir()})
+
+        # Document has changed ---
+        create_line(on_the_fly_item='Fly 20', unit_price=Decimal('20'))
+        invoice = self.refresh(invoice)
+
+        self._export_fileref(invoice)
+
+        # NB: the old files have been removed
+        cached_names2 = {p.name for p in cache_dir.iterdir()}
+        self.assertEqual(2, len(cached_names2))
+        self.assertFalse(cached_names1 & cached_names2)
+
+        # Deletion ---
+        invoice.delete()
+        self.assertFalse(cache_dir.exists())
+
+    @skipIfCustomInvoice
+    @skipIf(xhtml2pdf_not_installed, '"xhtml2pdf" is not installed.')
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xhtml2pdf.Xhtml2pdfExportEngine'],
+        BILLING_EXPORT_CACHE=True,
+    )
+    def test_export_cache02(self):
+        "Exporter which returns a HttpResponse."
+        self.login()
+        invoice = self.create_invoice_n_orgas('My Invoice', discount=0)[0]
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(
+            engine_id=Xhtml2pdfExportEngine.id,
+            flavour_id='FR/fr_FR/cappuccino',
+        )
+
+        url = self._build_export_url(invoice)
+        response1 = self.assertGET200(url)
+        self.assertEqual('application/pdf', response1['Content-Type'])
+
+        with patch.object(Xhtml2pdfExporter, 'export', side_effect=AssertionError):
+            response2 = self.assertGET200(url)
+
+        self.assertEqual('application/pdf', response2['Content-Type'])
+        self.assertEqual(
+            response1['Content-Disposition'], response2['Content-Disposition'],
+        )
+        self.assertEqual(response1.content, response2.content)
+
+    @skipIfCustomAddress
+    @skipIfCustomInvoice
+    def test_export_cache_key(self):
+        user = self.login()
+        invoice, source, target = self.create_invoice_n_orgas('My Invoice', discount=0)
+
+        exporter = XLSExportEngine(Invoice).exporter(flavour=ExporterFlavour.agnostic())
+        cache = ExportCache()
+        build_key = partial(cache.build_key, exporter=exporter)
+
+        key1 = build_key(entity=invoice)
+        self.assertIsInstance(key1, str)
+        self.assertEqual(key1, build_key(entity=self.refresh(invoice)))
+
+        # Address
+        source.billing_address = address = Address.objects.create(
+            owner=source, name='Billing address', city='Suna',
+        )
+        source.save()
+
+        invoice = self.refresh(invoice)
+        key2 = build_key(entity=invoice)
+        self.assertNotEqual(key1, key2)
+
+        address.city = 'Konoha'
+        address.save()
+        key3 = build_key(entity=self.refresh(invoice))
+        self.assertNotEqual(key2, key3)
+
+        # Line
+        ProductLine.objects.create(
+            user=user, related_document=invoice, on_the_fly_item='Fly',
+        )
+        self.assertNotEqual(key3, build_key(entity=self.refresh(invoice)))
+
+        # Other exporter
+        other_exporter = OnlyInvoiceExportEngine(Invoice).exporter(
+            flavour=ExporterFlavour('FR', 'fr_FR', 'basic'),
+        )
+        self.assertNotEqual(
+            build_key(entity=invoice),
+            cache.build_key(exporter=other_exporter, entity=invoice),
+        )
+
+    @skipIfCustomInvoice
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'],
+        BILLING_EXPORT_CACHE=False,
+    )
+    def test_export_cache_disabled(self):
+        self.login()
+        invoice = self.create_invoice_n_orgas('My Invoice', discount=0)[0]
+        self._configure_xls(Invoice)
+
+        self.assertIsNone(get_export_cache())
+
+        with patch.object(ExportCache, 'export', side_effect=AssertionError):
+            self._export_fileref(invoice)
+
+
+@skipIfCustomOrganisation
+@skipIfCustomInvoice
+@override_settings(
+    BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'],
+    BILLING_EXPORT_WORKERS=1,
+)
+class BatchExportTestCase(_BillingTestCase):
+    @staticmethod
+    def _build_batch_url(model):
+        return reverse(
+            'billing__batch_export',
+            args=(ContentType.objects.get_for_model(model).id,),
+        )
+
+    @staticmethod
+    def _configure_xls(engine_id=XLSExportEngine.id):
+        ExporterConfigItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Invoice),
+        ).update(engine_id=engine_id)
+
+    def _create_job(self, efilter_id=''):
+        response = self.client.post(
+            self._build_batch_url(Invoice), follow=True,
+            data={'filter': efilter_id},
+        )
+        self.assertNoFormError(response)
+
+        job = self.get_object_or_fail(Job, type_id=batch_export_type.id)
+        self.assertRedirects(response, job.get_absolute_url())
+
+        return job
+
+    def test_creation(self):
+        user = self.login()
+        url = self._build_batch_url(Invoice)
+        response = self.assertGET200(url)
+        self.assertTemplateUsed(response, 'creme_core/generics/blockform/add.html')
+
+        job = self._create_job()
+        self.assertEqual(user, job.user)
+        self.assertEqual(Job.STATUS_WAIT, job.status)
+        self.assertDictEqual(
+            {'ctype': ContentType.objects.get_for_model(Invoice).id},
+            job.data,
+        )
+        self.assertListEqual(
+            [_('Entity type: {}').format('Facture')],
+            batch_export_type.get_description(job),
+        )
+
+    def test_creation_bad_ctype(self):
+        self.login()
+        self.assertGET409(self._build_batch_url(Organisation))
+
+    def test_creation_app_perm(self):
+        self.login(is_superuser=False, allowed_apps=['persons'])
+        self.assertGET403(self._build_batch_url(Invoice))
+
+    def test_execution(self):
+        self.login()
+        invoice1 = self.create_invoice_n_orgas('Invoice #1', discount=0)[0]
+        invoice2 = self.create_invoice_n_orgas('Invoice #2', discount=0)[0]
+        self._configure_xls()
+
+        job = self._create_job()
+        batch_export_type.execute(job)
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_OK, job.status)
+        self.assertEqual(2, job.data.get('total'))
+        self.assertEqual(2, job.data.get('processed'))
+
+        file_ref = self.get_object_or_fail(FileRef, id=job.data.get('file_ref'))
+        self.assertEqual(self.user, file_ref.user)
+
+        with ZipFile(file_ref.filedata.path) as zip_file:
+            self.assertCountEqual(
+                [
+                    f"{_('Invoice')}_{invoice1.id}.xls",
+                    f"{_('Invoice')}_{invoice2.id}.xls",
+                ],
+                zip_file.namelist(),
+            )
+
+        self.assertListEqual(
+            [
+                '<a href="{url}">{label}</a>'.format(
+                    url=file_ref.get_download_absolute_url(),
+                    label=_('Download the file «{}»').format(file_ref.basename),
+                ),
+            ],
+            batch_export_type.get_stats(job),
+        )
+
+        progress = batch_export_type.progress(job)
+        self.assertEqual(100, progress.percentage)
+
+    def test_execution_filter(self):
+        self.login()
+        invoice1 = self.create_invoice_n_orgas('Invoice #1', discount=0)[0]
+        self.create_invoice_n_orgas('Other', discount=0)
+        self._configure_xls()
+
+        efilter = EntityFilter.objects.smart_update_or_create(
+            'billing-test_batch_export', 'Contains "Invoice"',
+            Invoice, is_custom=True,
+            conditions=[
+                RegularFieldConditionHandler.build_condition(
+                    model=Invoice, field_name='name',
+                    operator=operators.CONTAINS, values=['Invoice'],
+                ),
+            ],
+        )
+
+        job = self._create_job(efilter_id=efilter.id)
+        self.assertEqual(efilter.id, job.data.get('efilter'))
+
+        batch_export_type.execute(job)
+
+        file_ref = self.get_object_or_fail(FileRef, id=self.refresh(job).data.get('file_ref'))
+        with ZipFile(file_ref.filedata.path) as zip_file:
+            self.assertListEqual(
+                [f"{_('Invoice')}_{invoice1.id}.xls"],
+                zip_file.namelist(),
+            )
+
+    def test_execution_errors(self):
+        self.login()
+        invoice = self.create_invoice_n_orgas('Invoice #1', discount=0)[0]
+        self._configure_xls()
+
+        job = self._create_job()
+
+        with patch.object(XLSExporter, 'fill', side_effect=ValueError('Invalid data')):
+            batch_export_type.execute(job)
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_OK, job.status)
+
+        jresults = EntityJobResult.objects.filter(job=job)
+        self.assertEqual(1, len(jresults))
+
+        jresult = jresults[0]
+        self.assertEqual(invoice.id, jresult.entity_id)
+        self.assertListEqual(
+            [
+                _('The document cannot be exported'),
+                _('Original error: {}').format('Invalid data'),
+            ],
+            jresult.messages,
+        )
+
+        file_ref = self.get_object_or_fail(FileRef, id=job.data.get('file_ref'))
+        with ZipFile(file_ref.filedata.path) as zip_file:
+            self.assertListEqual([], zip_file.namelist())
+
+    def test_execution_not_configured(self):
+        self.login()
+        self._configure_xls(engine_id='')
+
+        job = self._create_job()
+        batch_export_type.execute(job)
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_ERROR, job.status)
+        self.assertEqual(
+            _('The exporter is not configured ; '
+              'go to the configuration of the app «Billing».'),
+            job.error,
+        )
@@ -1,6 +1,7 @@
 from decimal import Decimal
 from functools import partial
 from json import dumps as json_dump
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
@@ -1363,6 +1364,138 @@ class LineTestCase(_BillingTestCase):
         # 0.016 rounded up to 0.02
         self.assertEqual(Decimal('0.02'), product_line.get_price_exclusive_of_tax())
 
+    @skipIfCustomProductLine
+    @skipIfCustomServiceLine
+    def test_totals(self):
+        "Totals are computed from the values of the lines (without building the lines)."
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('Invoice0001', discount=10)[0]
+
+        create_vat = Vat.objects.get_or_create
+        vat1 = create_vat(value=Decimal('20.00'))[0]
+        vat2 = create_vat(value=Decimal('5.50'))[0]
+
+        kwargs = {'user': user, 'related_document': invoice}
+        lines = [
+            ProductLine.objects.create(
+                on_the_fly_item='Product #1',
+                unit_price=Decimal('100.05'), quantity=Decimal('3'), vat_value=vat1,
+                discount=Decimal('12.5'), discount_unit=ProductLine.Discount.PERCENT,
+                **kwargs
+            ),
+            ProductLine.objects.create(
+                on_the_fly_item='Product #2',
+                unit_price=Decimal('33.33'), quantity=Decimal('2'), vat_value=vat2,
+                discount=Decimal('5'), discount_unit=ProductLine.Discount.LINE_AMOUNT,
+                **kwargs
+            ),
+            ServiceLine.objects.create(
+                on_the_fly_item='Service #1',
+                unit_price=Decimal('10.01'), quantity=Decimal('7'), vat_value=vat1,
+                discount=Decimal('1.5'), discount_unit=ServiceLine.Discount.ITEM_AMOUNT,
+                **kwargs
+            ),
+        ]
+
+        invoice = self.refresh(invoice)
+        lines = [self.refresh(line) for line in lines]
+        self.assertEqual(
+            sum(line.get_price_exclusive_of_tax(invoice) for line in lines),
+            invoice.total_no_vat,
+        )
+        self.assertEqual(
+            sum(line.get_price_inclusive_of_tax(invoice) for line in lines),
+            invoice.total_vat,
+        )
+
+        # One query per class of line
+        invoice.invalidate_cache()
+        with self.assertNumQueries(2):
+            invoice._get_lines_totals()
+
+    @skipIfCustomProductLine
+    @skipIfCustomServiceLine
+    def test_save_lines(self):
+        "The document is saved once."
+        user = self.login()
+        invoice, source, target = self.create_invoice_n_orgas('Invoice0001')
+        invoice2 = self.create_invoice('Invoice0002', source, target, user=user)
+
+        line1 = ProductLine.objects.create(
+            user=user, related_document=invoice, on_the_fly_item='Product #1',
+            unit_price=Decimal('10'), quantity=Decimal('1'),
+        )
+        line1 = self.refresh(line1)
+        line1.quantity = Decimal('2')
+
+        line2 = ProductLine(
+            user=user, on_the_fly_item='Product #2',
+            unit_price=Decimal('20'), quantity=Decimal('1'),
+        )
+        line3 = ServiceLine(
+            user=user, on_the_fly_item='Service #1',
+            unit_price=Decimal('5'), quantity=Decimal('3'),
+        )
+
+        invoice = self.refresh(invoice)
+        with patch.object(Invoice, 'save', autospec=True, side_effect=Invoice.save) as save_mock:
+            invoice.save_lines([line1, line2, line3])
+
+        save_mock.assert_called_once()
+        self.assertFalse(invoice.totals_deferred)
+
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('55.00'), invoice.total_no_vat)
+        self.assertCountEqual(
+            [line1.id, line2.id], [line.id for line in invoice.get_lines(ProductLine)],
+        )
+        self.assertEqual(Decimal('2.00'), self.refresh(line1).quantity)
+        self.assertEqual(invoice, self.refresh(line3).related_document)
+
+        # Line of another document
+        other_line = ProductLine.objects.create(
+            user=user, related_document=invoice2, on_the_fly_item='Product #3',
+            unit_price=Decimal('10'), quantity=Decimal('1'),
+        )
+        with self.assertRaises(ValueError):
+            invoice.save_lines([self.refresh(other_line)])
+
+    @skipIfCustomProductLine
+    def test_deferred_totals(self):
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('Invoice0001')[0]
+
+        create_line = partial(
+            ProductLine.objects.create,
+            user=user, related_document=invoice,
+            unit_price=Decimal('10'), quantity=Decimal('1'),
+        )
+
+        with invoice.deferred_totals():
+            self.assertTrue(invoice.totals_deferred)
+
+            create_line(on_the_fly_item='Product #1')
+            create_line(on_the_fly_item='Product #2')
+            self.assertEqual(Decimal('0'), self.refresh(invoice).total_no_vat)
+
+        self.assertFalse(invoice.totals_deferred)
+        self.assertEqual(Decimal('20.00'), self.refresh(invoice).total_no_vat)
+
+        # Not saved
+        with invoice.deferred_totals(save=False):
+            create_line(on_the_fly_item='Product #3')
+
+        self.assertEqual(Decimal('20.00'), self.refresh(invoice).total_no_vat)
+
+        # Error => totals not updated
+        with self.assertRaises(ValueError):
+            with invoice.deferred_totals():
+                create_line(on_the_fly_item='Product #4')
+                raise ValueError('Rollback')
+
+        self.assertFalse(invoice.totals_deferred)
+        self.assertEqual(3, len(self.refresh(invoice).get_lines(ProductLine)))
+
     @skipIfCustomProductLine
     def test_inneredit(self):
         user = self.login()
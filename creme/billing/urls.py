@@ -26,6 +26,11 @@ urlpatterns = [
         export.Export.as_view(),
         name='billing__export',
     ),
+    re_path(
+        r'^export/batch/(?P<ct_id>\d+)[/]?$',
+        export.BatchExport.as_view(),
+        name='billing__batch_export',
+    ),
 
     re_path(r'^payment_information/', include([
         re_path(
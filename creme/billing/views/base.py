@@ -26,6 +26,8 @@ from creme.billing.models import Base
 from creme.creme_core.utils import bool_from_str_extended
 from creme.creme_core.views import generic
 
+from .. import gui
+
 
 class BaseCreation(generic.EntityCreation):
     model = Base
@@ -38,6 +40,11 @@ class BaseCreation(generic.EntityCreation):
         return initial
 
 
+class BaseList(generic.EntitiesList):
+    def get_buttons(self):
+        return super().get_buttons().append(gui.BatchExportButton)
+
+
 class RelatedBaseCreation(generic.AddingInstanceToEntityPopup):
     model = Base
     permissions: str | Sequence[str] = 'billing'  # Need creation perm too
@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2021  Hybird
+#    Copyright (C) 2009-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -95,6 +95,6 @@ class CreditNoteRemoving(generic.CremeModelDeletion):
         return self.object.subject_entity.get_absolute_url()
 
 
-class CreditNotesList(generic.EntitiesList):
+class CreditNotesList(base.BaseList):
     model = CreditNote
     default_headerfilter_id = constants.DEFAULT_HFILTER_CNOTE
@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2021  Hybird
+#    Copyright (C) 2009-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,16 +18,24 @@
 
 import logging
 
+from django.conf import settings
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils.translation import gettext as _
+from django.utils.translation import gettext_lazy
 
 from creme import billing
 from creme.creme_core.core.exceptions import ConflictError
-from creme.creme_core.models import FileRef
-from creme.creme_core.views.generic import CremeModelEditionWizardPopup, base
+from creme.creme_core.models import FileRef, Job
+from creme.creme_core.views.generic import (
+    CremeModelCreation,
+    CremeModelEditionWizardPopup,
+    base,
+)
 
 from ..exporters import BillingExportEngineManager
+from ..exporters.cache import get_export_cache
 from ..forms import export as export_forms
 from ..models import ExporterConfigItem
 
@@ -100,8 +108,11 @@ class Export(base.EntityRelatedMixin, base.CheckedView):
                 'go to the configuration of the app «Billing».'
             ))
 
-        export_result = exporter.export(
-            entity=entity, user=request.user,
+        cache = get_export_cache()
+        export_result = (
+            exporter.export(entity=entity, user=request.user)
+            if cache is None else
+            cache.export(exporter=exporter, entity=entity, user=request.user)
         )
 
         if isinstance(export_result, HttpResponse):
@@ -110,3 +121,50 @@ class Export(base.EntityRelatedMixin, base.CheckedView):
         assert export_result, FileRef
 
         return HttpResponseRedirect(export_result.get_download_absolute_url())
+
+
+class BatchExport(base.EntityCTypeRelatedMixin, CremeModelCreation):
+    model = Job
+    form_class = export_forms.BatchExportForm
+    permissions = 'billing'
+    title = gettext_lazy('Export the {models} in a ZIP file')
+    submit_label = gettext_lazy('Run')
+
+    def check_related_ctype(self, ctype):
+        super().check_related_ctype(ctype)
+
+        if ctype.model_class() not in Export.entity_classes:
+            raise ConflictError('This model is not a billing document')
+
+    def get(self, *args, **kwargs):
+        if self.has_too_many_jobs():
+            return HttpResponseRedirect(reverse('creme_core__my_jobs'))
+
+        return super().get(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        if self.has_too_many_jobs():
+            return HttpResponseRedirect(reverse('creme_core__my_jobs'))
+
+        return super().post(*args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['ctype'] = self.get_ctype()
+
+        return kwargs
+
+    def get_initial(self):
+        initial = super().get_initial()
+        initial['filter'] = self.request.GET.get('efilter')
+
+        return initial
+
+    def get_title_format_data(self):
+        # NB: Job has no "creation_label"
+        return {'models': self.get_ctype().model_class()._meta.verbose_name_plural}
+
+    def has_too_many_jobs(self):
+        return Job.objects.not_finished(
+            self.request.user,
+        ).count() >= settings.MAX_JOBS_PER_USER
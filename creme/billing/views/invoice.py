@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2021  Hybird
+#    Copyright (C) 2009-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -60,7 +60,7 @@ class InvoiceEdition(generic.EntityEdition):
     pk_url_kwarg = 'invoice_id'
 
 
-class InvoicesList(generic.EntitiesList):
+class InvoicesList(base.BaseList):
     model = Invoice
     default_headerfilter_id = constants.DEFAULT_HFILTER_INVOICE
 
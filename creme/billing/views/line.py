@@ -200,7 +200,9 @@ def multi_save_lines(request, document_id):
         )
 
     # Save all formset now that we haven't detect any errors
-    for formset in formset_to_save:
-        formset.save()
+    # NB: the totals of the document are updated once
+    with b_entity.deferred_totals():
+        for formset in formset_to_save:
+            formset.save()
 
     return HttpResponse()
@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2021  Hybird
+#    Copyright (C) 2009-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -55,6 +55,6 @@ class QuoteEdition(generic.EntityEdition):
     pk_url_kwarg = 'quote_id'
 
 
-class QuotesList(generic.EntitiesList):
+class QuotesList(base.BaseList):
     model = Quote
     default_headerfilter_id = DEFAULT_HFILTER_QUOTE
@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2021  Hybird
+#    Copyright (C) 2009-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -22,6 +22,7 @@ from ... import billing
 from .. import gui
 from ..constants import DEFAULT_HFILTER_TEMPLATE
 from ..custom_forms import BTEMPLATE_EDITION_CFORM
+from . import base
 
 TemplateBase = billing.get_template_base_model()
 
@@ -38,7 +39,7 @@ class TemplateBaseEdition(generic.EntityEdition):
     pk_url_kwarg = 'template_id'
 
 
-class TemplateBasesList(generic.EntitiesList):
+class TemplateBasesList(base.BaseList):
     model = TemplateBase
     default_headerfilter_id = DEFAULT_HFILTER_TEMPLATE
 
@@ -1,4 +1,5 @@
 from functools import partial
+from unittest.mock import patch
 
 from django.apps import apps
 from django.db.models import Max
@@ -8,6 +9,7 @@ from django.urls import reverse
 from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
 
+from creme.creme_core.core.bulk_save import bulk_save_receivers
 from creme.creme_core.creme_jobs import deletor_type
 from creme.creme_core.forms.widgets import Label
 from creme.creme_core.models import (
@@ -526,6 +528,81 @@ class GenericModelConfigTestCase(CremeTestCase, BrickTestCaseMixin):
         self.assertEqual(sector1.id, self.refresh(orga1).sector_id)
         self.assertEqual(sector3.id, self.refresh(orga2).sector_id)
 
+    def test_delete_chunks(self):
+        "Instances are replaced by chunks (grouped queries)."
+        user = self.user
+        sector1 = FakeSector.objects.create(title='Bo')
+        sector2del = FakeSector.objects.create(title='Gun')
+
+        create_contact = partial(
+            FakeContact.objects.create, user=user, last_name='Turtle', sector=sector2del,
+        )
+        contacts = [
+            create_contact(first_name='Donatello'),
+            create_contact(first_name='Leonardo'),
+            create_contact(first_name='Michelangelo'),
+        ]
+        orga = FakeOrganisation.objects.create(user=user, name='Foot clan', sector=sector2del)
+
+        response = self.assertPOST200(
+            reverse(
+                'creme_config__delete_instance',
+                args=('creme_core', 'fake_sector', sector2del.pk),
+            ),
+            data={
+                'replace_creme_core__fakecontact_sector': sector1.id,
+                'replace_creme_core__fakeorganisation_sector': sector1.id,
+            },
+        )
+        self.assertNoFormError(response)
+
+        job = self.get_object_or_fail(Job, type_id=deletor_type.id)
+        self.assertTrue(deletor_type._can_replace_in_bulk(FakeContact._meta.get_field('sector')))
+
+        bulk_saved = []
+
+        def _receiver(sender, instance, **kwargs):
+            pass
+
+        def _bulk_handler(model, instances):
+            bulk_saved.append((model, [i.id for i in instances], instances[0].sector_id))
+
+        bulk_save_receivers.register(_receiver, _bulk_handler)
+
+        try:
+            with patch.object(deletor_type, 'chunk_size', 2):
+                deletor_type.execute(job)
+        finally:
+            bulk_save_receivers.unregister(_receiver)
+
+        self.assertDoesNotExist(sector2del)
+
+        dcom = self.get_object_or_fail(DeletionCommand, job=job)
+        self.assertEqual(4, dcom.total_count)
+        self.assertEqual(4, dcom.updated_count)
+
+        for entity in [*contacts, orga]:
+            refreshed = self.refresh(entity)
+            self.assertEqual(sector1.id, refreshed.sector_id)
+            self.assertGreater(refreshed.modified, entity.modified)
+
+            hline = HistoryLine.objects.filter(entity=entity.id).order_by('-id').first()
+            self.assertIsNotNone(hline)
+            self.assertEqual(TYPE_EDITION, hline.type)
+            self.assertListEqual(
+                [['sector', sector2del.id, sector1.id]], hline.modifications,
+            )
+
+        # The receivers for all models are notified for each chunk
+        self.assertCountEqual(
+            [
+                (FakeContact, [contacts[0].id, contacts[1].id], sector1.id),
+                (FakeContact, [contacts[2].id], sector1.id),
+                (FakeOrganisation, [orga.id], sector1.id),
+            ],
+            bulk_saved,
+        )
+
     def test_delete05(self):
         "CASCADE."
         create_prod_type = FakeProductType.objects.create
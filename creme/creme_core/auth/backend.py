@@ -28,6 +28,22 @@ _EXPORT_PREFIX = 'export_'
 class EntityBackend(ModelBackend):
     supports_object_permissions = True
 
+    def get_user(self, user_id):
+        user = super().get_user(user_id)
+
+        if user is not None and user.role_id:
+            from ..models.auth import get_credentials_cache
+
+            creds_cache = get_credentials_cache()
+
+            if creds_cache is not None:
+                role = creds_cache.get_role(user.role_id)
+
+                if role is not None:
+                    user.role = role
+
+        return user
+
     def has_perm(self, user_obj, perm, obj=None):
         if perm == STAFF_PERM:
             return user_obj.is_staff
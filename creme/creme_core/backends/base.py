@@ -16,6 +16,10 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
+from typing import Iterable
+
 from django.http.response import HttpResponseBase
 
 
@@ -72,3 +76,28 @@ class ExportBackend:
               instance of <django.contrib.auth.get_user_model()>.
         """
         raise NotImplementedError
+
+    def export(self,
+               rows: Iterable[list],
+               filename: str,
+               user,
+               streaming: bool = False,
+               ) -> HttpResponseBase:
+        """Write all the rows & build the response.
+        The default implementation calls writerow() for each row, then save().
+        @param rows: Iterable of rows (see writerow()) ; it's consumed lazily,
+               so it can be a generator.
+        @param filename: see save().
+        @param user: see save().
+        @param streaming: If <True>, the backend is allowed to consume the
+               rows only when the response is sent, in order to keep the
+               used memory bounded (see <django.http.StreamingHttpResponse>).
+        @return: The response (i.e. the attribute "response").
+        """
+        writerow = self.writerow
+        for row in rows:
+            writerow(row)
+
+        self.save(filename, user)
+
+        return self.response
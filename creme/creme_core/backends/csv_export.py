@@ -18,13 +18,19 @@
 
 import csv
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.defaultfilters import slugify
 from django.utils.translation import gettext_lazy as _
 
 from .base import ExportBackend
 
 
+class _Echo:
+    "Pseudo-buffer for csv.writer ; writerow() just returns the formatted line."
+    def write(self, value):
+        return value
+
+
 class CSVExportBackend(ExportBackend):
     id = 'csv'
     verbose_name = _("CSV File (delimiter: ',')")
@@ -45,6 +51,23 @@ class CSVExportBackend(ExportBackend):
     def save(self, filename, user):
         self.response['Content-Disposition'] = f'attachment; filename="{slugify(filename)}.csv"'
 
+    def export(self, rows, filename, user, streaming=False):
+        if not streaming:
+            return super().export(rows=rows, filename=filename, user=user)
+
+        writerow = csv.writer(
+            _Echo(),
+            quoting=csv.QUOTE_ALL,
+            delimiter=self.delimiter,
+        ).writerow
+        self.response = StreamingHttpResponse(
+            (writerow(row) for row in rows),
+            content_type='text/csv',
+        )
+        self.save(filename, user)
+
+        return self.response
+
 
 class SemiCSVExportBackend(CSVExportBackend):
     id = 'scsv'
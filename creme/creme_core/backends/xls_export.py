@@ -16,7 +16,9 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+import shutil
 from os.path import basename, join
+from tempfile import TemporaryFile
 
 from django.conf import settings
 from django.http import HttpResponseRedirect
@@ -25,6 +27,7 @@ from django.utils.translation import gettext_lazy as _
 
 from ..models import FileRef
 from ..utils.file_handling import FileCreator
+from ..utils.xlsx_utils import XlsxWriter
 from ..utils.xlwt_utils import XlwtWriter
 from .base import ExportBackend
 
@@ -38,9 +41,12 @@ class XLSExportBackend(ExportBackend):
     def __init__(self, encoding='utf-8'):
         super().__init__()
         self.dir_path = join(settings.MEDIA_ROOT, *self.dir_parts)
-        self.writer = XlwtWriter(encoding=encoding)
+        self.writer = self._build_writer(encoding=encoding)
 
-    def save(self, filename, user):
+    def _build_writer(self, encoding):
+        return XlwtWriter(encoding=encoding)
+
+    def _create_fileref(self, filename, user):
         name = f'{slugify(filename)}.{self.id}'
         path = FileCreator(dir_path=self.dir_path, name=name).create()
         fileref = FileRef.objects.create(
@@ -52,7 +58,46 @@ class XLSExportBackend(ExportBackend):
             ),
         )
         self.response = HttpResponseRedirect(fileref.get_download_absolute_url())
-        self.writer.save(path)
+
+        return path
+
+    def save(self, filename, user):
+        self.writer.save(self._create_fileref(filename, user))
 
     def writerow(self, row):
         self.writer.writerow(row)
+
+
+class XLSXExportBackend(XLSExportBackend):
+    """Export to the format .xlsx (Excel 2007+).
+    Contrarily to XLSExportBackend, the rows are not kept in memory (they are
+    written in a temporary file as soon as they are given), so this backend is
+    suitable for big exports.
+    """
+    id = 'xlsx'
+    verbose_name = _('XLSX File')
+    help_text = ''
+
+    def __init__(self):
+        self._tmp_file = TemporaryFile()
+        super().__init__()
+
+    def _build_writer(self, encoding):
+        return XlsxWriter(self._tmp_file)
+
+    def export(self, rows, filename, user, streaming=False):
+        # NB: the temporary file is closed even if the rows cannot be retrieved
+        try:
+            return super().export(rows=rows, filename=filename, user=user, streaming=streaming)
+        finally:
+            self._tmp_file.close()
+
+    def save(self, filename, user):
+        path = self._create_fileref(filename, user)
+
+        with self._tmp_file as tmp_file:
+            self.writer.close()
+            tmp_file.seek(0)
+
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(tmp_file, f)
@@ -228,6 +228,10 @@ class BatchAction:
                 )
             ) from e
 
+    @property
+    def field_name(self) -> str:
+        return self._field_name
+
     def __call__(self, entity: CremeEntity) -> bool:
         """The action's operator is computed with the given entity
         (on the field indicated by action-field and using the action-value),
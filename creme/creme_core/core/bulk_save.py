@@ -0,0 +1,164 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Some code saves instances with grouped queries (QuerySet.update(),
+QuerySet.bulk_update()...) ; the signals 'pre_save' & 'post_save' are not sent.
+
+The receivers of these signals which listen all the senders (i.e. which are not
+specific to a model) must be registered in <bulk_save_receivers> ; if a
+receiver is not registered, the instances are saved one by one (see
+creme_core.utils.db.has_specific_save_logic()).
+
+The receivers specific to a model & the overridden methods "save()" can declare
+the fields they depend on (see BulkSaveReceiversRegistry.register_fields()) ;
+so the instances can be saved with grouped queries when none of these fields
+is modified (or when a handler does the work for the saved instances).
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, List, Type
+
+from django.db.models import Model
+from django.db.models.signals import post_save, pre_save
+from django.dispatch.dispatcher import _make_id
+
+BulkHandler = Callable[[Type[Model], List[Model]], None]
+
+
+class BulkSaveReceiversRegistry:
+    """Registry of the receivers of 'pre_save'/'post_save' which listen all
+    the senders & which can be skipped when instances are saved with grouped
+    queries.
+    """
+    def __init__(self):
+        self._handlers: dict = {}
+        self._fields: dict = {}
+
+    def register(self, receiver: Callable, handler: BulkHandler | None = None,
+                 ) -> BulkSaveReceiversRegistry:
+        """Register a receiver.
+        @param receiver: Function connected to the signal 'pre_save' or 'post_save'.
+        @param handler: Function called with the arguments (model, instances)
+               after some instances have been saved with grouped queries (see
+               <send()>) ; it does the work of the receiver for these instances.
+               <None> means that the code saving the instances does this work
+               itself (e.g. the history lines are created in bulk).
+        @return: The registry, to chain calls.
+        """
+        self._handlers[_make_id(receiver)] = handler
+
+        return self
+
+    def unregister(self, receiver: Callable) -> None:
+        self._handlers.pop(_make_id(receiver), None)
+
+    def is_registered(self, receiver_id) -> bool:
+        "@param receiver_id: ID of a receiver, as stored in <Signal.receivers>."
+        return receiver_id in self._handlers
+
+    def register_fields(self,
+                        function: Callable,
+                        fields: Iterable[str],
+                        handler: BulkHandler | None = None,
+                        ) -> BulkSaveReceiversRegistry:
+        """Declare the fields a specific logic depends on ; the instances can be
+        saved with grouped queries when none of these fields is modified, or
+        when a handler does the work of the logic.
+        @param function: Receiver of the signal 'pre_save' or 'post_save' which
+               is specific to a model, or overridden method "save()".
+        @param fields: Names of the fields used by the function.
+        @param handler: Function called with the arguments (model, instances)
+               after some instances have been saved with grouped queries while
+               some of these fields were modified (see <send()>).
+               <None> means that the instances must be saved one by one when
+               these fields are modified.
+        @return: The registry, to chain calls.
+        """
+        self._fields[_make_id(function)] = (frozenset(fields), handler)
+
+        return self
+
+    def unregister_fields(self, function: Callable) -> None:
+        self._fields.pop(_make_id(function), None)
+
+    def _depends_on(self, function_id, field_names: Iterable[str] | None) -> bool:
+        fields = self._fields[function_id][0]
+
+        return field_names is None or not fields.isdisjoint(field_names)
+
+    def needs_save(self, function_id, field_names: Iterable[str] | None = None) -> bool:
+        """Does a specific logic need the instances to be saved one by one?
+        @param function_id: ID of a receiver (as stored in <Signal.receivers>),
+               or of a method "save()" (see django.dispatch.dispatcher._make_id()).
+        @param field_names: Names of the modified fields ; <None> means "all fields".
+        @return: A boolean ; <True> for the functions without declared fields.
+        """
+        info = self._fields.get(function_id)
+        if info is None:
+            return True
+
+        return info[1] is None and self._depends_on(function_id, field_names)
+
+    @staticmethod
+    def _specific_function_ids(model: type[Model]) -> set:
+        "IDs of the methods save() & of the receivers specific to a model."
+        sender_id = _make_id(model)
+        ids = {
+            _make_id(klass.__dict__['save'])
+            for klass in model.__mro__ if 'save' in klass.__dict__
+        }
+        ids.update(
+            lookup_key[0]
+            for signal in (pre_save, post_save)
+            for lookup_key, *__ in signal.receivers
+            if lookup_key[1] == sender_id
+        )
+
+        return ids
+
+    def send(self,
+             model: type[Model],
+             instances: Iterable[Model],
+             field_names: Iterable[str] | None = None,
+             ) -> None:
+        """Call the handlers ; must be called after some instances have been
+        saved with grouped queries.
+        @param model: Class of the instances.
+        @param instances: Saved instances.
+        @param field_names: Names of the modified fields ; <None> means "all fields".
+        """
+        instances = [*instances]
+
+        if instances:
+            for handler in self._handlers.values():
+                if handler is not None:
+                    handler(model, instances)
+
+            specific_ids = self._specific_function_ids(model)
+
+            for function_id, (__, handler) in self._fields.items():
+                if (
+                    handler is not None
+                    and function_id in specific_ids
+                    and self._depends_on(function_id, field_names)
+                ):
+                    handler(model, instances)
+
+
+bulk_save_receivers = BulkSaveReceiversRegistry()
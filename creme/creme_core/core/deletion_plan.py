@@ -0,0 +1,258 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Planning of the deletion of many entities (e.g. when the trash is emptied).
+
+The entities which reference (with a ForeignKey) other deleted entities have
+to be deleted first: with models.PROTECT the referenced entity could not be
+deleted, & with models.CASCADE the referencing entity would be deleted by the
+Django's collector (i.e. without the method CremeEntity.delete(), so its
+relationships would block the deletion).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Type
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+from ..models import CremeEntity, Relation
+
+logger = logging.getLogger(__name__)
+
+# Key: model ; value: IDs of entities
+EntityIds = Dict[Type[CremeEntity], List[int]]
+
+
+class DeletionPlan:
+    """Order the deletion of some entities.
+
+    The entities are regrouped in layers ; the entities of a layer can be
+    deleted when the entities of the previous layers have been deleted
+    (entities which are in a cycle of references are in the last layer).
+    The plan can be split in independent groups of models (see groups()),
+    which can be processed concurrently.
+
+    Example:
+        plan = DeletionPlan({FakeContact: [12, 13], FakeOrganisation: [14]})
+
+        for layer in plan.layers:
+            for model, entity_ids in layer.items():
+                [...]
+    """
+    # Behaviours of ForeignKeys which do not need an order of deletion
+    ignored_on_delete = (models.SET_NULL, models.SET_DEFAULT, models.DO_NOTHING)
+
+    def __init__(self, entity_ids: EntityIds):
+        """Constructor.
+        @param entity_ids: Dictionary <model: IDs of the entities to delete>.
+        """
+        self._entity_ids = {
+            model: [*ids] for model, ids in entity_ids.items() if ids
+        }
+        self._model_per_id = {
+            entity_id: model
+            for model, ids in self._entity_ids.items()
+            for entity_id in ids
+        }
+        # Key: ID of a referenced entity ; value: IDs of the referencing entities
+        self._referencing_ids: defaultdict[int, set[int]] = defaultdict(set)
+        self._build_references()
+
+        self._layers: list[EntityIds] | None = None
+
+    def __bool__(self):
+        return bool(self._entity_ids)
+
+    def __len__(self):
+        return len(self._model_per_id)
+
+    def __repr__(self):
+        return 'DeletionPlan({})'.format(
+            ', '.join(f'{model.__name__}: {len(ids)}' for model, ids in self._entity_ids.items())
+        )
+
+    @classmethod
+    def dependency_fields(cls, model: type[CremeEntity]) -> Iterator[models.ForeignKey]:
+        "Get the ForeignKeys of a model which reference entities & need an order of deletion."
+        for field in model._meta.concrete_fields:
+            if not (field.many_to_one or field.one_to_one):
+                continue
+
+            remote_field = field.remote_field
+
+            if (
+                not remote_field.parent_link
+                and issubclass(remote_field.model, CremeEntity)
+                and remote_field.on_delete not in cls.ignored_on_delete
+            ):
+                yield field
+
+    def _build_references(self) -> None:
+        model_per_id = self._model_per_id
+        referencing_ids = self._referencing_ids
+
+        for model in self._entity_ids.keys():
+            for field in self.dependency_fields(model):
+                # NB: only the references between deleted entities are interesting
+                for entity_id, referenced_id in model._default_manager.filter(
+                    is_deleted=True,
+                    **{f'{field.name}__is_deleted': True},
+                ).values_list('id', field.attname):
+                    if entity_id in model_per_id and referenced_id in model_per_id:
+                        referencing_ids[referenced_id].add(entity_id)
+
+    @property
+    def entity_ids(self) -> EntityIds:
+        return self._entity_ids
+
+    @property
+    def layers(self) -> list[EntityIds]:
+        "Layers of entities (see the class' docstring)."
+        layers = self._layers
+
+        if layers is None:
+            self._layers = layers = []
+            model_per_id = self._model_per_id
+            referencing_ids = self._referencing_ids
+
+            # Number of (not deleted yet) entities which reference an entity
+            pending_count = {
+                entity_id: len(referencing_ids.get(entity_id, ()))
+                for entity_id in model_per_id.keys()
+            }
+            referenced_ids = defaultdict(list)
+            for referenced_id, ids in referencing_ids.items():
+                for entity_id in ids:
+                    referenced_ids[entity_id].append(referenced_id)
+
+            current_ids = sorted(
+                entity_id for entity_id, count in pending_count.items() if not count
+            )
+
+            while current_ids:
+                layer = defaultdict(list)
+                next_ids = []
+
+                for entity_id in current_ids:
+                    layer[model_per_id[entity_id]].append(entity_id)
+                    del pending_count[entity_id]
+
+                    for referenced_id in referenced_ids.get(entity_id, ()):
+                        count = pending_count[referenced_id] - 1
+                        pending_count[referenced_id] = count
+
+                        if not count:
+                            next_ids.append(referenced_id)
+
+                layers.append(dict(layer))
+                current_ids = sorted(next_ids)
+
+            if pending_count:
+                logger.warning(
+                    'DeletionPlan: %s entities are in a cycle of references',
+                    len(pending_count),
+                )
+
+                layer = defaultdict(list)
+                for entity_id in sorted(pending_count.keys()):
+                    layer[model_per_id[entity_id]].append(entity_id)
+
+                layers.append(dict(layer))
+
+        return layers
+
+    def _linked_models(self) -> Iterator[tuple[type[CremeEntity], type[CremeEntity]]]:
+        model_per_id = self._model_per_id
+
+        for referenced_id, ids in self._referencing_ids.items():
+            model = model_per_id[referenced_id]
+
+            for entity_id in ids:
+                yield model, model_per_id[entity_id]
+
+        # NB: the relationships are deleted with their subject & their object,
+        #     so these entities should not be deleted concurrently.
+        get_ct = ContentType.objects.get_for_model
+        get_model = {
+            get_ct(model).id: model for model in self._entity_ids.keys()
+        }.get
+        for subject_ctype_id, object_ctype_id in Relation.objects.filter(
+            subject_entity__is_deleted=True, object_entity__is_deleted=True,
+        ).values_list(
+            'subject_entity__entity_type', 'object_entity__entity_type',
+        ).distinct():
+            model1 = get_model(subject_ctype_id)
+            model2 = get_model(object_ctype_id)
+
+            if model1 is not None and model2 is not None:
+                yield model1, model2
+
+    def groups(self) -> list[DeletionPlan]:
+        """Split the plan in independent plans ; the entities of a plan do not
+        reference the entities of the other plans (so they can be deleted
+        concurrently).
+        """
+        # Union-find of models
+        parents = {model: model for model in self._entity_ids.keys()}
+
+        def find(model):
+            while parents[model] is not model:
+                parents[model] = model = parents[parents[model]]
+
+            return model
+
+        for model1, model2 in self._linked_models():
+            root1 = find(model1)
+            root2 = find(model2)
+
+            if root1 is not root2:
+                parents[root2] = root1
+
+        grouped_models = defaultdict(list)
+        for model in self._entity_ids.keys():
+            grouped_models[find(model)].append(model)
+
+        if len(grouped_models) == 1:
+            return [self]
+
+        return [
+            self._sub_plan(models_group) for models_group in grouped_models.values()
+        ]
+
+    def _sub_plan(self, models_group: Iterable[type[CremeEntity]]) -> DeletionPlan:
+        plan = object.__new__(type(self))
+        plan._entity_ids = entity_ids = {
+            model: self._entity_ids[model] for model in models_group
+        }
+        plan._model_per_id = model_per_id = {
+            entity_id: model
+            for model, ids in entity_ids.items()
+            for entity_id in ids
+        }
+        plan._referencing_ids = defaultdict(set, {
+            referenced_id: ids
+            for referenced_id, ids in self._referencing_ids.items()
+            if referenced_id in model_per_id
+        })
+        plan._layers = None
+
+        return plan
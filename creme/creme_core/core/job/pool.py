@@ -0,0 +1,261 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from __future__ import annotations
+
+import logging
+import sys
+from subprocess import PIPE, Popen
+from typing import Iterable, TextIO
+
+from django.db import close_old_connections
+
+from creme.creme_core.global_info import clear_global_info
+from creme.creme_core.utils.system import python_subprocess
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(stream: TextIO = sys.stdin) -> None:
+    """Main loop of a worker process: the IDs of the jobs to execute are read
+    from the given stream (one ID per line), until the end of the stream.
+    Django must have been set up before.
+    """
+    from . import job_type_registry
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            job_id = int(line)
+        except ValueError:
+            logger.warning('JobWorker: invalid job ID "%s" -> ignored', line)
+            continue
+
+        try:
+            job_type_registry(job_id)
+        except Exception:
+            logger.exception('JobWorker: error when running the job id="%s"', job_id)
+        finally:
+            # The process is re-used, so we clean the job's environment
+            clear_global_info()
+            close_old_connections()
+
+
+def process_memory(pid: int) -> int | None:
+    """Get the resident memory of a process, in kilobytes.
+    @return An integer, or None if this information is not available (not Linux...).
+    """
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+
+    return None
+
+
+class JobWorker:
+    """A process where Django is already set up, which executes the jobs one
+    after the other (see run_worker()) ; so the cost of the initialisation
+    is not paid by each job.
+    """
+    script = (
+        'import django; '
+        'django.setup(); '
+        'from creme.creme_core.core.job.pool import run_worker; '
+        'run_worker()'
+    )
+
+    def __init__(self):
+        self.job_id: int | None = None  # ID of the running job
+        self.executed_jobs = 0
+        self.process: Popen = self._create_process()
+
+    def __repr__(self):
+        return f'<JobWorker pid={self.process.pid} job={self.job_id}>'
+
+    def _create_process(self) -> Popen:
+        return python_subprocess(self.script, stdin=PIPE, text=True)
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    @property
+    def is_busy(self) -> bool:
+        return self.job_id is not None
+
+    @property
+    def memory(self) -> int | None:
+        "Resident memory in kilobytes (None means 'unknown')."
+        return process_memory(self.process.pid)
+
+    def run_job(self, job_id: int) -> bool:
+        """Send a job ID to the process.
+        @return False if the process cannot receive the job.
+        """
+        stdin = self.process.stdin
+
+        try:
+            stdin.write(f'{job_id}\n')
+            stdin.flush()
+        except (OSError, ValueError) as e:  # ValueError => closed stream
+            logger.warning('JobWorker: cannot send the job id=%s to %r (%s)', job_id, self, e)
+            return False
+
+        self.job_id = job_id
+
+        return True
+
+    def end_job(self) -> None:
+        self.job_id = None
+        self.executed_jobs += 1
+
+    def stop(self, wait: bool = True) -> None:
+        "The process terminates when its current job is finished."
+        process = self.process
+
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        if wait:
+            process.wait()
+
+
+class JobWorkerPool:
+    """Pool of JobWorkers.
+
+    The workers are started in advance, & they are recycled (i.e. stopped &
+    replaced by a new worker) after a number of jobs, or when they use too
+    much memory.
+    """
+    worker_class = JobWorker
+
+    def __init__(self, size: int, max_jobs: int = 0, max_memory: int = 0):
+        """Constructor.
+        @param size: Number of workers.
+        @param max_jobs: Number of jobs executed by a worker before it's recycled ;
+               0 means "no limit".
+        @param max_memory: Memory (in kilobytes) used by a worker which causes
+               its recycling (only when it's available -- see process_memory()) ;
+               0 means "no limit".
+        """
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_memory = max_memory
+        self._workers: list[JobWorker] = []
+        self._recycled_workers: list[JobWorker] = []
+
+    def __len__(self):
+        return len(self._workers)
+
+    @property
+    def workers(self) -> Iterable[JobWorker]:
+        return iter(self._workers)
+
+    def _must_recycle(self, worker: JobWorker) -> bool:
+        max_jobs = self.max_jobs
+        if max_jobs and worker.executed_jobs >= max_jobs:
+            return True
+
+        max_memory = self.max_memory
+        if max_memory:
+            memory = worker.memory
+            if memory is not None and memory > max_memory:
+                return True
+
+        return False
+
+    def check(self) -> list[int]:
+        """Remove the dead workers, & start new workers to get the wanted size.
+        @return IDs of the jobs which were running in the dead workers
+                (i.e. the jobs which have crashed).
+        """
+        crashed_job_ids = []
+        workers = []
+
+        # Reap the processes of the recycled workers
+        self._recycled_workers = [w for w in self._recycled_workers if w.is_alive]
+
+        for worker in self._workers:
+            if worker.is_alive:
+                workers.append(worker)
+            else:
+                logger.critical(
+                    'JobWorkerPool: the worker %r died (return code: %s)',
+                    worker, worker.process.returncode,
+                )
+
+                worker.stop(wait=False)  # Release the pipe
+
+                if worker.job_id is not None:
+                    crashed_job_ids.append(worker.job_id)
+
+        create_worker = self.worker_class
+        for __ in range(self.size - len(workers)):
+            workers.append(create_worker())
+
+        self._workers = workers
+
+        return crashed_job_ids
+
+    def run_job(self, job_id: int) -> bool:
+        """Give the job to a free worker.
+        @return False if no worker is available.
+        """
+        for worker in self._workers:
+            if not worker.is_busy and worker.is_alive and worker.run_job(job_id):
+                return True
+
+        return False
+
+    def end_job(self, job_id: int) -> bool:
+        """Release the worker which was running the job.
+        @return False if the job was not run by a worker of the pool.
+        """
+        workers = self._workers
+
+        for i, worker in enumerate(workers):
+            if worker.job_id == job_id:
+                worker.end_job()
+
+                if self._must_recycle(worker):
+                    logger.info('JobWorkerPool: recycle the worker %r', worker)
+                    worker.stop(wait=False)
+
+                    # NB: check() will create a new worker
+                    del workers[i]
+                    self._recycled_workers.append(worker)
+
+                return True
+
+        return False
+
+    def stop(self) -> None:
+        "The workers terminate when their current job is finished."
+        for worker in self._workers:
+            worker.stop(wait=False)
+
+        self._workers.clear()
@@ -20,10 +20,11 @@ from __future__ import annotations
 
 import logging
 
+from django.conf import settings
 from django.utils.translation import activate
 
 from creme.creme_core.creme_jobs.base import JobType
-from creme.creme_core.global_info import set_global_info
+from creme.creme_core.global_info import PerRequestCache, set_global_info
 from creme.creme_core.models import Job
 from creme.creme_core.utils.imports import import_apps_sub_modules
 
@@ -46,7 +47,10 @@ class _JobTypeRegistry:
 
         # Configure environment
         activate(job.language)
-        set_global_info(user=job.user)
+        set_global_info(
+            user=job.user,
+            per_request_cache=PerRequestCache(max_size=settings.JOBS_CACHE_MAX_SIZE),
+        )
 
         job_type.execute(job)
 
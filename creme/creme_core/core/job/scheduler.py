@@ -36,6 +36,7 @@ from creme.creme_core.utils.system import (
     python_subprocess,
 )
 
+from .pool import JobWorkerPool
 from .queue import Command, get_queue
 
 logger = logging.getLogger(__name__)
@@ -61,11 +62,16 @@ class JobScheduler:
     The "period" of pseudo-periodic is computed each time they are run. But
     the manager runs them regularly (see settings.PSEUDO_PERIOD) in order to
     reduce the aftermath of a redis/... connection problem.
+
+    When settings.JOBMANAGER_POOL_SIZE is not 0, the jobs are preferably run
+    by a pool of processes where Django is already set up (see JobWorkerPool) ;
+    a new process is spawned only when all the workers are busy.
     """
     def __init__(self):
         self._max_user_jobs = settings.MAX_USER_JOBS
         self._queue = get_queue()
         self._procs = {}  # key: job.id; value: subprocess.Popen instance
+        self._pool = self._build_pool()
 
         # Heap, which elements are (wakeup_date, job_instance)
         #   => closer wakeup in the first element.
@@ -103,6 +109,16 @@ class JobScheduler:
         def reaches_trials_limit(self) -> bool:
             return self.trials >= 100
 
+    @staticmethod
+    def _build_pool() -> JobWorkerPool | None:
+        size = settings.JOBMANAGER_POOL_SIZE
+
+        return JobWorkerPool(
+            size=size,
+            max_jobs=settings.JOBMANAGER_POOL_MAX_JOBS,
+            max_memory=settings.JOBMANAGER_POOL_MAX_MEMORY * 1024,
+        ) if size else None
+
     def _retrieve_jobs(self) -> None:
         now_value = now()
         users_jobs = self._users_jobs
@@ -186,6 +202,10 @@ class JobScheduler:
     def _start_job(self, job: Job):
         logger.info('JobScheduler: start %s', repr(job))
 
+        pool = self._pool
+        if pool is not None and pool.run_job(job.id):
+            return
+
         self._procs[job.id] = python_subprocess(
             f'import django; '
             f'django.setup(); '
@@ -198,9 +218,25 @@ class JobScheduler:
         proc = self._procs.pop(job.id, None)
         if proc is not None:
             proc.wait()  # TODO: use return code ??
+        elif self._pool is not None:
+            self._pool.end_job(job.id)
+
+    def _check_pool(self) -> None:
+        pool = self._pool
+
+        if pool is not None:
+            for job_id in pool.check():
+                logger.critical(
+                    'JobScheduler: the job id="%s" crashed in its worker', job_id,
+                )
+                self._handle_command_end(Command(cmd_type=Command.END, data_id=job_id))
 
     def _handle_kill(self, *args):
         logger.info('Job manager stops: %d running job(s)', len(self._procs))
+
+        if self._pool is not None:
+            self._pool.stop()
+
         self._queue.destroy()
         exit()
 
@@ -336,6 +372,7 @@ class JobScheduler:
         #       (with a problem which is not a catchable) ?
         self._queue.clear()
         self._retrieve_jobs()
+        self._check_pool()
 
         enable_exit_handler(self._handle_kill)
 
@@ -382,6 +419,7 @@ class JobScheduler:
 
         while True:
             now_value = now()
+            self._check_pool()
 
             if system_jobs:
                 wakeup = system_jobs[0][0]
@@ -0,0 +1,128 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from __future__ import annotations
+
+from typing import Callable, Iterable
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .bulk_save import bulk_save_receivers
+
+
+class ModelVersions:
+    """Versions of the models ; the version of a model is changed when one of
+    its instances is saved/deleted.
+    The caches whose content depends on some models (e.g. the cache of bricks)
+    use these versions to build their keys.
+
+    Notice that changes which do not send signals (e.g. QuerySet.update())
+    must call <bump()> explicitly.
+    """
+    key_prefix = 'creme_core-model_version-'
+
+    # Models which never change the content of the caches
+    ignored_models = {'sessions.session', 'creme_core.brickstate'}
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _key(self, model: type[Model]) -> str:
+        return self.key_prefix + model._meta.label_lower
+
+    def bump(self, *models: type[Model]) -> None:
+        "Change the versions of some models (& of their parent classes)."
+        versions = {}
+
+        for model in models:
+            meta = model._meta
+
+            if meta.label_lower not in self.ignored_models:
+                # NB: the signals are only sent for the child class with
+                #     multi-table inheritance (e.g. CremeEntity).
+                for m in (model, *meta.get_parent_list()):
+                    versions[self._key(m)] = uuid4().hex
+
+        if versions:
+            self.cache.set_many(versions, None)
+
+    def get_versions(self, models: Iterable[type[Model]]) -> list[str]:
+        keys = [self._key(model) for model in models]
+        cache = self.cache
+        versions = cache.get_many(keys)
+
+        missing = {key: uuid4().hex for key in keys if key not in versions}
+        if missing:
+            cache.set_many(missing, None)
+            versions.update(missing)
+
+        return [versions[key] for key in keys]
+
+
+_cache_alias_getters: list[Callable[[], str]] = []
+
+
+def register_cache(get_alias: Callable[[], str]) -> None:
+    """Register a cache which uses the versions of the models.
+    @param get_alias: Function without argument which returns the alias of the
+           cache (see settings.CACHES), or an empty string if the cache is disabled.
+    """
+    _cache_alias_getters.append(get_alias)
+
+
+def get_model_versions() -> ModelVersions | None:
+    """Get the versions of the models.
+    @return: A ModelVersions instance (stored in the first enabled cache among
+             the caches registered with <register_cache()>), or None if all
+             these caches are disabled.
+    """
+    for get_alias in _cache_alias_getters:
+        alias = get_alias()
+
+        if alias:
+            return ModelVersions(caches[alias])
+
+    return None
+
+
+@receiver((post_save, post_delete))
+def _bump_version(sender, **kwargs):
+    model_versions = get_model_versions()
+    if model_versions is not None:
+        model_versions.bump(sender)
+
+
+def _bump_version_in_bulk(model, instances):
+    model_versions = get_model_versions()
+    if model_versions is not None:
+        model_versions.bump(model)
+
+
+bulk_save_receivers.register(_bump_version, _bump_version_in_bulk)
+
+
+@receiver(m2m_changed)
+def _bump_version_m2m(sender, instance, action, model, **kwargs):
+    if action.startswith('post_'):
+        model_versions = get_model_versions()
+        if model_versions is not None:
+            model_versions.bump(type(instance), model)
@@ -71,7 +71,13 @@ class FlowPaginator:
     _attr_name: str
     _reverse_order: bool
 
-    def __init__(self, queryset: QuerySet, key: str, per_page: int, count: int = sys.maxsize):
+    def __init__(self,
+                 queryset: QuerySet,
+                 key: str,
+                 per_page: int,
+                 count: int = sys.maxsize,
+                 approximate_count: bool = False,
+                 ):
         """Constructor.
         @param queryset: QuerySet instance. Beware: lines must have always the
                same order when sub-set queries are performed, or the paginated
@@ -87,6 +93,8 @@ class FlowPaginator:
                The default value _should_ be overridden with the correct value ;
                it is only useful when a whole queryset is iterated with pages()
                (because count is not used).
+        @param approximate_count: True means that <count> is only an estimation
+               (so it is not used to detect that there is only one page).
         @raise ValueError: If key is invalid.
         """
         assert per_page > 1
@@ -94,6 +102,7 @@ class FlowPaginator:
         self.queryset = queryset
         self.per_page = per_page
         self.count = count
+        self.approximate_count = approximate_count
         self._num_pages: int | None = None
 
         self._attr_name: str = ''
@@ -259,7 +268,9 @@ class FlowPaginator:
         # methods in local contexts...
         # entities: Iterable[Model]
 
-        if move_type == 'first' or self.count <= per_page:
+        if move_type == 'first' or (
+            self.count <= per_page and not self.approximate_count
+        ):
             entities = [*self.queryset[:per_page + 1]]
             next_item = None if len(entities) <= per_page else entities.pop()
             first_page = True
@@ -27,6 +27,7 @@ from django.db.models.query import Q, QuerySet
 from ..core import entity_cell
 from ..models import CustomField, FieldsConfig, SearchConfigItem
 from ..utils.string import smart_split
+from .search_index import get_search_index
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +75,8 @@ class Searcher:
     The search configuration (see the model SearchConfigItem) is used to know
     which fields to use.
     Hidden fields (see model FieldsConfig) are ignored.
+    The index of words (see creme_core.core.search_index) is used for the
+    indexed cells if one has been set up.
     """
     CELL_TO_Q = {
         entity_cell.EntityCellRegularField.type_id:
@@ -101,6 +104,7 @@ class Searcher:
                 search_map[model] = [*sci.refined_cells]
 
         self._search_map = search_map
+        self.index = get_search_index()
 
     def _build_query(self, words, cells) -> Q:
         """Build a Q with given fields for the given search.
@@ -113,10 +117,23 @@ class Searcher:
         """
         result_q = Q()
         get_q_builder = self.CELL_TO_Q.get
+        index = self.index
+        indexed_cells = (
+            {cell.key for cell in cells if index.is_cell_indexed(cell)}
+            if index else
+            ()
+        )
 
         for word in words:
             word_q = Q()
             for cell in cells:
+                if cell.key in indexed_cells:
+                    cell_q = index.build_q(cell, word)
+
+                    if cell_q is not None:
+                        word_q |= cell_q
+                        continue
+
                 builder = get_q_builder(cell.type_id)
                 if builder:
                     word_q |= builder(cell, word)
@@ -149,9 +166,17 @@ class Searcher:
 
         assert cells is not None  # search on a disabled model ?
 
-        strings = smart_split(research)
+        if not cells:
+            return None
+
+        qs = model.objects.filter(self._build_query(smart_split(research), cells))
+
+        # NB: the other cells are searched with sub-queries (no JOIN)
+        if any(
+            isinstance(cell, entity_cell.EntityCellRegularField)
+            and len(cell.field_info) > 1
+            for cell in cells
+        ):
+            qs = qs.distinct()
 
-        # TODO: distinct() only if there is a JOIN...
-        return model.objects.filter(
-            self._build_query(strings, cells)
-        ).distinct() if cells else None
+        return qs
@@ -0,0 +1,276 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Indexes of words used by the global search (see creme_core.core.search),
+in order to avoid a scan of the tables (i.e. "LIKE '%word%'" queries) for each
+searched word.
+
+The index used is set by 'settings.SEARCH_INDEX' ; the search does not use
+any index by default.
+Notice that the searched words are matched as prefixes of the indexed words
+(the search without index finds the words anywhere in the fields).
+
+The index is updated when the entities & their custom values are saved ;
+the command "creme_search_index" (re)builds the index for the existing entities.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from functools import lru_cache
+from typing import Iterable, Sequence
+from unicodedata import combining, normalize
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.signals import setting_changed
+from django.db import models
+from django.db.models.query import Q
+from django.db.transaction import atomic
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from ..models import CremeEntity, CustomField, SearchIndexEntry
+from ..models.custom_field import CustomFieldValue
+from . import entity_cell
+from .field_tags import FieldTag
+from .paginator import FlowPaginator
+
+logger = logging.getLogger(__name__)
+_WORD_RE = re.compile(r'\w+')
+
+
+def index_words(text: str, max_length: int = 100) -> set[str]:
+    """Split a text in normalised words (lower case, without accent).
+    @param text: String.
+    @param max_length: The words are truncated to this length.
+    @return: A set of strings.
+    """
+    text = ''.join(c for c in normalize('NFKD', text) if not combining(c)).casefold()
+
+    return {word[:max_length] for word in _WORD_RE.findall(text)}
+
+
+class SearchIndex:
+    """Base class for the indexes of the global search.
+
+    Only the regular fields which are directly stored in the table of the
+    entities (i.e. not the fields of related instances, because they are not
+    updated when the entities are saved) & containing text are indexed, like
+    the custom-fields containing text.
+    The other cells are searched without index.
+    """
+    indexed_field_types: tuple[type[models.Field], ...] = (
+        models.CharField, models.TextField,
+    )
+    indexed_cfield_types = (CustomField.STR, CustomField.TEXT, CustomField.URL)
+
+    def __init__(self):
+        self._fields_per_model: dict[type[CremeEntity], list[models.Field]] = {}
+
+    def _indexed_fields(self, model: type[CremeEntity]) -> list[models.Field]:
+        fields = self._fields_per_model.get(model)
+
+        if fields is None:
+            field_types = self.indexed_field_types
+            self._fields_per_model[model] = fields = [
+                field
+                for field in model._meta.fields
+                if isinstance(field, field_types)
+                and not field.choices
+                and field.get_tag(FieldTag.VIEWABLE)
+            ]
+
+        return fields
+
+    def is_cell_indexed(self, cell: entity_cell.EntityCell) -> bool:
+        if isinstance(cell, entity_cell.EntityCellRegularField):
+            field_info = cell.field_info
+
+            return len(field_info) == 1 and field_info[0] in self._indexed_fields(cell.model)
+
+        if isinstance(cell, entity_cell.EntityCellCustomField):
+            return cell.custom_field.field_type in self.indexed_cfield_types
+
+        return False
+
+    def build_q(self, cell: entity_cell.EntityCell, word: str) -> Q | None:
+        """Build a Q instance to retrieve the entities with the given word in
+        the given cell.
+        @param cell: Instance of EntityCell ; is_cell_indexed() must return True.
+        @param word: Searched string.
+        @return: A Q instance, or None if the index cannot be used for this word.
+        """
+        raise NotImplementedError
+
+    def update_entities(self,
+                        entities: Sequence[CremeEntity],
+                        custom_fields: bool = False,
+                        ) -> None:
+        """Update the words related to some entities.
+        @param entities: Instances of CremeEntity ; they must be "real" entities.
+        @param custom_fields: If True, the words of the custom-fields are updated too.
+        """
+        raise NotImplementedError
+
+    def update_custom_value(self, custom_value: CustomFieldValue) -> None:
+        raise NotImplementedError
+
+    def remove_custom_value(self, custom_value: CustomFieldValue) -> None:
+        raise NotImplementedError
+
+    def rebuild(self, model: type[CremeEntity], per_page: int = 256) -> int:
+        """Build the index for all the entities of a model.
+        @return: Number of indexed entities.
+        """
+        count = 0
+        paginator = FlowPaginator(
+            queryset=model.objects.order_by('id'), key='id', per_page=per_page,
+        )
+
+        for page in paginator.pages():
+            entities = page.object_list
+            self.update_entities(entities, custom_fields=True)
+            count += len(entities)
+
+        return count
+
+
+class TableSearchIndex(SearchIndex):
+    """Built-in index which stores the words in a table of the database
+    (see the model SearchIndexEntry) ; it works with all the DBRMS.
+    """
+    def build_q(self, cell, word):
+        words = index_words(word)
+        if not words:
+            return None
+
+        entries = SearchIndexEntry.objects.filter(
+            entity_type=ContentType.objects.get_for_model(cell.model),
+            cell_key=cell.key,
+        )
+        q = Q()
+
+        for index_word in words:
+            q &= Q(
+                pk__in=entries.filter(
+                    word__startswith=index_word,
+                ).values_list('entity_id', flat=True)
+            )
+
+        return q
+
+    @staticmethod
+    def _build_entries(entity_id, ctype_id, cell_key, value):
+        return [
+            SearchIndexEntry(
+                entity_id=entity_id, entity_type_id=ctype_id,
+                cell_key=cell_key, word=word,
+            ) for word in index_words(str(value))
+        ]
+
+    def _build_cfield_entries(self, entities: Iterable[CremeEntity]):
+        ctype_ids = {entity.entity_type_id for entity in entities}
+        cfields = [
+            *CustomField.objects.filter(
+                content_type__in=ctype_ids,
+                field_type__in=self.indexed_cfield_types,
+            ),
+        ]
+        if not cfields:
+            return []
+
+        entries = []
+        cvalues_map = CustomField.get_custom_values_map(entities, cfields)
+        build_entries = self._build_entries
+        key_fmt = f'{entity_cell.EntityCellCustomField.type_id}-{{}}'.format
+
+        for entity in entities:
+            for cfield_id, cvalue in cvalues_map.get(entity.id, {}).items():
+                entries.extend(build_entries(
+                    entity.id, entity.entity_type_id, key_fmt(cfield_id), cvalue.value,
+                ))
+
+        return entries
+
+    def update_entities(self, entities, custom_fields=False):
+        entries = []
+        cell_keys = set()
+        build_entries = self._build_entries
+        key_fmt = f'{entity_cell.EntityCellRegularField.type_id}-{{}}'.format
+
+        for entity in entities:
+            for field in self._indexed_fields(type(entity)):
+                cell_key = key_fmt(field.name)
+                cell_keys.add(cell_key)
+
+                value = getattr(entity, field.attname)
+                if value:
+                    entries.extend(build_entries(
+                        entity.id, entity.entity_type_id, cell_key, value,
+                    ))
+
+        old_entries = SearchIndexEntry.objects.filter(entity__in=[e.id for e in entities])
+        if custom_fields:
+            entries.extend(self._build_cfield_entries(entities))
+        else:
+            old_entries = old_entries.filter(cell_key__in=cell_keys)
+
+        with atomic():
+            old_entries.delete()
+            SearchIndexEntry.objects.bulk_create(entries)
+
+    def update_custom_value(self, custom_value):
+        cfield = custom_value.custom_field
+        if cfield.field_type not in self.indexed_cfield_types:
+            return
+
+        entity_id = custom_value.entity_id
+        cell_key = f'{entity_cell.EntityCellCustomField.type_id}-{cfield.id}'
+
+        with atomic():
+            SearchIndexEntry.objects.filter(entity=entity_id, cell_key=cell_key).delete()
+            SearchIndexEntry.objects.bulk_create(self._build_entries(
+                # NB: the ContentType of the custom-field is the one of the entity
+                entity_id, cfield.content_type_id, cell_key, custom_value.value,
+            ))
+
+    def remove_custom_value(self, custom_value):
+        SearchIndexEntry.objects.filter(
+            entity=custom_value.entity_id,
+            cell_key=f'{entity_cell.EntityCellCustomField.type_id}-{custom_value.custom_field_id}',
+        ).delete()
+
+
+@lru_cache(maxsize=None)
+def get_search_index() -> SearchIndex | None:
+    """Get the index used by the global search.
+    @return A SearchIndex instance, or None if no index is used
+            (see settings.SEARCH_INDEX).
+    NB: the instance is built once (it is used each time an entity is saved).
+    """
+    path = settings.SEARCH_INDEX
+
+    return import_string(path)() if path else None
+
+
+@receiver(setting_changed)
+def _reset_search_index(setting, **kwargs):
+    if setting == 'SEARCH_INDEX':
+        get_search_index.cache_clear()
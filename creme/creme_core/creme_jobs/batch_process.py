@@ -23,13 +23,23 @@ from functools import partial
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.db.transaction import atomic
+from django.utils.timezone import now
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext
 
 from ..core.batch_process import BatchAction
+from ..core.bulk_save import bulk_save_receivers
 from ..core.paginator import FlowPaginator
-from ..models import EntityCredentials, EntityFilter, EntityJobResult
+from ..models import (
+    CremeEntity,
+    EntityCredentials,
+    EntityFilter,
+    EntityJobResult,
+)
+from ..models.entity import _SEARCH_FIELD_MAX_LENGTH
+from ..models.history import _HLTEntityEdition
+from ..utils.db import has_specific_save_logic
 from .base import JobProgress, JobType
 
 logger = logging.getLogger(__name__)
@@ -98,38 +108,143 @@ class _BatchProcessType(JobType):
             queryset=entities.order_by('id'), key='id', per_page=1024,
         )
         actions = [*self._get_actions(model, job_data)]
-        create_result = partial(EntityJobResult.objects.create, job=job)
+        process_page = (
+            self._process_page_in_bulk
+            if self._can_bulk_update(model, actions) else
+            self._process_page
+        )
 
         for entities_page in paginator.pages():
-            for entity in entities_page.object_list:
-                if entity.id in already_processed:
+            entity_ids = [
+                entity.id
+                for entity in entities_page.object_list
+                if entity.id not in already_processed
+            ]
+
+            if entity_ids:
+                process_page(
+                    job=job, model=model, entity_ids=entity_ids, actions=actions,
+                )
+
+    @staticmethod
+    def _can_bulk_update(model, actions) -> bool:
+        """Can the modified entities be saved with grouped queries (see
+        _process_page_in_bulk()), i.e. without calling their method save()?
+        It's not possible when the model has some specific logic depending on
+        the modified fields when it's saved (overridden save(), specific handlers
+        for signals 'pre_save'/'post_save', handlers for all models which are
+        not registered in bulk_save_receivers) or when a modified field is
+        unique (alone or with other fields) ; the errors of uniqueness are
+        reported per entity by _process_page().
+        """
+        field_names = {action.field_name for action in actions}
+
+        if has_specific_save_logic(model, base_save=CremeEntity.save, field_names=field_names):
+            return False
+
+        meta = model._meta
+
+        if any(meta.get_field(field_name).unique for field_name in field_names):
+            return False
+
+        return not any(
+            field_names.intersection(unique_fields)
+            for m in (model, *meta.get_parent_list())
+            for unique_fields in (
+                *m._meta.unique_together,
+                *(constraint.fields for constraint in m._meta.total_unique_constraints),
+            )
+        )
+
+    def _process_page(self, *, job, model, entity_ids, actions):
+        "Process the entities one by one, each one with its own transaction."
+        create_result = partial(EntityJobResult.objects.create, job=job)
+
+        for entity_id in entity_ids:
+            changed = False
+
+            with atomic():
+                try:
+                    final_entity = model.objects.select_for_update().get(id=entity_id)
+                except model.DoesNotExist:
                     continue
 
-                changed = False
+                for action in actions:
+                    if action(final_entity):
+                        changed = True
 
-                with atomic():
+                if changed:
                     try:
-                        final_entity = model.objects.select_for_update().get(id=entity.id)
-                    except model.DoesNotExist:
-                        continue
-
-                    for action in actions:
-                        if action(final_entity):
-                            changed = True
-
-                    if changed:
-                        try:
-                            final_entity.full_clean()
-                        except ValidationError as e:
-                            create_result(
-                                # entity=final_entity,
-                                real_entity=final_entity,
-                                messages=self._humanize_validation_error(final_entity, e)
-                            )
-                        else:
-                            final_entity.save()
-                            # create_result(entity=final_entity)
-                            create_result(real_entity=final_entity)
+                        final_entity.full_clean()
+                    except ValidationError as e:
+                        create_result(
+                            # entity=final_entity,
+                            real_entity=final_entity,
+                            messages=self._humanize_validation_error(final_entity, e)
+                        )
+                    else:
+                        final_entity.save()
+                        # create_result(entity=final_entity)
+                        create_result(real_entity=final_entity)
+
+    def _process_page_in_bulk(self, *, job, model, entity_ids, actions):
+        """Process the entities of a page with a transaction for the whole page:
+        the rows are locked with one query, the valid entities are updated with
+        one query, & the history lines & the job results are created in bulk.
+        """
+        results = []
+        modified_entities = []
+
+        with atomic():
+            # NB: the rows are locked in a stable order to avoid dead locks.
+            for entity in model.objects.select_for_update().filter(
+                id__in=entity_ids,
+            ).order_by('id'):
+                # NB: the "old" values used by the history (the method save()
+                #     is not called, so the snapshot is not taken lazily).
+                _HLTEntityEdition._create_entity_backup(entity)
+                changed = False
+
+                for action in actions:
+                    if action(entity):
+                        changed = True
+
+                if not changed:
+                    continue
+
+                try:
+                    # NB: the modified fields are not unique, even with other
+                    #     fields (see _can_bulk_update()).
+                    entity.full_clean(validate_unique=False)
+                except ValidationError as e:
+                    results.append(EntityJobResult(
+                        job=job,
+                        real_entity=entity,
+                        messages=self._humanize_validation_error(entity, e),
+                    ))
+                else:
+                    modified_entities.append(entity)
+                    results.append(EntityJobResult(job=job, real_entity=entity))
+
+            if modified_entities:
+                # NB: these fields are set by CremeEntity.save() in the per-entity way
+                now_value = now()
+                for entity in modified_entities:
+                    entity.modified = now_value
+                    entity.header_filter_search_field = \
+                        entity._search_field_value()[:_SEARCH_FIELD_MAX_LENGTH]
+
+                field_names = {action.field_name for action in actions}
+                model.objects.bulk_update(
+                    modified_entities,
+                    fields=[*field_names, 'modified', 'header_filter_search_field'],
+                )
+                _HLTEntityEdition.bulk_create_lines(modified_entities)
+
+                # NB: the signal "post_save" is not sent by bulk_update()
+                bulk_save_receivers.send(model, modified_entities, field_names=field_names)
+
+            EntityJobResult.objects.bulk_create(results)
 
     def progress(self, job):
         count = EntityJobResult.objects.filter(job=job).count()
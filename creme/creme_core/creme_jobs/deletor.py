@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2019-2021 Hybird
+#    Copyright (C) 2019-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,14 +18,20 @@
 
 from collections import Counter
 
-from django.db.models import F, ProtectedError
+from django.db.models import F, Model, ProtectedError
 from django.db.transaction import atomic
+from django.utils.timezone import now
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext
 
-from ..models import DeletionCommand, FieldsConfig, JobResult
+from ..core.bulk_save import bulk_save_receivers
+from ..models import CremeEntity, DeletionCommand, FieldsConfig, JobResult
+from ..models.entity import _SEARCH_FIELD_MAX_LENGTH
+from ..models.history import _HLTEntityEdition
 from ..signals import pre_replace_and_delete
+from ..utils.chunktools import iter_as_chunk
+from ..utils.db import has_specific_save_logic
 from ..utils.translation import get_model_verbose_name
 from .base import JobProgress, JobType
 
@@ -36,6 +42,9 @@ class _DeletorType(JobType):
     id = JobType.generate_id('creme_core', 'deletor')
     verbose_name = _('Replace & delete')
 
+    # Number of referencing instances which are updated at once
+    chunk_size = 256
+
     def _execute(self, job):
         dcom_mngr = DeletionCommand.objects
         dcom = dcom_mngr.get(job=job)
@@ -45,13 +54,10 @@ class _DeletorType(JobType):
                              .get(pk=dcom.pk_to_delete)
 
         # TODO: is_deleted field ?
-        # TODO: regroup by same CType & update several fields at once when its possible
+        # TODO: update several fields of the same model at once when its possible
         for replacer in dcom.replacers:
             new_value = replacer.get_value()
-
             model_field = replacer.model_field
-            rel_mngr   = model_field.model._default_manager
-            field_name = model_field.name
 
             pre_replace_and_delete.send_robust(
                 sender=instance_2_del,
@@ -59,24 +65,17 @@ class _DeletorType(JobType):
                 replacing_instance=new_value,
             )
 
-            for pk in rel_mngr.filter(
-                **{field_name: instance_2_del.pk}
-            ).values_list('pk', flat=True):
-                # NB1: we perform a .save(), not an .update() in order to:
-                #       - let the model compute it's business logic (if there is one).
-                #       - get an HistoryLine for entities.
-                # NB2: as in edition view, we perform a select_for_update() to avoid
-                #      overriding other fields (if there are concurrent accesses)
-                with atomic():
-                    related_instance = rel_mngr.select_for_update().filter(pk=pk).first()
-                    if related_instance is not None:
-                        if model_field.many_to_many:
-                            getattr(related_instance, field_name).add(new_value)
-                        else:
-                            setattr(related_instance, field_name, new_value)
-                            related_instance.save()
-
-                    dcom_mngr.filter(pk=dcom.pk).update(updated_count=F('updated_count') + 1)
+            replace = (
+                self._replace_in_bulk
+                if self._can_replace_in_bulk(model_field) else
+                self._replace
+            )
+            replace(
+                dcom=dcom,
+                model_field=model_field,
+                old_value=instance_2_del,
+                new_value=new_value,
+            )
 
         try:
             instance_2_del.delete()
@@ -100,6 +99,117 @@ class _DeletorType(JobType):
                 ]
             )
 
+    @staticmethod
+    def _can_replace_in_bulk(model_field) -> bool:
+        """Can the instances referencing the deleted instance be updated with
+        grouped queries (see _replace_in_bulk()), i.e. without calling their
+        method save()?
+        It's not possible for ManyToManyFields (the signal 'm2m_changed' is
+        used by the history), for models with some specific logic depending on
+        the field when they are saved (including the models which are sent to
+        receivers for all models not registered in bulk_save_receivers), & for
+        auxiliary models (their history needs the method save()).
+        """
+        if model_field.many_to_many:
+            return False
+
+        model = model_field.model
+
+        if hasattr(model, 'get_related_entity'):
+            return False
+
+        return not has_specific_save_logic(
+            model,
+            base_save=CremeEntity.save if issubclass(model, CremeEntity) else Model.save,
+            field_names=[model_field.name],
+        )
+
+    def _replace(self, *, dcom, model_field, old_value, new_value):
+        "Update the referencing instances one by one, by calling their method save()."
+        rel_mngr = model_field.model._default_manager
+        field_name = model_field.name
+        dcom_mngr = DeletionCommand.objects
+
+        for pks in iter_as_chunk(
+            rel_mngr.filter(**{field_name: old_value.pk}).values_list('pk', flat=True),
+            self.chunk_size,
+        ):
+            for pk in pks:
+                # NB1: we perform a .save(), not an .update() in order to:
+                #       - let the model compute it's business logic (if there is one).
+                #       - get an HistoryLine for entities.
+                # NB2: as in edition view, we perform a select_for_update() to avoid
+                #      overriding other fields (if there are concurrent accesses)
+                with atomic():
+                    related_instance = rel_mngr.select_for_update().filter(pk=pk).first()
+                    if related_instance is not None:
+                        if model_field.many_to_many:
+                            getattr(related_instance, field_name).add(new_value)
+                        else:
+                            setattr(related_instance, field_name, new_value)
+                            related_instance.save()
+
+            dcom_mngr.filter(pk=dcom.pk).update(updated_count=F('updated_count') + len(pks))
+
+    def _replace_in_bulk(self, *, dcom, model_field, old_value, new_value):
+        """Update the referencing instances by chunks ; each chunk is updated
+        in its own transaction with grouped queries (& the history lines of
+        entities are created in bulk). The receivers registered in
+        bulk_save_receivers are notified for each chunk.
+        """
+        model = model_field.model
+        rel_mngr = model._default_manager
+        field_name = model_field.name
+        is_entity = issubclass(model, CremeEntity)
+        dcom_mngr = DeletionCommand.objects
+        chunk_size = self.chunk_size
+
+        while True:
+            with atomic():
+                # NB1: the updated instances do not reference the deleted
+                #      instance anymore, so the next query retrieves the next chunk.
+                # NB2: the rows are locked in a stable order to avoid dead locks.
+                instances = [
+                    *rel_mngr.select_for_update()
+                             .filter(**{field_name: old_value.pk})
+                             .order_by('pk')[:chunk_size],
+                ]
+                if not instances:
+                    break
+
+                if is_entity:
+                    # NB: these fields are set by CremeEntity.save() in the per-entity way
+                    now_value = now()
+
+                    for entity in instances:
+                        # NB: the "old" values used by the history (the method
+                        #     save() is not called, so the snapshot is not taken lazily).
+                        _HLTEntityEdition._create_entity_backup(entity)
+                        setattr(entity, field_name, new_value)
+                        entity.modified = now_value
+                        entity.header_filter_search_field = \
+                            entity._search_field_value()[:_SEARCH_FIELD_MAX_LENGTH]
+
+                    rel_mngr.bulk_update(
+                        instances,
+                        fields=[field_name, 'modified', 'header_filter_search_field'],
+                    )
+                    _HLTEntityEdition.bulk_create_lines(instances)
+                else:
+                    rel_mngr.filter(
+                        pk__in=[instance.pk for instance in instances],
+                    ).update(**{field_name: new_value})
+
+                    for instance in instances:
+                        setattr(instance, field_name, new_value)
+
+                # NB: the signal 'post_save' is not sent
+                bulk_save_receivers.send(model, instances, field_names=[field_name])
+
+                dcom_mngr.filter(pk=dcom.pk).update(
+                    updated_count=F('updated_count') + len(instances),
+                )
+
     def progress(self, job):
         dcom = DeletionCommand.objects.get(job=job)
         total = dcom.total_count
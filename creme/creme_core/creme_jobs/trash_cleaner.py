@@ -17,8 +17,11 @@
 ################################################################################
 
 import logging
+import multiprocessing
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.db import connections
 from django.db.models import F, ProtectedError
 from django.db.transaction import atomic
 from django.db.utils import NotSupportedError
@@ -27,8 +30,10 @@ from django.utils.translation import gettext_lazy, ngettext
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 
-from ..core.paginator import FlowPaginator
-from ..models import CremeEntity, EntityJobResult, TrashCleaningCommand
+from ..core.deletion_plan import DeletionPlan
+from ..global_info import set_global_info
+from ..models import CremeEntity, EntityJobResult, Job, TrashCleaningCommand
+from ..utils.chunktools import iter_as_chunk
 from .base import JobProgress, JobType
 
 logger = logging.getLogger(__name__)
@@ -38,15 +43,48 @@ class _TrashCleanerType(JobType):
     id = JobType.generate_id('creme_core', 'trash_cleaner')
     verbose_name = gettext_lazy('Trash cleaner')
 
+    # Number of entities deleted in the same transaction
+    chunk_size = 256
+
     def _execute(self, job):
-        # NB 1: we try to delete the remaining entities (which could not be deleted
-        #       because of relationships) when there are errors, while the previous
+        # NB 1: the entities are deleted in the order given by a DeletionPlan
+        #       (referencing entities first). We try to delete the remaining
+        #       entities (which could not be deleted because of dependencies
+        #       unknown by the plan) when there are errors, while the previous
         #       iteration managed to remove some entities.
         #       It will not work with cyclic references (but it is certainly very unusual).
         # NB 2: we do not use delete() method of queryset in order to send signals.
-        user = job.user
-        cmd_qs = TrashCleaningCommand.objects.filter(job=job)
+        workers = settings.TRASH_CLEANER_WORKERS
+
+        while True:
+            plan = DeletionPlan(self._trashed_entity_ids(job.user))
+            if not plan:
+                break
+
+            groups = plan.groups() if workers > 1 else [plan]
+
+            if len(groups) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+                # NB: the connections must not be shared with the child processes
+                connections.close_all()
+
+                with multiprocessing.get_context('fork').Pool(
+                    processes=min(workers, len(groups)),
+                ) as pool:
+                    results = pool.starmap(
+                        _delete_in_worker, [(job.id, group) for group in groups],
+                    )
+            else:
+                results = [self._delete(job, group) for group in groups]
+
+            errors = any(group_errors for group_errors, __ in results)
+            progress = any(group_progress for __, group_progress in results)
+
+            if not errors or not progress:
+                break
 
+    @staticmethod
+    def _trashed_entity_ids(user) -> dict:
+        "@return: Dictionary <model: IDs of the trashed entities which can be deleted>."
         ctype_ids_qs = CremeEntity.objects.filter(is_deleted=True) \
                                           .values_list('entity_type', flat=True)
 
@@ -56,83 +94,79 @@ class _TrashCleanerType(JobType):
         except NotSupportedError:
             ctype_ids = {*ctype_ids_qs}
 
-        entity_classes = [
-            ct.model_class()
-            for ct in map(ContentType.objects.get_for_id, ctype_ids)
-        ]
-
-        while True:
-            errors = False
-            progress = False
-
-            def create_error(entity, msg):
-                nonlocal errors
-                errors = True
-                EntityJobResult.objects.update_or_create(
-                    job=job,
-                    entity=entity,
-                    defaults={
-                        'entity_ctype': entity.entity_type,
-                        'messages': [msg],
-                    },
-                )
-
-            # NB: 'SELECT FOR UPDATE' in a query using an 'OUTER JOIN'
-            #       and nullable ids will fail with postgresql (both 9.6 & 10.x).
-            # TODO: This bug may be fixed in django > 2.2
-            #  (see https://code.djangoproject.com/ticket/28010)
-
-            # for entity_class in entity_classes:
-            #     paginator = FlowPaginator(
-            #         queryset=EntityCredentials.filter(
-            #             user,
-            #             entity_class.objects.filter(is_deleted=True),
-            #             EntityCredentials.DELETE,
-            #         ).order_by('id').select_for_update(),
-            #         key='id',
-            #         per_page=256,
-            #     )
-            #
-            #     with atomic():
-            #         for entities_page in paginator.pages():
-            #             for entity in entities_page.object_list:
-            #                 entity = entity.get_real_entity()
-            for entity_class in entity_classes:
-                paginator = FlowPaginator(
-                    queryset=EntityCredentials.filter(
-                        user,
-                        entity_class.objects.filter(is_deleted=True),
-                        EntityCredentials.DELETE,
-                    ).order_by('id'),  # .select_for_update()
-                    key='id',
-                    per_page=256,
-                )
-
-                for entities_page in paginator.pages():
+        entity_ids = {}
+
+        for ctype in map(ContentType.objects.get_for_id, ctype_ids):
+            entity_class = ctype.model_class()
+            entity_ids[entity_class] = [
+                *EntityCredentials.filter(
+                    user,
+                    entity_class.objects.filter(is_deleted=True),
+                    EntityCredentials.DELETE,
+                ).order_by('id').values_list('id', flat=True),
+            ]
+
+        return entity_ids
+
+    def _delete(self, job, plan: DeletionPlan) -> tuple[bool, bool]:
+        """Delete the entities of a plan, by chunks.
+        @return: Tuple (errors, progress) ; 'errors' is True if some entities
+                 could not be deleted, 'progress' is True if some entities
+                 have been deleted.
+        """
+        cmd_qs = TrashCleaningCommand.objects.filter(job=job)
+        errors = False
+        progress = False
+
+        for layer in plan.layers:
+            for entity_class, entity_ids in layer.items():
+                for ids_chunk in iter_as_chunk(entity_ids, self.chunk_size):
+                    deleted_count = 0
+                    failures = []
+
+                    # NB: 'SELECT FOR UPDATE' in a query using an 'OUTER JOIN'
+                    #       and nullable ids will fail with postgresql (both 9.6 & 10.x).
+                    #     So the credentials are checked by _trashed_entity_ids()
+                    #     & the rows are locked here (see #60).
                     with atomic():
-                        # NB (#60): Move 'SELECT FOR UPDATE' here for now (see above).
                         for entity in entity_class.objects.filter(
-                            pk__in=entities_page.object_list
-                        ).select_for_update():
+                            pk__in=ids_chunk, is_deleted=True,
+                        ).order_by('id').select_for_update():
                             try:
-                                entity.delete()
+                                # NB: a savepoint per entity, so an error does not
+                                #     break the transaction of the chunk.
+                                with atomic():
+                                    entity.delete()
                             except ProtectedError:
-                                create_error(
+                                failures.append((
                                     entity,
                                     _('Can not be deleted because of its dependencies.'),
-                                )
+                                ))
                             except Exception as e:
                                 logger.exception('Error when trying to empty the trash')
-                                create_error(
+                                failures.append((
                                     entity,
                                     _('Deletion caused an unexpected error [{}].').format(e),
-                                )
+                                ))
                             else:
-                                progress = True
-                                cmd_qs.update(deleted_count=F('deleted_count') + 1)
+                                deleted_count += 1
 
-            if not errors or not progress:
-                break
+                        if deleted_count:
+                            progress = True
+                            cmd_qs.update(deleted_count=F('deleted_count') + deleted_count)
+
+                    for entity, msg in failures:
+                        errors = True
+                        EntityJobResult.objects.update_or_create(
+                            job=job,
+                            entity=entity,
+                            defaults={
+                                'entity_ctype': entity.entity_type,
+                                'messages': [msg],
+                            },
+                        )
+
+        return errors, progress
 
     def progress(self, job):
         count = TrashCleaningCommand.objects.get(job=job).deleted_count
@@ -165,3 +199,14 @@ class _TrashCleanerType(JobType):
 
 
 trash_cleaner_type = _TrashCleanerType()
+
+
+def _delete_in_worker(job_id: int, plan: DeletionPlan) -> tuple[bool, bool]:
+    "Delete the entities of a plan in a child process (see _TrashCleanerType._execute())."
+    try:
+        job = Job.objects.get(id=job_id)
+        set_global_info(user=job.user)
+
+        return trash_cleaner_type._delete(job, plan)
+    finally:
+        connections.close_all()
@@ -59,6 +59,7 @@ from ..models import (
     Relation,
     RelationType,
 )
+from ..utils.chunktools import iter_as_chunk
 from ..utils.meta import ModelFieldEnumerator
 from ..utils.url import TemplateURLBuilder
 from .base import _CUSTOM_NAME, CremeForm, CremeModelForm, FieldBlockManager
@@ -67,7 +68,7 @@ from .fields import CreatorEntityField, MultiRelationEntityField
 from .widgets import ChainedInput, SelectorList, UnorderedMultipleChoiceWidget
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Optional, Sequence, Tuple
+    from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
 
     Line = Sequence[str]
     ExtractedTuple = Tuple[Any, Optional[str]]
@@ -77,6 +78,16 @@ logger = logging.getLogger(__name__)
 Document = get_document_model()
 
 
+def _is_simple_field(model, field_name: str) -> bool:
+    "Is the field directly stored in the table of the model (& not a relation)?"
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return False
+
+    return field.concrete and not field.is_relation
+
+
 def get_import_backend_class(filedata):
     filename = filedata.name
     pathname, extension = splitext(filename)
@@ -163,6 +174,43 @@ class BaseExtractor:
     def extract_value(self, line: Line, user) -> ExtractedTuple:
         raise NotImplementedError
 
+    def prefetch(self, lines: Sequence[Line], user) -> None:
+        """Prepare the extraction of a chunk of lines, generally by retrieving
+        the instances referenced by all the lines with one query ;
+        extract_value() is then called for each line.
+        """
+        pass
+
+    def commit_line(self) -> None:
+        """The import of the line given to the last call of extract_value()
+        has been committed ; the instances created by this extraction can be
+        re-used by the next lines.
+        """
+        pass
+
+    def rollback_line(self) -> None:
+        """The import of the line given to the last call of extract_value()
+        has failed (its save point has been rolled back) ; the instances
+        created by this extraction do not exist anymore.
+        """
+        pass
+
+
+class _CreationCacheMixin:
+    """Mixin for the extractors which create the referenced instances not
+    found in <_prefetched> ; the created instances are kept in <_created>
+    while the line is not committed.
+    """
+    _prefetched: dict
+    _created: dict
+
+    def commit_line(self):
+        self._prefetched.update(self._created)
+        self._created.clear()
+
+    def rollback_line(self):
+        self._created.clear()
+
 
 class SingleColumnExtractor(BaseExtractor):
     def __init__(self, column_index: int):
@@ -185,7 +233,7 @@ class BaseExtractorWidget(Widget):
 
 # Extractors (and related field/widget) for regular model's fields--------------
 
-class RegularFieldExtractor(SingleColumnExtractor):
+class RegularFieldExtractor(_CreationCacheMixin, SingleColumnExtractor):
     def __init__(
             self,
             column_index: int,
@@ -198,6 +246,10 @@ class RegularFieldExtractor(SingleColumnExtractor):
         self._fk_model = None
         self._m2m = None
         self._fk_form = None
+        # Instances retrieved by prefetch(), grouped by searched value
+        self._prefetched: dict[str, list] = {}
+        # Instances created by the current line (see _CreationCacheMixin)
+        self._created: dict[str, list] = {}
 
     def set_subfield_search(
             self,
@@ -213,6 +265,19 @@ class RegularFieldExtractor(SingleColumnExtractor):
             # TODO: creme_config form ??
             self._fk_form = modelform_factory(subfield_model, fields='__all__')
 
+    def prefetch(self, lines, user):
+        self._prefetched = prefetched = {}
+        self._created = {}
+        search = self._subfield_search
+        index = self._column_index
+
+        if search and index and _is_simple_field(self._fk_model, search):
+            values = {line[index - 1] for line in lines} - {''}
+
+            if values:
+                for instance in self._fk_model.objects.filter(**{f'{search}__in': values}):
+                    prefetched.setdefault(str(getattr(instance, search)), []).append(instance)
+
     def extract_value(self, line, user) -> ExtractedTuple:
         value = self._default_value
         err_msg = None
@@ -221,7 +286,14 @@ class RegularFieldExtractor(SingleColumnExtractor):
             line_value = line[self._column_index - 1]
 
             if line_value:
-                if self._subfield_search:
+                prefetched = self._prefetched.get(line_value) if self._subfield_search else None
+
+                # NB: the values which are not found (or found several times
+                #     for a ForeignKey) by prefetch() are searched again
+                #     (error message, creation...).
+                if prefetched and (self._m2m or len(prefetched) == 1):
+                    value = prefetched if self._m2m else prefetched[0]
+                elif self._subfield_search:
                     data = {self._subfield_search: line_value}
                     retriever = (
                         self._fk_model.objects.filter
@@ -241,6 +313,7 @@ class RegularFieldExtractor(SingleColumnExtractor):
                                 creator.save()
 
                                 value = creator.instance
+                                self._created[line_value] = [value]
                             else:
                                 err_msg = gettext(
                                     'Error while extracting value: tried to retrieve '
@@ -698,7 +771,7 @@ class EntityExtractorField(forms.Field):
 
 # Extractors (and related field/widget) for relations---------------------------
 
-class RelationExtractor(SingleColumnExtractor):
+class RelationExtractor(_CreationCacheMixin, SingleColumnExtractor):
     def __init__(
             self,
             column_index: int,
@@ -713,12 +786,36 @@ class RelationExtractor(SingleColumnExtractor):
         self._related_form = modelform_factory(
             related_model, fields='__all__',
         ) if create_if_unfound else None
+        # Entities retrieved by prefetch() (per searched value), & the user
+        # used to check the credentials.
+        self._prefetched: dict[str, CremeEntity] = {}
+        self._created: dict[str, CremeEntity] = {}
+        self._prefetch_user_id = None
 
     related_model = property(lambda self: self._related_model)
 
     def create_if_unfound(self):
         return self._related_form is not None
 
+    def prefetch(self, lines, user):
+        self._prefetched = prefetched = {}
+        self._created = {}
+        self._prefetch_user_id = user.id
+        search = self._subfield_search
+        model = self._related_model
+
+        if _is_simple_field(model, search):
+            values = {line[self._column_index - 1] for line in lines} - {''}
+
+            if values:
+                qs = EntityCredentials.filter(
+                    user, model.objects.filter(**{f'{search}__in': values}),
+                )
+
+                # NB: same order than QuerySet.first() (see extract_value())
+                for entity in (qs if qs.ordered else qs.order_by('pk')):
+                    prefetched.setdefault(str(getattr(entity, search)), entity)
+
     # TODO: link credentials
     # TODO: constraint on properties for relationtypes (wait for cache in RelationType)
     def extract_value(self, line, user):
@@ -726,7 +823,10 @@ class RelationExtractor(SingleColumnExtractor):
         err_msg = None
         value = line[self._column_index - 1]
 
-        if value:
+        if value and self._prefetch_user_id == user.id:
+            object_entity = self._prefetched.get(value)
+
+        if value and object_entity is None:
             data = {self._subfield_search: value}
             model = self._related_model
 
@@ -754,6 +854,9 @@ class RelationExtractor(SingleColumnExtractor):
 
                         if creator.is_valid():
                             object_entity = creator.save()
+
+                            if self._prefetch_user_id == user.id:
+                                self._created[value] = object_entity
                         else:
                             err_msg = gettext(
                                 'Error while extracting value: '
@@ -788,6 +891,18 @@ class MultiRelationsExtractor:
         for extractor in self._extractors:
             yield extractor.extract_value(line, user)
 
+    def prefetch(self, lines, user):
+        for extractor in self._extractors:
+            extractor.prefetch(lines, user)
+
+    def commit_line(self):
+        for extractor in self._extractors:
+            extractor.commit_line()
+
+    def rollback_line(self):
+        for extractor in self._extractors:
+            extractor.rollback_line()
+
     def __iter__(self):
         return iter(self._extractors)
 
@@ -969,7 +1084,7 @@ class RelationExtractorField(MultiRelationEntityField):
 
 # Extractors (and related field/widget) for custom fields ----------------------
 
-class CustomFieldExtractor(SingleColumnExtractor):
+class CustomFieldExtractor(_CreationCacheMixin, SingleColumnExtractor):
     _manage_enum: Callable | None
 
     def __init__(
@@ -994,6 +1109,29 @@ class CustomFieldExtractor(SingleColumnExtractor):
         else:
             self._manage_enum = None
 
+        # IDs of the choices retrieved by prefetch() (per value)
+        self._prefetched: dict[str, int] = {}
+        self._created: dict[str, int] = {}
+
+    def prefetch(self, lines, user):
+        self._prefetched = prefetched = {}
+        self._created = {}
+        index = self._column_index
+
+        if self._manage_enum and index:
+            values = {line[index - 1] for line in lines} - {''}
+
+            if values:
+                qs = CustomFieldEnumValue.objects.filter(
+                    custom_field=self._custom_field, value__in=values,
+                )
+
+                # NB: same order than QuerySet.first() (see extract_value())
+                for enum_id, enum_value in (
+                    qs if qs.ordered else qs.order_by('pk')
+                ).values_list('id', 'value'):
+                    prefetched.setdefault(enum_value, enum_id)
+
     def extract_value(self, line, user):
         value = self._default_value
         err_msg = None
@@ -1003,6 +1141,10 @@ class CustomFieldExtractor(SingleColumnExtractor):
 
             if line_value:
                 if self._manage_enum:
+                    enum_id = self._prefetched.get(line_value)
+                    if enum_id is not None:
+                        return self._manage_enum(enum_id), err_msg
+
                     enum_value = CustomFieldEnumValue.objects.filter(
                         custom_field=self._custom_field,
                         value__iexact=line_value,
@@ -1015,15 +1157,12 @@ class CustomFieldExtractor(SingleColumnExtractor):
                         )
                     elif self._create_if_unfound:
                         # TODO: improve self._value_castor avoid the direct 'return' ?
-                        return (
-                            self._manage_enum(
-                                CustomFieldEnumValue.objects.create(
-                                    custom_field=self._custom_field,
-                                    value=line_value,
-                                ).id
-                            ),
-                            err_msg
-                        )
+                        enum_id = CustomFieldEnumValue.objects.create(
+                            custom_field=self._custom_field, value=line_value,
+                        ).id
+                        self._created[line_value] = enum_id
+
+                        return self._manage_enum(enum_id), err_msg
                     else:
                         return (
                             value,
@@ -1187,6 +1326,9 @@ class ImportForm(CremeModelForm):
     ]  # Overloaded by factory
     header_dict: dict[str, int] = {}  # Idem
 
+    # Number of lines which are read & imported at once
+    chunk_size: int = 256
+
     blocks = FieldBlockManager(
         {
             'id': 'general',
@@ -1268,7 +1410,6 @@ class ImportForm(CremeModelForm):
     def process(self, job: Job):
         model_class = self._meta.model
         get_cleaned = self.cleaned_data.get
-        user = self.user
 
         exclude = frozenset(self._meta.exclude or ())
 
@@ -1311,13 +1452,56 @@ class ImportForm(CremeModelForm):
             for i in range(MassImportJobResult.objects.filter(job=job).count()):
                 next(lines)
 
-            append_error = self.append_error
-            key_fields = frozenset(get_cleaned('key_fields'))
+            for lines_chunk in iter_as_chunk(filter(None, lines), self.chunk_size):
+                self._process_lines(
+                    job=job, lines=lines_chunk,
+                    regular_fields=regular_fields,
+                    extractor_fields=extractor_fields,
+                )
+
+    def _get_extractors(self) -> Iterator[tuple[str, BaseExtractor | MultiRelationsExtractor]]:
+        "Get the extractors of the cleaned data, with the name of their field."
+        for fname, value in self.cleaned_data.items():
+            if isinstance(value, (BaseExtractor, MultiRelationsExtractor)):
+                yield fname, value
+
+    def _get_extraction_user(self, field_name: str):
+        "Get the user used to extract the values of a field."
+        return self.user
+
+    def _prefetch_lines(self, lines: list[Line]) -> None:
+        """Prepare the extractors for a chunk of lines (see BaseExtractor.prefetch())."""
+        for fname, extractor in self._get_extractors():
+            extractor.prefetch(lines, self._get_extraction_user(fname))
+
+    def _process_lines(self,
+                       job: Job,
+                       lines: list[Line],
+                       regular_fields: list[tuple[str, Any]],
+                       extractor_fields: list[tuple[str, RegularFieldExtractor]],
+                       ) -> None:
+        """Import a chunk of lines.
+        The instances are saved one by one (each line has its own save point,
+        so an error only cancels its line), & the results of the job are
+        created at once at the end of the chunk.
+        """
+        model_class = self._meta.model
+        get_cleaned = self.cleaned_data.get
+        user = self.user
+        append_error = self.append_error
+        key_fields = frozenset(get_cleaned('key_fields'))
+
+        def is_empty_value(s):
+            return s is None or isinstance(s, str) and not s.strip()
 
-            def is_empty_value(s):
-                return s is None or isinstance(s, str) and not s.strip()
+        self._prefetch_lines(lines)
+        extractors = [extractor for __, extractor in self._get_extractors()]
+        job_results = []
 
-            for i, line in enumerate(filter(None, lines), start=1):
+        # NB: the lines & their results are committed together, so a resumed
+        #     job does not import twice the same lines.
+        with atomic():
+            for line in lines:
                 job_result = MassImportJobResult(job=job, line=line)
 
                 try:
@@ -1392,24 +1576,32 @@ class ImportForm(CremeModelForm):
 
                         # job_result.entity = instance
                         job_result.real_entity = instance
-                        if self.import_errors:
-                            job_result.messages = self.import_errors
-                        job_result.save()
                 except Exception as e:
                     logger.exception('Exception in Mass importing')
 
+                    # NB: the instances created by the extractors have been
+                    #     removed by the rollback of the save point.
+                    for extractor in extractors:
+                        extractor.rollback_line()
+
                     try:
                         for messages in e.message_dict.values():
                             for message in messages:
                                 append_error(str(message))
                     except Exception:
                         append_error(str(e))
+                else:
+                    for extractor in extractors:
+                        extractor.commit_line()
 
-                    job_result.messages = self.import_errors
-                    job_result.save()
+                if self.import_errors:
+                    job_result.messages = [*self.import_errors]
 
+                job_results.append(job_result)
                 self.import_errors.clear()
 
+            MassImportJobResult.objects.bulk_create(job_results)
+
 
 class ImportForm4CremeEntity(ImportForm):
     # TODO : Replace by CremeUserChoiceField
@@ -1504,6 +1696,14 @@ class ImportForm4CremeEntity(ImportForm):
             perm=EntityCredentials.VIEW | EntityCredentials.CHANGE,
         )
 
+    def _get_extraction_user(self, field_name):
+        # NB: the relationships are extracted with the credentials of the owner
+        return (
+            self.cleaned_data['user']
+            if field_name == 'dyn_relations' else
+            super()._get_extraction_user(field_name)
+        )
+
     def _post_instance_creation(self, instance, line, updated):
         cdata = self.cleaned_data
         user = instance.user
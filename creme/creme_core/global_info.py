@@ -23,48 +23,110 @@
 ################################################################################
 
 # See  middleware.global_info.GlobalInfoMiddleware
+#
+# The global information is stored in a context variable (see the module
+# "contextvars"), so each thread/asynchronous task gets its own values.
+# Notice that the threads started within a request do not inherit them ;
+# use contextvars.copy_context().run() to share the global information
+# (including the per-request cache) with these threads.
+
+from __future__ import annotations
 
-from collections import defaultdict
+from collections import OrderedDict
+from contextvars import ContextVar
 from functools import wraps
-from threading import current_thread
-from typing import DefaultDict, Hashable
+from typing import Hashable
 
-_globals: DefaultDict = defaultdict(dict)
+_globals: ContextVar[dict | None] = ContextVar('creme_global_info', default=None)
 
 
 def get_global_info(key: Hashable):
-    """Get a global value, safely because stored in a per-thread way.
+    """Get a global value, safely because stored in a per-context way.
 
     @param key: Hashable object (typically a string) as usual.
     @return The value corresponding to the key.
             <None> is returned if the key is not found.
     """
-    thread_globals = _globals.get(current_thread())
-    return thread_globals and thread_globals.get(key)
+    context_globals = _globals.get()
+    return context_globals and context_globals.get(key)
 
 
 def set_global_info(**kwargs) -> None:
-    """Set some global values, safely because stored in a per-thread way.
+    """Set some global values, safely because stored in a per-context way.
 
     @param kwargs: Each key-value are sored as global data.
     """
-    _globals[current_thread()].update(kwargs)
+    context_globals = _globals.get()
+
+    if context_globals is None:
+        context_globals = {}
+        _globals.set(context_globals)
+
+    context_globals.update(kwargs)
 
 
 def clear_global_info() -> None:
-    # Don't use del _globals[current_thread()], it causes problems with dev server.
-    _globals.pop(current_thread(), None)
+    _globals.set(None)
+
+
+class PerRequestCache(OrderedDict):
+    """Dictionary used as per-request cache (see get_per_request_cache()).
+
+    It counts its hits & misses, & it can be limited in size: the least
+    recently used items are removed (useful for long jobs which use the same
+    cache for all their work).
+    """
+    def __init__(self, max_size: int | None = None):
+        """Constructor.
+        @param max_size: Maximum number of items ; <None> means "no limit".
+        """
+        super().__init__()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (
+            f'PerRequestCache(size={len(self)}, max_size={self.max_size}, '
+            f'hits={self.hits}, misses={self.misses})'
+        )
+
+    def __getitem__(self, key):
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            self.misses += 1
+            raise
+
+        self.hits += 1
+        self.move_to_end(key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        max_size = self.max_size
+        if max_size is not None and len(self) > max_size:
+            self.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
 
 
 def get_per_request_cache() -> dict:
     """Get a special global data, which is a dictionary used as a per-request cache.
 
-    @return: A dictionary.
+    @return: A dictionary (generally a PerRequestCache instance).
     """
     cache = get_global_info('per_request_cache')
 
     if cache is None:
-        cache = {}
+        cache = PerRequestCache()
         set_global_info(per_request_cache=cache)
 
     return cache
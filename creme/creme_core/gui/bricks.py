@@ -18,10 +18,13 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import warnings
 from collections import defaultdict
+from hashlib import sha256
 from typing import (
+    Callable,
     DefaultDict,
     Iterable,
     Iterator,
@@ -34,14 +37,19 @@ from typing import (
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
 from django.core.paginator import EmptyPage, InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Model
 from django.template.loader import get_template
 from django.utils.functional import cached_property
-from django.utils.translation import gettext
+from django.utils.safestring import mark_safe
+from django.utils.timezone import get_current_timezone_name
+from django.utils.translation import get_language, gettext
 from django.utils.translation import gettext_lazy as _
 
 from ..constants import MODELBRICK_ID
+from ..core import model_versions
 from ..core.entity_cell import EntityCell, EntityCellRegularField
 from ..core.field_tags import FieldTag
 from ..core.sorter import cell_sorter_registry
@@ -169,6 +177,15 @@ class Brick:
     # An empty value (like the default empty string) means "No special permission required".
     permissions: str | Sequence[str] = ''
 
+    # Number of seconds during which the rendered brick can be stored in the
+    # cache of bricks (see BricksCache & settings.BRICKS_CACHE).
+    # None (default value) means "never cached" ; bricks with the dependencies
+    # '*' are never cached.
+    # Only bricks which display instances of their dependencies (& fields of
+    # the current entity) should use the cache, because the cached content is
+    # refreshed when these instances are saved/deleted.
+    cache_timeout: int | None = None
+
     GENERIC_HAT_BRICK_ID: str = 'hatbrick'
 
     def __init__(self):
@@ -778,6 +795,127 @@ class BricksManager:
         self._used_relationtypes = {*relationtypes_ids}
 
 
+class BricksCache:
+    """Cache for the rendered bricks (see Brick.cache_timeout).
+
+    The key of a rendered brick is built with:
+        - the brick's ID & its state (see BrickState) & its context (page...).
+        - the current entity (ID & modification date).
+        - the user (ID, role) & the language/time zone.
+        - the versions of the brick's dependencies (see ModelVersions).
+    Notice that changes which do not send signals (e.g. QuerySet.update())
+    are only visible when the cached bricks expire.
+    """
+    key_prefix = 'creme_core-brick-'
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get_versions(self, models: Iterable[type[Model]]) -> list[str]:
+        return (
+            model_versions.get_model_versions()
+            or model_versions.ModelVersions(self.cache)
+        ).get_versions(models)
+
+    def build_key(self, brick: Brick, context: dict) -> str | None:
+        """Build the cache key of a brick.
+        @return: A string, or None if the brick cannot be cached.
+        """
+        dependencies = brick.dependencies
+        if brick.cache_timeout is None or dependencies == '*':
+            return None
+
+        brick_id = brick.id_
+        request = context['request']
+        # NB: changes of page/order are not cached, because the context stored
+        #     in the session must be updated.
+        if any(arg.startswith(f'{brick_id}_') for arg in request.GET):
+            return None
+
+        user = context['user']
+        state = BricksManager.get(context).get_state(brick_id, user)
+
+        try:
+            brick_context = request.session['brickcontexts_manager'][
+                request.GET.get('base_url', request.path)
+            ][brick_id]
+        except KeyError:
+            brick_context = None
+
+        entity = context.get('object')
+        if isinstance(entity, CremeEntity):
+            entity_info = f'{entity.id}#{entity.modified.isoformat()}'
+        else:
+            entity_info = ''
+
+        key_data = json.dumps(
+            [
+                brick_id, state.is_open, state.show_empty_fields,
+                brick_context, brick.reloading_info,
+                entity_info,
+                user.id, user.role_id, user.is_superuser,
+                get_language(), get_current_timezone_name(),
+                self.get_versions(dependencies),
+            ],
+            cls=DjangoJSONEncoder,
+            sort_keys=True,
+        )
+
+        return self.key_prefix + sha256(key_data.encode()).hexdigest()
+
+    def render(self, brick: Brick, render_method: Callable[[dict], str], context: dict) -> str:
+        """Get the rendered brick from the cache, or render it & store it.
+        @param brick: Instance of Brick.
+        @param render_method: Bound method of the brick, like detailview_display().
+        @param context: Template context, passed to the method.
+        @return: Rendered brick.
+        """
+        key = self.build_key(brick, context)
+        if key is None:
+            return render_method(context)
+
+        content = self.cache.get(key)
+        if content is None:
+            content = render_method(context)
+            self.cache.set(key, content, brick.cache_timeout)
+        else:
+            content = mark_safe(content)
+
+        return content
+
+
+def _get_bricks_cache_alias() -> str:
+    return settings.BRICKS_CACHE
+
+
+model_versions.register_cache(_get_bricks_cache_alias)
+
+
+def get_bricks_cache() -> BricksCache | None:
+    """Get the cache for rendered bricks.
+    @return A BricksCache instance, or None if the cache is disabled
+            (see settings.BRICKS_CACHE).
+    """
+    alias = settings.BRICKS_CACHE
+
+    return BricksCache(caches[alias]) if alias else None
+
+
+def render_brick(brick: Brick, render_method: Callable[[dict], str], context: dict) -> str:
+    """Render a brick, by using the cache of bricks if it's enabled.
+    @param brick: Instance of Brick.
+    @param render_method: Bound method of the brick, like detailview_display().
+    @param context: Template context, passed to the method.
+    """
+    bricks_cache = get_bricks_cache()
+
+    return (
+        render_method(context)
+        if bricks_cache is None else
+        bricks_cache.render(brick, render_method, context)
+    )
+
+
 class _BrickRegistry:
     """Use to retrieve a Brick by its id.
     Many services (like reloading views) need your Bricks to be registered in.
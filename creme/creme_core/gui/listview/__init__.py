@@ -7,6 +7,7 @@ from .buttons import (  # NOQA
     MassExportHeaderButton,
     MassImportButton,
 )
+from .count import CountStrategy, get_count_strategy  # NOQA
 from .search import ListViewSearchFieldRegistry, search_field_registry  # NOQA
 from .smart_columns import smart_columns_registry  # NOQA
 from .state import ListViewState, NoHeaderFilterAvailable  # NOQA
@@ -0,0 +1,126 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Strategies used by the list-views to count the entities.
+
+The count is performed for each displayed page, & on big tables it can be
+slower than the retrieving of the page itself. The strategy used is set by
+'settings.LISTVIEW_COUNT_STRATEGY'.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class EntitiesCount(NamedTuple):
+    value: int
+    # True means that <value> is only an estimation
+    approximate: bool = False
+
+
+class CountStrategy:
+    """Base class for the strategies of count."""
+    def count(self, queryset: QuerySet, key: str) -> EntitiesCount:
+        """Count the entities.
+        @param queryset: QuerySet of the displayed entities (filters,
+               search & credentials are applied).
+        @param key: String which identifies the list (content type, filter,
+               search, user's credentials...) ; it can be used as cache key.
+        @return: An EntitiesCount instance.
+        """
+        raise NotImplementedError
+
+
+class ExactCount(CountStrategy):
+    """A query 'SELECT COUNT(*)' is performed each time (default behaviour)."""
+    def count(self, queryset, key):
+        return EntitiesCount(queryset.count())
+
+
+class CachedCount(CountStrategy):
+    """The exact count is stored in the cache during
+    'settings.LISTVIEW_COUNT_CACHE_TIMEOUT' seconds ; so the displayed total
+    can be a little outdated.
+    """
+    key_prefix = 'creme_core-listview_count-'
+
+    def __init__(self, timeout: int | None = None):
+        self.timeout = settings.LISTVIEW_COUNT_CACHE_TIMEOUT if timeout is None else timeout
+
+    def count(self, queryset, key):
+        cache_key = self.key_prefix + key
+        value = cache.get(cache_key)
+
+        if value is None:
+            value = queryset.count()
+            cache.set(cache_key, value, self.timeout)
+
+        return EntitiesCount(value)
+
+
+class EstimatedCount(CountStrategy):
+    """The estimation of the query planner is used instead of a real count
+    when it is big (i.e. the list-view uses the fast-mode, see
+    'settings.FAST_QUERY_MODE_THRESHOLD') ; smaller counts are exact.
+    Only PostgreSQL is supported ; with the other DBRMS the count is exact.
+    """
+    def estimate(self, queryset: QuerySet) -> int | None:
+        "@return: The estimated number of rows, or None if it's not available."
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        sql, params = queryset.query.sql_with_params()
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            return int(plan[0]['Plan']['Plan Rows'])
+        except (DatabaseError, LookupError, TypeError, ValueError) as e:
+            logger.warning('EstimatedCount: the estimation failed (%s)', e)
+
+        return None
+
+    def count(self, queryset, key):
+        estimation = self.estimate(queryset)
+
+        if estimation is not None and estimation >= settings.FAST_QUERY_MODE_THRESHOLD:
+            return EntitiesCount(estimation, approximate=True)
+
+        return EntitiesCount(queryset.count())
+
+
+def get_count_strategy() -> CountStrategy:
+    "Get the strategy set up by 'settings.LISTVIEW_COUNT_STRATEGY'."
+    return import_string(settings.LISTVIEW_COUNT_STRATEGY)()
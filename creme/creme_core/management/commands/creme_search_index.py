@@ -0,0 +1,76 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from creme.creme_core.core.search_index import get_search_index
+from creme.creme_core.registry import creme_registry
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the index of words used by the global search (see the setting '
+        '"SEARCH_INDEX") for the existing entities.'
+    )
+    leave_locale_alone = True
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.ModelName',
+            help='Models of entities to index. [default: all the models]',
+        )
+        parser.add_argument(
+            '-p', '--per_page',
+            action='store', dest='per_page', type=int, default=256,
+            help='Number of entities indexed at once. [default: %(default)s]',
+        )
+
+    def handle(self, **options):
+        search_index = get_search_index()
+        if search_index is None:
+            raise CommandError('No index is set up (see the setting "SEARCH_INDEX").')
+
+        entity_models = [*creme_registry.iter_entity_models()]
+        model_names = options['models']
+
+        if model_names:
+            models = []
+
+            for model_name in model_names:
+                try:
+                    model = apps.get_model(model_name)
+                except (LookupError, ValueError) as e:
+                    raise CommandError(str(e)) from e
+
+                if model not in entity_models:
+                    raise CommandError(f'"{model_name}" is not a registered model of entities.')
+
+                models.append(model)
+        else:
+            models = entity_models
+
+        verbosity = options['verbosity']
+        per_page = options['per_page']
+
+        for model in models:
+            count = search_index.rebuild(model, per_page=per_page)
+
+            if verbosity:
+                self.stdout.write(f'{model._meta.label}: {count} entities have been indexed.')
@@ -22,15 +22,28 @@
 #
 ################################################################################
 
+import logging
+
 from django.utils.deprecation import MiddlewareMixin
 
-from ..global_info import clear_global_info, set_global_info
+from ..global_info import (
+    PerRequestCache,
+    clear_global_info,
+    get_global_info,
+    set_global_info,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class GlobalInfoMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        set_global_info(user=request.user, per_request_cache={})
+        set_global_info(user=request.user, per_request_cache=PerRequestCache())
 
     def process_response(self, request, response):
+        cache = get_global_info('per_request_cache')
+        if cache is not None:
+            logger.debug('Per-request cache of "%s": %s', request.path, cache)
+
         clear_global_info()
         return response
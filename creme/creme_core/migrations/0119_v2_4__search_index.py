@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models.deletion import CASCADE
+
+from creme.creme_core.models.fields import EntityCTypeForeignKey
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('creme_core', '0118_v2_4__fileref_extra_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'entity',
+                    models.ForeignKey(
+                        to='creme_core.cremeentity', related_name='+',
+                        editable=False, on_delete=CASCADE,
+                    )
+                ),
+                (
+                    'entity_type',
+                    EntityCTypeForeignKey(
+                        to='contenttypes.contenttype', related_name='+',
+                        editable=False, on_delete=CASCADE,
+                    )
+                ),
+                ('cell_key', models.CharField(editable=False, max_length=100)),
+                ('word', models.CharField(editable=False, max_length=100)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=models.Index(
+                fields=['entity_type', 'cell_key', 'word'],
+                name='core__search_index__word',
+            ),
+        ),
+    ]
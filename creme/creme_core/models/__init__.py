@@ -34,7 +34,7 @@ from .lock import Mutex, MutexAutoLock  # NOQA
 from .menu import MenuConfigItem  # NOQA
 from .relation import Relation, RelationType, SemiFixedRelationType  # NOQA
 from .reminder import DateReminder  # NOQA
-from .search import SearchConfigItem  # NOQA
+from .search import SearchConfigItem, SearchIndexEntry  # NOQA
 from .setting_value import SettingValue  # NOQA
 from .vat import Vat  # NOQA
 from .version import Version  # NOQA
@@ -35,9 +35,12 @@ from django.contrib.auth.models import (
 )
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import models
 from django.db.models import Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.utils.functional import partition
 from django.utils.timezone import now
 from django.utils.translation import gettext
@@ -1045,7 +1048,12 @@ class CremeUser(AbstractBaseUser):
 
         teams = self._teams
         if teams is None:
-            self._teams = teams = [*self.teams_set.all()]
+            creds_cache = get_credentials_cache()
+            self._teams = teams = (
+                [*self.teams_set.all()]
+                if creds_cache is None else
+                creds_cache.get_teams(self)
+            )
 
         return teams
 
@@ -1289,6 +1297,163 @@ for fname in ('password', 'last_login'):
 del get_user_field
 
 
+class CredentialsCache:
+    """Store the data used to compute the credentials in a cache of Django
+    (see settings.CACHES), in order to avoid some queries in each request:
+      - the roles, with their creatable/exportable ContentTypes & their
+        SetCredentials (with the related EntityFilters & their conditions).
+      - the teams of the users.
+
+    The keys contain a version, which is changed when an instance used by
+    the credentials is modified (see the signal handlers below) ; so the
+    outdated entries are not used anymore (& they expire with the timeout).
+    Hint: use get_credentials_cache().
+    """
+    version_key = 'creme_core-credentials-version'
+
+    def __init__(self, cache):
+        """Constructor.
+        @param cache: Instance of <django.core.cache.backends.base.BaseCache>.
+        """
+        self._cache = cache
+
+    @property
+    def version(self) -> str:
+        cache = self._cache
+        version = cache.get(self.version_key)
+
+        if version is None:
+            # NB: add() does not override the version set by another process
+            cache.add(self.version_key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(self.version_key)
+
+        return version
+
+    def clear(self) -> None:
+        "All the stored data become outdated."
+        self._cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+
+    @staticmethod
+    def _dump_role(role: UserRole) -> dict:
+        from .entity_filter import EntityFilter, EntityFilterCondition
+
+        credentials = [*role.credentials.all()]
+        efilter_ids = {sc.efilter_id for sc in credentials if sc.efilter_id}
+        conditions = defaultdict(list)
+
+        if efilter_ids:
+            for condition in EntityFilterCondition.objects.filter(filter__in=efilter_ids):
+                conditions[condition.filter_id].append(condition)
+
+        return {
+            'role': role,
+            'creatable_ctypes': [*role.creatable_ctypes.values_list('id', flat=True)],
+            'exportable_ctypes': [*role.exportable_ctypes.values_list('id', flat=True)],
+            'credentials': credentials,
+            'efilters': [
+                (efilter, conditions[efilter.id])
+                for efilter in EntityFilter.objects.filter(id__in=efilter_ids)
+            ],
+        }
+
+    @staticmethod
+    def _load_role(data: dict) -> UserRole:
+        role = data['role']
+        role._creatable_ctypes_set = frozenset(data['creatable_ctypes'])
+        role._exportable_ctypes_set = frozenset(data['exportable_ctypes'])
+
+        efilters = {}
+        for efilter, conditions in data['efilters']:
+            efilter._build_conditions_cache(conditions)
+            efilters[efilter.id] = efilter
+
+        credentials = data['credentials']
+        for sc in credentials:
+            if sc.efilter_id:
+                sc.efilter = efilters[sc.efilter_id]
+
+        role._setcredentials = credentials
+
+        return role
+
+    def get_role(self, role_id: int) -> UserRole | None:
+        """Get a role with its credentials already retrieved.
+        @return A UserRole instance, or None if the role does not exist.
+        """
+        cache = self._cache
+        key = f'creme_core-role-{self.version}-{role_id}'
+        data = cache.get(key)
+
+        if data is None:
+            logger.debug('CredentialsCache.get_role(): Cache MISS for id=%s', role_id)
+            role = UserRole.objects.filter(id=role_id).first()
+            if role is None:
+                return None
+
+            data = self._dump_role(role)
+            cache.set(key, data)
+        else:
+            logger.debug('CredentialsCache.get_role(): Cache HIT for id=%s', role_id)
+
+        return self._load_role(data)
+
+    def get_teams(self, user: CremeUser) -> list[CremeUser]:
+        cache = self._cache
+        key = f'creme_core-teams-{self.version}-{user.id}'
+        teams = cache.get(key)
+
+        if teams is None:
+            logger.debug('CredentialsCache.get_teams(): Cache MISS for user_id=%s', user.id)
+            teams = [*user.teams_set.all()]
+            cache.set(key, teams)
+        else:
+            logger.debug('CredentialsCache.get_teams(): Cache HIT for user_id=%s', user.id)
+
+        return teams
+
+
+def get_credentials_cache() -> CredentialsCache | None:
+    """Get the cache for credentials (see CredentialsCache).
+    @return A CredentialsCache instance, or None if the cache is disabled
+            (see settings.CREDENTIALS_CACHE).
+    """
+    alias = settings.CREDENTIALS_CACHE
+
+    return CredentialsCache(caches[alias]) if alias else None
+
+
+@receiver((post_save, post_delete), sender=UserRole)
+@receiver((post_save, post_delete), sender=SetCredentials)
+# NB: we do not retrieve the filter of the condition to check its type
+#     (the conditions are not often modified).
+@receiver((post_save, post_delete), sender='creme_core.EntityFilterCondition')
+# NB: the teams of a user are retrieved again if one of its teams is deleted
+#     (the role is retrieved from the field "role_id" of the user, so saving
+#     a user does not make the data outdated).
+@receiver(post_delete, sender=CremeUser)
+def _clear_credentials_cache(sender, instance, **kwargs):
+    creds_cache = get_credentials_cache()
+
+    if creds_cache is not None:
+        creds_cache.clear()
+
+
+@receiver((post_save, post_delete), sender='creme_core.EntityFilter')
+def _clear_credentials_cache_for_efilter(sender, instance, **kwargs):
+    from ..core.entity_filter import EF_CREDENTIALS
+
+    if instance.filter_type == EF_CREDENTIALS:
+        _clear_credentials_cache(sender=sender, instance=instance)
+
+
+@receiver(m2m_changed, sender=UserRole.creatable_ctypes.through)
+@receiver(m2m_changed, sender=UserRole.exportable_ctypes.through)
+@receiver(m2m_changed, sender=CremeUser.teammates_set.through)
+def _clear_credentials_cache_for_m2m(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _clear_credentials_cache(sender=sender, instance=instance)
+
+
 class Sandbox(models.Model):
     """When a CremeEntity is associated to a sandbox, only the user related to this sandbox
     can have its regular permission on this entity.
@@ -28,22 +28,24 @@ from json import JSONEncoder
 from json import loads as json_load
 from typing import Container, Iterable, Iterator, Sequence  # Any Callable
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 # from django.core.exceptions import FieldDoesNotExist
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models, router
 # from django.db.models import Field
 from django.db.models import ForeignKey, Model, signals
-from django.db.models.base import ModelState
-from django.db.transaction import atomic
+from django.db.transaction import atomic, on_commit
 from django.dispatch import receiver
 # from django.utils.formats import date_format, number_format
 # from django.utils.timezone import localtime
 # from django.utils.translation import gettext
 # from django.utils.translation import pgettext
+from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
 
+from ..core.bulk_save import bulk_save_receivers
 from ..core.field_tags import FieldTag
 from ..global_info import (
     cached_per_request,
@@ -282,9 +284,6 @@ class _HistoryLineType:
         backup = getattr(instance, '_instance_backup', None)
 
         if backup is not None:
-            backup['_state'] = ModelState()
-            old_instance = instance.__class__()
-            old_instance.__dict__ = backup
             excluded_fields: Container = (
                 _EXCLUDED_FIELDS if isinstance(instance, CremeEntity) else ()
             )
@@ -296,13 +295,19 @@ class _HistoryLineType:
                 if fname in excluded_fields or not field.get_tag(FieldTag.VIEWABLE):
                     continue
 
-                old_value = getattr(old_instance, fname)
-                new_value = getattr(instance, fname)
+                attname = field.attname
+
+                try:
+                    old_value = backup[attname]
+                except KeyError:  # Deferred field
+                    continue
 
                 if isinstance(field, ForeignKey):
-                    old_value = old_value and old_value.pk
-                    new_value = new_value and new_value.pk
+                    # NB: we compare the IDs, so the instances are not retrieved
+                    new_value = getattr(instance, attname)
                 else:
+                    new_value = getattr(instance, fname)
+
                     try:
                         # Sometimes a form sets a string representing an int in
                         # an IntegerField (for example)
@@ -336,8 +341,28 @@ class _HistoryLineType:
 
     @staticmethod
     def _create_entity_backup(entity: Model) -> None:
-        entity._instance_backup = backup = entity.__dict__.copy()
-        del backup['_state']
+        """Store the current values of the fields of an instance ; they will be
+        used as "old" values to build the modifications of the next edition.
+        It should be called when the instance is synchronised with the DB
+        (i.e. just after being retrieved or saved).
+        """
+        instance_dict = entity.__dict__
+        entity._instance_backup = {
+            attname: instance_dict[attname]
+            for attname in (field.attname for field in entity._meta.concrete_fields)
+            if attname in instance_dict
+        }
+
+    @staticmethod
+    def _load_entity_backup(entity: Model) -> None:
+        """Store the values of the fields of an instance as they are in the DB.
+        Notice that the snapshot is taken lazily (see _prepare_log()), so the
+        instances which are retrieved but not modified (list-views, exports...)
+        do not pay for it.
+        """
+        entity._instance_backup = type(entity)._base_manager.filter(
+            pk=entity.pk,
+        ).values(*(field.attname for field in entity._meta.concrete_fields)).first()
 
     # def _get_printer(self, field: Field) -> Printer:
     #     warnings.warn(
@@ -443,11 +468,21 @@ class _HLTCacheMixin:
     def _set_cached_line(cls, instance, hline):
         raise NotImplementedError
 
+    @staticmethod
+    def _updatable_line(hline):
+        # NB: a line inserted with a grouped query does not get its ID on some
+        #     DB backends (see BufferedHistoryWriter.write_lines()) ; it cannot
+        #     be updated, so a new line must be created.
+        if hline is not None and hline.pk is None and not hline._buffered:
+            return None
+
+        return hline
+
 
 class _HLTInstanceCacheMixin(_HLTCacheMixin):
     @classmethod
     def _get_cached_line(cls, instance):
-        return getattr(instance, cls._get_cache_key(instance), None)
+        return cls._updatable_line(getattr(instance, cls._get_cache_key(instance), None))
 
     @classmethod
     def _set_cached_line(cls, instance, hline):
@@ -459,7 +494,7 @@ class _HLTRequestCacheMixin(_HLTCacheMixin):
     def _get_cached_line(cls, instance):
         cache = get_per_request_cache()
         cache_key = cls._get_cache_key(instance)
-        return cache.get(cache_key)
+        return cls._updatable_line(cache.get(cache_key))
 
     @classmethod
     def _set_cached_line(cls, instance, hline):
@@ -499,8 +534,8 @@ class _HLTEntityCreation(_HistoryLineType):
     @classmethod
     def create_line(cls, entity: CremeEntity) -> None:
         HistoryLine._create_line_4_instance(entity, cls.type_id, date=entity.created)
-        # We do not backup here (and the handler _prepare_log() only creates if
-        # PK exists), in order to keep a kind of 'creation session'.
+        # We do not backup here (and the handler _log_creation_edition() marks
+        # the instance as without backup), in order to keep a kind of 'creation session'.
         # So when you create a CremeEntity, while you still use the same python
         # object, multiple save() will not generate several HistoryLine objects.
 
@@ -542,6 +577,52 @@ class _HLTEntityEdition(_HLTManyToManyMixin,
                 hline.value = hline._encode_attrs(entity, modifs=modifications)
                 hline.save()
 
+    @classmethod
+    def bulk_create_lines(cls, entities: Iterable[CremeEntity]) -> None:
+        """Create the lines of several edited entities with a grouped query ;
+        it's useful when the entities have been saved without the method save()
+        (e.g. with QuerySet.bulk_update()), so the signal 'post_save' has not
+        been sent.
+        The "old" values must have been stored before the entities are
+        modified (see _create_entity_backup()).
+        Notice that the lines are not cached (see create_lines()).
+        """
+        if not HistoryLine.ENABLED:
+            return
+
+        entities = [
+            entity for entity in entities
+            if not getattr(entity, '_hline_disabled', False)
+        ]
+
+        if HistoryConfigItem.objects.configured_relation_type_ids():
+            # The related lines need the ID of the main line
+            for entity in entities:
+                cls.create_lines(entity)
+
+            return
+
+        user = get_global_info('user')
+        username = user.username if user else ''
+        lines = []
+
+        for entity in entities:
+            modifs = cls._build_fields_modifs(entity)
+
+            if modifs:
+                lines.append(HistoryLine(
+                    entity=entity,
+                    entity_ctype_id=entity.entity_type_id,
+                    entity_owner_id=entity.user_id,
+                    username=username,
+                    type=cls.type_id,
+                    date=entity.modified,
+                    value=HistoryLine._encode_attrs(entity, modifs=modifs),
+                ))
+                cls._create_entity_backup(entity)
+
+        HistoryLine.objects.bulk_create(lines)
+
     @classmethod
     def create_lines_for_m2m(cls,
                              entity: CremeEntity,
@@ -594,6 +675,20 @@ class _HLTCustomFieldsEdition(_HLTManyToManyMixin,
             )
             setattr(custom_value, cls.backup_attname, storable_value)
 
+    @classmethod
+    def _load_cvalue_backup(cls, custom_value: CustomFieldValue):
+        if not isinstance(custom_value, CustomFieldMultiEnum):
+            setattr(
+                custom_value,
+                cls.backup_attname,
+                type(custom_value)._base_manager.filter(
+                    pk=custom_value.pk,
+                ).values_list(
+                    'value_id' if isinstance(custom_value, CustomFieldEnum) else 'value',
+                    flat=True,
+                ).first(),
+            )
+
     @classmethod
     def _get_cache_key(cls, instance):
         return f'creme_core-history_lines-custom-{instance.id}'
@@ -737,12 +832,12 @@ class _HLTEntityDeletion(_HistoryLineType):
 
     @classmethod
     def create_line(cls, entity: CremeEntity) -> None:
-        HistoryLine.objects.create(
+        get_history_writer().write(HistoryLine(
             entity_ctype=entity.entity_type,
             entity_owner=entity.user,
             type=cls.type_id,
             value=HistoryLine._encode_attrs(entity),
-        )
+        ))
 
 
 @TYPES_MAP(TYPE_TRASH)
@@ -754,14 +849,8 @@ class _HLTEntityTrash(_HistoryLineType):
         backup = getattr(entity, '_instance_backup', None)
 
         if backup and backup['is_deleted'] != entity.is_deleted:
-            HistoryLine.objects.create(
-                entity=entity,
-                entity_ctype=entity.entity_type,
-                entity_owner=entity.user,
-                type=cls.type_id,
-                value=HistoryLine._encode_attrs(
-                    entity, modifs=[entity.is_deleted],
-                ),
+            HistoryLine._create_line_4_instance(
+                entity, cls.type_id, modifs=[entity.is_deleted],
             )
 
     # def verbose_modifications(self, modifications, entity_ctype, user):
@@ -793,7 +882,7 @@ class _HLTRelatedEntity(_HistoryLineType):
             object_entities = [r.object_entity for r in relations]
             create_line = partial(
                 HistoryLine._create_line_4_instance,
-                ltype=cls.type_id, date=entity.modified, related_line_id=related_line.id,
+                ltype=cls.type_id, date=entity.modified, related_line=related_line,
             )
 
             CremeEntity.populate_real_entities(object_entities)  # Optimisation
@@ -860,12 +949,18 @@ class _HLTRelation(_HistoryLineType):
         hline_sym = create_line(
             relation.object_entity, sym_cls.type_id,
             modifs=[relation.type.symmetric_type_id],
-            related_line_id=hline.id,
+            related_line=hline,
         )
         hline.value = HistoryLine._encode_attrs(
             hline.entity,
             modifs=[relation.type_id], related_line_id=hline_sym.id,
+            pending_related_line=hline_sym.id is None,
         )
+
+        if hline_sym.id is None:
+            # The line has not been written yet (see BufferedHistoryWriter)
+            hline._pending_related_line = hline_sym
+
         hline.save()
 
     @classmethod
@@ -1147,6 +1242,10 @@ class HistoryLine(Model):
     _related_line_id: int | None = None
     _related_line: HistoryLine | bool | None = False
 
+    # See BufferedHistoryWriter
+    _buffered: bool = False
+    _pending_related_line: HistoryLine | None = None
+
     class Meta:
         app_label = 'creme_core'
         verbose_name = _('Line of history')
@@ -1240,10 +1339,15 @@ class HistoryLine(Model):
                       instance,
                       modifs=(),
                       related_line_id: int | None = None,
+                      pending_related_line: bool = False,
                       ) -> str:
         value: list = [str(instance)]
         if related_line_id:
             value.append(related_line_id)
+        elif pending_related_line:
+            # NB: the ID is set when the related line is written (see
+            #     BufferedHistoryWriter.write_lines()).
+            value.append(None)
 
         encode = _JSONEncoder().encode
 
@@ -1258,7 +1362,7 @@ class HistoryLine(Model):
     def _read_attrs(self) -> None:
         value = json_load(self.value)
         self._entity_repr = value.pop(0)
-        self._related_line_id = value.pop(0) if self.line_type.has_related_line else 0
+        self._related_line_id = (value.pop(0) or 0) if self.line_type.has_related_line else 0
         self._modifications = value
 
     @property
@@ -1305,6 +1409,10 @@ class HistoryLine(Model):
     #         return ['??']
 
     def _get_related_line_id(self) -> int | None:
+        pending_line = self._pending_related_line
+        if pending_line is not None:
+            return pending_line.id
+
         if self._related_line_id is None:
             self._read_attrs()
 
@@ -1355,6 +1463,10 @@ class HistoryLine(Model):
 
     @property
     def related_line(self) -> HistoryLine | None:
+        pending_line = self._pending_related_line
+        if pending_line is not None:
+            return pending_line
+
         if self._related_line is False:
             self._related_line = None
             line_id = self._get_related_line_id()
@@ -1374,13 +1486,20 @@ class HistoryLine(Model):
             ltype: int,
             date=None,
             modifs=(),
-            related_line_id=None):
+            related_line_id=None,
+            related_line: HistoryLine | None = None):
         """Builder.
+        The line is written by the writer set up by 'settings.HISTORY_WRITER'.
         @param ltype: See TYPE_*
         @param date: If not given, will be 'now'.
         @param modifs: List of tuples containing JSONifiable values.
         @param related_line_id: HistoryLine.id.
+        @param related_line: HistoryLine instance (can be used instead of
+               'related_line_id', when the related line is not written yet).
         """
+        if related_line is not None:
+            related_line_id = related_line.id
+
         kwargs = {
             'entity': instance,
             'entity_ctype': instance.entity_type,
@@ -1390,16 +1509,25 @@ class HistoryLine(Model):
                 instance,
                 modifs=modifs,
                 related_line_id=related_line_id,
+                pending_related_line=related_line is not None,
             ),
         }
 
         if date:
             kwargs['date'] = date
 
-        return cls.objects.create(**kwargs)
+        line = cls(**kwargs)
+
+        if related_line is not None and related_line_id is None:
+            line._pending_related_line = related_line
+
+        get_history_writer().write(line)
+
+        return line
 
     def save(self, *args, **kwargs):
-        if self.ENABLED:
+        # NB: a buffered line is inserted later with its current value.
+        if self.ENABLED and not self._buffered:
             # if self.pk is None: TODO ?
             user = get_global_info('user')
             self.username = user.username if user else ''
@@ -1424,34 +1552,188 @@ class HistoryLine(Model):
         self.username = user.username if user else ''
 
 
+class HistoryWriter:
+    """Writes the new lines of history in the DB.
+    The writer which is used is set by 'settings.HISTORY_WRITER'.
+    """
+    def write(self, line: HistoryLine) -> None:
+        """Write a line (which is not saved yet).
+        Notice that the related line of <line> (see HistoryLine.related_line)
+        can be not written yet too (see HistoryLine._pending_related_line).
+        """
+        raise NotImplementedError
+
+
+class ImmediateHistoryWriter(HistoryWriter):
+    "Each line is saved immediately, with its own query (default behaviour)."
+    def write(self, line):
+        line.save()
+
+
+class BufferedHistoryWriter(HistoryWriter):
+    """The lines created in an atomic block are collected, & inserted with
+    grouped queries when the transaction is committed. The lines created
+    outside atomic blocks are saved immediately.
+
+    The lines created in a savepoint which is rolled back are discarded (the
+    lines are stored in buffers per savepoint, with a callback registered by
+    on_commit() which is removed by Django when the savepoint is rolled back).
+    A new buffer is started each time the savepoint changes, in order to keep
+    the order of creation (i.e. the order of the IDs).
+
+    The buffers are written in their order of creation, & a line is always
+    created after its related line ; so when a buffer is written, a related
+    line which belongs to another buffer & has no ID comes from a rolled back
+    savepoint, & it is discarded.
+    """
+    # Name of the attribute of the DB connection which stores the buffers
+    buffers_attname = '_creme_history_buffers'
+
+    def write(self, line):
+        connection = connections[router.db_for_write(HistoryLine)]
+
+        if not connection.in_atomic_block:
+            line.save()
+        elif HistoryLine.ENABLED:
+            user = get_global_info('user')
+            line.username = user.username if user else ''
+            line._buffered = True
+
+            self._get_buffer(connection).append(line)
+
+    def _get_buffer(self, connection) -> list[HistoryLine]:
+        registered_ids = {id(hook[1]) for hook in connection.run_on_commit}
+
+        # NB: we remove the buffers which have been discarded (rolled back
+        #     savepoints) or written (the callbacks stay registered when they
+        #     are executed by TestCase.captureOnCommitCallbacks()).
+        buffers = [
+            buffer
+            for buffer in connection.__dict__.get(self.buffers_attname, ())
+            if id(buffer[1]) in registered_ids and buffer[2][-1]._buffered
+        ]
+        setattr(connection, self.buffers_attname, buffers)
+
+        key = tuple(connection.savepoint_ids)
+        if buffers:
+            last_key, __, lines = buffers[-1]
+
+            if last_key == key:
+                return lines
+
+        lines = []
+        callback = partial(self.write_lines, lines)
+        buffers.append((key, callback, lines))
+        on_commit(callback, using=connection.alias)
+
+        return lines
+
+    @staticmethod
+    def write_lines(lines: Sequence[HistoryLine]) -> None:
+        """Insert some buffered lines with grouped queries.
+        Notice that the inserted lines do not get their ID when the DB backend
+        does not support it (see 'can_return_rows_from_bulk_insert').
+        """
+        lines = [line for line in lines if line._buffered and line.pk is None]
+        if not lines:
+            return
+
+        for line in lines:
+            line._buffered = False
+
+        # NB: the entities which have been deleted in the transaction (their
+        #     existing lines have been detached by the DB collector)
+        entity_ids = {line.entity_id for line in lines if line.entity_id}
+        if entity_ids:
+            existing_ids = {
+                *CremeEntity.objects.filter(id__in=entity_ids).values_list('id', flat=True),
+            }
+
+            for line in lines:
+                if line.entity_id and line.entity_id not in existing_ids:
+                    line.entity = None
+
+        manager = HistoryLine.objects
+        pending_lines = [line for line in lines if line._pending_related_line is not None]
+
+        with atomic():
+            if not pending_lines:
+                manager.bulk_create(lines)
+                return
+
+            # The related lines must be inserted first to get their ID (NB: the
+            # order of creation is kept).
+            if connections[manager.db].features.can_return_rows_from_bulk_insert:
+                manager.bulk_create(lines)
+                remaining_lines = ()
+            else:
+                related_ids = {id(line._pending_related_line) for line in pending_lines}
+                split = max(
+                    (i for i, line in enumerate(lines) if id(line) in related_ids),
+                    default=-1,
+                ) + 1
+
+                for line in lines[:split]:
+                    Model.save(line)
+
+                remaining_lines = lines[split:]
+
+            encode = _JSONEncoder().encode
+
+            for line in pending_lines:
+                related_line = line._pending_related_line
+                line._pending_related_line = None
+
+                # NB: line of another buffer which has been rolled back
+                #     => the line is kept without related line.
+                if related_line.pk is None:
+                    line._related_line_id = 0
+                    continue
+
+                value = json_load(line.value)
+                value[1] = line._related_line_id = related_line.pk
+                line.value = encode(value)
+
+            manager.bulk_update(
+                [line for line in pending_lines if line.pk is not None], ['value'],
+            )
+            manager.bulk_create(remaining_lines)
+
+
+def get_history_writer() -> HistoryWriter:
+    "Get the writer set up by 'settings.HISTORY_WRITER'."
+    return import_string(settings.HISTORY_WRITER)()
+
+
 # TODO: method of CremeEntity ??
 def _final_entity(entity) -> bool:
     "Is the instance an instance of a 'leaf' class."
     return entity.entity_type_id == _get_ct(entity).id
 
 
-@receiver(signals.post_init)
-def _prepare_log(sender, instance, **kwargs):
-    if hasattr(instance, 'get_related_entity'):
-        _HistoryLineType._create_entity_backup(instance)
-    elif isinstance(instance, CremeEntity) and instance.id and _final_entity(instance):
-        _HistoryLineType._create_entity_backup(instance)
+# NB: the "old" values are retrieved lazily, just before the instance is saved,
+#     & not when the instance is built (signal 'post_init'), because many
+#     instances are retrieved without being modified (list-views, exports...).
+@receiver(signals.pre_save)
+def _prepare_log(sender, instance, raw, **kwargs):
+    if (
+        raw
+        or not HistoryLine.ENABLED
+        or instance._state.adding
+        or getattr(instance, '_hline_disabled', False)
+    ):
+        return
+
+    if hasattr(instance, 'get_related_entity') or (
+        isinstance(instance, CremeEntity) and _final_entity(instance)
+    ):
+        # NB: the backup is updated after each edition (see create_lines()),
+        #     & there is no backup during a 'creation session'.
+        if not hasattr(instance, '_instance_backup'):
+            _HistoryLineType._load_entity_backup(instance)
     elif isinstance(instance, CustomFieldValue):
-        _HLTCustomFieldsEdition._create_cvalue_backup(instance)
-    # XXX: following billing lines problem should not exist anymore
-    #      (several inheritance levels are avoided).
-    # TODO: replace with this code
-    #      problem with billing lines : the update view does not retrieve
-    #      final class, so 'instance.entity_type_id == _get_ct(instance).id'
-    #      test avoid the creation of a line
-    #      --> find a better way to test if a final object is alive ?
-    # if isinstance(instance, CremeEntity):
-    #     if not instance.id or instance.entity_type_id != _get_ct(instance).id:
-    #         return
-    # elif not hasattr(instance, 'get_related_entity'):
-    #     return
-    #
-    # _HistoryLineType._create_entity_backup(instance)
+        if not hasattr(instance, _HLTCustomFieldsEdition.backup_attname):
+            _HLTCustomFieldsEdition._load_cvalue_backup(instance)
 
 
 @receiver(signals.post_save)
@@ -1467,11 +1749,15 @@ def _log_creation_edition(sender, instance, created, **kwargs):
         elif hasattr(instance, 'get_related_entity'):
             if created:
                 _HLTAuxCreation.create_line(instance)
+                _HistoryLineType._create_entity_backup(instance)
             else:
                 _HLTAuxEdition.create_line(instance)
         elif isinstance(instance, CremeEntity):
             if created:
                 _HLTEntityCreation.create_line(instance)
+                # NB: no backup => next calls to save() on this instance do
+                #     not create lines (see _HLTEntityCreation).
+                instance._instance_backup = None
             else:
                 _HLTEntityEdition.create_lines(instance)
                 _HLTEntityTrash.create_line(instance)
@@ -1483,6 +1769,11 @@ def _log_creation_edition(sender, instance, created, **kwargs):
         )
 
 
+# NB: the code which saves entities with grouped queries creates the history
+#     lines itself (see _HLTEntityEdition.bulk_create_lines()).
+bulk_save_receivers.register(_prepare_log).register(_log_creation_edition)
+
+
 @receiver(signals.m2m_changed)
 def _log_m2m_edition(sender, instance, action, pk_set, **kwargs):
     if getattr(instance, '_hline_disabled', False):  # see HistoryLine.disable
@@ -1567,6 +1858,9 @@ def _log_deletion(sender, instance, **kwargs):
             _get_deleted_entity_ids().add(instance.id)
             _HLTEntityDeletion.create_line(instance)
         elif isinstance(instance, CustomFieldValue):
+            if not hasattr(instance, _HLTCustomFieldsEdition.backup_attname):
+                _HLTCustomFieldsEdition._create_cvalue_backup(instance)
+
             _HLTCustomFieldsEdition.create_lines(instance, emptied=True)
     except Exception:
         logger.exception('Error in _log_deletion() ; HistoryLine may not be created.')
@@ -25,13 +25,17 @@ from typing import TYPE_CHECKING, DefaultDict, Iterable, Iterator
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models.query_utils import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext_lazy
 
+from ..core.bulk_save import bulk_save_receivers
 from ..utils.meta import ModelFieldEnumerator
 from .auth import UserRole
 from .base import CremeModel
+from .custom_field import CustomFieldValue
 from .entity import CremeEntity
 from .fields import DatePeriodField, EntityCTypeForeignKey
 
@@ -257,3 +261,68 @@ class SearchConfigItem(CremeModel):
             raise ValueError('"role" must be NULL if "superuser" is True')
 
         super().save(*args, **kwargs)
+
+
+class SearchIndexEntry(models.Model):
+    """Word contained in a field of an entity ; used by the built-in index for
+    the global search (see creme_core.core.search_index.TableSearchIndex).
+    """
+    entity = models.ForeignKey(
+        CremeEntity, related_name='+', on_delete=models.CASCADE, editable=False,
+    )
+    # NB: de-normalized to get smaller index scans
+    entity_type = EntityCTypeForeignKey(related_name='+', editable=False)
+    # Key of the related EntityCell (see EntityCell.key)
+    cell_key = models.CharField(max_length=100, editable=False)
+    word = models.CharField(max_length=100, editable=False)
+
+    class Meta:
+        app_label = 'creme_core'
+        indexes = [
+            models.Index(
+                fields=['entity_type', 'cell_key', 'word'],
+                name='core__search_index__word',
+            ),
+        ]
+
+    def __str__(self):
+        return f'SearchIndexEntry(entity={self.entity_id}, cell={self.cell_key}, word={self.word})'
+
+
+@receiver(post_save)
+def _update_search_index(sender, instance, **kwargs):
+    if isinstance(instance, (CremeEntity, CustomFieldValue)):
+        from ..core.search_index import get_search_index
+
+        search_index = get_search_index()
+
+        if search_index is not None:
+            if isinstance(instance, CremeEntity):
+                search_index.update_entities([instance])
+            else:
+                search_index.update_custom_value(instance)
+
+
+def _update_search_index_in_bulk(model, instances):
+    if issubclass(model, CremeEntity):
+        from ..core.search_index import get_search_index
+
+        search_index = get_search_index()
+
+        if search_index is not None:
+            search_index.update_entities(instances)
+
+
+bulk_save_receivers.register(_update_search_index, _update_search_index_in_bulk)
+
+
+@receiver(post_delete)
+def _remove_from_search_index(sender, instance, **kwargs):
+    # NB: the entries related to a deleted entity are removed by the CASCADE.
+    if isinstance(instance, CustomFieldValue):
+        from ..core.search_index import get_search_index
+
+        search_index = get_search_index()
+
+        if search_index is not None:
+            search_index.remove_custom_value(instance)
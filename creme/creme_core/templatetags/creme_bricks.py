@@ -28,7 +28,7 @@ from ..core import sorter
 from ..core.entity_cell import EntityCellRegularField
 # NB: do not import registries directly to facilitate unit tests
 from ..gui import bricks, bulk_update
-from ..gui.bricks import Brick, BricksManager
+from ..gui.bricks import Brick, BricksManager, render_brick
 from ..gui.pager import PagerContext
 from ..utils.media import get_current_theme_from_context
 from ..utils.translation import plural as is_plural
@@ -1020,7 +1020,7 @@ def brick_display(context, *bricks, **kwargs):
         if fun:
             # NB: the context is copied is order to a 'fresh' one for each brick,
             #     & so avoid annoying side-effects.
-            return fun({**context_dict})
+            return render_brick(brick, fun, {**context_dict})
 
         logger.warning(
             'Brick without %s(): %s (id=%s)',
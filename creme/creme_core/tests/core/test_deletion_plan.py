@@ -0,0 +1,146 @@
+from functools import partial
+
+from creme.creme_core.core.deletion_plan import DeletionPlan
+from creme.creme_core.models import (
+    FakeContact,
+    FakeDocument,
+    FakeFolder,
+    FakeImage,
+    FakeOrganisation,
+    Relation,
+    RelationType,
+)
+
+from ..base import CremeTestCase
+
+
+class DeletionPlanTestCase(CremeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+
+    def test_dependency_fields(self):
+        self.assertListEqual(
+            ['linked_folder'],
+            [f.name for f in DeletionPlan.dependency_fields(FakeDocument)],
+        )
+        self.assertListEqual(
+            ['parent'],
+            [f.name for f in DeletionPlan.dependency_fields(FakeFolder)],
+        )
+        # NB: FakeContact.image is SET_NULL
+        self.assertFalse([*DeletionPlan.dependency_fields(FakeContact)])
+
+    def test_empty(self):
+        plan = DeletionPlan({FakeContact: []})
+        self.assertFalse(plan)
+        self.assertEqual(0, len(plan))
+        self.assertListEqual([], plan.layers)
+
+    def test_layers(self):
+        user = self.user
+        create_folder = partial(FakeFolder.objects.create, user=user, is_deleted=True)
+        folder1 = create_folder(title='Root')
+        folder2 = create_folder(title='Child', parent=folder1)
+        folder3 = create_folder(title='Not deleted', is_deleted=False)
+
+        create_doc = partial(FakeDocument.objects.create, user=user, is_deleted=True)
+        doc1 = create_doc(title='Doc #1', linked_folder=folder2)
+        doc2 = create_doc(title='Doc #2', linked_folder=folder3)
+        contact = FakeContact.objects.create(
+            user=user, first_name='Spike', last_name='Spiegel', is_deleted=True,
+        )
+
+        plan = DeletionPlan({
+            FakeFolder: [folder1.id, folder2.id],
+            FakeDocument: [doc1.id, doc2.id],
+            FakeContact: [contact.id],
+        })
+        self.assertTrue(plan)
+        self.assertEqual(5, len(plan))
+        self.assertListEqual(
+            [
+                {
+                    FakeDocument: [doc1.id, doc2.id],
+                    FakeContact: [contact.id],
+                },
+                {FakeFolder: [folder2.id]},
+                {FakeFolder: [folder1.id]},
+            ],
+            plan.layers,
+        )
+
+    def test_layers_cycle(self):
+        user = self.user
+        create_folder = partial(FakeFolder.objects.create, user=user, is_deleted=True)
+        folder1 = create_folder(title='#1')
+        folder2 = create_folder(title='#2', parent=folder1)
+        folder3 = create_folder(title='#3')
+        FakeFolder.objects.filter(id=folder1.id).update(parent=folder2)
+
+        plan = DeletionPlan({FakeFolder: [folder1.id, folder2.id, folder3.id]})
+
+        with self.assertLogs(level='WARNING'):
+            layers = plan.layers
+
+        self.assertListEqual(
+            [
+                {FakeFolder: [folder3.id]},
+                {FakeFolder: [folder1.id, folder2.id]},
+            ],
+            layers,
+        )
+
+    def test_groups(self):
+        user = self.user
+        folder = FakeFolder.objects.create(user=user, title='Root', is_deleted=True)
+        doc = FakeDocument.objects.create(
+            user=user, title='Doc', linked_folder=folder, is_deleted=True,
+        )
+
+        create_contact = partial(FakeContact.objects.create, user=user, is_deleted=True)
+        contact1 = create_contact(first_name='Spike', last_name='Spiegel')
+        contact2 = create_contact(first_name='Jet',   last_name='Black')
+        orga = FakeOrganisation.objects.create(user=user, name='Bebop', is_deleted=True)
+        image = FakeImage.objects.create(user=user, name='Photo', is_deleted=True)
+
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed', 'is employed by'),
+            ('test-object_employed',  'employs'),
+        )[0]
+        Relation.objects.create(
+            user=user, type=rtype, subject_entity=contact1, object_entity=orga,
+        )
+
+        plan = DeletionPlan({
+            FakeFolder: [folder.id],
+            FakeDocument: [doc.id],
+            FakeContact: [contact1.id, contact2.id],
+            FakeOrganisation: [orga.id],
+            FakeImage: [image.id],
+        })
+        groups = plan.groups()
+        self.assertEqual(3, len(groups))
+
+        entity_ids = sorted(
+            (group.entity_ids for group in groups), key=len, reverse=True,
+        )
+        self.assertDictEqual(
+            {FakeFolder: [folder.id], FakeDocument: [doc.id]}, entity_ids[0],
+        )
+        self.assertDictEqual(
+            {FakeContact: [contact1.id, contact2.id], FakeOrganisation: [orga.id]},
+            entity_ids[1],
+        )
+        self.assertDictEqual({FakeImage: [image.id]}, entity_ids[2])
+
+        group = next(g for g in groups if FakeFolder in g.entity_ids)
+        self.assertListEqual(
+            [{FakeDocument: [doc.id]}, {FakeFolder: [folder.id]}],
+            group.layers,
+        )
+
+        # Only one group
+        plan = DeletionPlan({FakeImage: [image.id]})
+        self.assertListEqual([plan], plan.groups())
@@ -1,14 +1,22 @@
 import os
 from datetime import timedelta
+from io import StringIO
 from shutil import rmtree
 from tempfile import mkdtemp
 from unittest import skipIf
+from unittest.mock import patch
 
 from django.core.exceptions import ImproperlyConfigured
 from django.test.utils import override_settings
 from django.utils.timezone import now
 
 from creme.creme_core.core.job import JobScheduler, _JobTypeRegistry
+from creme.creme_core.core.job.pool import (
+    JobWorker,
+    JobWorkerPool,
+    process_memory,
+    run_worker,
+)
 from creme.creme_core.core.job.queue.unix_socket import UnixSocketQueue
 from creme.creme_core.core.reminder import Reminder, reminder_registry
 from creme.creme_core.creme_jobs import reminder_type
@@ -207,3 +215,172 @@ class JobSchedulerTestCase(CremeTestCase):
             rounded_hour + timedelta(hours=1),
             JobScheduler()._next_wakeup(job),
         )
+
+    @override_settings(JOBMANAGER_POOL_SIZE=0)
+    def test_pool_disabled(self):
+        self.assertIsNone(JobScheduler()._pool)
+
+    @override_settings(
+        JOBMANAGER_POOL_SIZE=3,
+        JOBMANAGER_POOL_MAX_JOBS=10,
+        JOBMANAGER_POOL_MAX_MEMORY=256,
+    )
+    def test_pool_enabled(self):
+        pool = JobScheduler()._pool
+        self.assertIsInstance(pool, JobWorkerPool)
+        self.assertEqual(3, pool.size)
+        self.assertEqual(10, pool.max_jobs)
+        self.assertEqual(256 * 1024, pool.max_memory)
+        self.assertEqual(0, len(pool))  # Workers are started by check()
+
+
+class _LightJobWorker(JobWorker):
+    "Worker which does not set up Django (& so starts quickly)."
+    script = (
+        'import sys\n'
+        'for line in sys.stdin: pass'
+    )
+
+
+class _LightJobWorkerPool(JobWorkerPool):
+    worker_class = _LightJobWorker
+
+
+class JobWorkerPoolTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pools = []
+
+    def tearDown(self):
+        super().tearDown()
+
+        for pool in self.pools:
+            for worker in pool.workers:
+                worker.stop(wait=False)
+                worker.process.kill()
+                worker.process.wait()
+
+    def _build_pool(self, **kwargs):
+        pool = _LightJobWorkerPool(**kwargs)
+        self.pools.append(pool)
+
+        return pool
+
+    def test_run_worker(self):
+        job = Job.objects.get(type_id=reminder_type.id)
+        executed = []
+
+        def fake_call(registry, job_id):
+            executed.append(job_id)
+
+            if job_id == 666:
+                raise ValueError('Invalid job')
+
+        with patch.object(_JobTypeRegistry, '__call__', fake_call):
+            with self.assertLogs(level='WARNING'):
+                run_worker(StringIO(f'{job.id}\n\ninvalid\n666\n{job.id}\n'))
+
+        self.assertListEqual([job.id, 666, job.id], executed)
+
+    def test_process_memory(self):
+        memory = process_memory(os.getpid())
+
+        if os.path.exists('/proc'):
+            self.assertIsInstance(memory, int)
+            self.assertGreater(memory, 0)
+        else:
+            self.assertIsNone(memory)
+
+    def test_check(self):
+        pool = self._build_pool(size=2)
+        self.assertListEqual([], pool.check())
+
+        workers = [*pool.workers]
+        self.assertEqual(2, len(workers))
+        self.assertTrue(all(worker.is_alive for worker in workers))
+        self.assertFalse(any(worker.is_busy for worker in workers))
+
+        # Nothing to do
+        self.assertListEqual([], pool.check())
+        self.assertListEqual(workers, [*pool.workers])
+
+    def test_run_job(self):
+        pool = self._build_pool(size=2)
+        pool.check()
+
+        self.assertTrue(pool.run_job(12))
+        self.assertTrue(pool.run_job(13))
+        self.assertFalse(pool.run_job(14))  # All workers are busy
+        self.assertCountEqual([12, 13], [w.job_id for w in pool.workers])
+
+        self.assertTrue(pool.end_job(12))
+        self.assertFalse(pool.end_job(14))
+        self.assertCountEqual([None, 13], [w.job_id for w in pool.workers])
+
+        self.assertTrue(pool.run_job(14))
+        self.assertCountEqual([14, 13], [w.job_id for w in pool.workers])
+
+    def test_crash(self):
+        pool = self._build_pool(size=2)
+        pool.check()
+        pool.run_job(12)
+
+        worker = next(w for w in pool.workers if w.job_id == 12)
+        worker.process.kill()
+        worker.process.wait()
+
+        with self.assertLogs(level='CRITICAL'):
+            crashed_job_ids = pool.check()
+
+        self.assertListEqual([12], crashed_job_ids)
+
+        workers = [*pool.workers]
+        self.assertEqual(2, len(workers))
+        self.assertNotIn(worker, workers)
+
+    def test_recycle_max_jobs(self):
+        pool = self._build_pool(size=1, max_jobs=2)
+        pool.check()
+        worker1 = next(pool.workers)
+
+        pool.run_job(12)
+        pool.end_job(12)
+        self.assertEqual(1, worker1.executed_jobs)
+        self.assertListEqual([worker1], [*pool.workers])
+
+        pool.run_job(13)
+        pool.end_job(13)
+        self.assertEqual(0, len(pool))
+
+        worker1.process.wait()
+        self.assertFalse(worker1.is_alive)
+
+        self.assertListEqual([], pool.check())  # Not crashed
+        worker2 = next(pool.workers)
+        self.assertIsNot(worker1, worker2)
+        self.assertEqual(0, worker2.executed_jobs)
+
+    def test_recycle_max_memory(self):
+        pool = self._build_pool(size=1, max_memory=1)  # 1 KB
+        pool.check()
+        worker = next(pool.workers)
+
+        with patch.object(_LightJobWorker, 'memory', 2):
+            pool.run_job(12)
+            pool.end_job(12)
+
+        self.assertEqual(0, len(pool))
+        worker.process.wait()
+
+    def test_scheduler(self):
+        scheduler = JobScheduler()
+        scheduler._pool = pool = self._build_pool(size=1)
+        scheduler._check_pool()
+
+        job = Job.objects.get(type_id=reminder_type.id)
+        scheduler._start_job(job)
+        self.assertDictEqual({}, scheduler._procs)
+        self.assertEqual(job.id, next(pool.workers).job_id)
+
+        scheduler._end_job(job)
+        self.assertIsNone(next(pool.workers).job_id)
@@ -0,0 +1,71 @@
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+from creme.creme_core.core.model_versions import (
+    ModelVersions,
+    get_model_versions,
+)
+from creme.creme_core.models import (
+    BrickState,
+    CremeEntity,
+    FakeContact,
+    FakeImage,
+    FakeImageCategory,
+    FakeSector,
+)
+
+from ..base import CremeTestCase
+
+
+class ModelVersionsTestCase(CremeTestCase):
+    def test_bump(self):
+        cache = caches['default']
+        cache.clear()
+
+        versions = ModelVersions(cache)
+        models = [FakeContact, CremeEntity, FakeSector]
+        versions1 = versions.get_versions(models)
+        self.assertEqual(3, len(versions1))
+        self.assertListEqual(versions1, versions.get_versions(models))
+
+        versions.bump(FakeContact)
+        versions2 = versions.get_versions(models)
+        self.assertNotEqual(versions1[0], versions2[0])
+        self.assertNotEqual(versions1[1], versions2[1])  # Parent class
+        self.assertEqual(versions1[2], versions2[2])
+
+        # Ignored model
+        state_version = versions.get_versions([BrickState])
+        versions.bump(BrickState)
+        self.assertListEqual(state_version, versions.get_versions([BrickState]))
+
+    def test_get_model_versions(self):
+        with override_settings(BRICKS_CACHE='', REPORTS_GRAPHS_CACHE=''):
+            self.assertIsNone(get_model_versions())
+
+        with override_settings(BRICKS_CACHE='default'):
+            self.assertIsInstance(get_model_versions(), ModelVersions)
+
+    def test_signals(self):
+        user = self.create_user()
+
+        with override_settings(BRICKS_CACHE='default'):
+            versions = get_model_versions()
+            versions.cache.clear()
+
+            contact_v1, sector_v1 = versions.get_versions([FakeContact, FakeSector])
+            contact = FakeContact.objects.create(user=user, first_name='Bell', last_name='Cranel')
+            contact_v2, sector_v2 = versions.get_versions([FakeContact, FakeSector])
+            self.assertNotEqual(contact_v1, contact_v2)
+            self.assertEqual(sector_v1, sector_v2)
+
+            contact.delete()
+            self.assertNotEqual(contact_v2, versions.get_versions([FakeContact])[0])
+
+            # ManyToMany
+            img = FakeImage.objects.create(user=user, name='Hestia')
+            image_v1, cat_v1 = versions.get_versions([FakeImage, FakeImageCategory])
+            img.categories.set([FakeImageCategory.objects.first()])
+            image_v2, cat_v2 = versions.get_versions([FakeImage, FakeImageCategory])
+            self.assertNotEqual(image_v1, image_v2)
+            self.assertNotEqual(cat_v1, cat_v2)
@@ -180,6 +180,29 @@ class FlowPaginatorTestCase(CremeTestCase):
 
         self.assertIsNone(page.next_page_info())
 
+    def test_approximate_count(self):
+        "The estimated count is lower than the real count."
+        self._build_contacts()
+
+        contacts = FakeContact.objects.all()
+        paginator = FlowPaginator(
+            contacts.all(), key='last_name', per_page=2, count=2, approximate_count=True,
+        )
+        self.assertIs(paginator.approximate_count, True)
+        self.assertIs(
+            FlowPaginator(contacts, key='last_name', per_page=2).approximate_count,
+            False,
+        )
+
+        page1 = paginator.page()
+        self.assertListEqual([contacts[0], contacts[1]], [*page1.object_list])
+        self.assertTrue(page1.has_next())
+
+        # Not the first page again
+        page2 = paginator.page(page1.next_page_info())
+        self.assertListEqual([contacts[2], contacts[3]], [*page2.object_list])
+        self.assertTrue(page2.has_previous())
+
     def test_invalid_paginator(self):
         contacts = FakeContact.objects.all()
         count = len(contacts)
@@ -0,0 +1,221 @@
+from functools import partial
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from creme.creme_core.core.entity_cell import (
+    EntityCellCustomField,
+    EntityCellRegularField,
+)
+from creme.creme_core.core.search import Searcher
+from creme.creme_core.core.search_index import (
+    TableSearchIndex,
+    get_search_index,
+    index_words,
+)
+from creme.creme_core.management.commands.creme_search_index import (
+    Command as IndexCommand,
+)
+from creme.creme_core.models import (
+    CustomField,
+    CustomFieldInteger,
+    CustomFieldString,
+    FakeContact,
+    FakeOrganisation,
+    FakeSector,
+    SearchConfigItem,
+    SearchIndexEntry,
+)
+
+from ..base import CremeTestCase
+
+TABLE_INDEX = 'creme.creme_core.core.search_index.TableSearchIndex'
+
+
+class SearchIndexTestCase(CremeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+
+    def _words(self, entity, cell_key):
+        return {
+            *SearchIndexEntry.objects.filter(
+                entity=entity.id, cell_key=cell_key,
+            ).values_list('word', flat=True),
+        }
+
+    def test_index_words(self):
+        self.assertSetEqual({'kusanagi', 'motoko'}, index_words('Motoko KUSANAGI'))
+        self.assertSetEqual({'gerard', 'dupont'}, index_words('Gérard  Dupont-Gérard'))
+        self.assertSetEqual({'jean', 'example', 'com'}, index_words('jean@example.com'))
+        self.assertSetEqual(set(), index_words(' @ - '))
+        self.assertSetEqual({'abc'}, index_words('abcdef', max_length=3))
+
+    def test_get_search_index(self):
+        self.assertIsNone(get_search_index())
+
+        with override_settings(SEARCH_INDEX=TABLE_INDEX):
+            search_index = get_search_index()
+            self.assertIs(search_index, get_search_index())
+
+        self.assertIsInstance(search_index, TableSearchIndex)
+        self.assertIsNone(get_search_index())
+
+    def test_is_cell_indexed(self):
+        search_index = TableSearchIndex()
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        self.assertTrue(search_index.is_cell_indexed(build_cell(name='last_name')))
+        self.assertTrue(search_index.is_cell_indexed(build_cell(name='description')))
+        self.assertFalse(search_index.is_cell_indexed(build_cell(name='birthday')))
+        self.assertFalse(search_index.is_cell_indexed(build_cell(name='sector__title')))
+
+        create_cfield = partial(CustomField.objects.create, content_type=FakeContact)
+        self.assertTrue(search_index.is_cell_indexed(EntityCellCustomField(
+            create_cfield(name='Nickname', field_type=CustomField.STR),
+        )))
+        self.assertFalse(search_index.is_cell_indexed(EntityCellCustomField(
+            create_cfield(name='Size', field_type=CustomField.INT),
+        )))
+
+    @override_settings(SEARCH_INDEX=TABLE_INDEX)
+    def test_update_index(self):
+        contact = FakeContact.objects.create(
+            user=self.user, first_name='Motoko', last_name='Kusanagi',
+            description='Major of the Section 9',
+        )
+        self.assertSetEqual({'motoko'}, self._words(contact, 'regular_field-first_name'))
+        self.assertSetEqual({'kusanagi'}, self._words(contact, 'regular_field-last_name'))
+        self.assertSetEqual(
+            {'major', 'of', 'the', 'section', '9'},
+            self._words(contact, 'regular_field-description'),
+        )
+        self.assertFalse(self._words(contact, 'regular_field-email'))
+
+        entry = SearchIndexEntry.objects.filter(entity=contact.id).first()
+        self.assertEqual(
+            ContentType.objects.get_for_model(FakeContact).id, entry.entity_type_id,
+        )
+
+        # Edition ---
+        contact.last_name = 'Kusanagi-Aramaki'
+        contact.description = ''
+        contact.save()
+        self.assertSetEqual(
+            {'kusanagi', 'aramaki'}, self._words(contact, 'regular_field-last_name'),
+        )
+        self.assertFalse(self._words(contact, 'regular_field-description'))
+
+        # Custom-field ---
+        create_cfield = partial(CustomField.objects.create, content_type=FakeContact)
+        cfield1 = create_cfield(name='Nickname', field_type=CustomField.STR)
+        cfield2 = create_cfield(name='Size',     field_type=CustomField.INT)
+
+        cvalue = CustomFieldString.objects.create(
+            custom_field=cfield1, entity=contact, value='The Major',
+        )
+        CustomFieldInteger.objects.create(custom_field=cfield2, entity=contact, value=170)
+        cf_key = f'custom_field-{cfield1.id}'
+        self.assertSetEqual({'the', 'major'}, self._words(contact, cf_key))
+        self.assertFalse(self._words(contact, f'custom_field-{cfield2.id}'))
+
+        contact.first_name = 'Motoko-chan'
+        contact.save()
+        self.assertSetEqual({'the', 'major'}, self._words(contact, cf_key))
+
+        cvalue.delete()
+        self.assertFalse(self._words(contact, cf_key))
+
+        # Deletion ---
+        contact.delete()
+        self.assertFalse(SearchIndexEntry.objects.filter(entity=contact.id))
+
+    def test_no_index(self):
+        contact = FakeContact.objects.create(
+            user=self.user, first_name='Motoko', last_name='Kusanagi',
+        )
+        self.assertFalse(SearchIndexEntry.objects.filter(entity=contact.id))
+
+    @override_settings(SEARCH_INDEX=TABLE_INDEX)
+    def test_search(self):
+        user = self.user
+        SearchConfigItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(FakeContact),
+        ).delete()
+        SearchConfigItem.objects.create_if_needed(
+            FakeContact, ['first_name', 'last_name', 'sector__title'],
+        )
+
+        sector = FakeSector.objects.create(title='Cyber-police')
+        create_contact = partial(FakeContact.objects.create, user=user)
+        motoko = create_contact(first_name='Motoko', last_name='Kusanagi', sector=sector)
+        batou = create_contact(first_name='Batou', last_name='Ranger')
+        togusa = create_contact(first_name='Togusa', last_name='Gérard')
+
+        searcher = Searcher([FakeContact], user)
+        self.assertIsInstance(searcher.index, TableSearchIndex)
+
+        def search(research):
+            return {*searcher.search(FakeContact, research)}
+
+        self.assertSetEqual({motoko}, search('kusa'))
+        self.assertSetEqual({motoko}, search('Motoko kusanagi'))
+        self.assertSetEqual(set(),    search('sanagi'))  # Beginning of words only
+        self.assertSetEqual({togusa}, search('gerard'))
+        self.assertSetEqual({batou},  search('BAT'))
+
+        # Not indexed cell (sub-field)
+        self.assertSetEqual({motoko}, search('police'))
+        self.assertSetEqual({motoko}, search('moto police'))
+
+        # No word for the index => the index is not used
+        self.assertSetEqual({motoko}, search('-'))
+
+    def test_search_without_index(self):
+        user = self.user
+        SearchConfigItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(FakeOrganisation),
+        ).delete()
+        SearchConfigItem.objects.create_if_needed(FakeOrganisation, ['name'])
+
+        orga = FakeOrganisation.objects.create(user=user, name='Section 9')
+
+        searcher = Searcher([FakeOrganisation], user)
+        self.assertIsNone(searcher.index)
+
+        qs = searcher.search(FakeOrganisation, 'ctio')
+        self.assertListEqual([orga], [*qs])
+        self.assertFalse(qs.query.distinct)
+
+    def test_command(self):
+        create_contact = partial(FakeContact.objects.create, user=self.user)
+        contact1 = create_contact(first_name='Motoko', last_name='Kusanagi')
+        contact2 = create_contact(first_name='Batou',  last_name='Ranger')
+        contact3 = create_contact(first_name='Togusa', last_name='Gerard')
+        orga = FakeOrganisation.objects.create(user=self.user, name='Section 9')
+
+        cfield = CustomField.objects.create(
+            name='Nickname', field_type=CustomField.STR, content_type=FakeContact,
+        )
+        CustomFieldString.objects.create(custom_field=cfield, entity=contact1, value='Major')
+        self.assertFalse(SearchIndexEntry.objects.all())
+
+        with self.assertRaises(CommandError):
+            call_command(IndexCommand(), verbosity=0)
+
+        with override_settings(SEARCH_INDEX=TABLE_INDEX):
+            with self.assertRaises(CommandError):
+                call_command(IndexCommand(), 'creme_core.Unknown', verbosity=0)
+
+            with self.assertRaises(CommandError):
+                call_command(IndexCommand(), 'creme_core.FakeSector', verbosity=0)
+
+            call_command(IndexCommand(), 'creme_core.FakeContact', verbosity=0, per_page=2)
+
+        self.assertSetEqual({'kusanagi'}, self._words(contact1, 'regular_field-last_name'))
+        self.assertSetEqual({'major'}, self._words(contact1, f'custom_field-{cfield.id}'))
+        self.assertSetEqual({'ranger'}, self._words(contact2, 'regular_field-last_name'))
+        self.assertSetEqual({'gerard'}, self._words(contact3, 'regular_field-last_name'))
+        self.assertFalse(SearchIndexEntry.objects.filter(entity=orga.id))
@@ -4,6 +4,7 @@ from django.contrib.sessions.backends.base import SessionBase
 from django.template.context import make_context
 from django.template.engine import Engine
 from django.test import RequestFactory
+from django.test.utils import override_settings
 from django.utils.translation import gettext as _
 
 from creme.creme_core.constants import MODELBRICK_ID
@@ -13,6 +14,7 @@ from creme.creme_core.core.entity_cell import (
 )
 from creme.creme_core.gui.bricks import (
     Brick,
+    BricksCache,
     BricksManager,
     CustomBrick,
     EntityBrick,
@@ -21,6 +23,8 @@ from creme.creme_core.gui.bricks import (
     SimpleBrick,
     SpecificRelationsBrick,
     _BrickRegistry,
+    get_bricks_cache,
+    render_brick,
 )
 from creme.creme_core.models import (
     CustomBrickConfigItem,
@@ -1470,3 +1474,87 @@ class BrickTestCase(CremeTestCase):
 
         with self.assertNumQueries(0):
             self.assertCountEqual(expected_models, [*brick.target_ctypes])
+
+    def test_cache(self):
+        user = self.login()
+        other_user = self.other_user
+        orga = FakeOrganisation.objects.create(user=user, name='Hestia familia')
+
+        class CachedBrick(SimpleBrick):
+            id_ = SimpleBrick.generate_id('creme_core', 'BrickTestCase-test_cache')
+            dependencies = (FakeContact,)
+            cache_timeout = 60
+            renders = 0
+
+            def detailview_display(self, context):
+                CachedBrick.renders += 1
+                return f'<div>{context["object"]}</div>'
+
+        self.assertIsNone(get_bricks_cache())
+
+        def render(brick, request_user=user, url='/'):
+            request = self._build_request(url)
+            request.user = request_user
+            context = self._build_context(request)
+            context['user'] = request_user
+            context['object'] = orga
+
+            bricks_manager = BricksManager()
+            bricks_manager.add_group(brick.id_, brick)
+            context[BricksManager.var_name] = bricks_manager
+
+            return render_brick(brick, brick.detailview_display, context)
+
+        brick = CachedBrick()
+
+        with override_settings(BRICKS_CACHE='default'):
+            bricks_cache = get_bricks_cache()
+            self.assertIsInstance(bricks_cache, BricksCache)
+            bricks_cache.cache.clear()
+
+            self.assertHTMLEqual('<div>Hestia familia</div>', render(brick))
+            self.assertEqual(1, CachedBrick.renders)
+
+            self.assertHTMLEqual('<div>Hestia familia</div>', render(brick))
+            self.assertEqual(1, CachedBrick.renders)
+
+            # Other user
+            render(brick, request_user=other_user)
+            self.assertEqual(2, CachedBrick.renders)
+
+            # Change of page => not cached
+            render(brick, url=f'/?{brick.id_}_page=2')
+            self.assertEqual(3, CachedBrick.renders)
+
+            # Dependencies
+            FakeContact.objects.create(user=user, first_name='Bell', last_name='Cranel')
+            render(brick)
+            self.assertEqual(4, CachedBrick.renders)
+            render(brick)
+            self.assertEqual(4, CachedBrick.renders)
+
+            # The entity is modified
+            orga.name = 'Loki familia'
+            orga.save()
+            self.assertHTMLEqual('<div>Loki familia</div>', render(brick))
+            self.assertEqual(5, CachedBrick.renders)
+
+            # Wildcard
+            brick.dependencies = '*'
+            self.assertIsNone(bricks_cache.build_key(brick, {}))
+            render(brick)
+            self.assertEqual(6, CachedBrick.renders)
+
+        # No cache
+        brick.dependencies = (FakeContact,)
+        render(brick)
+        self.assertEqual(7, CachedBrick.renders)
+
+    def test_cache_not_cacheable(self):
+        "Attribute cache_timeout is None."
+        self.login()
+        brick = self.OrderedBrick()
+        self.assertIsNone(brick.cache_timeout)
+
+        with override_settings(BRICKS_CACHE='default'):
+            self.assertIsNone(get_bricks_cache().build_key(brick, {}))
@@ -3,6 +3,7 @@ from functools import partial
 from django.apps import apps
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db.models import QuerySet
 from django.db.models.deletion import ProtectedError
@@ -12,6 +13,7 @@ from django.utils.translation import gettext as _
 from creme.creme_config.models import FakeConfigEntity
 from creme.creme_core import constants
 from creme.creme_core.auth import STAFF_PERM, SUPERUSER_PERM, EntityCredentials
+from creme.creme_core.auth.backend import EntityBackend
 from creme.creme_core.core.entity_filter import (
     EF_CREDENTIALS,
     condition_handler,
@@ -34,6 +36,10 @@ from creme.creme_core.models import (
     SetCredentials,
     UserRole,
 )
+from creme.creme_core.models.auth import (
+    CredentialsCache,
+    get_credentials_cache,
+)
 from creme.creme_core.sandboxes import OnlySuperusersType
 from creme.documents.models import Document, Folder
 from creme.documents.tests.base import skipIfCustomDocument, skipIfCustomFolder
@@ -2270,6 +2276,148 @@ class CredentialsTestCase(CremeTestCase):
         )  # Belongs to the teams
         self.assertFalse(creds_filter(user, qs, perm=EntityCredentials.CHANGE))
 
+    @override_settings(CREDENTIALS_CACHE='default')
+    def test_credentials_cache01(self):
+        "Role & teams are stored in the cache."
+        caches['default'].clear()
+
+        user = self.user
+        contact1 = self.contact1
+        contact2 = self.contact2
+
+        efilter = EntityFilter.objects.create(
+            id='creme_core-test_auth',
+            entity_type=FakeContact,
+            filter_type=EF_CREDENTIALS,
+        )
+        efilter.set_conditions(
+            [
+                condition_handler.RegularFieldConditionHandler.build_condition(
+                    model=FakeContact,
+                    operator=operators.IEQUALS,
+                    field_name='last_name', values=[contact2.last_name],
+                    filter_type=EF_CREDENTIALS,
+                ),
+            ],
+            check_cycles=False, check_privacy=False,
+        )
+        role = self._create_role(
+            'Coder', ['creme_core'], users=[user],
+            set_creds=[
+                SetCredentials(
+                    value=EntityCredentials.VIEW,
+                    set_type=SetCredentials.ESET_OWN,
+                ),
+                SetCredentials(
+                    value=EntityCredentials.VIEW,
+                    set_type=SetCredentials.ESET_FILTER,
+                    ctype=FakeContact,
+                    efilter=efilter,
+                ),
+            ],
+        )
+        role.creatable_ctypes.set([ContentType.objects.get_for_model(FakeContact)])
+        team = self._create_team('Teamee', [user])
+
+        backend = EntityBackend()
+        user = backend.get_user(user.id)
+        self.assertEqual(role, user.role)
+        self.assertTrue(user.has_perm_to_view(contact1))
+        self.assertTrue(user.has_perm_to_view(contact2))
+        self.assertListEqual([team], user.teams)
+
+        user = backend.get_user(user.id)
+        contact1 = self.refresh(contact1)
+        contact2 = self.refresh(contact2)
+
+        with self.assertNumQueries(0):
+            user_role = user.role
+            can_view1 = user.has_perm_to_view(contact1)
+            can_view2 = user.has_perm_to_view(contact2)
+            can_create = user.has_perm_to_create(FakeContact)
+            teams = user.teams
+
+        self.assertEqual(role, user_role)
+        self.assertTrue(can_view1)
+        self.assertTrue(can_view2)
+        self.assertFalse(user.has_perm_to_change(contact2))
+        self.assertTrue(can_create)
+        self.assertFalse(user.has_perm_to_create(FakeOrganisation))
+        self.assertListEqual([team], teams)
+
+        self.assertCountEqual(
+            [contact1.id, contact2.id],
+            self._ids_list(EntityCredentials.filter(
+                user, self._build_contact_qs(), perm=EntityCredentials.VIEW,
+            )),
+        )
+
+    @override_settings(CREDENTIALS_CACHE='default')
+    def test_credentials_cache02(self):
+        "The cache is cleared when the credentials are modified."
+        caches['default'].clear()
+
+        user = self.user
+        contact2_id = self.contact2.id
+        role = self._create_role(
+            'Coder', ['creme_core'], users=[user],
+            set_creds=[
+                SetCredentials(
+                    value=EntityCredentials.VIEW,
+                    set_type=SetCredentials.ESET_OWN,
+                ),
+            ],
+        )
+
+        # NB: a new instance of entity is used each time, to avoid the cache
+        #     of credentials in the entity
+        get_contact = FakeContact.objects.get
+        backend = EntityBackend()
+        self.assertFalse(backend.get_user(user.id).has_perm_to_view(get_contact(id=contact2_id)))
+
+        sc = SetCredentials.objects.create(
+            role=role,
+            value=EntityCredentials.VIEW | EntityCredentials.CHANGE,
+            set_type=SetCredentials.ESET_ALL,
+        )
+        user = backend.get_user(user.id)
+        self.assertTrue(user.has_perm_to_view(get_contact(id=contact2_id)))
+        self.assertTrue(user.has_perm_to_change(get_contact(id=contact2_id)))
+
+        sc.value = EntityCredentials.VIEW
+        sc.save()
+        user = backend.get_user(user.id)
+        self.assertTrue(user.has_perm_to_view(get_contact(id=contact2_id)))
+        self.assertFalse(user.has_perm_to_change(get_contact(id=contact2_id)))
+
+        sc.delete()
+        self.assertFalse(backend.get_user(user.id).has_perm_to_view(get_contact(id=contact2_id)))
+
+        # Teams ---
+        team = self._create_team('Teamee', [self.other_user])
+        contact3 = FakeContact.objects.create(user=team, first_name='Ito', last_name='Ittosai')
+        self.assertListEqual([], backend.get_user(user.id).teams)
+        self.assertFalse(backend.get_user(user.id).has_perm_to_view(get_contact(id=contact3.id)))
+
+        team.teammates = [self.other_user, user]
+        user = backend.get_user(user.id)
+        self.assertListEqual([team], user.teams)
+        self.assertTrue(user.has_perm_to_view(get_contact(id=contact3.id)))
+
+        # Apps ---
+        role.allowed_apps = ['documents']
+        role.save()
+        self.assertFalse(backend.get_user(user.id).has_perm_to_access('creme_core'))
+
+    def test_credentials_cache03(self):
+        "No cache by default."
+        self.assertIsNone(get_credentials_cache())
+
+        with override_settings(CREDENTIALS_CACHE='default'):
+            creds_cache = get_credentials_cache()
+
+        self.assertIsInstance(creds_cache, CredentialsCache)
+
     def test_has_perm_to01(self):
         "Not real entity."
         user = self.user
@@ -5,6 +5,8 @@ from functools import partial
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db.transaction import atomic
+from django.test.utils import override_settings
 from django.urls import reverse
 # from django.utils.formats import date_format, number_format
 # from django.utils.translation import gettext as _
@@ -365,6 +367,37 @@ about this fantastic animation studio."""
 
         self.assertEqual(old_count, HistoryLine.objects.count())
 
+    def test_edition_lazy_backup(self):
+        "The old values are retrieved only when the instance is saved."
+        gainax = FakeOrganisation.objects.create(user=self.user, name='Gainax', capital=12000)
+        self.assertIsNone(gainax._instance_backup)  # Creation session
+
+        gainax = self.refresh(gainax)
+        self.assertFalse(hasattr(gainax, '_instance_backup'))
+
+        gainax.capital = 24000
+        gainax.save()
+        self.assertEqual(24000, gainax._instance_backup.get('capital'))
+
+        hline = HistoryLine.objects.order_by('-id')[0]
+        self.assertEqual(TYPE_EDITION, hline.type)
+        self.assertListEqual([['capital', 12000, 24000]], hline.modifications)
+
+        # Several saves => same line
+        gainax.name = 'Gainax studio'
+        gainax.save()
+
+        hline = self.refresh(hline)
+        self.assertListEqual(
+            [['capital', 12000, 24000], ['name', 'Gainax', 'Gainax studio']],
+            hline.modifications,
+        )
+
+        # Not saved => no snapshot
+        self.assertFalse(any(
+            hasattr(orga, '_instance_backup') for orga in FakeOrganisation.objects.all()
+        ))
+
     def test_edition_fk(self):
         "FK to CremeEntity."
         user = self.user
@@ -2034,6 +2067,243 @@ about this fantastic animation studio."""
         FakeAddress.objects.create(entity=nerv, city='Tokyo')
         self.assertEqual(old_count, HistoryLine.objects.count())
 
+    BUFFERED_WRITER = 'creme.creme_core.models.history.BufferedHistoryWriter'
+
+    def test_buffered_writer01(self):
+        "Lines are inserted on commit ; related lines."
+        user = self.user
+        old_count = HistoryLine.objects.count()
+
+        rtype, srtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_works4', 'is employed'),
+            ('test-object_works4',  'employs'),
+        )
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER), \
+             self.captureOnCommitCallbacks(execute=True):
+            nerv = FakeOrganisation.objects.create(user=user, name='Nerv')
+            rei = FakeContact.objects.create(user=user, first_name='Rei', last_name='Ayanami')
+            Relation.objects.create(
+                user=user, subject_entity=rei, object_entity=nerv, type=rtype,
+            )
+
+            nerv = self.refresh(nerv)
+            nerv.description = 'Secret organisation'
+            nerv.save()
+            self.assertEqual(old_count, HistoryLine.objects.count())
+
+        hlines = self._get_hlines()
+        self.assertEqual(old_count + 5, len(hlines))
+
+        creation_hline1, creation_hline2, hline, hline_sym, edition_hline = hlines[-5:]
+        self.assertEqual(TYPE_CREATION, creation_hline1.type)
+        self.assertEqual(nerv.id,       creation_hline1.entity_id)
+
+        self.assertEqual(TYPE_CREATION, creation_hline2.type)
+        self.assertEqual(rei.id,        creation_hline2.entity_id)
+
+        self.assertEqual(TYPE_RELATION,     hline.type)
+        self.assertEqual(rei.id,            hline.entity_id)
+        self.assertListEqual([rtype.id],    hline.modifications)
+        self.assertEqual(TYPE_SYM_RELATION, hline_sym.type)
+        self.assertEqual(nerv.id,           hline_sym.entity_id)
+        self.assertListEqual([srtype.id],   hline_sym.modifications)
+        self.assertEqual(hline_sym.id, hline.related_line.id)
+        self.assertEqual(hline.id,     hline_sym.related_line.id)
+
+        self.assertEqual(TYPE_EDITION, edition_hline.type)
+        self.assertEqual(nerv.id,      edition_hline.entity_id)
+        self.assertListEqual(
+            [['description', 'Secret organisation']], edition_hline.modifications,
+        )
+
+    def test_buffered_writer02(self):
+        "Related entity."
+        user = self.user
+        ghibli = self.create_old(FakeOrganisation, user=user, name='Ghibli')
+        hayao = self.create_old(
+            FakeContact, user=user, first_name='Hayao', last_name='Miyazaki',
+        )
+
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed', 'is employed'),
+            ('test-object_employed', 'employs'),
+        )[0]
+        Relation.objects.create(
+            user=user, subject_entity=hayao, object_entity=ghibli, type=rtype,
+        )
+
+        HistoryConfigItem.objects.create(relation_type=rtype)
+        old_count = HistoryLine.objects.count()
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER), \
+             self.captureOnCommitCallbacks(execute=True):
+            hayao = self.refresh(hayao)
+            hayao.description = 'A great animation movie maker'
+            hayao.save()
+
+        hlines = self._get_hlines()
+        self.assertEqual(old_count + 2, len(hlines))
+
+        edition_hline = hlines[-2]
+        self.assertEqual(TYPE_EDITION, edition_hline.type)
+        self.assertEqual(hayao.id,     edition_hline.entity_id)
+
+        hline = hlines[-1]
+        self.assertEqual(TYPE_RELATED,     hline.type)
+        self.assertEqual(ghibli.id,        hline.entity_id)
+        self.assertEqual(edition_hline.id, hline.related_line.id)
+
+    def test_buffered_writer03(self):
+        "Rolled back savepoint ; deleted entity."
+        user = self.user
+        old_count = HistoryLine.objects.count()
+
+        class _Rollback(Exception):
+            pass
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER), \
+             self.captureOnCommitCallbacks(execute=True):
+            nerv = FakeOrganisation.objects.create(user=user, name='Nerv')
+
+            try:
+                with atomic():
+                    FakeOrganisation.objects.create(user=user, name='Seele')
+                    nerv.name = 'NERV'
+                    nerv.save()
+
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            nerv.name = 'Nerv'  # Not the value in DB, but the backup is re-used
+            gendo = FakeContact.objects.create(
+                user=user, first_name='Gendo', last_name='Ikari',
+            )
+            gendo.delete()
+
+        hlines = self._get_hlines()
+        self.assertEqual(old_count + 3, len(hlines))
+
+        creation_hline, gendo_hline, deletion_hline = hlines[-3:]
+        self.assertEqual(TYPE_CREATION, creation_hline.type)
+        self.assertEqual(nerv.id,       creation_hline.entity_id)
+
+        self.assertEqual(TYPE_CREATION, gendo_hline.type)
+        self.assertIsNone(gendo_hline.entity)
+        self.assertEqual(str(gendo),    gendo_hline.entity_repr)
+
+        self.assertEqual(TYPE_DELETION, deletion_hline.type)
+        self.assertEqual(str(gendo),    deletion_hline.entity_repr)
+
+    def test_buffered_writer04(self):
+        "History is disabled."
+        old_count = HistoryLine.objects.count()
+        HistoryLine.ENABLED = False
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER), \
+             self.captureOnCommitCallbacks(execute=True) as callbacks:
+            nerv = FakeOrganisation.objects.create(user=self.user, name='nerv')
+            nerv.name = nerv.name.title()
+            nerv.save()
+
+        self.assertFalse(callbacks)
+        self.assertEqual(old_count, HistoryLine.objects.count())
+
+    def test_buffered_writer_successive_transactions(self):
+        "The cached line has been written in a previous transaction."
+        user = self.user
+        nerv = self.refresh(self.create_old(FakeOrganisation, user=user, name='Nerv'))
+        old_count = HistoryLine.objects.count()
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER):
+            with self.captureOnCommitCallbacks(execute=True):
+                nerv.capital = 1000
+                nerv.save()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                nerv.name = 'NERV'
+                nerv.save()
+
+        hlines = self._get_hlines()
+        self.assertEqual(old_count + 2, len(hlines))
+
+        hline1, hline2 = hlines[-2:]
+        self.assertEqual(TYPE_EDITION, hline1.type)
+        self.assertListEqual([['capital', 1000]], hline1.modifications)
+
+        self.assertEqual(TYPE_EDITION, hline2.type)
+        self.assertListEqual([['name', 'Nerv', 'NERV']], hline2.modifications)
+
+    def test_buffered_writer05(self):
+        "Attributes of a line with a related line are read before the writing."
+        user = self.user
+        nerv = self.create_old(FakeOrganisation, user=user, name='Nerv')
+        rei = self.create_old(FakeContact, user=user, first_name='Rei', last_name='Ayanami')
+        rtype, srtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_works5', 'is employed'),
+            ('test-object_works5',  'employs'),
+        )
+
+        create_line = HistoryLine._create_line_4_instance
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER), \
+             self.captureOnCommitCallbacks(execute=True):
+            sym_hline = create_line(nerv, TYPE_SYM_RELATION, modifs=[srtype.id])
+            hline = create_line(rei, TYPE_RELATION, modifs=[rtype.id], related_line=sym_hline)
+            self.assertIsNone(sym_hline.id)
+            self.assertIsNone(hline.id)
+
+            self.assertEqual(str(rei),       hline.entity_repr)
+            self.assertListEqual([rtype.id], hline.modifications)
+            self.assertIs(sym_hline, hline.related_line)
+
+        hline = self.get_object_or_fail(HistoryLine, entity=rei.id, type=TYPE_RELATION)
+        sym_hline = self.get_object_or_fail(HistoryLine, entity=nerv.id, type=TYPE_SYM_RELATION)
+        self.assertEqual(str(rei),       hline.entity_repr)
+        self.assertListEqual([rtype.id], hline.modifications)
+        self.assertEqual(sym_hline.id,   hline.related_line.id)
+
+    def test_buffered_writer06(self):
+        "The related line has been created in a rolled back savepoint."
+        user = self.user
+        nerv = self.create_old(FakeOrganisation, user=user, name='Nerv')
+        rei = self.create_old(FakeContact, user=user, first_name='Rei', last_name='Ayanami')
+        rtype, srtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_works6', 'is employed'),
+            ('test-object_works6',  'employs'),
+        )
+        old_count = HistoryLine.objects.count()
+
+        class _Rollback(Exception):
+            pass
+
+        create_line = HistoryLine._create_line_4_instance
+
+        with override_settings(HISTORY_WRITER=self.BUFFERED_WRITER), \
+             self.captureOnCommitCallbacks(execute=True):
+            try:
+                with atomic():
+                    sym_hline = create_line(nerv, TYPE_SYM_RELATION, modifs=[srtype.id])
+
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            create_line(rei, TYPE_RELATION, modifs=[rtype.id], related_line=sym_hline)
+
+        self.assertIsNone(sym_hline.id)
+        self.assertFalse(HistoryLine.objects.filter(entity=nerv.id, type=TYPE_SYM_RELATION))
+
+        hlines = self._get_hlines()
+        self.assertEqual(old_count + 1, len(hlines))
+
+        hline = hlines[-1]
+        self.assertEqual(TYPE_RELATION,  hline.type)
+        self.assertEqual(rei.id,         hline.entity_id)
+        self.assertListEqual([rtype.id], hline.modifications)
+        self.assertIsNone(hline.related_line)
+
     def test_delete_lines(self):
         user = self.user
         hayao = FakeContact.objects.create(
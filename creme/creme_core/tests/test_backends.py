@@ -1,5 +1,10 @@
+from os.path import join
+
+from django.conf import settings
+
 from creme.creme_core.backends import _BackendRegistry, base
 from creme.creme_core.backends.csv_import import CSVImportBackend
+from creme.creme_core.backends.xls_export import XLSXExportBackend
 from creme.creme_core.backends.xls_import import XLSImportBackend
 
 from .base import CremeTestCase
@@ -57,3 +62,19 @@ class BackendsTestCase(CremeTestCase):
 
         with self.assertRaises(registry.InvalidClass):
             registry.get_backend_class(CSVImportBackend.id)
+
+    def test_xlsx_export_error(self):
+        "The temporary file is closed even if the export fails."
+        user = self.create_user()
+
+        def rows():
+            yield ['Spike', 'Spiegel']
+            raise ValueError('Invalid row')
+
+        backend = XLSXExportBackend()
+        self.assertEqual(join(settings.MEDIA_ROOT, 'xls'), backend.dir_path)
+
+        with self.assertRaises(ValueError):
+            backend.export(rows=rows(), filename='contacts', user=user)
+
+        self.assertTrue(backend._tmp_file.closed)
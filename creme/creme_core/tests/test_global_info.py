@@ -0,0 +1,98 @@
+from contextvars import copy_context
+from threading import Thread
+
+from creme.creme_core.global_info import (
+    PerRequestCache,
+    cached_per_request,
+    clear_global_info,
+    get_global_info,
+    get_per_request_cache,
+    set_global_info,
+)
+
+from .base import CremeTestCase
+
+
+class GlobalInfoTestCase(CremeTestCase):
+    def test_global_info(self):
+        self.assertIsNone(get_global_info('foo'))
+
+        set_global_info(foo=1, bar='baz')
+        self.assertEqual(1, get_global_info('foo'))
+        self.assertEqual('baz', get_global_info('bar'))
+
+        clear_global_info()
+        self.assertIsNone(get_global_info('foo'))
+
+    def test_threads(self):
+        set_global_info(foo=1)
+        values = {}
+
+        def get_value(key):
+            values[key] = get_global_info('foo')
+
+        # New thread => new context
+        thread = Thread(target=get_value, args=('isolated',))
+        thread.start()
+        thread.join()
+
+        # Shared context
+        thread = Thread(target=copy_context().run, args=(get_value, 'shared'))
+        thread.start()
+        thread.join()
+
+        self.assertDictEqual({'isolated': None, 'shared': 1}, values)
+
+    def test_per_request_cache(self):
+        cache = get_per_request_cache()
+        self.assertIsInstance(cache, PerRequestCache)
+        self.assertIsNone(cache.max_size)
+        self.assertIs(cache, get_per_request_cache())
+
+        cache['foo'] = 1
+        self.assertEqual(1, cache['foo'])
+        self.assertEqual(1, cache.get('foo'))
+        self.assertIsNone(cache.get('bar'))
+        self.assertEqual(2, cache.get('bar', 2))
+
+        with self.assertRaises(KeyError):
+            cache['bar']  # NOQA
+
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(3, cache.misses)
+
+        clear_global_info()
+        self.assertIsNot(cache, get_per_request_cache())
+
+    def test_per_request_cache_lru(self):
+        cache = PerRequestCache(max_size=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(1, cache['a'])  # 'b' is now the least recently used item
+
+        cache['c'] = 3
+        self.assertListEqual(['a', 'c'], [*cache.keys()])
+
+        cache['a'] = 4
+        cache['d'] = 5
+        self.assertDictEqual({'a': 4, 'd': 5}, {**cache})
+
+    def test_cached_per_request(self):
+        calls = []
+
+        @cached_per_request('creme_core-tests-cached')
+        def compute(x):
+            calls.append(x)
+            return x * 2
+
+        self.assertEqual(4, compute(2))
+        self.assertEqual(4, compute(3))
+        self.assertListEqual([2], calls)
+
+        cache = get_per_request_cache()
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+        clear_global_info()
+        self.assertEqual(6, compute(3))
+        self.assertListEqual([2, 3], calls)
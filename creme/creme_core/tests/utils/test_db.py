@@ -3,8 +3,10 @@ from functools import partial
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import post_save
 
 from creme.creme_core.constants import REL_SUB_HAS
+from creme.creme_core.core.bulk_save import bulk_save_receivers
 from creme.creme_core.models import (
     CremeEntity,
     FakeCivility,
@@ -21,6 +23,7 @@ from creme.creme_core.utils.db import (
     build_columns_key,
     get_indexed_ordering,
     get_indexes_columns,
+    has_specific_save_logic,
     populate_related,
 )
 
@@ -510,6 +513,68 @@ class DBTestCase(CremeTestCase):
         with self.assertNumQueries(2):
             populate_related(contacts, ['user__role__name'])
 
+    def test_has_specific_save_logic(self):
+        self.assertFalse(has_specific_save_logic(FakeSector))
+        self.assertTrue(has_specific_save_logic(FakeContact))
+        self.assertFalse(has_specific_save_logic(FakeContact, base_save=CremeEntity.save))
+
+        def _handler(sender, instance, **kwargs):
+            pass
+
+        post_save.connect(_handler, sender=FakeSector)
+
+        try:
+            self.assertTrue(has_specific_save_logic(FakeSector))
+        finally:
+            post_save.disconnect(_handler, sender=FakeSector)
+
+        self.assertFalse(has_specific_save_logic(FakeSector))
+
+    def test_has_specific_save_logic_fields(self):
+        def _handler(sender, instance, **kwargs):
+            pass
+
+        def _bulk_handler(model, instances):
+            pass
+
+        post_save.connect(_handler, sender=FakeContact)
+
+        try:
+            has_logic = partial(
+                has_specific_save_logic, FakeContact, base_save=CremeEntity.save,
+            )
+            self.assertTrue(has_logic())
+            self.assertTrue(has_logic(field_names=['sector']))
+
+            bulk_save_receivers.register_fields(_handler, fields=['last_name'])
+
+            try:
+                self.assertFalse(has_logic(field_names=['sector']))
+                self.assertTrue(has_logic(field_names=['sector', 'last_name']))
+                self.assertTrue(has_logic())
+
+                # Bulk handler
+                bulk_save_receivers.register_fields(
+                    _handler, fields=['last_name'], handler=_bulk_handler,
+                )
+                self.assertFalse(has_logic(field_names=['last_name']))
+                self.assertFalse(has_logic())
+            finally:
+                bulk_save_receivers.unregister_fields(_handler)
+        finally:
+            post_save.disconnect(_handler, sender=FakeContact)
+
+        # Overridden save()
+        self.assertTrue(has_specific_save_logic(FakeContact, field_names=['sector']))
+
+        bulk_save_receivers.register_fields(CremeEntity.save, fields=['description'])
+
+        try:
+            self.assertFalse(has_specific_save_logic(FakeContact, field_names=['sector']))
+            self.assertTrue(has_specific_save_logic(FakeContact, field_names=['description']))
+        finally:
+            bulk_save_receivers.unregister_fields(CremeEntity.save)
+
     def test_prefetcher01(self):
         sector1, sector2, sector3 = FakeSector.objects.all()[:3]
 
@@ -1,11 +1,19 @@
 import os
-from datetime import datetime
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
 from tempfile import NamedTemporaryFile
 
+from django.test.utils import override_settings
 from xlrd import XLRDError
 
 from creme.creme_core.tests.base import CremeTestCase
 from creme.creme_core.utils.xlrd_utils import XlrdReader
+from creme.creme_core.utils.xlsx_utils import (
+    XlsxWriter,
+    column_letters,
+    excel_date_format,
+)
 from creme.creme_core.utils.xlwt_utils import XlwtWriter
 
 
@@ -109,3 +117,80 @@ Praesent blandit pharetra nulla, id ultrices diam molestie sed.
         elt = read_content[0]
         self.assertEqual(1, len(elt))
         self.assertEqual(32767, len(elt[0]))
+
+    def test_xlsx_write_and_read(self):
+        file = NamedTemporaryFile(suffix='.xlsx')
+
+        wt = XlsxWriter(file.name)
+        writerow = wt.writerow
+        for element in self.data:
+            writerow(element)
+        wt.close()
+
+        rd = XlrdReader(filedata=file.name)
+        self.assertEqual([*rd], self.data)
+
+    def test_xlsx_write_types(self):
+        file = NamedTemporaryFile(suffix='.xlsx')
+
+        wt = XlsxWriter(file.name)
+        wt.writerow(['<Spike> & "Jet"', True, False, None, date(2022, 6, 26)])
+        wt.writerow(['Control\x07 character', Decimal('12.5')])
+        wt.close()
+
+        rd = XlrdReader(filedata=file.name)
+        self.assertListEqual(
+            ['<Spike> & "Jet"', True, False, '', datetime(2022, 6, 26)],
+            next(rd),
+        )
+        self.assertListEqual(['Control character', 12.5, '', '', ''], next(rd))
+
+    def test_xlsx_truncate(self):
+        file = NamedTemporaryFile(suffix='.xlsx')
+
+        wt = XlsxWriter(file.name)
+        wt.writerow(['a' * 40000])
+        wt.close()
+
+        read_content = [*XlrdReader(filedata=file.name)]
+        self.assertEqual(1, len(read_content))
+        self.assertEqual(32767, len(read_content[0][0]))
+
+    @override_settings(
+        USE_L10N=False,
+        DATE_INPUT_FORMATS=['%Y-%m-%d'],
+        DATETIME_INPUT_FORMATS=['%d.%m.%y %H:%M:%S'],
+    )
+    def test_xlsx_date_formats(self):
+        file = NamedTemporaryFile(suffix='.xlsx')
+
+        wt = XlsxWriter(file.name)
+        wt.writerow([date(2022, 6, 26), datetime(2022, 6, 26, 17, 30)])
+        wt.close()
+
+        with zipfile.ZipFile(file.name) as zf:
+            styles = zf.read('xl/styles.xml').decode()
+
+        self.assertIn('<numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>', styles)
+        self.assertIn('<numFmt numFmtId="165" formatCode="dd.mm.yy hh:mm:ss"/>', styles)
+
+        self.assertListEqual(
+            [datetime(2022, 6, 26), datetime(2022, 6, 26, 17, 30)],
+            next(XlrdReader(filedata=file.name)),
+        )
+
+    def test_excel_date_format(self):
+        self.assertEqual('dd/mm/yyyy', excel_date_format('%d/%m/%Y'))
+        self.assertEqual('yyyy-mm-dd hh:mm:ss', excel_date_format('%Y-%m-%d %H:%M:%S'))
+        self.assertEqual('dd mmm yy', excel_date_format('%d %b %y'))
+        self.assertEqual('dddd dd mmmm yyyy', excel_date_format('%A %d %B %Y'))
+        self.assertEqual('hh:mm AM/PM', excel_date_format('%I:%M %p'))
+        self.assertEqual('yyyy\\T\\W', excel_date_format('%YTW'))
+        self.assertEqual('hh:mm\\%', excel_date_format('%H:%M%f%%'))
+
+    def test_column_letters(self):
+        self.assertEqual('A',  column_letters(0))
+        self.assertEqual('Z',  column_letters(25))
+        self.assertEqual('AA', column_letters(26))
+        self.assertEqual('AB', column_letters(27))
+        self.assertEqual('BA', column_letters(52))
@@ -1,9 +1,12 @@
 from functools import partial
 from json import dumps as json_dump
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.db.models import UniqueConstraint
+from django.db.models.signals import post_save, pre_save
 from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.timezone import now
@@ -11,6 +14,8 @@ from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
+from creme.creme_core.core.batch_process import BatchAction
+from creme.creme_core.core.bulk_save import bulk_save_receivers
 from creme.creme_core.core.entity_filter import operands, operators
 from creme.creme_core.core.entity_filter.condition_handler import (
     RegularFieldConditionHandler,
@@ -19,13 +24,16 @@ from creme.creme_core.core.entity_filter.condition_handler import (
 from creme.creme_core.core.job import get_queue, job_type_registry
 from creme.creme_core.creme_jobs.batch_process import batch_process_type
 from creme.creme_core.models import (
+    CremeEntity,
     EntityFilter,
     EntityJobResult,
     FakeContact,
     FakeOrganisation,
+    HistoryLine,
     Job,
     SetCredentials,
 )
+from creme.creme_core.models.history import TYPE_EDITION
 
 from .base import ViewsTestCase
 
@@ -755,4 +763,130 @@ class BatchProcessViewsTestCase(ViewsTestCase):
         self.assertEqual(_('The filter does not exist anymore'), job.error)
         self.assertTrue(job.is_finished)
 
+    def test_bulk_update(self):
+        user = self.login()
+        self.assertTrue(batch_process_type._can_bulk_update(
+            FakeOrganisation,
+            [BatchAction(FakeOrganisation, 'name', 'upper', value='')],
+        ))
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        orga01 = create_orga(name='Genshiken')
+        orga02 = create_orga(name='Manga club')
+        orga03 = create_orga(name='MANGA CLUB')  # Not modified
+
+        old_count = HistoryLine.objects.count()
+        response = self.client.post(
+            self._build_add_url(FakeOrganisation), follow=True,
+            data={
+                'actions': self.build_formfield_value(
+                    name='name', operator='upper', value='',
+                ),
+            },
+        )
+        self.assertNoFormError(response)
+
+        job = self._get_job(response)
+        batch_process_type.execute(job)
+
+        orga01 = self.refresh(orga01)
+        self.assertEqual('GENSHIKEN', orga01.name)
+        self.assertEqual('GENSHIKEN', orga01.header_filter_search_field)
+        self.assertEqual('MANGA CLUB', self.refresh(orga02).name)
+
+        self.assertSetEqual(
+            {orga01.id, orga02.id},
+            {*EntityJobResult.objects.filter(job=job).values_list('entity_id', flat=True)},
+        )
+
+        hlines = [*HistoryLine.objects.order_by('id')[old_count:]]
+        self.assertEqual(2, len(hlines))
+
+        hline = next(hl for hl in hlines if hl.entity_id == orga01.id)
+        self.assertEqual(TYPE_EDITION, hline.type)
+        self.assertEqual(orga01.modified, hline.date)
+        self.assertListEqual([['name', 'Genshiken', 'GENSHIKEN']], hline.modifications)
+
+        self.assertFalse(HistoryLine.objects.filter(entity=orga03.id, type=TYPE_EDITION))
+
+    def test_bulk_update_not_possible(self):
+        actions = [BatchAction(FakeContact, 'first_name', 'upper', value='')]
+        self.assertTrue(batch_process_type._can_bulk_update(FakeContact, actions))
+
+        def _handler(sender, instance, **kwargs):
+            pass
+
+        pre_save.connect(_handler, sender=FakeContact)
+
+        try:
+            self.assertFalse(batch_process_type._can_bulk_update(FakeContact, actions))
+        finally:
+            pre_save.disconnect(_handler, sender=FakeContact)
+
+        self.assertTrue(batch_process_type._can_bulk_update(FakeContact, actions))
+
+        # Handler for all senders
+        post_save.connect(_handler)
+
+        try:
+            self.assertFalse(batch_process_type._can_bulk_update(FakeContact, actions))
+
+            bulk_save_receivers.register(_handler)
+
+            try:
+                self.assertTrue(batch_process_type._can_bulk_update(FakeContact, actions))
+            finally:
+                bulk_save_receivers.unregister(_handler)
+        finally:
+            post_save.disconnect(_handler)
+
+    def test_bulk_update_not_possible_unique(self):
+        "Field unique with other fields."
+        actions = [BatchAction(FakeContact, 'first_name', 'upper', value='')]
+        meta = FakeContact._meta
+
+        with patch.object(meta, 'unique_together', (('last_name', 'first_name'),)):
+            self.assertFalse(batch_process_type._can_bulk_update(FakeContact, actions))
+
+        constraint = UniqueConstraint(fields=['first_name', 'email'], name='unique_name')
+        with patch.object(meta, 'total_unique_constraints', [constraint]):
+            self.assertFalse(batch_process_type._can_bulk_update(FakeContact, actions))
+
+        # Field of the parent model
+        description_actions = [BatchAction(FakeContact, 'description', 'upper', value='')]
+        self.assertTrue(batch_process_type._can_bulk_update(FakeContact, description_actions))
+
+        with patch.object(
+            CremeEntity._meta, 'unique_together', (('description', 'entity_type'),),
+        ):
+            self.assertFalse(
+                batch_process_type._can_bulk_update(FakeContact, description_actions)
+            )
+
+        # Collision => error per entity
+        user = self.login()
+        create_contact = partial(FakeContact.objects.create, user=user, last_name='Ayanami')
+        contact1 = create_contact(first_name='Rei')
+        contact2 = create_contact(first_name='REI')
+
+        response = self.client.post(
+            self._build_add_url(FakeContact), follow=True,
+            data={
+                'actions': self.build_formfield_value(
+                    name='first_name', operator='upper', value='',
+                ),
+            },
+        )
+        self.assertNoFormError(response)
+        job = self._get_job(response)
+
+        with patch.object(meta, 'unique_together', (('last_name', 'first_name'),)):
+            batch_process_type.execute(job)
+
+        self.assertEqual('Rei', self.refresh(contact1).first_name)
+        self.assertEqual('REI', self.refresh(contact2).first_name)
+
+        jresult = self.get_object_or_fail(EntityJobResult, job=job, entity=contact1)
+        self.assertTrue(jresult.messages)
+
     # TODO: custom fields ??
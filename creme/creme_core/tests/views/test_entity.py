@@ -1,6 +1,7 @@
 from datetime import date, timedelta
 from decimal import Decimal
 from functools import partial
+from unittest.mock import patch
 from urllib.parse import unquote, urlparse
 
 from django.conf import settings
@@ -777,6 +778,36 @@ class EntityViewsTestCase(BrickTestCaseMixin, ViewsTestCase):
         self.assertEqual(1, len(result_bricks))
         self.assertIsInstance(result_bricks[0], EntityJobErrorsBrick)
 
+    def test_empty_trash_ordered(self):
+        "The referencing entities are deleted first."
+        user = self.login()
+
+        create_folder = partial(FakeFolder.objects.create, user=user, is_deleted=True)
+        folder1 = create_folder(title='Root')
+        folder2 = create_folder(title='Child', parent=folder1)  # CASCADE
+        folder3 = create_folder(title='Not deleted', is_deleted=False)
+
+        create_doc = partial(FakeDocument.objects.create, user=user, is_deleted=True)
+        doc1 = create_doc(title='Doc #1', linked_folder=folder2)  # PROTECT
+        doc2 = create_doc(title='Doc #2', linked_folder=folder3)
+
+        self.assertPOST200(self.EMPTY_TRASH_URL)
+
+        job = self.get_object_or_fail(Job, type_id=trash_cleaner_type.id)
+
+        with patch.object(trash_cleaner_type, 'chunk_size', 1):
+            trash_cleaner_type.execute(job)
+
+        self.assertFalse(EntityJobResult.objects.filter(job=job))
+        self.assertDoesNotExist(folder1)
+        self.assertDoesNotExist(folder2)
+        self.assertStillExists(folder3)
+        self.assertDoesNotExist(doc1)
+        self.assertDoesNotExist(doc2)
+        self.assertEqual(
+            4, self.get_object_or_fail(TrashCleaningCommand, job=job).deleted_count,
+        )
+
     def test_empty_trash03(self):
         "Credentials on specific ContentType."
         # NB: can delete ESET_OWN
@@ -3,11 +3,13 @@ from datetime import date, timedelta
 from functools import partial
 from json import dumps as json_dump
 from random import shuffle
+from unittest.mock import patch
 from urllib.parse import quote
 from xml.etree.ElementTree import tostring as html_tostring
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db.models import Q
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -31,6 +33,7 @@ from creme.creme_core.core.entity_filter import (
 )
 from creme.creme_core.core.function_field import function_field_registry
 from creme.creme_core.gui.listview import ListViewState
+from creme.creme_core.gui.listview.count import EstimatedCount
 from creme.creme_core.models import (
     CremeProperty,
     CremePropertyType,
@@ -3171,6 +3174,75 @@ class ListViewTestCase(ViewsTestCase):
         page1_fast = post()
         self.assertTrue(hasattr(page1_fast, 'next_page_info'))  # Means fast mode
 
+    @override_settings(
+        LISTVIEW_COUNT_STRATEGY='creme.creme_core.gui.listview.count.CachedCount',
+        LISTVIEW_COUNT_CACHE_TIMEOUT=300,
+        FAST_QUERY_MODE_THRESHOLD=100000,
+        PAGE_SIZES=[10, 25],
+        DEFAULT_PAGE_SIZE_IDX=0,
+    )
+    def test_count_cached(self):
+        user = self.login()
+        self._build_orgas()
+        hf = self._build_hf()
+        cache.clear()
+
+        def post(**data):
+            return self.assertPOST200(
+                self.url, data={'hfilter': hf.id, **data},
+            ).context['paginator']
+
+        paginator = post()
+        self.assertEqual(13, paginator.count)
+
+        FakeOrganisation.objects.create(user=user, name='Zalem')
+        self.assertEqual(13, post().count)  # The count is cached
+
+        # Other search => other key
+        self.assertEqual(1, post(**{'search-regular_field-name': 'Zalem'}).count)
+
+        cache.clear()
+        self.assertEqual(14, post(search='clear').count)
+
+    @override_settings(
+        LISTVIEW_COUNT_STRATEGY='creme.creme_core.gui.listview.count.EstimatedCount',
+        FAST_QUERY_MODE_THRESHOLD=5,
+        PAGE_SIZES=[10, 25],
+        DEFAULT_PAGE_SIZE_IDX=0,
+    )
+    def test_count_estimated(self):
+        self.login()
+        self._build_orgas()
+        hf = self._build_hf()
+
+        def post():
+            return self.assertPOST200(self.url, data={'hfilter': hf.id})
+
+        # Estimation of the DB (only PostgreSQL) or exact count
+        with patch.object(EstimatedCount, 'estimate', return_value=None):
+            response1 = post()
+
+        paginator1 = response1.context['paginator']
+        self.assertEqual(13, paginator1.count)
+        self.assertFalse(paginator1.approximate_count)
+
+        # Small estimation => exact count
+        with patch.object(EstimatedCount, 'estimate', return_value=3):
+            paginator2 = post().context['paginator']
+
+        self.assertEqual(13, paginator2.count)
+        self.assertFalse(paginator2.approximate_count)
+
+        # Big estimation
+        with patch.object(EstimatedCount, 'estimate', return_value=1234):
+            response3 = post()
+
+        page3 = response3.context['page_obj']
+        self.assertTrue(page3.paginator.approximate_count)
+        self.assertEqual(1234, page3.paginator.count)
+        self.assertEqual(10, len(page3))
+        self.assertContains(response3, '~1234')
+
     def test_listview_popup_GET(self):
         user = self.login()
 
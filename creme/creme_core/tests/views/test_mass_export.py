@@ -1,6 +1,7 @@
 from datetime import date
 from functools import partial
 from pathlib import Path
+from unittest.mock import patch
 from urllib.parse import urlencode
 
 from django.conf import settings
@@ -46,6 +47,7 @@ from creme.creme_core.models.history import TYPE_EXPORT, HistoryLine
 from creme.creme_core.utils.content_type import as_ctype
 from creme.creme_core.utils.queries import QSerializer
 from creme.creme_core.utils.xlrd_utils import XlrdReader
+from creme.creme_core.views.mass_export import MassExport
 
 from .base import ViewsTestCase
 
@@ -296,6 +298,59 @@ class MassExportViewsTestCase(ViewsTestCase):
         with self.assertRaises(StopIteration):
             next(it)
 
+    @override_settings(MASS_EXPORT_STREAMING=True)
+    def test_list_view_export_csv_streaming(self):
+        user = self.login()
+        hf = self._build_hf_n_contacts()
+        existing_hline_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        response = self.assertGET200(self._build_contact_dl_url())
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            'attachment; filename="fakecontact.csv"',
+            response['Content-Disposition'],
+        )
+
+        # The lines are generated when the response is consumed
+        self.assertFalse(HistoryLine.objects.exclude(id__in=existing_hline_ids))
+
+        result = b''.join(response.streaming_content).splitlines()
+        it = (force_str(line) for line in result)
+        self.assertEqual(next(it), ','.join(f'"{hfi.title}"' for hfi in hf.cells))
+        self.assertEqual(next(it), '"","Black","Jet","Bebop",""')
+        self.assertEqual(next(it), '"","Spiegel","Spike","Bebop/Swordfish",""')
+        self.assertEqual(next(it), '"","Valentine","Faye","","is a girl/is beautiful"')
+        self.assertEqual(next(it), '"","Wong","Edward","","is a girl"')
+        with self.assertRaises(StopIteration):
+            next(it)
+
+        hlines = HistoryLine.objects.exclude(id__in=existing_hline_ids)
+        self.assertEqual(1, len(hlines))
+
+        hline = hlines[0]
+        self.assertEqual(TYPE_EXPORT, hline.type)
+        self.assertEqual(user,        hline.entity_owner)
+        self.assertListEqual([4, hf.name], hline.modifications)
+
+    @override_settings(MASS_EXPORT_STREAMING=True)
+    def test_list_view_export_csv_streaming_pages(self):
+        "Several pages of entities."
+        self.login()
+        hf = self._build_hf_n_contacts()
+
+        with patch.object(MassExport, 'page_size', 2):
+            response = self.assertGET200(self._build_contact_dl_url())
+            content = b''.join(response.streaming_content)
+
+        it = (force_str(line) for line in content.splitlines())
+        self.assertEqual(next(it), ','.join(f'"{hfi.title}"' for hfi in hf.cells))
+        self.assertEqual(next(it), '"","Black","Jet","Bebop",""')
+        self.assertEqual(next(it), '"","Spiegel","Spike","Bebop/Swordfish",""')
+        self.assertEqual(next(it), '"","Valentine","Faye","","is a girl/is beautiful"')
+        self.assertEqual(next(it), '"","Wong","Edward","","is a girl"')
+        with self.assertRaises(StopIteration):
+            next(it)
+
     def test_list_view_export_credentials03(self):
         "'export' credential."
         self.login(is_superuser=False)
@@ -609,6 +664,36 @@ class MassExportViewsTestCase(ViewsTestCase):
         with self.assertRaises(StopIteration):
             next(it)
 
+    def test_xlsx_export(self):
+        user = self.login()
+        cells = self._build_hf_n_contacts().cells
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+
+        response = self.assertGET200(
+            self._build_contact_dl_url(doc_type='xlsx'), follow=True,
+        )
+
+        it = iter(XlrdReader(None, file_contents=b''.join(response.streaming_content)))
+        self.assertListEqual(next(it), [hfi.title for hfi in cells])
+        self.assertListEqual(next(it), ['', 'Black', 'Jet', 'Bebop', ''])
+        self.assertListEqual(next(it), ['', 'Spiegel', 'Spike', 'Bebop/Swordfish', ''])
+        self.assertListEqual(next(it), ['', 'Valentine', 'Faye', '', 'is a girl/is beautiful'])
+        self.assertListEqual(next(it), ['', 'Wong', 'Edward', '', 'is a girl'])
+        with self.assertRaises(StopIteration):
+            next(it)
+
+        filerefs = FileRef.objects.exclude(id__in=existing_fileref_ids)
+        self.assertEqual(1, len(filerefs))
+
+        fileref = filerefs[0]
+        self.assertTrue(fileref.temporary)
+        self.assertEqual('fakecontact.xlsx', fileref.basename)
+        self.assertEqual(user, fileref.user)
+
+        fullpath = Path(fileref.filedata.path)
+        self.assertTrue(fullpath.exists(), f'<{fullpath}> does not exists ?!')
+        self.assertEqual(Path(settings.MEDIA_ROOT, 'xls'), fullpath.parent)
+
     def test_print_integer01(self):
         "No choices."
         user = self.login()
@@ -1,6 +1,7 @@
 from decimal import Decimal
 from functools import partial
 from json import dumps as json_dump
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.template.defaultfilters import slugify
@@ -14,6 +15,7 @@ from django.utils.translation import ngettext
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.bricks import JobErrorsBrick, MassImportJobErrorsBrick
 from creme.creme_core.creme_jobs import batch_process_type, mass_import_type
+from creme.creme_core.forms.mass_import import ImportForm
 from creme.creme_core.models import (
     CremeProperty,
     CremePropertyType,
@@ -1491,6 +1493,124 @@ class MassImportViewsTestCase(MassImportBaseTestCaseMixin,
         self.assertEqual(punch, get_cf_values(cf_enum, kanu).value)
         self.assertListEqual([sword], [*get_cf_values(cf_menum, kanu).value.all()])
 
+    def test_chunks(self):
+        "Lines are imported by chunks (prefetched FK/relations, error in a chunk)."
+        user = self.login()
+
+        sector = FakeSector.objects.create(title='Spaceship')
+        bebop = FakeOrganisation.objects.create(user=user, name='Bebop')
+        employed = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed_by', 'is an employee of'),
+            ('test-object_employed_by',  'employs'),
+        )[0]
+        contact_count = FakeContact.objects.count()
+
+        lines = [
+            ('Spike', 'Spiegel',  sector.title, bebop.name),
+            ('Jet',   'Black',    sector.title, bebop.name),
+            ('Faye',  '',         sector.title, bebop.name),  # Last name is required
+            ('Ed',    'Wong',     'Hacking',    ''),
+            ('Ein',   'The dog',  sector.title, 'Unknown'),
+        ]
+
+        doc = self._build_csv_doc(lines)
+        response = self.client.post(
+            self._build_import_url(FakeContact), follow=True,
+            data={
+                **self.lv_import_data,
+                'document': doc.id,
+                'user': user.id,
+
+                'sector_colselect': 3,
+                'sector_subfield': 'title',
+                'sector_defval': '',
+
+                'dyn_relations': self._dyn_relations_value(
+                    employed, FakeOrganisation, 4, 'name',
+                ),
+            },
+        )
+        self.assertNoFormError(response)
+
+        with patch.object(ImportForm, 'chunk_size', 2):
+            job = self._execute_job(response)
+
+        self.assertEqual(contact_count + 4, FakeContact.objects.count())
+
+        spike = self.get_object_or_fail(FakeContact, first_name='Spike', last_name='Spiegel')
+        jet = self.get_object_or_fail(FakeContact, first_name='Jet', last_name='Black')
+        ed = self.get_object_or_fail(FakeContact, first_name='Ed', last_name='Wong')
+        ein = self.get_object_or_fail(FakeContact, first_name='Ein', last_name='The dog')
+        self.assertFalse(FakeContact.objects.filter(first_name='Faye'))
+
+        self.assertEqual(sector, spike.sector)
+        self.assertEqual(sector, jet.sector)
+        self.assertIsNone(ed.sector)
+        self.assertEqual(sector, ein.sector)
+
+        self.assertRelationCount(1, spike, employed.id, bebop)
+        self.assertRelationCount(1, jet,   employed.id, bebop)
+        self.assertRelationCount(0, ein,   employed.id, bebop)
+
+        results = [*self._get_job_results(job).order_by('id')]
+        self.assertListEqual(
+            [[*line] for line in lines], [r.line for r in results],
+        )
+        self.assertListEqual(
+            [spike.id, jet.id, None, ed.id, ein.id], [r.entity_id for r in results],
+        )
+        self.assertFalse(results[0].messages)
+        self.assertFalse(results[1].messages)
+        self.assertTrue(results[2].messages)  # Error
+        self.assertEqual(1, len(results[3].messages))  # Sector not found
+        self.assertEqual(1, len(results[4].messages))  # Organisation not found
+
+    def test_chunks_created_fk_rollback(self):
+        "An instance created by a line which fails is not re-used by the next lines."
+        user = self.login()
+
+        position_title = 'Bounty hunter'
+        self.assertFalse(FakePosition.objects.filter(title=position_title))
+
+        lines = [
+            ('Faye',  '',        position_title),  # Last name is required
+            ('Spike', 'Spiegel', position_title),
+            ('Jet',   'Black',   position_title),
+        ]
+
+        doc = self._build_csv_doc(lines)
+        response = self.client.post(
+            self._build_import_url(FakeContact), follow=True,
+            data={
+                **self.lv_import_data,
+                'document': doc.id,
+                'user': user.id,
+
+                'position_colselect': 3,
+                'position_subfield': 'title',
+                'position_defval': '',
+                'position_create': True,
+            },
+        )
+        self.assertNoFormError(response)
+
+        job = self._execute_job(response)
+
+        positions = FakePosition.objects.filter(title=position_title)
+        self.assertEqual(1, len(positions))
+
+        position = positions[0]
+        spike = self.get_object_or_fail(FakeContact, first_name='Spike', last_name='Spiegel')
+        jet = self.get_object_or_fail(FakeContact, first_name='Jet', last_name='Black')
+        self.assertEqual(position, spike.position)
+        self.assertEqual(position, jet.position)
+        self.assertFalse(FakeContact.objects.filter(first_name='Faye'))
+
+        results = [*self._get_job_results(job).order_by('id')]
+        self.assertEqual(3, len(results))
+        self.assertTrue(results[0].messages)
+        self.assertListEqual([spike.id, jet.id], [r.entity_id for r in results[1:]])
+
     def test_import_error01(self):
         "Form error: unknown extension"
         self.login()
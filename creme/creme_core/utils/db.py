@@ -25,12 +25,15 @@ from __future__ import annotations
 
 from collections import defaultdict
 from fnmatch import fnmatch
-from functools import lru_cache
+from functools import lru_cache, partial
 from typing import Any, DefaultDict, Iterable, Iterator, Sequence
 
 from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.models import ForeignKey, Model
+from django.db.models.signals import post_save, pre_save
+from django.dispatch.dispatcher import _make_id
 
+from ..core.bulk_save import bulk_save_receivers
 from ..models import CaseSensitivity
 from .meta import FieldInfo
 
@@ -282,6 +285,52 @@ def is_db_like_case_sensitive() -> bool:  # TODO: idem
     return not CaseSensitivity.objects.filter(text__contains='case').exists()
 
 
+def has_specific_save_logic(model: type[Model],
+                            base_save=Model.save,
+                            field_names: Iterable[str] | None = None,
+                            ) -> bool:
+    """Has a model some specific logic when its instances are saved? If it does
+    not, its instances can be saved with grouped queries (QuerySet.update(),
+    QuerySet.bulk_update()...) without bypassing any business code.
+    @param model: A class inheriting DjangoModel.
+    @param base_save: Method "save()" which is considered as not specific
+           (e.g. CremeEntity.save if the caller manages the fields it sets).
+    @param field_names: Names of the modified fields ; the methods "save()" &
+           the handlers specific to the model which have declared that they do
+           not depend on these fields (or which have a bulk handler) are ignored
+           (see BulkSaveReceiversRegistry.register_fields()).
+           <None> means "all fields".
+    @return A boolean ; <True> means that the method "save()" is overridden, or
+            that some handlers of the signals 'pre_save'/'post_save' are
+            specific to this model, or that some handlers which listen all
+            senders are not registered in <bulk_save_receivers>.
+
+    NB: the caller has to manage the registered handlers (see
+        creme_core.core.bulk_save).
+    """
+    needs_save = partial(bulk_save_receivers.needs_save, field_names=field_names)
+
+    for klass in model.__mro__:
+        save = klass.__dict__.get('save')
+
+        if save is base_save:
+            break
+
+        if save is not None and needs_save(_make_id(save)):
+            return True
+
+    sender_id = _make_id(model)
+    any_sender_id = _make_id(None)
+    is_registered = bulk_save_receivers.is_registered
+
+    return any(
+        (lookup_key[1] == sender_id and needs_save(lookup_key[0]))
+        or (lookup_key[1] == any_sender_id and not is_registered(lookup_key[0]))
+        for signal in (pre_save, post_save)
+        for lookup_key, *__ in signal.receivers
+    )
+
+
 # TODO: accept multiple/iterative order()/proceed() calls ?
 class PreFetcher:
     """Regroup queries on same model (to retrieve instances by their PK)
@@ -0,0 +1,248 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Minimal writer for the Office Open XML spreadsheet format (.xlsx).
+
+Contrarily to XlwtWriter (which builds the whole workbook in memory before
+saving it), the rows are compressed & written in the file as soon as they are
+appended, so the memory used is constant whatever the number of rows.
+"""
+
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils.formats import get_format
+from django.utils.translation import gettext as _
+
+from . import prefixed_truncate
+
+# Characters which are forbidden in XML 1.0
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+_EPOCH = datetime(1899, 12, 30)
+
+# Directives of strftime() => codes of the number formats of Excel
+_DATE_CODES = {
+    'd': 'dd',
+    'm': 'mm',
+    'y': 'yy',
+    'Y': 'yyyy',
+    'b': 'mmm',
+    'B': 'mmmm',
+    'a': 'ddd',
+    'A': 'dddd',
+    'H': 'hh',
+    'I': 'hh',
+    'M': 'mm',
+    'S': 'ss',
+    'p': 'AM/PM',
+    '%': '\\%',
+}
+_DATE_DIRECTIVE = re.compile('%(.)|(.)', flags=re.DOTALL)
+# Characters which are displayed as is in the number formats of Excel
+_DATE_LITERALS = ' /-.:,'
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Style #1 is used for dates, style #2 for date-times
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="{date_format}"/>'
+    '<numFmt numFmtId="165" formatCode="{datetime_format}"/>'
+    '</numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '</fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+def column_letters(index: int) -> str:
+    "Get the name of a column from its (0-based) index ; e.g. 0 => 'A', 27 => 'AB'."
+    letters = ''
+    index += 1
+
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+
+    return letters
+
+
+def excel_date_format(strftime_format: str) -> str:
+    """Convert a format of strftime() to a number format of Excel.
+    E.g. '%d/%m/%Y %H:%M' => 'dd/mm/yyyy hh:mm'.
+    The directives which have no equivalent are ignored.
+    """
+    def convert(match):
+        directive, char = match.groups()
+
+        if directive is not None:
+            return _DATE_CODES.get(directive, '')
+
+        return char if char in _DATE_LITERALS else f'\\{char}'
+
+    return _DATE_DIRECTIVE.sub(convert, strftime_format)
+
+
+class XlsxWriter:
+    """Write rows in a .xlsx file, row after row.
+
+    Usage:
+        writer = XlsxWriter('/path/to/my_file.xlsx')
+        writer.writerow(['Name', 'Birthday'])
+        writer.writerow(['Spike', date(year=2044, month=6, day=26)])
+        writer.close()
+
+    Notice that the file is not usable before close() is called.
+    """
+    max_cell_length = 32767
+
+    def __init__(self, filepath, sheet_name='sheet 1'):
+        self.nline = 0
+        self.truncate_prefix = _('(truncated cell)')
+        self._zip = zf = zipfile.ZipFile(filepath, mode='w', compression=zipfile.ZIP_DEFLATED)
+
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _ROOT_RELS)
+        zf.writestr('xl/workbook.xml', _WORKBOOK.format(name=escape(sheet_name)))
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        # NB: the formats used by the other exports (see gui.field_printers)
+        zf.writestr(
+            'xl/styles.xml',
+            _STYLES.format(
+                date_format=self._format_code(get_format('DATE_INPUT_FORMATS')[0]),
+                datetime_format=self._format_code(get_format('DATETIME_INPUT_FORMATS')[0]),
+            ),
+        )
+
+        # NB: the sheet is written at last, because an entry of the archive
+        #     must be closed before another one can be written.
+        self._sheet = sheet = zf.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True)
+        sheet.write(_SHEET_HEADER.encode())
+
+    @staticmethod
+    def _format_code(strftime_format: str) -> str:
+        return escape(excel_date_format(strftime_format), {'"': '&quot;'})
+
+    def _cell_xml(self, ref: str, value) -> str:
+        if value is None or value == '':
+            return ''
+
+        if isinstance(value, bool):
+            return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+
+        if isinstance(value, (int, float, Decimal)):
+            return f'<c r="{ref}"><v>{value}</v></c>'
+
+        if isinstance(value, datetime):
+            delta = value.replace(tzinfo=None) - _EPOCH
+            return f'<c r="{ref}" s="2"><v>{delta.total_seconds() / 86400}</v></c>'
+
+        if isinstance(value, date):
+            return f'<c r="{ref}" s="1"><v>{(value - _EPOCH.date()).days}</v></c>'
+
+        text = _INVALID_XML_CHARS.sub(
+            '',
+            prefixed_truncate(str(value), self.truncate_prefix, self.max_cell_length),
+        )
+
+        return (
+            f'<c r="{ref}" t="inlineStr">'
+            f'<is><t xml:space="preserve">{escape(text)}</t></is>'
+            f'</c>'
+        )
+
+    def writerow(self, line):
+        self.nline += 1
+        nline = self.nline
+        cell_xml = self._cell_xml
+
+        self._sheet.write(
+            '<row r="{}">{}</row>'.format(
+                nline,
+                ''.join(
+                    cell_xml(f'{column_letters(col)}{nline}', value)
+                    for col, value in enumerate(line)
+                ),
+            ).encode()
+        )
+
+    def close(self):
+        sheet = self._sheet
+        sheet.write(_SHEET_FOOTER.encode())
+        sheet.close()
+        self._zip.close()
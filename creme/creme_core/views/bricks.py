@@ -30,6 +30,7 @@ from django.template.engine import Engine
 from .. import utils
 from ..gui.bricks import Brick, BricksManager, _BrickRegistry
 from ..gui.bricks import brick_registry as global_brick_registry
+from ..gui.bricks import render_brick
 from ..http import CremeJsonResponse
 from ..models import BrickState
 from . import generic
@@ -128,7 +129,7 @@ class BricksReloading(generic.CheckedView):
                 # brick, & so avoid annoying side-effects
                 # Notice that build_context() creates a shared dictionary with
                 # the "shared" key in order to explicitly share data between 2+ bricks.
-                brick_renders.append((brick.id_, render_func({**context})))
+                brick_renders.append((brick.id_, render_brick(brick, render_func, {**context})))
 
         return brick_renders
 
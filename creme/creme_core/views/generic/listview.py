@@ -21,6 +21,7 @@ from __future__ import annotations
 import logging
 from enum import Enum
 from functools import partial
+from hashlib import sha256
 from json import JSONDecodeError
 from json import loads as json_load
 
@@ -76,6 +77,8 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
      - Choice of EntityFilters (ie: which entities to display).
      - Pagination, with a fast pagination mode when there is a lot of entities
        Related settings : PAGE_SIZES, DEFAULT_PAGE_SIZE_IDX, FAST_QUERY_MODE_THRESHOLD.
+       The entities are counted with a strategy (exact, cached, estimated...) ;
+       see the setting LISTVIEW_COUNT_STRATEGY & the method 'get_count_strategy()'.
      - Ordering: some columns can be used to order the list ; the chosen column
        is used as main order criterion, the model's meta ordering information are used
        as secondary criteria.
@@ -159,6 +162,7 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
 
         self.queryset = None  # We hide voluntarily the class attribute which SHOULD not be used.
         self.count = None
+        self.approximate_count = False
         self.fast_mode = None
         self.ordering = None  # Idem
 
@@ -311,6 +315,25 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
     def get_buttons(self) -> lv_gui.ListViewButtonList:
         return lv_gui.ListViewButtonList(self.button_classes)
 
+    def get_count_key(self) -> str:
+        """Get the key identifying the counted entities (see get_count_strategy()).
+        The user's credentials are identified by the user & their role ;
+        the superusers share their keys.
+        """
+        user = self.request.user
+        efilter = self.entity_filter
+        searches = f'{self.extra_q["total"]}#{self.search_form.search_q}'
+
+        return '{ctype}-{efilter}-{user}-{searches}'.format(
+            ctype=ContentType.objects.get_for_model(self.model).id,
+            efilter=efilter.id if efilter else '',
+            user='superuser' if user.is_superuser else f'{user.id}_{user.role_id}',
+            searches=sha256(searches.encode()).hexdigest(),
+        )
+
+    def get_count_strategy(self) -> lv_gui.CountStrategy:
+        return lv_gui.get_count_strategy()
+
     def get_entity_filter(self, entity_filters: EntityFilterList) -> EntityFilter:
         return self.state.set_entityfilter(
             entity_filters,
@@ -445,6 +468,7 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
             paginator = FlowPaginator(
                 queryset=queryset, key=self.ordering[0],
                 per_page=per_page, count=self.count,
+                approximate_count=self.approximate_count,
             )
 
         return paginator
@@ -509,25 +533,27 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
         # ----
         # If the query does not use the real entities' specific fields to filter,
         # we perform a query on CremeEntity & so we avoid a JOIN.
-        if filtered:
-            count = qs.count()
-        else:
+        count_qs = qs
+        if not filtered:
             model = self.model
             try:
-                count = EntityCredentials.filter_entities(
+                count_qs = EntityCredentials.filter_entities(
                     user,
                     CremeEntity.objects.filter(
                         is_deleted=False,
                         entity_type=ContentType.objects.get_for_model(model),
                     ),
                     as_model=model,
-                ).count()
+                )
             except EntityCredentials.FilteringError as e:
                 logger.debug(
                     '%s.get_unordered_queryset_n_count() : fast count is not possible (%s)',
                     type(self).__name__, e,
                 )
-                count = qs.count()
+
+        count, self.approximate_count = self.get_count_strategy().count(
+            count_qs, key=self.get_count_key(),
+        )
 
         return qs, count
 
@@ -18,12 +18,14 @@
 
 import logging
 
+from django.conf import settings
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.encoding import smart_str
 
 from ..backends import export_backend_registry
 from ..core import sorter
+from ..core.entity_cell import EntityCell
 from ..core.paginator import FlowPaginator
 from ..forms.listview import ListViewSearchForm
 from ..gui.listview import search_field_registry
@@ -37,7 +39,6 @@ from .generic import base
 logger = logging.getLogger(__name__)
 
 
-# TODO: stream response ??
 # TODO: factorise with generic.listview.EntitiesList ?
 class MassExport(base.EntityCTypeRelatedMixin, base.CheckedView):
     ct_id_arg = 'ct_id'
@@ -153,87 +154,119 @@ class MassExport(base.EntityCTypeRelatedMixin, base.CheckedView):
 
         return sort_info.field_names
 
-    def get(self, request, *args, **kwargs):
-        user = request.user
+    def get_streaming(self):
+        return settings.MASS_EXPORT_STREAMING
+
+    def get_entities_queryset(self, *, model, cells, efilter):
+        entities_qs = model.objects.filter(is_deleted=False)
+        use_distinct = False
+
+        # ----
+        if efilter is not None:
+            entities_qs = efilter.filter(entities_qs)
+
+        # ----
+        extra_q = self.request.GET.get(self.extra_q_arg)
+        if extra_q is not None:
+            entities_qs = entities_qs.filter(QSerializer().loads(extra_q))
+            use_distinct = True  # TODO: test + only if needed
+
+        # ----
+        search_form = self.get_search_form(cells=cells)
+        search_q = search_form.search_q
+        if search_q:
+            try:
+                entities_qs = entities_qs.filter(search_q)
+            except Exception as e:
+                logger.exception(
+                    'Error when building the search queryset with Q=%s (%s).',
+                    search_q, e,
+                )
+            else:
+                use_distinct = True  # TODO: test + only if needed
 
-        header_only = self.get_header_only()
-        backend_cls = self.get_backend_class()
-        ct = self.get_ctype()
-        model = ct.model_class()
-        hf = self.get_header_filter()
+        # ----
+        entities_qs = EntityCredentials.filter(self.request.user, entities_qs)
 
-        cells = self.get_cells(header_filter=hf)
+        if use_distinct:
+            entities_qs = entities_qs.distinct()
 
-        writer = backend_cls()
-        writerow = writer.writerow
-        # Doesn't accept generator expression... ;(
-        writerow([smart_str(cell.title) for cell in cells])
+        return entities_qs
 
-        if not header_only:
-            ordering = self.get_ordering(model=model, cells=cells)
+    def iter_entity_rows(self, *, paginator, cells):
+        """Generator of rows (list of strings) corresponding to the entities.
+        Only one page of entities is in memory at once.
+        """
+        user = self.request.user
 
-            entities_qs = model.objects.filter(is_deleted=False)
-            use_distinct = False
+        for entities_page in paginator.pages():
+            entities = entities_page.object_list
 
-            # ----
-            efilter = self.get_entity_filter()
-            if efilter is not None:
-                entities_qs = efilter.filter(entities_qs)
+            # Optimisation time !!!
+            EntityCell.mixed_populate_entities(cells=cells, entities=entities, user=user)
 
-            # ----
-            extra_q = request.GET.get(self.extra_q_arg)
-            if extra_q is not None:
-                entities_qs = entities_qs.filter(QSerializer().loads(extra_q))
-                use_distinct = True  # TODO: test + only if needed
+            for entity in entities:
+                line = []
 
-            # ----
-            search_form = self.get_search_form(cells=cells)
-            search_q = search_form.search_q
-            if search_q:
-                try:
-                    entities_qs = entities_qs.filter(search_q)
-                except Exception as e:
-                    logger.exception(
-                        'Error when building the search queryset with Q=%s (%s).',
-                        search_q, e,
-                    )
-                else:
-                    use_distinct = True  # TODO: test + only if needed
+                for cell in cells:
+                    try:
+                        res = cell.render_csv(entity, user)
+                    except Exception as e:
+                        logger.debug('Exception in CSV export: %s', e)
+                        res = ''
 
-            # ----
-            entities_qs = EntityCredentials.filter(user, entities_qs)
+                    line.append(smart_str(res) if res else '')
 
-            if use_distinct:
-                entities_qs = entities_qs.distinct()
+                yield line
 
-            paginator = self.get_paginator(queryset=entities_qs, ordering=ordering)
+    def iter_rows(self, *, ctype, cells, header_filter, entity_filter=None, paginator=None):
+        """Generator of all the exported rows (the header, & then the entities).
+        When all the entities have been exported, the history line is created.
+        @param paginator: Paginator on the exported entities ;
+               <None> means "only the header".
+        """
+        yield [smart_str(cell.title) for cell in cells]
 
+        if paginator is not None:
             total_count = 0
 
-            for entities_page in paginator.pages():
-                entities = entities_page.object_list
+            for row in self.iter_entity_rows(paginator=paginator, cells=cells):
+                total_count += 1
+                yield row
 
-                hf.populate_entities(entities, user)  # Optimisation time !!!
-
-                for entity in entities:
-                    total_count += 1
-                    line = []
-
-                    for cell in cells:
-                        try:
-                            res = cell.render_csv(entity, user)
-                        except Exception as e:
-                            logger.debug('Exception in CSV export: %s', e)
-                            res = ''
+            _HLTEntityExport.create_line(
+                ctype=ctype, user=self.request.user, count=total_count,
+                hfilter=header_filter, efilter=entity_filter,
+            )
 
-                        line.append(smart_str(res) if res else '')
+    def get(self, request, *args, **kwargs):
+        header_only = self.get_header_only()
+        backend_cls = self.get_backend_class()
+        ct = self.get_ctype()
+        model = ct.model_class()
+        hf = self.get_header_filter()
 
-                    writerow(line)
+        cells = self.get_cells(header_filter=hf)
 
-            _HLTEntityExport.create_line(
-                ctype=ct, user=user, count=total_count, hfilter=hf, efilter=efilter,
+        # NB: all the data which can raise an error (404...) are retrieved here,
+        #     because the rows can be generated when the response is streamed.
+        if header_only:
+            efilter = paginator = None
+        else:
+            efilter = self.get_entity_filter()
+            paginator = self.get_paginator(
+                queryset=self.get_entities_queryset(
+                    model=model, cells=cells, efilter=efilter,
+                ),
+                ordering=self.get_ordering(model=model, cells=cells),
             )
 
-        writer.save(ct.model, user)
-
-        return writer.response
+        return backend_cls().export(
+            rows=self.iter_rows(
+                ctype=ct, cells=cells, header_filter=hf,
+                entity_filter=efilter, paginator=paginator,
+            ),
+            filename=ct.model,
+            user=request.user,
+            streaming=self.get_streaming(),
+        )
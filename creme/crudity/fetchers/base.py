@@ -40,3 +40,10 @@ class CrudityFetcher:
                   (i.e: emails objects for email fetcher for example).
         """
         raise NotImplementedError
+
+    def mark_as_processed(self, data) -> None:
+        """Called when some data (element returned by <fetch()>) has been
+        processed by the inputs/backends (even if no backend has handled it).
+        Does nothing by default.
+        """
+        pass
@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2017-2020  Hybird
+#    Copyright (C) 2017-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -16,17 +16,104 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
 import logging
+import os
 import os.path
+import select
+import struct
+from hashlib import sha1
+from queue import Full, Queue
+from tempfile import gettempdir
+from threading import Event, Lock, Thread
+from typing import Callable, Iterable
 
 from django.conf import settings
+from django.db import connection
 
+from ..models import ProcessedFile
 from .base import CrudityFetcher
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 
+class WatcherLock:
+    """Lock (on a file) held by a FileSystemWatcher while it processes the
+    files of a directory ; the fetcher ignores the directory while it's held,
+    so the files are not processed by the job "crudity_synchronize" too.
+    NB: the lock is released by the OS when the process ends (even if it's
+        killed) ; it is not available on Windows.
+    """
+    def __init__(self, dir_path: str):
+        self.path = os.path.join(
+            gettempdir(),
+            'creme_crudity_watcher-{}.lock'.format(
+                sha1(os.path.abspath(dir_path).encode()).hexdigest(),
+            ),
+        )
+        self._file = None
+
+    def _lock(self, lock_file) -> bool:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+
+        return True
+
+    def acquire(self) -> bool:
+        """Try to take the lock (without waiting).
+        @return: <False> if it is held by another watcher.
+        """
+        if fcntl is None or self._file is not None:
+            return True
+
+        lock_file = open(self.path, 'a')
+        if not self._lock(lock_file):
+            lock_file.close()
+            return False
+
+        self._file = lock_file
+
+        return True
+
+    def release(self) -> None:
+        lock_file = self._file
+
+        if lock_file is not None:
+            self._file = None
+            # NB: closing the file releases the lock
+            lock_file.close()
+
+    def is_locked(self) -> bool:
+        "Is the lock held (by this instance or another one)?"
+        if self._file is not None:
+            return True
+
+        if fcntl is None or not os.path.exists(self.path):
+            return False
+
+        with open(self.path, 'a') as lock_file:
+            if not self._lock(lock_file):
+                return True
+
+        return False
+
+
 class FileSystemFetcher(CrudityFetcher):
+    """Fetcher which returns the paths of the files contained by a directory.
+    The files which have already been processed (& which are still in the
+    directory, see <ProcessedFile>) are ignored while they are not modified.
+    The directory is ignored while a FileSystemWatcher processes its files.
+    """
     class FileSystemFetcherError(Exception):
         pass
 
@@ -35,12 +122,31 @@ class FileSystemFetcher(CrudityFetcher):
         self.setting_name = setting_name
 
     def fetch(self, *args, **kwargs):
+        try:
+            dir_path = self._get_path()
+        except self.FileSystemFetcherError as e:
+            logger.warning('FileSystemFetcher.fetch(): %s', e)
+            return []
+
+        if WatcherLock(dir_path).is_locked():
+            logger.info(
+                'FileSystemFetcher.fetch(): the files of "%s" are processed by '
+                'the command "crudity_watch_files".', dir_path,
+            )
+            return []
+
+        return self.scan()
+
+    def scan(self) -> list[str]:
+        """Get the paths of the files which have not been processed yet, even
+        if the directory is watched (used by FileSystemWatcher).
+        """
         paths = []
 
         try:
             dir_path = self._get_path()
         except self.FileSystemFetcherError as e:
-            logger.warning('FileSystemFetcher.fetch(): %s', e)
+            logger.warning('FileSystemFetcher.scan(): %s', e)
         else:
             for filename in os.listdir(dir_path):
                 path = os.path.join(dir_path, filename)
@@ -48,8 +154,87 @@ class FileSystemFetcher(CrudityFetcher):
                 if not os.path.isdir(path):
                     paths.append(path)
 
+            # NB: the entries of the removed files are useless
+            listed = {*paths}
+            processed = {}
+            stale_ids = []
+            for pf_id, path, size, mtime in ProcessedFile.objects.filter(
+                path__startswith=os.path.join(dir_path, ''),
+            ).values_list('id', 'path', 'size', 'mtime'):
+                if path in listed:
+                    processed[path] = (size, mtime)
+                else:
+                    stale_ids.append(pf_id)
+
+            if stale_ids:
+                ProcessedFile.objects.filter(id__in=stale_ids).delete()
+
+            paths = self._exclude_processed(paths, processed)
+
         return paths
 
+    @staticmethod
+    def _signature(path: str) -> tuple[int, float] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return stat.st_size, stat.st_mtime
+
+    def _exclude_processed(self,
+                           paths: list[str],
+                           processed: dict[str, tuple[int, float]],
+                           ) -> list[str]:
+        if not processed:
+            return paths
+
+        signature = self._signature
+
+        return [
+            path for path in paths
+            if path not in processed or processed[path] != signature(path)
+        ]
+
+    def filter_unprocessed(self, paths: Iterable[str]) -> list[str]:
+        """Get the paths of the files which have not been processed yet (or
+        which have been modified since their processing).
+        """
+        paths = [*paths]
+
+        return self._exclude_processed(
+            paths,
+            {
+                path: (size, mtime)
+                for path, size, mtime in ProcessedFile.objects.filter(
+                    path__in=paths,
+                ).values_list('path', 'size', 'mtime')
+            } if paths else {},
+        )
+
+    def mark_as_processed(self, data):
+        if not isinstance(data, str):
+            return
+
+        try:
+            dir_path = self._get_path()
+        except self.FileSystemFetcherError:
+            return
+
+        if os.path.normpath(os.path.dirname(data)) != os.path.normpath(dir_path):
+            return
+
+        signature = self._signature(data)
+        if signature is None:
+            # NB: the file has been consumed (e.g. IniFileInput removes the
+            #     files it uses)
+            ProcessedFile.objects.filter(path=data).delete()
+        else:
+            size, mtime = signature
+            ProcessedFile.objects.update_or_create(
+                path=data, defaults={'size': size, 'mtime': mtime},
+            )
+
     def _get_path(self):
         setting_name = self.setting_name
         # TODO: validate it's a str
@@ -73,3 +258,251 @@ class FileSystemFetcher(CrudityFetcher):
         # TODO: credentials ??
 
         return dir_path
+
+
+class InotifyEventSource:
+    """Source of events for FileSystemWatcher, based on inotify (Linux).
+    It returns the paths of the files which have been written (or moved) in a
+    directory.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO    = 0x00000080
+    IN_Q_OVERFLOW  = 0x00004000
+    IN_ISDIR       = 0x40000000
+
+    # Header of an event: watch descriptor, mask, cookie, length of the name
+    _event_header = struct.Struct('iIII')
+    buffer_size = 64 * 1024
+
+    def __init__(self, dir_path: str):
+        libc = self._get_libc()
+        if libc is None:
+            raise OSError('inotify is not available on this system')
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        if libc.inotify_add_watch(
+            fd, os.fsencode(dir_path), self.IN_CLOSE_WRITE | self.IN_MOVED_TO,
+        ) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno), dir_path)
+
+        self.dir_path = dir_path
+        self._fd = fd
+
+    @staticmethod
+    def _get_libc():
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        except OSError:
+            return None
+
+        return libc if hasattr(libc, 'inotify_init1') else None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return cls._get_libc() is not None
+
+    def wait(self, timeout: float) -> list[str] | None:
+        """Wait for some events.
+        @param timeout: Maximum number of seconds to wait.
+        @return: A list of paths (empty if there is no event), or None if some
+                 events have been lost (so the directory must be scanned).
+        """
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+
+        try:
+            buffer = os.read(self._fd, self.buffer_size)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        header = self._event_header
+        offset = 0
+
+        while offset + header.size <= len(buffer):
+            __, mask, __, name_length = header.unpack_from(buffer, offset)
+            offset += header.size
+            name = buffer[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+
+            if name and not mask & self.IN_ISDIR:
+                paths.append(os.path.join(self.dir_path, os.fsdecode(name)))
+
+        return paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingEventSource:
+    """Source of events for FileSystemWatcher, used when inotify is not
+    available: the directory is scanned periodically.
+    """
+    def __init__(self, stop_event: Event):
+        self._stop_event = stop_event
+
+    def wait(self, timeout: float) -> None:
+        "See InotifyEventSource.wait()."
+        self._stop_event.wait(timeout)
+
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class FileSystemWatcher:
+    """Process the files dropped in the directory of a FileSystemFetcher as
+    soon as they are written (the periodic job "crudity_synchronize" processes
+    them only when it runs).
+
+    The files are detected with inotify (the directory is scanned periodically
+    if inotify is not available). Their paths are pushed in a bounded queue
+    (the detection waits when the queue is full) & they are processed by a pool
+    of threads. The processed files are indexed (see
+    FileSystemFetcher.mark_as_processed()), so they are not parsed again after
+    a restart.
+    """
+    def __init__(self,
+                 fetcher: FileSystemFetcher,
+                 handler: Callable[[str], object],
+                 *,
+                 workers: int = 1,
+                 queue_size: int = 1024,
+                 poll_interval: float = 5.0,
+                 use_inotify: bool = True,
+                 ):
+        """Constructor.
+        @param fetcher: Instance of FileSystemFetcher.
+        @param handler: Function which processes a path (e.g.
+               <FetcherInterface.handle()> with a user) ; it's called by the threads.
+        @param workers: Number of threads.
+        @param queue_size: Maximum number of paths waiting to be processed.
+        @param poll_interval: Number of seconds between 2 scans of the directory
+               when inotify is not used ; it's also the maximum delay to stop.
+        @param use_inotify: <False> to force the scanning of the directory.
+        """
+        self.fetcher = fetcher
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self._stop_event = Event()
+        self._pending: set[str] = set()  # Paths in the queue or being processed
+        self._lock = Lock()
+
+    def _create_source(self, dir_path: str):
+        if self.use_inotify and InotifyEventSource.is_available():
+            try:
+                return InotifyEventSource(dir_path)
+            except OSError as e:
+                logger.warning(
+                    'FileSystemWatcher: inotify cannot be used (%s) ; '
+                    'the directory is scanned periodically.', e,
+                )
+
+        return PollingEventSource(self._stop_event)
+
+    def _work(self, tasks: Queue) -> None:
+        handler = self.handler
+
+        try:
+            while True:
+                path = tasks.get()
+                if path is None:
+                    break
+
+                try:
+                    handler(path)
+                except Exception:
+                    logger.exception('FileSystemWatcher: error with the file "%s"', path)
+                finally:
+                    with self._lock:
+                        self._pending.discard(path)
+        finally:
+            # NB: each thread uses its own connection.
+            connection.close()
+
+    def _enqueue(self, tasks: Queue, paths: Iterable[str]) -> None:
+        pending = self._pending
+        lock = self._lock
+
+        with lock:
+            paths = [
+                path for path in paths
+                if path not in pending and not os.path.isdir(path)
+            ]
+
+        for path in self.fetcher.filter_unprocessed(paths):
+            with lock:
+                if path in pending:
+                    continue
+
+                pending.add(path)
+
+            while not self._stop_event.is_set():
+                try:
+                    tasks.put(path, timeout=self.poll_interval)
+                except Full:
+                    continue
+                else:
+                    break
+
+    def run(self) -> None:
+        """Watch the directory until <stop()> is called.
+        @raise FileSystemFetcher.FileSystemFetcherError if the directory is
+               invalid, or if it's already watched.
+        """
+        dir_path = self.fetcher._get_path()
+        lock = WatcherLock(dir_path)
+        if not lock.acquire():
+            raise FileSystemFetcher.FileSystemFetcherError(
+                f'the directory "{dir_path}" is already watched.'
+            )
+
+        try:
+            self._watch(dir_path)
+        finally:
+            lock.release()
+
+    def _watch(self, dir_path: str) -> None:
+        tasks = Queue(maxsize=self.queue_size)
+        threads = [
+            Thread(target=self._work, args=(tasks,), daemon=True)
+            for __ in range(self.workers)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        # NB: the watching starts before the first scan, so no file is missed.
+        source = self._create_source(dir_path)
+
+        try:
+            paths = None
+
+            while not self._stop_event.is_set():
+                self._enqueue(tasks, self.fetcher.scan() if paths is None else paths)
+                paths = source.wait(self.poll_interval)
+        finally:
+            source.close()
+
+            for __ in threads:
+                tasks.put(None)
+
+            for thread in threads:
+                thread.join()
+
+    def stop(self) -> None:
+        self._stop_event.set()
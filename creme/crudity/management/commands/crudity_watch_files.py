@@ -0,0 +1,117 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from threading import Thread
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from creme.creme_core.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        'Process the files of the fetcher "filesystem" (see the setting '
+        'CRUDITY_FILESYS_FETCHER_DIR) as soon as they are written.'
+    )
+
+    def add_arguments(self, parser):
+        add_argument = parser.add_argument
+        add_argument(
+            '-w', '--workers',
+            action='store', dest='workers', type=int,
+            default=settings.CRUDITY_FILESYS_WATCHER_WORKERS,
+            help='Number of threads which process the files. [default: %(default)s]',
+        )
+        add_argument(
+            '-p', '--polling',
+            action='store_true', dest='polling', default=False,
+            help='Scan the directory periodically, even if inotify is available.',
+        )
+
+    def _get_user(self):
+        from creme.crudity.creme_jobs import crudity_synchronize_type
+
+        CremeUser = get_user_model()
+        job = Job.objects.filter(type_id=crudity_synchronize_type.id).first()
+        user_id = (job.data or {}).get('user') if job else None
+
+        return (
+            CremeUser.objects.filter(id=user_id).first() if user_id else None
+        ) or CremeUser.objects.get_admin()
+
+    def handle(self, **options):
+        from creme.crudity.fetchers.filesystem import (
+            FileSystemFetcher,
+            FileSystemWatcher,
+            WatcherLock,
+        )
+        from creme.crudity.registry import crudity_registry
+
+        fetcher_interface = crudity_registry.get_fetcher('filesystem')
+        fetchers = [
+            fetcher
+            for fetcher in (fetcher_interface.fetchers if fetcher_interface else ())
+            if isinstance(fetcher, FileSystemFetcher)
+        ]
+        if not fetchers:
+            raise CommandError('The fetcher "filesystem" is not used (see CRUDITY_BACKENDS).')
+
+        for fetcher in fetchers:
+            try:
+                dir_path = fetcher._get_path()
+            except FileSystemFetcher.FileSystemFetcherError as e:
+                raise CommandError(str(e)) from e
+
+            if WatcherLock(dir_path).is_locked():
+                raise CommandError(
+                    f'The directory "{dir_path}" is already watched by another process.'
+                )
+
+        user = self._get_user()
+        watchers = [
+            FileSystemWatcher(
+                fetcher=fetcher,
+                handler=lambda path: fetcher_interface.handle(path, user),
+                workers=options['workers'],
+                queue_size=settings.CRUDITY_FILESYS_WATCHER_QUEUE_SIZE,
+                poll_interval=settings.CRUDITY_FILESYS_WATCHER_POLL_INTERVAL,
+                use_inotify=not options['polling'],
+            ) for fetcher in fetchers
+        ]
+        threads = [Thread(target=watcher.run) for watcher in watchers]
+
+        if options['verbosity']:
+            self.stdout.write(
+                'Watching the files (user: {user}) ; hit CTRL-C to stop.'.format(user=user)
+            )
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            for watcher in watchers:
+                watcher.stop()
+
+            for thread in threads:
+                thread.join()
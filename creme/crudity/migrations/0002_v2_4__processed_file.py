@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.utils.timezone import now
+
+import creme.creme_core.models.fields as core_fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('crudity', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedFile',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID', serialize=False, auto_created=True, primary_key=True,
+                    )
+                ),
+                ('path', models.CharField(max_length=500, unique=True, verbose_name='Path')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('mtime', models.FloatField(verbose_name='Modification time')),
+                (
+                    'modified',
+                    core_fields.ModificationDateTimeField(
+                        default=now, editable=False, blank=True,
+                        verbose_name='Last processing',
+                    )
+                ),
+            ],
+            options={
+                'verbose_name': 'Processed file',
+                'verbose_name_plural': 'Processed files',
+            },
+        ),
+    ]
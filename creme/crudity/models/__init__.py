@@ -1,2 +1,3 @@
 from .actions import WaitingAction  # NOQA
+from .filesystem import ProcessedFile  # NOQA
 from .history import History  # NOQA
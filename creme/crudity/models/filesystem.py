@@ -0,0 +1,42 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+import creme.creme_core.models.fields as core_fields
+from creme.creme_core.models import CremeModel
+
+
+class ProcessedFile(CremeModel):
+    """Index of the files (see the fetcher "filesystem") which have already
+    been processed, but which are still in the directory (e.g. invalid files) ;
+    they are not parsed again while they are not modified.
+    """
+    path = models.CharField(_('Path'), max_length=500, unique=True)
+    size = models.BigIntegerField(_('Size'))
+    mtime = models.FloatField(_('Modification time'))
+    modified = core_fields.ModificationDateTimeField(_('Last processing'))
+
+    class Meta:
+        app_label = 'crudity'
+        verbose_name = _('Processed file')
+        verbose_name_plural = _('Processed files')
+
+    def __str__(self):
+        return self.path
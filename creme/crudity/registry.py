@@ -82,6 +82,38 @@ class FetcherInterface:
 
         return data
 
+    def handle(self, data, user) -> CrudityBackend | None:
+        """Give some fetched data to the inputs (or to the default backend).
+        The fetchers are notified that the data have been processed (see
+        CrudityFetcher.mark_as_processed()).
+        @param data: Element returned by <fetch()>.
+        @param user: User used by the default backend.
+        @return: The backend which handles the data, or None.
+        """
+        backend = self._handle_data(data, user)
+
+        for fetcher in self.fetchers:
+            fetcher.mark_as_processed(data)
+
+        return backend
+
+    def _handle_data(self, data, user) -> CrudityBackend | None:
+        for inputs_per_method in self.get_inputs():
+            for crud_input in inputs_per_method.values():
+                handling_backend = crud_input.handle(data)
+
+                if handling_backend is not None:
+                    return handling_backend
+
+            default_backend = self.get_default_backend()
+
+            if default_backend is not None:
+                # TODO: need better type for default backend (fetcher_fallback() method)
+                default_backend.fetcher_fallback(data, user)
+                return default_backend
+
+        return None
+
     def get_default_backend(self) -> CrudityBackend | None:
         """Special case, for retrieving the backend defined as the default one.
         The backend should be aware in his fetcher_fallback method that the input
@@ -368,23 +400,6 @@ class CRUDityRegistry:
     def fetch(self, user) -> list[CrudityBackend]:
         used_backends = []
 
-        def _handle_data(multi_fetcher: FetcherInterface, data) -> CrudityBackend | None:
-            for inputs_per_method in multi_fetcher.get_inputs():
-                for crud_input in inputs_per_method.values():
-                    handling_backend = crud_input.handle(data)
-
-                    if handling_backend is not None:
-                        return handling_backend
-
-                default_backend = multi_fetcher.get_default_backend()
-
-                if default_backend is not None:
-                    # TODO: need better type for default backend (fetcher_fallback() method)
-                    default_backend.fetcher_fallback(data, user)
-                    return default_backend
-
-            return None
-
         for fetcher_multiplex in self.get_fetchers():
             # TODO: FetcherInterface.has_backends() ?
             if not any(
@@ -395,7 +410,7 @@ class CRUDityRegistry:
                 continue
 
             for data in fetcher_multiplex.fetch():
-                backend = _handle_data(fetcher_multiplex, data)
+                backend = fetcher_multiplex.handle(data, user)
 
                 if backend:
                     used_backends.append(backend)
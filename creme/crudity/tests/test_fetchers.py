@@ -1,9 +1,21 @@
+import os
+from contextlib import suppress
 from os.path import join
+from tempfile import TemporaryDirectory
+from threading import Lock, Timer
+from unittest import skipIf
 
 from django.conf import settings
 from django.test.utils import override_settings
 
-from ..fetchers.filesystem import FileSystemFetcher
+from ..fetchers.filesystem import (
+    FileSystemFetcher,
+    FileSystemWatcher,
+    InotifyEventSource,
+    WatcherLock,
+    fcntl,
+)
+from ..models import ProcessedFile
 from .base import CrudityTestCase
 
 
@@ -44,3 +56,205 @@ class FetcherFileSystemTestCase(CrudityTestCase):
         paths = FileSystemFetcher(setting_name='MY_FILESYS_FETCHER_DIR').fetch()
         self.assertIsList(paths)
         self.assertIn(join(settings.MY_FILESYS_FETCHER_DIR, 'LICENSE.txt'), paths)
+
+
+class FetcherFileSystemIndexTestCase(CrudityTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir_path = tmp_dir.name
+
+        self.addCleanup(self._remove_lock_file, WatcherLock(self.dir_path).path)
+
+    @staticmethod
+    def _remove_lock_file(path):
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+    def _create_file(self, name, content='[head]\n'):
+        path = join(self.dir_path, name)
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+        return path
+
+    def test_mark_as_processed(self):
+        path1 = self._create_file('file1.ini')
+        path2 = self._create_file('file2.ini')
+
+        with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+            fetcher = FileSystemFetcher()
+            self.assertCountEqual([path1, path2], fetcher.fetch())
+
+            fetcher.mark_as_processed(path1)
+            pfile = self.get_object_or_fail(ProcessedFile, path=path1)
+            self.assertEqual(os.path.getsize(path1), pfile.size)
+            self.assertListEqual([path2], fetcher.fetch())
+            self.assertListEqual([path2], fetcher.filter_unprocessed([path1, path2]))
+
+            # Modified file
+            self._create_file('file1.ini', content='[head]\nfoo=bar\n')
+            self.assertCountEqual([path1, path2], fetcher.fetch())
+
+            # Removed file
+            fetcher.mark_as_processed(path1)
+            os.remove(path1)
+            self.assertListEqual([path2], fetcher.fetch())
+            self.assertFalse(ProcessedFile.objects.filter(path=path1).exists())
+
+            fetcher.mark_as_processed(path2)
+            os.remove(path2)
+            fetcher.mark_as_processed(path2)
+            self.assertFalse(ProcessedFile.objects.filter(path=path2).exists())
+
+    def test_mark_as_processed_other_dir(self):
+        with TemporaryDirectory() as other_dir:
+            other_path = join(other_dir, 'file.ini')
+            with open(other_path, 'w') as f:
+                f.write('[head]\n')
+
+            with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+                fetcher = FileSystemFetcher()
+                fetcher.mark_as_processed(other_path)
+                fetcher.mark_as_processed({'not': 'a path'})
+
+        self.assertFalse(ProcessedFile.objects.exists())
+
+    def _watch(self, watcher, timeout=10):
+        "Run the watcher until it is stopped (by the handler, or by a timer)."
+        timer = Timer(timeout, watcher.stop)
+        timer.start()
+
+        try:
+            watcher.run()
+        finally:
+            timer.cancel()
+
+    def test_watcher_polling(self):
+        path1 = self._create_file('file1.ini')
+        path2 = self._create_file('file2.ini')
+        path3 = self._create_file('file3.ini')
+        os.mkdir(join(self.dir_path, 'subdir'))
+
+        processed = []
+        lock = Lock()
+
+        def handler(path):
+            with lock:
+                processed.append(path)
+
+                if len(processed) == 2:
+                    watcher.stop()
+
+        with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+            fetcher = FileSystemFetcher()
+            fetcher.mark_as_processed(path3)
+
+            watcher = FileSystemWatcher(
+                fetcher=fetcher, handler=handler,
+                workers=2, queue_size=1, poll_interval=0.1, use_inotify=False,
+            )
+            self._watch(watcher)
+
+        self.assertCountEqual([path1, path2], processed)
+
+    def test_watcher_error(self):
+        path = self._create_file('file.ini')
+        calls = []
+
+        def handler(path):
+            calls.append(path)
+            watcher.stop()
+            raise ValueError('Invalid file')
+
+        with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+            watcher = FileSystemWatcher(
+                fetcher=FileSystemFetcher(), handler=handler,
+                poll_interval=0.1, use_inotify=False,
+            )
+
+            with self.assertLogs('creme.crudity.fetchers.filesystem', level='ERROR'):
+                self._watch(watcher)
+
+        self.assertListEqual([path], calls)
+
+    def test_watcher_inotify(self):
+        if not InotifyEventSource.is_available():
+            self.skipTest('inotify is not available')
+
+        processed = []
+        path = join(self.dir_path, 'file.ini')
+
+        def handler(path):
+            processed.append(path)
+            watcher.stop()
+
+        with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+            watcher = FileSystemWatcher(
+                fetcher=FileSystemFetcher(), handler=handler, poll_interval=0.1,
+            )
+
+            source = watcher._create_source(self.dir_path)
+            self.assertIsInstance(source, InotifyEventSource)
+            source.close()
+
+            # NB: the file is written while the watcher is running
+            writer = Timer(0.3, self._create_file, args=('file.ini',))
+            writer.start()
+            self._watch(watcher)
+            writer.join()
+
+        self.assertListEqual([path], processed)
+
+    @skipIf(fcntl is None, 'The lock of the watcher is not available')
+    def test_watcher_lock(self):
+        path = self._create_file('file.ini')
+        calls = []
+
+        def handler(path):
+            # The job does not process the files while the watcher runs
+            calls.append((path, WatcherLock(self.dir_path).is_locked(), fetcher.fetch()))
+            watcher.stop()
+
+        with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+            fetcher = FileSystemFetcher()
+            watcher = FileSystemWatcher(
+                fetcher=fetcher, handler=handler, poll_interval=0.1, use_inotify=False,
+            )
+
+            with self.assertLogs('creme.crudity.fetchers.filesystem', level='INFO'):
+                self._watch(watcher)
+
+            self.assertListEqual([(path, True, [])], calls)
+
+            # The lock is released
+            self.assertFalse(WatcherLock(self.dir_path).is_locked())
+            self.assertListEqual([path], fetcher.fetch())
+
+    @skipIf(fcntl is None, 'The lock of the watcher is not available')
+    def test_watcher_lock_already_watched(self):
+        path = self._create_file('file.ini')
+
+        lock = WatcherLock(self.dir_path)
+        self.assertTrue(lock.acquire())
+        self.addCleanup(lock.release)
+        self.assertTrue(lock.is_locked())
+
+        with override_settings(CRUDITY_FILESYS_FETCHER_DIR=self.dir_path):
+            fetcher = FileSystemFetcher()
+
+            with self.assertLogs('creme.crudity.fetchers.filesystem', level='INFO'):
+                self.assertListEqual([], fetcher.fetch())
+
+            self.assertListEqual([path], fetcher.scan())
+
+            watcher = FileSystemWatcher(fetcher=fetcher, handler=lambda path: None)
+            with self.assertRaises(FileSystemFetcher.FileSystemFetcherError):
+                watcher.run()
+
+        # The lock of the first watcher is kept
+        self.assertTrue(WatcherLock(self.dir_path).is_locked())
+        lock.release()
+        self.assertFalse(lock.is_locked())
@@ -54,6 +54,18 @@ class CrudityRegistryTestCase(CrudityTestCase):
         self.assertIsInstance(ifetcher, registry.FetcherInterface)
         self.assertEqual([f1, f2], ifetcher.fetchers)
 
+    def test_fetcher_interface_handle(self):
+        "The fetchers are notified that the data have been processed."
+        processed = []
+
+        class ProcessingFakeFetcher(FakeFetcher):
+            def mark_as_processed(self, data):
+                processed.append(data)
+
+        fetcher_interface = registry.FetcherInterface([ProcessingFakeFetcher()])
+        self.assertIsNone(fetcher_interface.handle('data', self.create_user()))
+        self.assertListEqual(['data'], processed)
+
     def test_register_backend01(self):
         crudity_registry = self.crudity_registry
         crudity_registry.register_backends([FakeContactBackend, FakeOrganisationBackend])
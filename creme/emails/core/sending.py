@@ -0,0 +1,219 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Sending of the emails of the campaigns.
+
+The emails are sent by several threads (one SMTP connection per thread),
+at a limited rate; the statuses of the emails are saved by chunks.
+"""
+
+from __future__ import annotations
+
+import logging
+from queue import Queue
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Callable
+
+from django.db.models import QuerySet
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Limit the rate of an operation (e.g. the sending of emails).
+
+    Each operation takes a token ; the bucket contains at most <capacity>
+    tokens, & it is refilled with <rate> tokens per second. When the bucket
+    is empty, the operations wait for a new token.
+    The methods are thread-safe.
+    """
+    def __init__(self,
+                 rate: float,
+                 capacity: int = 1,
+                 clock: Callable[[], float] = monotonic,
+                 sleep_function: Callable[[float], None] = sleep,
+                 ):
+        """Constructor.
+        @param rate: Number of tokens added per second ; 0 means "no limit".
+        @param capacity: Maximum number of tokens (i.e. size of a burst of operations).
+        @param clock: Function returning the current time, in seconds.
+        @param sleep_function: Function used to wait, with a number of seconds as argument.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep_function
+
+        self._tokens = float(capacity)
+        self._last_time = clock()
+        self._lock = Lock()
+
+    def take(self) -> None:
+        "Take a token ; wait until a token is available if the bucket is empty."
+        rate = self.rate
+        if rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now_value = self._clock()
+                tokens = min(
+                    self.capacity,
+                    self._tokens + (now_value - self._last_time) * rate,
+                )
+                self._last_time = now_value
+
+                if tokens >= 1:
+                    self._tokens = tokens - 1
+                    return
+
+                self._tokens = tokens
+                delay = (1 - tokens) / rate
+
+            self._sleep(delay)
+
+
+class CampaignMailsSender:
+    """Send some emails (instances of LightWeightEmail) with several SMTP
+    connections.
+
+    The emails are retrieved by chunks (so big campaigns do not use a lot of
+    memory) & sent by a pool of threads ; each thread uses its own connection.
+    The statuses of the emails are saved with a grouped query at the end of
+    each chunk, so if the process is stopped, the emails which are still not
+    sent (see EmailSending.unsent_mails) can be sent later (the emails of the
+    last chunk may be sent again).
+
+    Notice that the threads do not use the database.
+    """
+    # Number of emails retrieved/updated with the same query
+    chunk_size = 256
+
+    def __init__(self,
+                 mail_sender,
+                 get_connection: Callable,
+                 workers: int = 1,
+                 bucket: TokenBucket | None = None,
+                 ):
+        """Constructor.
+        @param mail_sender: Instance of <creme.emails.utils.EMailSender>.
+        @param get_connection: Function (without argument) which returns a
+               new connection (see <django.core.mail.get_connection()>).
+        @param workers: Number of threads/connections.
+        @param bucket: Limit the rate of sending ; <None> means "no limit".
+        """
+        self.mail_sender = mail_sender
+        self.get_connection = get_connection
+        self.workers = max(1, workers)
+        self.bucket = bucket
+
+    @staticmethod
+    def _close(connection) -> None:
+        # NB: the SMTP backend raises the errors when it's not silent.
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning('CampaignMailsSender: error when closing the connection (%s)', e)
+
+    def _work(self, connection, tasks: Queue, results: Queue) -> None:
+        mail_sender = self.mail_sender
+        bucket = self.bucket
+
+        try:
+            while True:
+                mail = tasks.get()
+                if mail is None:
+                    break
+
+                ok = False
+
+                try:
+                    if bucket is not None:
+                        bucket.take()
+
+                    ok = mail_sender.send(mail, connection=connection, save=False)
+                except Exception:
+                    logger.exception('CampaignMailsSender: error with the mail id=%s', mail.id)
+                    mail.status = mail.Status.SENDING_ERROR
+                finally:
+                    if ok:
+                        logger.debug('Mail sent to %s', mail.recipient)
+                    else:
+                        # NB: the connection may be broken ; it is re-opened by
+                        #     the next sending.
+                        self._close(connection)
+
+                    # NB: send() waits for a result per mail.
+                    results.put(ok)
+        finally:
+            self._close(connection)
+
+    def send(self, mails: QuerySet) -> int:
+        """Send some emails & save their statuses.
+        @param mails: QuerySet of LightWeightEmails.
+        @return: The number of emails which have been sent.
+        """
+        tasks = Queue()
+        results = Queue()
+        threads = [
+            Thread(
+                target=self._work,
+                args=(self.get_connection(), tasks, results),
+                daemon=True,
+            ) for __ in range(self.workers)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        sent_count = 0
+        chunk_size = self.chunk_size
+        mails = mails.order_by('id')
+
+        try:
+            last_id = None
+
+            while True:
+                chunk = [
+                    *(mails if last_id is None else mails.filter(id__gt=last_id))[:chunk_size]
+                ]
+                if not chunk:
+                    break
+
+                for mail in chunk:
+                    tasks.put(mail)
+
+                sent_count += sum(results.get() for __ in chunk)
+
+                type(chunk[0])._default_manager.bulk_update(
+                    chunk, fields=['status', 'sending_date'],
+                )
+
+                if len(chunk) < chunk_size:
+                    break
+
+                last_id = chunk[-1].id
+        finally:
+            for __ in threads:
+                tasks.put(None)
+
+            for thread in threads:
+                thread.join()
+
+        return sent_count
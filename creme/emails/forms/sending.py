@@ -16,6 +16,7 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from collections import defaultdict
 from datetime import datetime, time
 from json import dumps as json_dump
 
@@ -32,7 +33,8 @@ from django.utils.translation import gettext_lazy as _
 from creme.creme_core.auth import EntityCredentials
 from creme.creme_core.forms import CreatorEntityField, CremeModelForm
 from creme.creme_core.forms.widgets import CalendarWidget
-from creme.creme_core.models import HistoryLine, SettingValue
+from creme.creme_core.models import SettingValue
+from creme.creme_core.utils.chunktools import iter_as_chunk
 from creme.creme_core.utils.dates import make_aware_dt
 
 from .. import get_emailtemplate_model
@@ -54,6 +56,9 @@ class SendingCreateForm(CremeModelForm):
     hour = IntegerField(label=_('Sending hour'), required=False, min_value=0, max_value=23)
     minute = IntegerField(label=_('Sending minute'), required=False, min_value=0, max_value=59)
 
+    # Number of mails created with the same query
+    chunk_size = 256
+
     error_messages = {
         'forbidden': _(
             'You are not allowed to modify the sender address, '
@@ -178,30 +183,46 @@ class SendingCreateForm(CremeModelForm):
             *self._get_variables(template.body_html),
         ]
 
-        disable_history = HistoryLine.disable
+        # NB: the mails are created by chunks, & the instances of Contact/Organisation
+        #     are only retrieved if the template uses some variables.
+        for recipients in iter_as_chunk(instance.campaign.iter_recipients(), self.chunk_size):
+            entities = {}
+
+            if varlist:
+                entity_ids = defaultdict(list)
+                for __, entity_id, ctype in recipients:
+                    if entity_id is not None:
+                        entity_ids[ctype].append(entity_id)
+
+                for ctype, ids in entity_ids.items():
+                    entities.update(ctype.model_class()._default_manager.in_bulk(ids))
+
+            mails = []
+            for address, entity_id, ctype in recipients:
+                mail = LightWeightEmail(
+                    sending=instance,
+                    sender=instance.sender,
+                    recipient=address,
+                    sending_date=instance.sending_date,
+                    recipient_ctype=ctype,
+                    recipient_entity_id=entity_id,
+                )
 
-        for address, recipient_entity in instance.campaign.all_recipients():
-            mail = LightWeightEmail(
-                sending=instance,
-                sender=instance.sender,
-                recipient=address,
-                sending_date=instance.sending_date,
-                # recipient_entity=recipient_entity,
-                real_recipient=recipient_entity,
-            )
+                recipient_entity = entities.get(entity_id)
+                if recipient_entity:
+                    context = {}
 
-            if recipient_entity:
-                context = {}
+                    for varname in varlist:
+                        val = getattr(recipient_entity, varname, None)
+                        if val:
+                            context[varname] = str(val)
 
-                for varname in varlist:
-                    val = getattr(recipient_entity, varname, None)
-                    if val:
-                        context[varname] = str(val)
+                    if context:
+                        mail.body = json_dump(context, separators=(',', ':'))
 
-                if context:
-                    mail.body = json_dump(context, separators=(',', ':'))
+                mails.append(mail)
 
-            disable_history(mail)
-            mail.genid_n_save()
+            # NB: no history line is created by bulk_create()
+            LightWeightEmail.genid_n_bulk_create(mails)
 
         return instance
@@ -16,7 +16,13 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterator
+
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -60,35 +66,76 @@ class AbstractEmailCampaign(CremeEntity):
     def get_lv_absolute_url():
         return reverse('emails__list_campaigns')
 
-    def all_recipients(self):
-        # Merge all the mailing_lists and their children
-        lists = {
-            pk: ml
-            for ml in self.mailing_lists.filter(is_deleted=False)
-            for pk, ml in ml.get_family().items()
-        }.values()
-
-        # Manual recipients
-        recipients = {
-            addr: None
-            for addr in EmailRecipient.objects
-                                      .filter(ml__in=[ml.id for ml in lists])
-                                      .values_list('address', flat=True)
-        }
+    def iter_recipients(self) -> Iterator[tuple[str, int | None, ContentType | None]]:
+        """Get the recipients of the campaign (i.e. recipients of the related
+        mailing lists & their children), without duplicated address.
+        The instances of Contact/Organisation are not retrieved.
+        @return: Iterator on tuples (address, entity_id, ctype) ; "entity_id" &
+                 "ctype" are None for the manual recipients (see EmailRecipient).
+        """
+        mlist_model = self.mailing_lists.model
+        mlist_ids = mlist_model.get_family_ids(
+            self.mailing_lists.filter(is_deleted=False).values_list('id', flat=True)
+        )
+        if not mlist_ids:
+            return
+
+        # NB: if an address is used by several recipients, the organisation
+        #     is used in priority, then the contact (& finally the manual recipient).
+        recipients = dict.fromkeys(
+            EmailRecipient.objects
+                          .filter(ml__in=mlist_ids)
+                          .values_list('address', flat=True)
+                          .distinct(),
+            (None, None),
+        )
+
+        for field_name in ('contacts', 'organisations'):
+            field = mlist_model._meta.get_field(field_name)
+            mlist_fname = field.m2m_field_name()
+            person_fname = field.m2m_reverse_field_name()
+            ctype = ContentType.objects.get_for_model(field.related_model)
 
-        # Contacts & organisations recipients
-        def update(get_persons):
             recipients.update(
-                (p.email, p)
-                for ml in lists
-                for p in get_persons(ml).filter(is_deleted=False)
-                if p.email
+                (address, (entity_id, ctype))
+                for address, entity_id in field.remote_field.through._default_manager.filter(
+                    **{
+                        f'{mlist_fname}_id__in': mlist_ids,
+                        f'{person_fname}__is_deleted': False,
+                        f'{person_fname}__email__isnull': False,
+                    }
+                ).exclude(
+                    **{f'{person_fname}__email': ''}
+                ).values_list(
+                    f'{person_fname}__email', f'{person_fname}_id',
+                ).distinct()
             )
 
-        update(lambda ml: ml.contacts)
-        update(lambda ml: ml.organisations)
+        for address, (entity_id, ctype) in recipients.items():
+            yield address, entity_id, ctype
+
+    def all_recipients(self):
+        """Get the recipients of the campaign.
+        @return: Iterable of tuples (address, entity) ; "entity" is an instance
+                 of Contact/Organisation, or None for the manual recipients.
+        Hint: use iter_recipients() for big campaigns.
+        """
+        recipients = [*self.iter_recipients()]
+
+        entity_ids = defaultdict(list)
+        for __, entity_id, ctype in recipients:
+            if entity_id is not None:
+                entity_ids[ctype].append(entity_id)
+
+        entities = {
+            ctype: ctype.model_class()._default_manager.in_bulk(ids)
+            for ctype, ids in entity_ids.items()
+        }
 
-        return recipients.items()
+        return [
+            (address, None if entity_id is None else entities[ctype][entity_id])
+            for address, entity_id, ctype in recipients
+        ]
 
     def restore(self):
         CremeEntity.restore(self)
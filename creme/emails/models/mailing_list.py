@@ -16,6 +16,10 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
+from typing import Iterable
+
 from django.conf import settings
 from django.db import models
 from django.urls import reverse
@@ -100,16 +104,45 @@ class AbstractMailingList(CremeEntity):
         """Return a dictionary<pk: MailingList> with self and all children,
          small children etc...
          """
-        family = {}
-        self.get_family_aux(family)
+        family = {self.id: self}
+        family_ids = self.get_family_ids([self.id])
+        family_ids.discard(self.id)
+
+        if family_ids:
+            family.update(
+                (ml.id, ml) for ml in type(self)._default_manager.filter(id__in=family_ids)
+            )
 
         return family
 
     def get_family_aux(self, dic):
-        dic[self.id] = self
+        dic.update(self.get_family())
+
+    @classmethod
+    def get_family_ids(cls, mlist_ids: Iterable[int]) -> set[int]:
+        """Get the IDs of some mailing lists and of all their (not deleted)
+        children, small children etc...
+        One query is performed by level of depth (& not by mailing list).
+        @param mlist_ids: IDs of the mailing lists.
+        @return: A set of IDs.
+        """
+        children_field = cls._meta.get_field('children')
+        parent_fname = children_field.m2m_field_name()
+        child_fname = children_field.m2m_reverse_field_name()
+        children_qs = children_field.remote_field.through._default_manager.filter(
+            **{f'{child_fname}__is_deleted': False}
+        ).values_list(f'{child_fname}_id', flat=True)
+
+        family = {*mlist_ids}
+        current_ids = family
+
+        while current_ids:
+            current_ids = {
+                *children_qs.filter(**{f'{parent_fname}_id__in': current_ids})
+            } - family
+            family |= current_ids
 
-        for child in self.children.filter(is_deleted=False):
-            child.get_family_aux(dic)
+        return family
 
 
 class MailingList(AbstractMailingList):
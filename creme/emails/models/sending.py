@@ -17,8 +17,8 @@
 ################################################################################
 
 import logging
+from functools import partial
 from json import loads as json_load
-from time import sleep
 
 from django.conf import settings
 from django.core.mail import get_connection, send_mail
@@ -35,6 +35,7 @@ from django.utils.translation import pgettext, pgettext_lazy
 import creme.creme_core.models.fields as core_fields
 from creme.creme_core.models import CremeEntity, CremeModel
 
+from ..core.sending import CampaignMailsSender, TokenBucket
 from ..utils import EMailSender, ImageFromHTMLError, generate_id
 from .mail import ID_LENGTH, _Email
 from .signature import EmailSignature
@@ -124,36 +125,31 @@ class EmailSending(CremeModel):
 
             return self.State.ERROR
 
-        connection = get_connection(
-            host=settings.EMAILCAMPAIGN_HOST,
-            port=settings.EMAILCAMPAIGN_PORT,
-            username=settings.EMAILCAMPAIGN_HOST_USER,
-            password=settings.EMAILCAMPAIGN_PASSWORD,
-            use_tls=settings.EMAILCAMPAIGN_USE_TLS,
-        )
-
-        mails_count = 0
-        one_mail_sent = False
-        SENDING_SIZE = getattr(settings, 'EMAILCAMPAIGN_SIZE', 40)
+        SIZE = getattr(settings, 'EMAILCAMPAIGN_SIZE', 40)
         SLEEP_TIME = getattr(settings, 'EMAILCAMPAIGN_SLEEP_TIME', 2)
 
-        for mail in LightWeightEmail.objects.filter(sending=self):
-            if sender.send(mail, connection=connection):
-                mails_count += 1
-                one_mail_sent = True
-                logger.debug('Mail sent to %s', mail.recipient)
-
-            if mails_count > SENDING_SIZE:
-                logger.debug('Sending: waiting timeout')
-
-                mails_count = 0
-                sleep(SLEEP_TIME)  # Avoiding the mail to be classed as spam
-
-        if not one_mail_sent:
+        # NB: the rate limit avoids the mails to be classed as spam
+        sent_count = CampaignMailsSender(
+            mail_sender=sender,
+            get_connection=partial(
+                get_connection,
+                host=settings.EMAILCAMPAIGN_HOST,
+                port=settings.EMAILCAMPAIGN_PORT,
+                username=settings.EMAILCAMPAIGN_HOST_USER,
+                password=settings.EMAILCAMPAIGN_PASSWORD,
+                use_tls=settings.EMAILCAMPAIGN_USE_TLS,
+            ),
+            workers=getattr(settings, 'EMAILCAMPAIGN_CONNECTIONS', 1),
+            bucket=TokenBucket(
+                rate=SIZE / SLEEP_TIME if SLEEP_TIME > 0 else 0,
+                capacity=SIZE,
+            ),
+        ).send(self.unsent_mails)
+
+        # NB: the mails may have been sent by a previous (interrupted) job
+        if not sent_count and not self.mails_set.filter(status=_Email.Status.SENT).exists():
             return self.State.ERROR
 
-        # TODO: close the connection ??
-
     @property
     def unsent_mails(self):
         Status = _Email.Status
@@ -221,6 +217,42 @@ class LightWeightEmail(_Email):
             else:
                 return
 
+    @classmethod
+    def genid_n_bulk_create(cls, mails) -> None:
+        """Generate the IDs of several mails & save them with grouped queries
+        (see genid_n_save()).
+        @param mails: Sequence of (not saved) instances.
+        """
+        pending = [*mails]
+
+        while pending:
+            for mail in pending:
+                mail.id = generate_id()
+
+            existing_ids = {
+                *cls._default_manager.filter(
+                    id__in=[mail.id for mail in pending],
+                ).values_list('id', flat=True)
+            }
+            new_mails = []
+            retried_mails = []
+
+            for mail in pending:
+                if mail.id in existing_ids:
+                    logger.debug('Mail id already exists: %s', mail.id)
+                    retried_mails.append(mail)
+                else:
+                    existing_ids.add(mail.id)
+                    new_mails.append(mail)
+
+            try:
+                with atomic():
+                    cls._default_manager.bulk_create(new_mails)
+            except IntegrityError:  # Created concurrently => retry all
+                logger.debug('Some mail ids already exist, retry')
+            else:
+                pending = retried_mails
+
 
 class LightWeightEmailSender(EMailSender):
     def __init__(self, sending):
@@ -228,7 +260,9 @@ class LightWeightEmailSender(EMailSender):
             body=sending.body,
             body_html=sending.body_html,
             signature=sending.signature,
-            attachments=sending.attachments.all(),
+            # NB: the attachments are retrieved now, because the mails can be
+            #     sent by other threads (which do not use the database).
+            attachments=[*sending.attachments.all()],
         )
         self._sending = sending
         self._body_template = Template(self._body)
@@ -1,6 +1,23 @@
+from functools import partial
+
+from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 
-from .base import EmailCampaign, _EmailsTestCase, skipIfCustomEmailCampaign
+from creme.persons.tests.base import (
+    skipIfCustomContact,
+    skipIfCustomOrganisation,
+)
+
+from ..models import EmailRecipient
+from .base import (
+    Contact,
+    EmailCampaign,
+    MailingList,
+    Organisation,
+    _EmailsTestCase,
+    skipIfCustomEmailCampaign,
+    skipIfCustomMailingList,
+)
 
 
 @skipIfCustomEmailCampaign
@@ -48,3 +65,64 @@ class CampaignTestCase(_EmailsTestCase):
 
         with self.assertNoException():
             response.context['page_obj']
+
+    @skipIfCustomContact
+    @skipIfCustomOrganisation
+    @skipIfCustomMailingList
+    def test_recipients(self):
+        user = self.user
+        camp = EmailCampaign.objects.create(user=user, name='camp01')
+
+        create_ml = partial(MailingList.objects.create, user=user)
+        mlist1 = create_ml(name='ml01')
+        mlist2 = create_ml(name='ml02')
+        mlist3 = create_ml(name='ml03', is_deleted=True)
+        camp.mailing_lists.add(mlist1)
+        mlist1.children.add(mlist2, mlist3)
+
+        create_contact = partial(Contact.objects.create, user=user, last_name='Spiegel')
+        contact1 = create_contact(first_name='Spike', email='spike@bebop.com')
+        contact2 = create_contact(first_name='Jet', email='jet@bebop.com')
+        contact3 = create_contact(first_name='Faye', email='')
+        contact4 = create_contact(first_name='Ein', email='ein@bebop.com', is_deleted=True)
+        contact5 = create_contact(first_name='Ed', email='ed@bebop.com')
+
+        create_orga = partial(Organisation.objects.create, user=user)
+        orga1 = create_orga(name='Bebop', email='contact@bebop.com')
+        orga2 = create_orga(name='Red dragons', email='jet@bebop.com')
+
+        mlist1.contacts.add(contact1, contact3, contact4)
+        mlist2.contacts.add(contact1, contact2)
+        mlist2.organisations.add(orga1, orga2)
+        mlist3.contacts.add(contact5)
+
+        create_recipient = EmailRecipient.objects.create
+        create_recipient(ml=mlist1, address='vicious@reddragons.mrs')
+        create_recipient(ml=mlist2, address='vicious@reddragons.mrs')
+        create_recipient(ml=mlist2, address='spike@bebop.com')
+
+        get_ct = ContentType.objects.get_for_model
+        contact_ct = get_ct(Contact)
+        orga_ct = get_ct(Organisation)
+        self.assertCountEqual(
+            [
+                ('vicious@reddragons.mrs', None,        None),
+                ('spike@bebop.com',        contact1.id, contact_ct),
+                ('contact@bebop.com',      orga1.id,    orga_ct),
+                ('jet@bebop.com',          orga2.id,    orga_ct),
+            ],
+            [*camp.iter_recipients()],
+        )
+        self.assertCountEqual(
+            [
+                ('vicious@reddragons.mrs', None),
+                ('spike@bebop.com',        contact1),
+                ('contact@bebop.com',      orga1),
+                ('jet@bebop.com',          orga2),
+            ],
+            camp.all_recipients(),
+        )
+
+        # Deleted list
+        mlist1.trash()
+        self.assertFalse([*camp.iter_recipients()])
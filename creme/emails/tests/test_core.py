@@ -2,6 +2,7 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
 from creme.creme_core.tests.base import CremeTestCase
+from creme.emails.core.sending import TokenBucket
 from creme.emails.core.validators import TemplateVariablesValidator
 
 
@@ -62,3 +63,45 @@ class ValidatorsTestCase(CremeTestCase):
             _('You can use variables: {}').format('{{name}} {{nick_name}}'),
             v.help_text,
         )
+
+
+class TokenBucketTestCase(CremeTestCase):
+    def _build_bucket(self, **kwargs):
+        times = [100.0]
+        sleeps = []
+
+        def fake_sleep(delay):
+            sleeps.append(delay)
+            times[0] += delay
+
+        bucket = TokenBucket(clock=lambda: times[0], sleep_function=fake_sleep, **kwargs)
+
+        return bucket, times, sleeps
+
+    def test_take01(self):
+        bucket, times, sleeps = self._build_bucket(rate=2, capacity=3)
+
+        for __ in range(3):
+            bucket.take()
+        self.assertFalse(sleeps)
+
+        bucket.take()
+        self.assertListEqual([0.5], sleeps)
+
+        # Refilled, but not beyond the capacity
+        times[0] += 60
+        for __ in range(3):
+            bucket.take()
+        self.assertListEqual([0.5], sleeps)
+
+        bucket.take()
+        self.assertListEqual([0.5, 0.5], sleeps)
+
+    def test_take02(self):
+        "No limit."
+        bucket, times, sleeps = self._build_bucket(rate=0, capacity=1)
+
+        for __ in range(5):
+            bucket.take()
+
+        self.assertFalse(sleeps)
@@ -688,3 +688,32 @@ class MailingListsTestCase(_EmailsTestCase):
         user = self.login()
         orga = FakeOrganisation.objects.create(user=user, name='Dojo')
         self.assertGET404(reverse('emails__add_child_mlists', args=(orga.id,)))
+
+    def test_ml_family(self):
+        user = self.login()
+        create_ml = partial(MailingList.objects.create, user=user)
+        mlist01 = create_ml(name='ml01')
+        mlist02 = create_ml(name='ml02')
+        mlist03 = create_ml(name='ml03')
+        mlist04 = create_ml(name='ml04')
+        mlist05 = create_ml(name='ml05', is_deleted=True)
+        mlist06 = create_ml(name='ml06')
+        create_ml(name='ml07')
+
+        mlist01.children.add(mlist02, mlist03)
+        mlist02.children.add(mlist04)
+        mlist03.children.add(mlist04, mlist05)
+        mlist05.children.add(mlist06)
+
+        # One query per level of depth (+1 to detect the end)
+        with self.assertNumQueries(3):
+            family_ids = MailingList.get_family_ids([mlist01.id])
+
+        self.assertSetEqual({mlist01.id, mlist02.id, mlist03.id, mlist04.id}, family_ids)
+
+        family = mlist03.get_family()
+        self.assertSetEqual({mlist03.id, mlist04.id}, {*family.keys()})
+        self.assertEqual(mlist04, family[mlist04.id])
+        self.assertIs(mlist03, family[mlist03.id])
+
+        self.assertSetEqual({mlist05.id, mlist06.id}, MailingList.get_family_ids([mlist05.id]))
@@ -1,8 +1,11 @@
 from datetime import timedelta
 from functools import partial
+from smtplib import SMTPException
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.core import mail as django_mail
+from django.core.mail.backends import locmem
 from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.html import format_html
@@ -29,8 +32,10 @@ from creme.persons.tests.base import (
 
 from ..bricks import MailsBrick
 from ..constants import SETTING_EMAILCAMPAIGN_SENDER
+from ..core.sending import CampaignMailsSender
 from ..creme_jobs import campaign_emails_send_type
 from ..models import EmailRecipient, EmailSending, LightWeightEmail
+from ..models.sending import LightWeightEmailSender
 from .base import (
     Contact,
     EmailCampaign,
@@ -883,6 +888,88 @@ class SendingsTestCase(_EmailsTestCase):
         self._send_mails(job)
         self.assertFalse(django_mail.outbox)
 
+    def _create_sending_n_mails(self, count):
+        camp = EmailCampaign.objects.create(user=self.user, name='camp01')
+        sending = EmailSending.objects.create(
+            sender='vicious@reddragons.mrs',
+            campaign=camp,
+            sending_date=now(),
+            subject='Subject',
+            body='My body is ready',
+            body_html='My body is <b>ready</b>',
+        )
+
+        for i in range(count):
+            LightWeightEmail(
+                sending=sending, recipient=f'spike{i}@bebop.com',
+                sender=sending.sender,
+            ).genid_n_save()
+
+        return sending
+
+    @override_settings(EMAILCAMPAIGN_CONNECTIONS=3, EMAILCAMPAIGN_SLEEP_TIME=0)
+    def test_send_mails01(self):
+        "Several connections, chunks, resumption."
+        self.login()
+        sending = self._create_sending_n_mails(7)
+
+        # Sent by a previous job
+        sent_mail = sending.mails_set.order_by('id')[3]
+        sent_mail.status = LightWeightEmail.Status.SENT
+        sent_mail.save()
+
+        with patch.object(CampaignMailsSender, 'chunk_size', 2):
+            self.assertIsNone(sending.send_mails())
+
+        messages = django_mail.outbox
+        self.assertEqual(6, len(messages))
+        self.assertNotIn(
+            sent_mail.recipient,
+            {recipient for message in messages for recipient in message.recipients()},
+        )
+
+        self.assertFalse(sending.unsent_mails)
+        for mail in sending.mails_set.exclude(id=sent_mail.id):
+            self.assertEqual(LightWeightEmail.Status.SENT, mail.status)
+            self.assertIsNotNone(mail.sending_date)
+
+        # All mails have been sent => not an error
+        self.assertIsNone(sending.send_mails())
+        self.assertEqual(6, len(django_mail.outbox))
+
+    @override_settings(EMAILCAMPAIGN_CONNECTIONS=2, EMAILCAMPAIGN_SLEEP_TIME=0)
+    def test_send_mails02(self):
+        "Errors."
+        self.login()
+        sending = self._create_sending_n_mails(3)
+
+        with patch.object(
+            LightWeightEmailSender, '_process_bodies', side_effect=ValueError('Invalid'),
+        ):
+            self.assertEqual(EmailSending.State.ERROR, sending.send_mails())
+
+        self.assertFalse(django_mail.outbox)
+        self.assertSetEqual(
+            {LightWeightEmail.Status.SENDING_ERROR},
+            {*sending.mails_set.values_list('status', flat=True)},
+        )
+        self.assertEqual(3, sending.unsent_mails.count())
+
+    @override_settings(EMAILCAMPAIGN_CONNECTIONS=2, EMAILCAMPAIGN_SLEEP_TIME=0)
+    def test_send_mails03(self):
+        "Errors when the connections are closed."
+        self.login()
+        sending = self._create_sending_n_mails(3)
+
+        with patch.object(
+            LightWeightEmailSender, '_process_bodies', side_effect=ValueError('Invalid'),
+        ), patch.object(
+            locmem.EmailBackend, 'close', side_effect=SMTPException('Connection lost'),
+        ):
+            self.assertEqual(EmailSending.State.ERROR, sending.send_mails())
+
+        self.assertEqual(3, sending.unsent_mails.count())
+
     def test_refresh_job01(self):
         "Restore campaign with sending which has to be sent."
         self.login()
@@ -111,9 +111,11 @@ class EMailSender:
     def _process_bodies(self, mail):
         return self._body, self._body_html
 
-    def send(self, mail, connection=None):
+    def send(self, mail, connection=None, save=True):
         """
         @param mail: Object with a class inheriting emails.models.mail._Email
+        @param save: If False, the new status of the mail is not saved (so the
+               caller can save several mails with a grouped query).
         @return True means <OK mail was sent>
         """
         ok = False
@@ -146,6 +148,7 @@ class EMailSender:
                 mail.sending_date = now()
                 ok = True
 
-            mail.save()
+            if save:
+                mail.save()
 
         return ok
@@ -0,0 +1,123 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+
+from django.db.models import Q
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
+
+from creme import persons
+from creme.creme_core.creme_jobs.base import JobProgress, JobType
+from creme.creme_core.models import Job
+
+from .models import GeoAddress, TownIndex
+
+logger = logging.getLogger(__name__)
+
+
+class _GeoAddressesBackfillType(JobType):
+    id = JobType.generate_id('geolocation', 'geoaddresses_backfill')
+    verbose_name = _('Localize the addresses')
+    periodic = JobType.PERIODIC
+
+    # Number of addresses retrieved (& localized) at once
+    page_size = 512
+
+    @staticmethod
+    def _addresses_to_localize():
+        "Addresses which have no position (& which could get one)."
+        return persons.get_address_model().objects.filter(
+            Q(geoaddress__isnull=True)
+            | Q(
+                geoaddress__latitude__isnull=True,
+                geoaddress__status=GeoAddress.Status.UNDEFINED,
+            )
+        ).exclude(zipcode='', city='').select_related('geoaddress').order_by('id')
+
+    @staticmethod
+    def _save_data(job, data):
+        job.data = data
+
+        # NB: Job.save() would send a refresh message to the job manager.
+        Job.objects.filter(id=job.id).update(data=data)
+
+    def _execute(self, job):
+        # NB: the ID of the last processed address is stored, so if the job is
+        #     interrupted, the next run resumes from this address.
+        data = job.data or {}
+        last_id = data.get('last_address_id') or 0
+        addresses = self._addresses_to_localize()
+
+        if not last_id:
+            data = {'total': addresses.count(), 'processed': 0}
+
+        town_index = TownIndex.build()
+        if not len(town_index):
+            logger.warning(
+                'GeoAddressesBackfill: no town in database (see the command "geolocation")'
+            )
+
+        page_size = self.page_size
+
+        while True:
+            page = [*addresses.filter(id__gt=last_id)[:page_size]]
+            if not page:
+                break
+
+            GeoAddress.populate_geoaddresses(page, town_index=town_index)
+
+            last_id = page[-1].id
+            data['last_address_id'] = last_id
+            data['processed'] = data.get('processed', 0) + len(page)
+            self._save_data(job, data)
+
+            if len(page) < page_size:
+                break
+
+        # The next run will process the new addresses (or the addresses which
+        # could not be localized) from the beginning.
+        data['last_address_id'] = None
+        self._save_data(job, data)
+
+    def get_description(self, job):
+        return [
+            gettext(
+                'The addresses without position are localized with the position '
+                'of their town (found by zip code or by name).'
+            ),
+        ]
+
+    def progress(self, job):
+        data = job.data or {}
+        total = data.get('total')
+        processed = data.get('processed', 0)
+
+        return JobProgress(
+            percentage=min(100, processed * 100 // total) if total else None,
+            label=ngettext(
+                '{count} address has been processed.',
+                '{count} addresses have been processed.',
+                processed
+            ).format(count=processed),
+        )
+
+
+geoaddresses_backfill_type = _GeoAddressesBackfillType()
+jobs = (geoaddresses_backfill_type,)
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('geolocation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geoaddress',
+            name='cell',
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='geoaddress',
+            index=models.Index(
+                fields=['cell', 'latitude', 'longitude'],
+                name='geolocation__geoaddress_cell',
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from math import floor
+
+from django.db import migrations
+
+# NB: copied from geolocation.utils (the code of the migrations must not change)
+GRID_CELL_SIZE = 0.1
+_GRID_ROWS = round(180 / GRID_CELL_SIZE)
+_GRID_COLUMNS = round(360 / GRID_CELL_SIZE)
+
+
+def location_grid_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+
+    row = min(max(floor((latitude + 90) / GRID_CELL_SIZE), 0), _GRID_ROWS - 1)
+    column = floor((longitude + 180) / GRID_CELL_SIZE) % _GRID_COLUMNS
+
+    return row * _GRID_COLUMNS + column
+
+
+def fill_cells(apps, schema_editor):
+    GeoAddress = apps.get_model('geolocation', 'GeoAddress')
+    geoaddresses = []
+
+    for geoaddress in GeoAddress.objects.filter(
+        latitude__isnull=False, longitude__isnull=False,
+    ).only('address_id', 'latitude', 'longitude').iterator():
+        geoaddress.cell = location_grid_cell(geoaddress.latitude, geoaddress.longitude)
+        geoaddresses.append(geoaddress)
+
+        if len(geoaddresses) >= 512:
+            GeoAddress.objects.bulk_update(geoaddresses, ['cell'])
+            geoaddresses = []
+
+    if geoaddresses:
+        GeoAddress.objects.bulk_update(geoaddresses, ['cell'])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('geolocation', '0002_v2_4__geoaddress_cell01'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_cells),
+    ]
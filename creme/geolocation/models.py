@@ -16,7 +16,8 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-from itertools import chain, groupby
+from collections import defaultdict
+from itertools import chain
 
 from django.conf import settings
 from django.db import models
@@ -29,7 +30,11 @@ from django.utils.translation import pgettext_lazy
 from creme.creme_core.utils import update_model_instance
 from creme.creme_core.utils.chunktools import iter_as_slices
 
-from .utils import location_bounding_box
+from .utils import (
+    haversine_expression,
+    location_grid_cell,
+    location_grid_ranges,
+)
 
 
 class GeoAddress(models.Model):
@@ -57,6 +62,8 @@ class GeoAddress(models.Model):
         verbose_name=pgettext_lazy('geolocation', 'Status'),
         choices=Status.choices, default=Status.UNDEFINED,
     )
+    # Cell of the grid used as spatial index (see utils.location_grid_cell())
+    cell = models.IntegerField(null=True, editable=False)
 
     creation_label = pgettext_lazy('geolocation-address', 'Create an address')
 
@@ -65,6 +72,12 @@ class GeoAddress(models.Model):
         verbose_name = pgettext_lazy('geolocation-address', 'Address')
         verbose_name_plural = pgettext_lazy('geolocation-address', 'Addresses')
         ordering = ('address_id',)
+        indexes = [
+            models.Index(
+                fields=['cell', 'latitude', 'longitude'],
+                name='geolocation__geoaddress_cell',
+            ),
+        ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -98,12 +111,17 @@ class GeoAddress(models.Model):
         return geoaddress
 
     @classmethod
-    def populate_geoaddresses(cls, addresses):
+    def populate_geoaddresses(cls, addresses, town_index=None):
+        """Create/update the GeoAddresses of some addresses (which have no
+        position yet) with the position of their Town.
+        @param addresses: Iterable of Addresses.
+        @param town_index: Instance of TownIndex used to search the Towns ;
+               <None> means the Towns are retrieved from the database.
+        """
         for addresses in iter_as_slices(addresses, 50):
             create = []
             update = []
 
-            # TODO: regroup queries ?
             for address in addresses:
                 try:
                     geoaddress = address.geoaddress
@@ -113,18 +131,27 @@ class GeoAddress(models.Model):
                 except GeoAddress.DoesNotExist:
                     create.append(GeoAddress(address=address))
 
-            towns = Town.search_all([geo.address for geo in chain(create, update)])
+            geoaddresses = [*chain(create, update)]
+            if not geoaddresses:
+                continue
 
-            for geoaddress, town in zip(chain(create, update), towns):
-                geoaddress.set_town_position(town)
+            geo_addresses = [geo.address for geo in geoaddresses]
+            towns = (
+                Town.search_all(geo_addresses)
+                if town_index is None else
+                map(town_index.search, geo_addresses)
+            )
 
-            GeoAddress.objects.bulk_create(create)
+            for geoaddress, town in zip(geoaddresses, towns):
+                geoaddress.set_town_position(town)
 
-            # TODO: only if has changed
-            # TODO: bulk_update() ?
             with atomic():
-                for geoaddress in update:
-                    geoaddress.save(force_update=True)
+                GeoAddress.objects.bulk_create(create)
+
+                # TODO: only if has changed
+                GeoAddress.objects.bulk_update(
+                    update, fields=['latitude', 'longitude', 'status', 'cell'],
+                )
 
     def set_town_position(self, town):
         if town is not None:
@@ -136,6 +163,68 @@ class GeoAddress(models.Model):
             self.longitude = None
             self.status = self.Status.UNDEFINED
 
+        self.refresh_cell()
+
+    def refresh_cell(self):
+        "Update the field 'cell' with the current position."
+        self.cell = location_grid_cell(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.refresh_cell()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def within_distance(cls, latitude, longitude, distance):
+        """Get the GeoAddresses around a location.
+        The spatial index (see the field 'cell') is used to find the candidates,
+        & the exact (haversine) distance is computed by the database.
+        @param distance: Distance in meters.
+        @return: A QuerySet, annotated with the field 'distance' (in meters)
+                 & sorted by distance.
+        """
+        cells_q = Q()
+        for first_cell, last_cell in location_grid_ranges(latitude, longitude, distance):
+            cells_q |= Q(cell__range=(first_cell, last_cell))
+
+        return cls.objects.filter(cells_q).annotate(
+            distance=haversine_expression(latitude, longitude),
+        ).filter(distance__lte=distance).order_by('distance', 'address_id')
+
+    @classmethod
+    def nearest(cls, latitude, longitude, count, max_distance=None, filter_queryset=None):
+        """Get the k-nearest GeoAddresses of a location.
+        The searching area is enlarged until enough GeoAddresses are found.
+        @param count: Maximum number of GeoAddresses.
+        @param max_distance: Maximum distance in meters ; None means "no limit".
+        @param filter_queryset: Function which takes the QuerySet of candidates &
+               returns a filtered QuerySet (e.g. to exclude some addresses) ;
+               None means "no filtering".
+        @return: A list of GeoAddresses (with an attribute 'distance'), sorted
+                 by distance.
+        """
+        # NB: the half of the Earth's circumference covers all the locations
+        world_distance = 20100000
+        distance = 10000
+
+        while True:
+            if max_distance is not None and distance >= max_distance:
+                distance = max_distance
+
+            qs = cls.within_distance(latitude, longitude, distance)
+            if filter_queryset is not None:
+                qs = filter_queryset(qs)
+
+            neighbours = [*qs[:count]]
+
+            if (
+                len(neighbours) >= count
+                or distance == max_distance
+                or distance >= world_distance
+            ):
+                return neighbours
+
+            distance *= 4
+
     def update(self, **kwargs):
         update_model_instance(self, **kwargs)
 
@@ -151,18 +240,13 @@ class GeoAddress(models.Model):
         latitude = self.latitude
         longitude = self.longitude
 
-        if latitude is None and longitude is None:
+        if latitude is None or longitude is None:
             return GeoAddress.objects.none()
 
-        upper_left, lower_right = location_bounding_box(latitude, longitude, distance)
-
-        return GeoAddress.objects.exclude(
+        return GeoAddress.within_distance(latitude, longitude, distance).exclude(
             address_id=self.address.pk,
         ).exclude(
             address__object_id=self.address.object_id,
-        ).filter(
-            latitude__range=(upper_left[0], lower_right[0]),
-            longitude__range=(upper_left[1], lower_right[1]),
         )
 
     def __str__(self):
@@ -216,30 +300,60 @@ class Town(models.Model):
 
     @classmethod
     def search_all(cls, addresses):
-        candidates = [
-            *Town.objects.filter(
+        addresses = [*addresses]
+        index = TownIndex(
+            Town.objects.filter(
                 Q(zipcode__in=(a.zipcode for a in addresses if a.zipcode))
                 | Q(slug__in=(slugify(a.city) for a in addresses if a.city))
-            ).order_by('zipcode'),
-        ]
+            )
+        )
 
-        cities = {key: [*c] for key, c in groupby(candidates, lambda c: c.slug)}
-        zipcodes = {key: [*c] for key, c in groupby(candidates, lambda c: c.zipcode)}
+        for address in addresses:
+            yield index.search(address)
 
-        get_city = cities.get
-        get_zipcode = zipcodes.get
 
-        for address in addresses:
-            zipcode = address.zipcode
-            slug = slugify(address.city) if address.city else None
-            towns = []
-
-            if zipcode:
-                towns = get_zipcode(zipcode, [])
-            elif slug:
-                towns = get_city(slug, [])
-
-            if len(towns) > 1 and slug:
-                yield next((t for t in towns if t.slug == slug), None)
-            else:
-                yield towns[0] if len(towns) == 1 else None
+class TownIndex:
+    """In-memory index of Towns, by zip code & by slug, to search the Towns of
+    many addresses without query (see Town.search()).
+
+    Hint: the index of all the Towns (see TownIndex.build()) is useful to
+          process a lot of addresses.
+    """
+    def __init__(self, towns):
+        """Constructor.
+        @param towns: Iterable of Towns.
+        """
+        self._towns_per_zipcode = towns_per_zipcode = defaultdict(list)
+        self._towns_per_slug = towns_per_slug = defaultdict(list)
+
+        for town in sorted(towns, key=lambda t: t.zipcode):
+            towns_per_zipcode[town.zipcode].append(town)
+            towns_per_slug[town.slug].append(town)
+
+    def __len__(self):
+        return sum(len(towns) for towns in self._towns_per_zipcode.values())
+
+    @classmethod
+    def build(cls):
+        "Build the index of all the Towns (one query)."
+        return cls(
+            Town.objects.only('name', 'slug', 'zipcode', 'latitude', 'longitude')
+        )
+
+    def search(self, address):
+        """Search the Town of an address.
+        @return: A Town instance, or None.
+        """
+        zipcode = address.zipcode
+        slug = slugify(address.city) if address.city else None
+        towns = ()
+
+        if zipcode:
+            towns = self._towns_per_zipcode.get(zipcode, ())
+        elif slug:
+            towns = self._towns_per_slug.get(slug, ())
+
+        if len(towns) > 1 and slug:
+            return next((t for t in towns if t.slug == slug), None)
+
+        return towns[0] if len(towns) == 1 else None
@@ -18,6 +18,7 @@
 
 import logging
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from creme import persons
@@ -25,10 +26,12 @@ from creme.creme_core.management.commands.creme_populate import BasePopulator
 from creme.creme_core.models import (
     BrickDetailviewLocation,
     BrickMypageLocation,
+    Job,
     SettingValue,
 )
+from creme.creme_core.utils.date_period import date_period_registry
 
-from . import bricks, constants, setting_keys
+from . import bricks, constants, creme_jobs, setting_keys
 from .management.commands.geolocation import Command as GeolocationCommand
 
 logger = logging.getLogger(__name__)
@@ -38,6 +41,18 @@ class Populator(BasePopulator):
     dependencies = ['creme_core', 'persons']
 
     def populate(self):
+        Job.objects.get_or_create(
+            type_id=creme_jobs.geoaddresses_backfill_type.id,
+            defaults={
+                'language':    settings.LANGUAGE_CODE,
+                'periodicity': date_period_registry.get_period('days', 1),
+                'status':      Job.STATUS_OK,
+                # The addresses displayed on the maps are localized anyway ;
+                # the job is useful for the instances with many imported addresses.
+                'enabled': False,
+            },
+        )
+
         already_populated = SettingValue.objects.exists_4_key(setting_keys.NEIGHBOURHOOD_DISTANCE)
 
         if already_populated:
@@ -252,15 +252,19 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
 
         this._brick = brick;
         this._addresses = [];
+        this._clusters = {};
+        this._clustersQueryCount = 0;
 
         this.addressesUrl(options.addressesUrl);
+        this.clustersUrl(options.clustersUrl);
 
         Assert.is(options.mapController, creme.geolocation.GeoMapController, '${value} is not a GeoMapController');
 
         this._controller = options.mapController;
         this._controller.on('status', this._onCanvasStatus.bind(this))
                         .on('status-enabled', this._onCanvasEnabled.bind(this))
-                        .on('marker-click', this._onMarkerClick.bind(this));
+                        .on('marker-click', this._onMarkerClick.bind(this))
+                        .on('viewport-change', this._onViewportChange.bind(this));
 
         brick.on('state-update', this._onBrickStateUpdate.bind(this));
         brick.element().on('change', '.brick-geoaddress-filter', this._onFilterChange.bind(this));
@@ -284,6 +288,15 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
         return Object.property(this, '_addressesUrl', url);
     },
 
+    /*
+     * If an URL is given, only the addresses in the viewport of the map are
+     * retrieved (grouped in clusters when they are too many) ; they are
+     * retrieved again each time the map is moved or zoomed.
+     */
+    clustersUrl: function(url) {
+        return Object.property(this, '_clustersUrl', url);
+    },
+
     addresses: function() {
         return this._addresses;
     },
@@ -312,10 +325,27 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
     },
 
     _onCanvasEnabled: function(event) {
-        this._queryAddresses(this._brick.element().find('.brick-geoaddress-filter').val());
+        var filter = this.filterSelector().val();
+
+        // NB: with some controllers the viewport is only known later (see _onViewportChange())
+        if (Object.isEmpty(this.clustersUrl()) || this._controller.viewport() !== null) {
+            this._queryAddresses(filter);
+        }
+    },
+
+    _onViewportChange: function(event, viewport) {
+        if (Object.isNotEmpty(this.clustersUrl())) {
+            this._queryAddresses(this.filterSelector().val());
+        }
     },
 
     _queryAddresses: function(filter, listeners) {
+        var viewport = this._controller.viewport();
+
+        if (Object.isNotEmpty(this.clustersUrl()) && viewport !== null) {
+            return this._queryClusters(filter, viewport, listeners);
+        }
+
         var self = this;
         var query;
 
@@ -339,6 +369,90 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
         return query.start();
     },
 
+    _queryClusters: function(filter, viewport, listeners) {
+        var self = this;
+        var query;
+
+        // The responses of the previous viewports are ignored
+        var queryIndex = ++this._clustersQueryCount;
+        var isLastQuery = function() {
+            return queryIndex === self._clustersQueryCount;
+        };
+
+        if (Object.isEmpty(filter)) {
+            query = new creme.component.Action(function() {
+                this.fail();
+            });
+        } else {
+            query = creme.ajax.query(this.clustersUrl(), {}, $.extend({id: filter}, viewport))
+                              .converter(JSON.parse);
+        }
+
+        query.onDone(function(event, data) {
+                  if (isLastQuery()) {
+                      self._onUpdateClusters(data.addresses, data.clusters, viewport);
+                  }
+              })
+             .onFail(function() {
+                  if (isLastQuery()) {
+                      self._onUpdateClusters([], [], viewport);
+                  }
+              })
+             .on(listeners || {});
+
+        return query.start();
+    },
+
+    _onUpdateClusters: function(addresses, clusters, viewport) {
+        // NB: the map is not adjusted to the markers, because it would change the viewport.
+        var addressMarkers = [];
+        var clusterMarkers = [];
+        var count = 0;
+
+        this._addresses = (addresses || []).map(function(address) {
+            var location = new creme.geolocation.Location($.extend({
+                position: {lat: address.latitude, lng: address.longitude}
+            }, address));
+
+            addressMarkers.push({
+                id: location.id(),
+                title: location.markerLabel(),
+                position: location.position(),
+                visible: true,
+                draggable: false
+            });
+
+            return location;
+        });
+
+        this._clusters = {};
+
+        (clusters || []).forEach(function(cluster, index) {
+            // NB: the markers of the previous clusters are replaced (not updated)
+            var id = 'cluster-${query}-${index}'.template({
+                query: this._clustersQueryCount, index: index
+            });
+
+            this._clusters[id] = $.extend({
+                zoom: viewport.zoom
+            }, cluster);
+
+            clusterMarkers.push({
+                id: id,
+                title: ngettext('%0$d address', '%0$d addresses', cluster.count).format(cluster.count),
+                position: {lat: cluster.latitude, lng: cluster.longitude},
+                icon: 'circle',
+                visible: true,
+                draggable: false
+            });
+
+            count += cluster.count;
+        }.bind(this));
+
+        this._controller.replaceMarkers(addressMarkers.concat(clusterMarkers));
+        this._renderCount(count + addressMarkers.length);
+    },
+
     _onUpdateAddresses: function(addresses) {
         addresses = addresses || [];
         var controller = this._controller;
@@ -367,6 +481,17 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
     },
 
     _onMarkerClick: function(event, data) {
+        var cluster = this._clusters[data.id];
+
+        // Zoom in on a cluster to display its addresses
+        if (cluster) {
+            this._controller.centerOn(
+                {lat: cluster.latitude, lng: cluster.longitude},
+                cluster.zoom + 2
+            );
+            return;
+        }
+
         var location = this.address(data.id);
 
         if (location && !Object.isEmpty(location.url())) {
@@ -482,6 +482,11 @@ creme.geolocation.GoogleMapController = creme.geolocation.GeoMapController.sub({
 
         map.setMapTypeId(styleIds[0]);
 
+        var controller = this;
+        google.maps.event.addListener(map, 'idle', function() {
+            controller.trigger('viewport-change', [controller.viewport()]);
+        });
+
         this.autoResize();
         this.adjustMap();
         this.isEnabled(true);
@@ -574,6 +579,35 @@ creme.geolocation.GoogleMapController = creme.geolocation.GeoMapController.sub({
         return this;
     },
 
+    viewport: function() {
+        // NB: the bounds are undefined until the map is displayed
+        var bounds = this.isMapEnabled() ? this._map.getBounds() : undefined;
+
+        if (Object.isNone(bounds)) {
+            return null;
+        }
+
+        var southWest = bounds.getSouthWest();
+        var northEast = bounds.getNorthEast();
+
+        return {
+            south: southWest.lat(),
+            west: southWest.lng(),
+            north: northEast.lat(),
+            east: northEast.lng(),
+            zoom: this._map.getZoom()
+        };
+    },
+
+    centerOn: function(position, zoom) {
+        if (this.isMapEnabled()) {
+            this._map.setCenter(new google.maps.LatLng(position.lat, position.lng));
+            this._map.setZoom(zoom);
+        }
+
+        return this;
+    },
+
     _searchLocationQuery: function(search) {
         var geocoder = this.geocoder();
 
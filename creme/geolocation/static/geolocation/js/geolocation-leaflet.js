@@ -97,6 +97,12 @@ function __markerIcon(marker, name) {
 }
 
 
+// Leaflet does not wrap the longitudes of the bounds when the map is moved
+// beyond the anti-meridian.
+function __wrapLongitude(lng) {
+    return ((lng + 180) % 360 + 360) % 360 - 180;
+}
+
 function __circleShape(options) {
     options = $.extend({
         color: '#dea29b',
@@ -203,6 +209,13 @@ creme.geolocation.LeafletMapController = creme.geolocation.GeoMapController.sub(
 
         this.autoResize();
         this.adjustMap();
+
+        // NB: "moveend" is triggered after a zoom too
+        var controller = this;
+        map.on('moveend', function() {
+            controller.trigger('viewport-change', [controller.viewport()]);
+        });
+
         this.isEnabled(true);
     },
 
@@ -296,6 +309,41 @@ creme.geolocation.LeafletMapController = creme.geolocation.GeoMapController.sub(
         return this;
     },
 
+    viewport: function() {
+        if (!this.isMapEnabled()) {
+            return null;
+        }
+
+        var bounds = this._map.getBounds();
+        var west = bounds.getWest();
+        var east = bounds.getEast();
+
+        if (east - west >= 360) {
+            west = -180;
+            east = 180;
+        } else {
+            west = __wrapLongitude(west);
+            east = __wrapLongitude(east);
+        }
+
+        return {
+            south: bounds.getSouth(),
+            west: west,
+            north: bounds.getNorth(),
+            east: east,
+            // NB: the level of zoom can be fractional with some options of Leaflet
+            zoom: Math.round(this._map.getZoom())
+        };
+    },
+
+    centerOn: function(position, zoom) {
+        if (this.isMapEnabled()) {
+            this._map.setView([position.lat, position.lng], zoom);
+        }
+
+        return this;
+    },
+
     _itemVisibility: function(item, state) {
         var visible = $(item.getElement()).is(':not(.leaflet-hidden)');
 
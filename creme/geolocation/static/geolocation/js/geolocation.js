@@ -412,6 +412,19 @@ creme.geolocation.GeoMapController = creme.component.Component.sub({
 
     adjustMapToShape: function(id) {
         throw new Error('not implemented');
+    },
+
+    /*
+     * Returns the bounds & the level of zoom of the visible part of the map
+     * as {south, west, north, east, zoom}, or null if the map is not ready.
+     * An event "viewport-change" is triggered when it changes.
+     */
+    viewport: function() {
+        return null;
+    },
+
+    centerOn: function(position, zoom) {
+        throw new Error('not implemented');
     }
 });
 
@@ -19,10 +19,23 @@ QUnit.module("creme.geolocation.addresses-brick", new QUnitMixin(QUnitEventMixin
                     })
                 });
             },
-            'mock/addresses/fail': backend.response(400, 'Invalid addresses')
+            'mock/addresses/fail': backend.response(400, 'Invalid addresses'),
+            'mock/clusters': function(url, data, options) {
+                return backend.responseJSON(200, {
+                    addresses: self.defaultAddresses().slice(0, 1),
+                    clusters: [
+                        {count: 12, latitude: 43.5, longitude: 5.2},
+                        {count: 3, latitude: 42.1, longitude: 4.8}
+                    ]
+                });
+            }
         });
     },
 
+    defaultViewport: function() {
+        return {south: 42, west: 4, north: 44, east: 6, zoom: 8};
+    },
+
     defaultAddresses: function() {
         return [{
             id: 'Address_A',
@@ -585,4 +598,179 @@ QUnit.parametrize('creme.geolocation.brick.AddressesBrick (collapse state)', [
     stop(1);
 });
 
+QUnit.parametrize('creme.geolocation.brick.AddressesBrick (load clusters)', [
+    [new creme.geolocation.GoogleMapController()],
+    [new creme.geolocation.LeafletMapController()]
+], function(mapController, assert) {
+    var brick = this.createAddressesBrick({
+        filters: [
+            {
+                name: 'Group A',
+                items: [
+                    {value: 'A1', label: 'Contact A1'}
+                ]
+            }
+        ]
+    }).brick();
+    var canvas = brick.element().find('.brick-geoaddress-canvas');
+    var addresses = this.defaultAddresses();
+
+    this.fakeMethod({instance: mapController, method: 'viewport', result: this.defaultViewport()});
+
+    this.bindTestOn(canvas, 'geomap-status-enabled', function() {
+        var controller = this.controller;
+
+        equal('mock/clusters', controller.clustersUrl());
+
+        setTimeout(function() {
+            deepEqual([
+                ['mock/clusters', 'GET', $.extend({id: 'A1'}, this.defaultViewport())]
+            ], this.mockBackendUrlCalls().map(function(call) {
+                // NB: the values may be retrieved from the URI as strings
+                var data = {};
+
+                $.each(call[2], function(key, value) {
+                    data[key] = (key === 'id') ? value : parseFloat(value);
+                });
+
+                return [call[0], call[1], data];
+            }));
+
+            // 1 address + 12 + 3 addresses in clusters
+            equal(
+                ngettext('%0$d address from', '%0$d addresses from', 16).format(16),
+                brick.element().find('.brick-geoaddress-counter').text()
+            );
+            equal(3, controller.mapController().markers().length);
+            deepEqual([new creme.geolocation.Location(addresses[0])], controller.addresses());
+
+            // The markers are replaced when the viewport changes
+            controller.mapController().trigger('viewport-change', [this.defaultViewport()]);
+
+            setTimeout(function() {
+                equal(2, this.mockBackendUrlCalls('mock/clusters').length);
+                equal(3, controller.mapController().markers().length);
+
+                start();
+            }.bind(this), 0);
+        }.bind(this), 0);
+
+        stop(1);
+    });
+
+    this.controller = new creme.geolocation.AddressesBrick(brick, {
+        mapController: mapController,
+        addressesUrl: 'mock/addresses',
+        clustersUrl: 'mock/clusters'
+    });
+
+    stop(1);
+});
+
+QUnit.parametrize('creme.geolocation.brick.AddressesBrick (load clusters, no viewport)', [
+    [new creme.geolocation.GoogleMapController()],
+    [new creme.geolocation.LeafletMapController()]
+], function(mapController, assert) {
+    var brick = this.createAddressesBrick({
+        filters: [
+            {
+                name: 'Group A',
+                items: [
+                    {value: 'A1', label: 'Contact A1'}
+                ]
+            }
+        ]
+    }).brick();
+    var canvas = brick.element().find('.brick-geoaddress-canvas');
+    var viewportFaker = this.fakeMethod({instance: mapController, method: 'viewport', result: null});
+
+    this.bindTestOn(canvas, 'geomap-status-enabled', function() {
+        var controller = this.controller;
+
+        setTimeout(function() {
+            // The addresses are retrieved when the viewport is known
+            deepEqual([], this.mockBackendUrlCalls());
+
+            viewportFaker.result = this.defaultViewport();
+            controller.mapController().trigger('viewport-change', [this.defaultViewport()]);
+
+            setTimeout(function() {
+                equal(1, this.mockBackendUrlCalls('mock/clusters').length);
+                deepEqual([], this.mockBackendUrlCalls('mock/addresses'));
+                equal(3, controller.mapController().markers().length);
+
+                start();
+            }.bind(this), 0);
+        }.bind(this), 0);
+
+        stop(1);
+    });
+
+    this.controller = new creme.geolocation.AddressesBrick(brick, {
+        mapController: mapController,
+        addressesUrl: 'mock/addresses',
+        clustersUrl: 'mock/clusters'
+    });
+
+    stop(1);
+});
+
+QUnit.parametrize('creme.geolocation.brick.AddressesBrick (click cluster, zoom)', [
+    [new creme.geolocation.GoogleMapController()],
+    [new creme.geolocation.LeafletMapController()]
+], function(mapController, assert) {
+    var brick = this.createAddressesBrick({
+        filters: [
+            {
+                name: 'Group A',
+                items: [
+                    {value: 'A1', label: 'Contact A1'}
+                ]
+            }
+        ]
+    }).brick();
+    var canvas = brick.element().find('.brick-geoaddress-canvas');
+
+    this.fakeMethod({instance: mapController, method: 'viewport', result: this.defaultViewport()});
+    var centerOnFaker = this.fakeMethod({instance: mapController, method: 'centerOn'});
+
+    this.bindTestOn(canvas, 'geomap-status-enabled', function() {
+        var controller = this.controller;
+
+        setTimeout(function() {
+            var markerIds = controller.mapController().markerIds().filter(function(id) {
+                return String(id).indexOf('cluster-') === 0;
+            });
+            equal(2, markerIds.length);
+
+            this.triggerMarkerClick(controller.mapController().getMarker(markerIds[0]));
+
+            setTimeout(function() {
+                deepEqual([], this.mockRedirectCalls());
+                deepEqual([
+                    [{lat: 43.5, lng: 5.2}, 10]
+                ], centerOnFaker.calls());
+
+                // A click on an address still redirects
+                this.triggerMarkerClick(controller.mapController().getMarker('Address_A'));
+
+                setTimeout(function() {
+                    deepEqual(['mock/address/Address_A'], this.mockRedirectCalls());
+                    start();
+                }.bind(this), 0);
+            }.bind(this), 0);
+        }.bind(this), 0);
+
+        stop(1);
+    });
+
+    this.controller = new creme.geolocation.AddressesBrick(brick, {
+        mapController: mapController,
+        addressesUrl: 'mock/addresses',
+        clustersUrl: 'mock/clusters'
+    });
+
+    stop(1);
+});
+
 }(jQuery, QUnit));
@@ -192,4 +192,38 @@ QUnit.test('creme.geolocation.LeafletMapController.removeShape', function(assert
     });
 });
 
+QUnit.test('creme.geolocation.LeafletMapController.viewport', function(assert) {
+    var controller = new creme.geolocation.LeafletMapController();
+    var element = $(this.createMapHtml()).appendTo(this.qunitFixture());
+
+    equal(null, controller.viewport());
+
+    controller.bind(element);
+    controller.on('viewport-change', this.mockListener('viewport-change'));
+
+    var viewport = controller.viewport();
+    equal(controller.options().defaultLargeZoom, viewport.zoom);
+    ok(viewport.south < viewport.north);
+    ok(viewport.west < viewport.east);
+
+    controller.centerOn({lat: 43, lng: 5}, 10);
+
+    viewport = controller.viewport();
+    equal(10, viewport.zoom);
+    ok(viewport.south < 43 && 43 < viewport.north);
+    ok(viewport.west < 5 && 5 < viewport.east);
+
+    deepEqual([
+        ['viewport-change', viewport]
+    ], this.mockListenerCalls('viewport-change'));
+
+    // The longitudes are wrapped ; the viewport crosses the anti-meridian
+    controller.centerOn({lat: 0, lng: 540}, 10);
+
+    viewport = controller.viewport();
+    ok(viewport.west > viewport.east);
+    ok(viewport.west <= 180 && viewport.west > 179);
+    ok(viewport.east >= -180 && viewport.east < -179);
+});
+
 }(jQuery, QUnit));
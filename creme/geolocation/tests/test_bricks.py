@@ -282,6 +282,9 @@ class MapBrickTestCase(BrickTestCaseMixin, GeoLocationBaseTestCase):
             brick_node, './/script[@type="text/javascript"]',
         )
         self.assertIn(f"apiKey: '{api_key}'", script_node.text)
+        self.assertIn(
+            f"clustersUrl: '{reverse('geolocation__clusters')}'", script_node.text,
+        )
 
     def test_osm_filtered(self):
         BrickHomeLocation.objects.get_or_create(
@@ -317,6 +320,9 @@ class MapBrickTestCase(BrickTestCaseMixin, GeoLocationBaseTestCase):
             f"""tileMapAttribution: '&copy; <a href="{cright_url}">{cright_title}</a>'""",
             script_node.text,
         )
+        self.assertIn(
+            f"clustersUrl: '{reverse('geolocation__clusters')}'", script_node.text,
+        )
 
     @skipIfCustomAddress
     def test_google_neighbours(self):
@@ -1,14 +1,19 @@
 from functools import partial
+from unittest.mock import patch
 
 from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
 
+from creme.creme_core.models import Job
 from creme.persons.tests.base import (
     skipIfCustomAddress,
     skipIfCustomContact,
     skipIfCustomOrganisation,
 )
 
-from ..models import GeoAddress, Town
+from ..creme_jobs import geoaddresses_backfill_type
+from ..models import GeoAddress, Town, TownIndex
+from ..utils import haversine_distance, location_grid_cell
 from .base import Address, Contact, GeoLocationBaseTestCase, Organisation
 
 
@@ -553,6 +558,83 @@ class GeoLocationModelsTestCase(GeoLocationBaseTestCase):
             [ST_VICTOR.geoaddress, AUBAGNE.geoaddress],
         )
 
+    def test_cell(self):
+        geoaddress = Address.objects.create(owner=self.orga, city=self.marseille1.name).geoaddress
+        self.assertEqual(
+            location_grid_cell(geoaddress.latitude, geoaddress.longitude),
+            self.refresh(geoaddress).cell,
+        )
+
+        geoaddress.update(latitude=-21.1151, longitude=55.5364)
+        self.assertEqual(location_grid_cell(-21.1151, 55.5364), self.refresh(geoaddress).cell)
+
+        address = Address.objects.create(owner=self.orga, zipcode='0', city='Unknown')
+        self.assertIsNone(address.geoaddress.cell)
+
+    def test_within_distance(self):
+        create_address = partial(self.create_address, self.orga)
+        ST_VICTOR   = create_address(address='St Victor',   geoloc=(43.290347, 5.365572))
+        COMMANDERIE = create_address(address='Commanderie', geoloc=(43.301963, 5.462410))
+        create_address(address='Aubagne', geoloc=(43.295783, 5.565589))
+        # In the bounding box, but not in the circle
+        create_address(address='Corner', geoloc=(43.290347 + 0.085, 5.365572 + 0.12))
+
+        geoaddresses = [*GeoAddress.within_distance(43.290347, 5.365572, 10000)]
+        self.assertListEqual(
+            [ST_VICTOR.geoaddress, COMMANDERIE.geoaddress], geoaddresses,
+        )
+        self.assertEqual(0, geoaddresses[0].distance)
+        self.assertAlmostEqual(
+            haversine_distance(43.290347, 5.365572, 43.301963, 5.462410),
+            geoaddresses[1].distance,
+            delta=1,
+        )
+
+        self.assertListEqual(
+            [COMMANDERIE.geoaddress, ST_VICTOR.geoaddress],
+            [*GeoAddress.within_distance(43.301963, 5.462410, 10000)][:2],
+        )
+
+    def test_nearest(self):
+        create_address = partial(self.create_address, self.orga)
+        ST_VICTOR   = create_address(address='St Victor',   geoloc=(43.290347, 5.365572))
+        COMMANDERIE = create_address(address='Commanderie', geoloc=(43.301963, 5.462410))
+        AUBAGNE     = create_address(address='Aubagne',     geoloc=(43.295783, 5.565589))
+        PARIS       = create_address(address='Paris',       geoloc=(48.8566, 2.3522))
+
+        self.assertListEqual(
+            [AUBAGNE.geoaddress, COMMANDERIE.geoaddress],
+            GeoAddress.nearest(43.295783, 5.565589, 2),
+        )
+        self.assertListEqual(
+            [
+                AUBAGNE.geoaddress, COMMANDERIE.geoaddress,
+                ST_VICTOR.geoaddress, PARIS.geoaddress,
+            ],
+            [
+                geoaddress
+                for geoaddress in GeoAddress.nearest(43.295783, 5.565589, 10)
+                if geoaddress.address_id in {
+                    ST_VICTOR.id, COMMANDERIE.id, AUBAGNE.id, PARIS.id,
+                }
+            ],
+        )
+
+        # Max distance
+        self.assertNotIn(
+            PARIS.geoaddress,
+            GeoAddress.nearest(43.295783, 5.565589, 10, max_distance=100000),
+        )
+
+        # Filter
+        self.assertListEqual(
+            [COMMANDERIE.geoaddress],
+            GeoAddress.nearest(
+                43.295783, 5.565589, 1,
+                filter_queryset=lambda qs: qs.exclude(address_id=AUBAGNE.id),
+            ),
+        )
+
     @skipIfCustomContact
     def test_neighbours_with_same_owner(self):
         contact = Contact.objects.create(last_name='Contact 1', user=self.user)
@@ -672,3 +754,137 @@ class GeoLocationModelsTestCase(GeoLocationBaseTestCase):
             [town2, town1, town3, town3, None, None, town1, None],
             [*Town.search_all(addresses)],
         )
+
+    def test_town_index(self):
+        town1 = self.marseille1
+        town2 = self.marseille2
+        town3 = self.aubagne
+
+        with self.assertNumQueries(1):
+            index = TownIndex.build()
+
+        self.assertEqual(3, len(index))
+
+        build_address = partial(Address, owner=self.orga, address='Mairie')
+        addresses = [
+            build_address(address='La Major', zipcode=town2.zipcode, city=town2.name),
+            build_address(zipcode=town1.zipcode, city=town1.name),
+            build_address(zipcode=town3.zipcode),
+            build_address(zipcode=town3.zipcode, city=town1.name),
+            build_address(),
+            build_address(zipcode='unknown'),
+            build_address(city=town1.name),
+            build_address(city='unknown'),
+        ]
+
+        with self.assertNumQueries(0):
+            towns = [index.search(address) for address in addresses]
+
+        self.assertListEqual([town2, town1, town3, town3, None, None, town1, None], towns)
+
+    def _create_not_localized_addresses(self):
+        create_address = partial(Address.objects.create, owner=self.orga, address='Mairie')
+        addresses = [
+            create_address(zipcode=self.marseille1.zipcode),
+            create_address(zipcode=self.aubagne.zipcode),
+            create_address(city=self.marseille2.name, zipcode=self.marseille2.zipcode),
+            create_address(zipcode='unknown'),
+            create_address(),
+        ]
+
+        # Imported addresses
+        GeoAddress.objects.filter(address__in=addresses[:2]).delete()
+        GeoAddress.objects.filter(address=addresses[2]).update(
+            latitude=None, longitude=None, status=GeoAddress.Status.UNDEFINED, cell=None,
+        )
+
+        # Manually localized address => ignored
+        manual = create_address(zipcode=self.aubagne.zipcode)
+        manual.geoaddress.update(latitude=43.3, longitude=5.5, status=GeoAddress.Status.MANUAL)
+
+        return addresses
+
+    def test_backfill_job01(self):
+        addresses = self._create_not_localized_addresses()
+
+        job = self.get_object_or_fail(Job, type_id=geoaddresses_backfill_type.id)
+        self.assertFalse(job.enabled)
+
+        with patch.object(geoaddresses_backfill_type, 'page_size', 2):
+            geoaddresses_backfill_type.execute(job)
+
+        def get_geoaddress(address):
+            return GeoAddress.objects.get(address=address)
+
+        self.assertGeoAddress(
+            get_geoaddress(addresses[0]),
+            latitude=self.marseille1.latitude, longitude=self.marseille1.longitude,
+            status=GeoAddress.Status.PARTIAL,
+        )
+        geoaddress2 = get_geoaddress(addresses[1])
+        self.assertGeoAddress(
+            geoaddress2,
+            latitude=self.aubagne.latitude, longitude=self.aubagne.longitude,
+            status=GeoAddress.Status.PARTIAL,
+        )
+        self.assertEqual(
+            location_grid_cell(self.aubagne.latitude, self.aubagne.longitude),
+            geoaddress2.cell,
+        )
+        self.assertGeoAddress(
+            get_geoaddress(addresses[2]),
+            latitude=self.marseille2.latitude, longitude=self.marseille2.longitude,
+            status=GeoAddress.Status.PARTIAL,
+        )
+        self.assertGeoAddress(
+            get_geoaddress(addresses[3]), latitude=None, status=GeoAddress.Status.UNDEFINED,
+        )
+
+        job = self.refresh(job)
+        self.assertDictEqual(
+            {'total': 4, 'processed': 4, 'last_address_id': None}, job.data,
+        )
+
+        progress = geoaddresses_backfill_type.progress(job)
+        self.assertEqual(100, progress.percentage)
+        self.assertEqual(
+            ngettext(
+                '{count} address has been processed.',
+                '{count} addresses have been processed.',
+                4
+            ).format(count=4),
+            progress.label,
+        )
+
+    def test_backfill_job02(self):
+        "Resume an interrupted job."
+        addresses = self._create_not_localized_addresses()
+
+        job = self.get_object_or_fail(Job, type_id=geoaddresses_backfill_type.id)
+        Job.objects.filter(id=job.id).update(
+            data={'total': 4, 'processed': 1, 'last_address_id': addresses[0].id},
+        )
+        job = self.refresh(job)
+        self.assertEqual(25, geoaddresses_backfill_type.progress(job).percentage)
+
+        geoaddresses_backfill_type.execute(job)
+        self.assertFalse(GeoAddress.objects.filter(address=addresses[0]).exists())
+        self.assertEqual(
+            GeoAddress.Status.PARTIAL,
+            GeoAddress.objects.get(address=addresses[1]).status,
+        )
+
+        job = self.refresh(job)
+        self.assertDictEqual(
+            {'total': 4, 'processed': 4, 'last_address_id': None}, job.data,
+        )
+
+        # Next run => from the beginning
+        geoaddresses_backfill_type.execute(job)
+        self.assertEqual(
+            GeoAddress.Status.PARTIAL,
+            GeoAddress.objects.get(address=addresses[0]).status,
+        )
+        self.assertDictEqual(
+            {'total': 2, 'processed': 2, 'last_address_id': None}, self.refresh(job).data,
+        )
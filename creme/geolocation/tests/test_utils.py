@@ -16,7 +16,10 @@ from ..utils import (
     addresses_from_persons,
     get_google_api_key,
     get_radius,
+    haversine_distance,
     location_bounding_box,
+    location_grid_cell,
+    location_grid_ranges,
 )
 from .base import Address, Contact, GeoLocationBaseTestCase, Organisation
 
@@ -297,3 +300,57 @@ class GeoLocationUtilsTestCase(GeoLocationBaseTestCase):
             ),
             location_bounding_box(20.0, 5.0, 10000),
         )
+
+    def test_location_grid_cell(self):
+        self.assertIsNone(location_grid_cell(None, None))
+        self.assertIsNone(location_grid_cell(43.29, None))
+
+        self.assertEqual(0, location_grid_cell(-90.0, -180.0))
+        self.assertEqual(1332 * 3600 + 1853, location_grid_cell(43.29, 5.36))
+        self.assertEqual(1332 * 3600 + 1853, location_grid_cell('43.29', '5.36'))
+        self.assertEqual(1799 * 3600 + 3599, location_grid_cell(90.0, 179.99))
+        self.assertEqual(1799 * 3600, location_grid_cell(90.0, 180.0))
+
+    def test_location_grid_ranges(self):
+        # 10 km ~ 0.09 lat & 0.12 long (for 43.29° lat)
+        self.assertListEqual(
+            [
+                (1331 * 3600 + 1852, 1331 * 3600 + 1854),
+                (1332 * 3600 + 1852, 1332 * 3600 + 1854),
+                (1333 * 3600 + 1852, 1333 * 3600 + 1854),
+            ],
+            location_grid_ranges(43.29, 5.36, 10000),
+        )
+
+        # Anti-meridian
+        self.assertListEqual(
+            [
+                (1331 * 3600 + 3598, 1331 * 3600 + 3599), (1331 * 3600, 1331 * 3600 + 1),
+                (1332 * 3600 + 3598, 1332 * 3600 + 3599), (1332 * 3600, 1332 * 3600 + 1),
+                (1333 * 3600 + 3598, 1333 * 3600 + 3599), (1333 * 3600, 1333 * 3600 + 1),
+            ],
+            location_grid_ranges(43.29, 179.99, 10000),
+        )
+
+        # Too many ranges => whole rows
+        self.assertListEqual(
+            [(1242 * 3600, 1424 * 3600 - 1)],
+            location_grid_ranges(43.29, 5.36, 1000000),
+        )
+
+        # Pole => all columns
+        self.assertListEqual(
+            [(1799 * 3600, 1799 * 3600 + 3599)],
+            location_grid_ranges(90.0, 5.36, 1000),
+        )
+
+    def test_haversine_distance(self):
+        self.assertEqual(0, haversine_distance(43.29, 5.36, 43.29, 5.36))
+
+        # Marseille => Paris ~ 661 km
+        self.assertAlmostEqual(
+            661000, haversine_distance(43.2965, 5.3698, 48.8566, 2.3522), delta=2000,
+        )
+
+        # 1 degree of latitude ~ 111.2 km
+        self.assertAlmostEqual(111195, haversine_distance(0, 0, 1, 0), delta=1)
@@ -1,4 +1,5 @@
 from functools import partial
+from unittest.mock import patch
 
 from django.urls import reverse
 
@@ -13,6 +14,7 @@ from creme.persons.tests.base import (
 
 from ..models import GeoAddress, Town
 from ..utils import address_as_dict
+from ..views import AddressClustersInformation
 from .base import Contact, GeoLocationBaseTestCase, Organisation
 
 create_town = Town.objects.create
@@ -362,6 +364,214 @@ class GetAddressesTestCase(GeoLocationBaseTestCase):
         self.assertEqual(3, GeoAddress.objects.count())
 
 
+@skipIfCustomOrganisation
+@skipIfCustomAddress
+class GetClustersTestCase(GeoLocationBaseTestCase):
+    GET_CLUSTERS_URL = reverse('geolocation__clusters')
+
+    # Viewport around Marseille
+    VIEWPORT = {'south': 43.0, 'west': 5.0, 'north': 43.5, 'east': 5.7}
+
+    def populate_addresses(self, user):
+        create_baddr = self.create_billing_address
+        self.MARSEILLE_LA_MAJOR = create_baddr(
+            create_orga(name='A', user=user),
+            address='La Major', zipcode='13002', town='Marseille',
+            geoloc=(43.299991, 5.364832),
+        )
+        self.MARSEILLE_MAIRIE = create_baddr(
+            create_orga(name='B', user=user),
+            address='Mairie Marseille', zipcode='13002', town='Marseille',
+            geoloc=(43.296524, 5.369821),
+        )
+        self.AUBAGNE_MAIRIE = create_baddr(
+            create_orga(name='C', user=user),
+            address='Mairie Aubagne', zipcode='13400', town='Aubagne',
+            geoloc=(43.295783, 5.565589),
+        )
+
+        # Not in the viewport
+        self.PARIS = create_baddr(
+            create_orga(name='D', user=user),
+            address='Tour Eiffel', zipcode='75007', town='Paris',
+            geoloc=(48.858370, 2.294481),
+        )
+
+    def test_addresses(self):
+        user = self.login()
+        self.populate_addresses(user)
+
+        # No position
+        self.create_billing_address(
+            create_orga(name='E', user=user), zipcode='13008', town='Marseille',
+        )
+
+        response = self.assertGET200(
+            self.GET_CLUSTERS_URL, data={**self.VIEWPORT, 'zoom': 16},
+        )
+        data = response.json()
+        self.assertListEqual([], data['clusters'])
+        self.assertListAddressAsDict(
+            data['addresses'],
+            address_as_dict(self.MARSEILLE_LA_MAJOR),
+            address_as_dict(self.MARSEILLE_MAIRIE),
+            address_as_dict(self.AUBAGNE_MAIRIE),
+        )
+
+    def test_clusters(self):
+        user = self.login()
+        self.populate_addresses(user)
+
+        url = self.GET_CLUSTERS_URL
+        data = {**self.VIEWPORT, 'zoom': 10}
+
+        with patch.object(AddressClustersInformation, 'max_addresses', 2):
+            response1 = self.assertGET200(url, data=data)
+
+        content1 = response1.json()
+        self.assertListEqual([], content1['addresses'])
+
+        # Cells of ~0.088 degrees
+        clusters = sorted(content1['clusters'], key=lambda c: c['longitude'])
+        self.assertEqual(2, len(clusters), clusters)
+
+        cluster1 = clusters[0]
+        self.assertEqual(2, cluster1['count'])
+        self.assertAlmostEqual((43.299991 + 43.296524) / 2, cluster1['latitude'])
+        self.assertAlmostEqual((5.364832 + 5.369821) / 2, cluster1['longitude'])
+
+        cluster2 = clusters[1]
+        self.assertEqual(1, cluster2['count'])
+        self.assertAlmostEqual(43.295783, cluster2['latitude'])
+        self.assertAlmostEqual(5.565589, cluster2['longitude'])
+
+        # Whole world => one cluster
+        with patch.object(AddressClustersInformation, 'max_addresses', 2):
+            response2 = self.assertGET200(
+                url,
+                data={'south': -85, 'west': -180, 'north': 85, 'east': 180, 'zoom': 0},
+            )
+
+        self.assertListEqual(
+            [4], [cluster['count'] for cluster in response2.json()['clusters']],
+        )
+
+        # Invalid levels of zoom are clamped
+        with patch.object(AddressClustersInformation, 'max_addresses', 2):
+            response_neg = self.assertGET200(
+                url,
+                data={'south': -85, 'west': -180, 'north': 85, 'east': 180, 'zoom': -1100},
+            )
+
+        self.assertListEqual(
+            [4], [cluster['count'] for cluster in response_neg.json()['clusters']],
+        )
+
+        # Not enough addresses => no cluster
+        response3 = self.assertGET200(url, data=data)
+        content3 = response3.json()
+        self.assertListEqual([], content3['clusters'])
+        self.assertEqual(3, len(content3['addresses']))
+
+    def test_anti_meridian(self):
+        user = self.login()
+
+        create_baddr = self.create_billing_address
+        address1 = create_baddr(
+            create_orga(name='Fiji', user=user), zipcode='', town='Suva',
+            geoloc=(-18.1416, 178.4419),
+        )
+        address2 = create_baddr(
+            create_orga(name='Samoa', user=user), zipcode='', town='Apia',
+            geoloc=(-13.8333, -171.7500),
+        )
+        create_baddr(
+            create_orga(name='Australia', user=user), zipcode='', town='Sydney',
+            geoloc=(-33.8688, 151.2093),
+        )
+
+        response = self.assertGET200(
+            self.GET_CLUSTERS_URL,
+            data={'south': -40, 'west': 170, 'north': 0, 'east': -160, 'zoom': 16},
+        )
+        self.assertListAddressAsDict(
+            response.json()['addresses'],
+            address_as_dict(address1),
+            address_as_dict(address2),
+        )
+
+    def test_filter(self):
+        user = self.login()
+        self.populate_addresses(user)
+
+        efilter = EntityFilter.objects.smart_update_or_create(
+            'test-filter', 'Orga A', Organisation, is_custom=True,
+            conditions=[
+                condition_handler.RegularFieldConditionHandler.build_condition(
+                    model=Organisation,
+                    operator=operators.EQUALS,
+                    field_name='name', values=['A'],
+                ),
+            ],
+        )
+
+        response = self.assertGET200(
+            self.GET_CLUSTERS_URL,
+            data={**self.VIEWPORT, 'zoom': 16, 'id': efilter.id},
+        )
+        self.assertDictEqual(
+            {'clusters': [], 'addresses': [address_as_dict(self.MARSEILLE_LA_MAJOR)]},
+            response.json(),
+        )
+
+    def test_credentials(self):
+        user = self.login(
+            is_superuser=False, allowed_apps=('creme_core', 'geolocation', 'persons'),
+        )
+        SetCredentials.objects.create(
+            role=user.role,
+            ctype=Organisation,
+            value=EntityCredentials._ALL_CREDS,
+            set_type=SetCredentials.ESET_OWN,
+        )
+
+        address1 = self.create_billing_address(
+            create_orga(name='Orga 1', user=user), zipcode='13002', town='Marseille',
+            geoloc=(43.299991, 5.364832),
+        )
+        self.create_billing_address(
+            create_orga(name='Orga 2', user=self.other_user), zipcode='13002', town='Marseille',
+            geoloc=(43.296524, 5.369821),
+        )
+
+        url = self.GET_CLUSTERS_URL
+        data = {**self.VIEWPORT, 'zoom': 10}
+        response1 = self.assertGET200(url, data=data)
+        self.assertListEqual(
+            [address_as_dict(address1)], response1.json()['addresses'],
+        )
+
+        with patch.object(AddressClustersInformation, 'max_addresses', 0):
+            response2 = self.assertGET200(url, data=data)
+
+        self.assertListEqual(
+            [1], [cluster['count'] for cluster in response2.json()['clusters']],
+        )
+
+    def test_invalid_arguments(self):
+        self.login()
+
+        url = self.GET_CLUSTERS_URL
+        self.assertGET404(url, data={**self.VIEWPORT})  # No zoom
+        self.assertGET404(url, data={**self.VIEWPORT, 'zoom': 'abc'})
+        self.assertGET404(url, data={'south': 43.0, 'west': 5.0, 'north': 43.5, 'zoom': 10})
+        self.assertGET404(url, data={**self.VIEWPORT, 'north': 'abc', 'zoom': 10})
+        self.assertGET404(
+            url, data={**self.VIEWPORT, 'south': 44.0, 'north': 43.0, 'zoom': 10},
+        )
+        self.assertGET404(url, data={**self.VIEWPORT, 'zoom': 10, 'id': 'unknown'})
+
+
 class GetNeighboursTestCase(GeoLocationBaseTestCase):
     GET_NEIGHBOURS_URL = reverse('geolocation__neighbours')
 
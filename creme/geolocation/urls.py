@@ -13,6 +13,11 @@ urlpatterns = [
         views.AddressesInformation.as_view(),
         name='geolocation__addresses',
     ),
+    re_path(
+        r'^get_clusters[/]?$',
+        views.AddressClustersInformation.as_view(),
+        name='geolocation__clusters',
+    ),
     re_path(
         r'^get_neighbours[/]?$',
         views.NeighboursInformation.as_view(),
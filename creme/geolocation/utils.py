@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2014-2020  Hybird
+#    Copyright (C) 2014-2022  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -16,10 +16,14 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-from math import cos, radians
+from __future__ import annotations
+
+from math import asin, cos, floor, radians, sin, sqrt
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, FloatField, Min, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
 from django.db.models.query_utils import Q
 from django.utils.translation import gettext as _
 
@@ -80,34 +84,35 @@ def address_title(address):
 
 
 def addresses_from_persons(queryset, user):
+    """Get the main addresses of some persons: the billing address, or the
+    shipping address, or (for the persons which have none of them) the first
+    created address.
+    @param queryset: QuerySet on a person model (Contact, Organisation...).
+    @param user: Only the addresses of the persons the user can view are returned.
+    @return: A QuerySet on Addresses ; it is built with sub-queries (i.e. the
+             IDs of the persons/addresses are not retrieved in Python).
+    """
     entities = EntityCredentials.filter(user, queryset.filter(is_deleted=False))
     addresses = get_address_model().objects.filter(
         content_type=ContentType.objects.get_for_model(queryset.model),
     )
 
-    # get address ids which owner has billing or shipping or both
-    billing_shipping_ids = {
-        owner: billing or shipping
-        for owner, billing, shipping in entities.filter(
-            Q(billing_address__isnull=False) | Q(shipping_address__isnull=False)
-        ).values_list('pk', 'billing_address', 'shipping_address')
-    }
-
-    # get address ids which owner without billing nor shipping
-    address_ids = {
-        owner: pk
-        for owner, pk in addresses.filter(
-            object_id__in=entities.filter(
-                billing_address__isnull=True,
-                shipping_address__isnull=True,
-            ).values_list('pk', flat=True),
-        ).order_by('-pk').values_list('object_id', 'pk')
-    }
-
-    # merge ids
-    address_ids.update(billing_shipping_ids)
+    # Owners without billing nor shipping address => their first address
+    other_ids = addresses.filter(
+        object_id__in=entities.filter(
+            billing_address__isnull=True,
+            shipping_address__isnull=True,
+        ).values('pk'),
+    ).order_by().values('object_id').annotate(first_id=Min('pk')).values('first_id')
 
-    return addresses.filter(pk__in=address_ids.values())  # TODO: select_related('geoaddress') ??
+    return addresses.filter(
+        Q(pk__in=entities.filter(billing_address__isnull=False).values('billing_address'))
+        | Q(pk__in=entities.filter(
+            billing_address__isnull=True,
+            shipping_address__isnull=False,
+        ).values('shipping_address'))
+        | Q(pk__in=other_ids)
+    ).select_related('geoaddress')
 
 
 def get_radius():
@@ -140,3 +145,111 @@ def location_bounding_box(latitude, longitude, distance):
         (latitude - offset_latitude, longitude - offset_longitude),
         (latitude + offset_latitude, longitude + offset_longitude),
     )
+
+
+# Mean radius of the Earth (in meters)
+EARTH_RADIUS = 6371008.8
+
+# Size (in degrees) of the cells of the grid used to index the locations
+# (see GeoAddress.cell) ; 0.1 degree ~ 11 km.
+GRID_CELL_SIZE = 0.1
+_GRID_ROWS = round(180 / GRID_CELL_SIZE)
+_GRID_COLUMNS = round(360 / GRID_CELL_SIZE)
+
+# Beyond this number of ranges of cells, the cells of all the columns are used
+# (i.e. one range for all the rows), to keep the SQL query small.
+_GRID_MAX_RANGES = 64
+
+
+def _grid_row(latitude):
+    return min(max(floor((latitude + 90) / GRID_CELL_SIZE), 0), _GRID_ROWS - 1)
+
+
+def _grid_column(longitude):
+    return floor((longitude + 180) / GRID_CELL_SIZE)
+
+
+def location_grid_cell(latitude, longitude) -> int | None:
+    """Get the cell of the grid (used to index the locations) which contains
+    a location.
+    @return: An integer, or None if the location is not defined.
+    """
+    if latitude is None or longitude is None:
+        return None
+
+    return (
+        _grid_row(float(latitude)) * _GRID_COLUMNS
+        + _grid_column(float(longitude)) % _GRID_COLUMNS
+    )
+
+
+def location_grid_ranges(latitude, longitude, distance) -> list[tuple[int, int]]:
+    """Get the cells of the grid (see location_grid_cell()) which contain the
+    locations around a location.
+    @param distance: Distance in meters.
+    @return: List of ranges of cells (tuples (first_cell, last_cell)).
+    """
+    upper_left, lower_right = location_bounding_box(latitude, longitude, distance)
+    first_row = _grid_row(upper_left[0])
+    last_row = _grid_row(lower_right[0])
+    first_col = _grid_column(upper_left[1])
+    last_col = _grid_column(lower_right[1])
+
+    if (
+        # NB: near the poles, the longitude offset is very big (or infinite)
+        abs(lower_right[1] - upper_left[1]) >= 360
+        or last_col - first_col + 1 >= _GRID_COLUMNS
+    ):
+        col_ranges = [(0, _GRID_COLUMNS - 1)]
+    else:
+        first_col %= _GRID_COLUMNS
+        last_col %= _GRID_COLUMNS
+
+        col_ranges = [(first_col, last_col)] if first_col <= last_col else [
+            # Around the anti-meridian
+            (first_col, _GRID_COLUMNS - 1), (0, last_col),
+        ]
+
+    if len(col_ranges) * (last_row - first_row + 1) > _GRID_MAX_RANGES:
+        return [(first_row * _GRID_COLUMNS, (last_row + 1) * _GRID_COLUMNS - 1)]
+
+    return [
+        (row * _GRID_COLUMNS + col_range[0], row * _GRID_COLUMNS + col_range[1])
+        for row in range(first_row, last_row + 1)
+        for col_range in col_ranges
+    ]
+
+
+def haversine_distance(latitude1, longitude1, latitude2, longitude2) -> float:
+    "Distance (in meters) between 2 locations, with the haversine formula."
+    lat1 = radians(latitude1)
+    lat2 = radians(latitude2)
+
+    return 2 * EARTH_RADIUS * asin(sqrt(
+        sin((lat2 - lat1) / 2) ** 2
+        + cos(lat1) * cos(lat2) * sin(radians(longitude2 - longitude1) / 2) ** 2
+    ))
+
+
+def haversine_expression(latitude, longitude,
+                         latitude_field='latitude',
+                         longitude_field='longitude'):
+    """Get a SQL expression computing the distance (in meters) between a
+    location & the locations stored in the fields of a model
+    (see haversine_distance()).
+    """
+    lat_rad = radians(latitude)
+    field_lat_rad = Radians(F(latitude_field))
+
+    def value(v):
+        return Value(v, output_field=FloatField())
+
+    return value(2 * EARTH_RADIUS) * ASin(Sqrt(
+        Power(Sin((field_lat_rad - value(lat_rad)) / value(2)), 2)
+        + value(cos(lat_rad)) * Cos(field_lat_rad) * Power(
+            Sin(
+                (Radians(F(longitude_field)) - value(radians(longitude))) / value(2)
+            ),
+            2,
+        )
+    ))
@@ -19,13 +19,15 @@
 from functools import partial
 
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Avg, Count, F, FloatField, Q, Value
+from django.db.models.functions import Floor
 from django.db.transaction import atomic
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 
 from creme import persons
 from creme.creme_core.http import CremeJsonResponse
-from creme.creme_core.models import EntityFilter
+from creme.creme_core.models import CremeEntity, EntityFilter
 from creme.creme_core.utils import (
     bool_from_str_extended,
     get_from_GET_or_404,
@@ -93,22 +95,21 @@ class AddressesInformation(BaseAddressesInformation):
         persons.get_organisation_model(),
     ]
 
+    def get_owner_querysets(self, entity_filter, user):
+        "Generator of QuerySets on the persons whose addresses are displayed."
+        if entity_filter:
+            # TODO: assert in self.entity_classes
+            model = entity_filter.entity_type.model_class()
+            yield entity_filter.filter(model.objects.all(), user=user)
+        else:
+            for model in self.entity_classes:
+                yield model.objects.all()
+
     def get_info(self, request):
-        entity_filter = self.get_efilter()
         user = request.user
-
-        def owner_groups():
-            if entity_filter:
-                # TODO: assert in self.entity_classes
-                model = entity_filter.entity_type.model_class()
-                yield entity_filter.filter(model.objects.all(), user=user)
-            else:
-                for model in self.entity_classes:
-                    yield model.objects.all()
-
         addresses = [
             address
-            for owners in owner_groups()
+            for owners in self.get_owner_querysets(self.get_efilter(), user)
             for address in addresses_from_persons(owners, user)
         ]
 
@@ -117,6 +118,104 @@ class AddressesInformation(BaseAddressesInformation):
         return {'addresses': [address_as_dict(address) for address in addresses]}
 
 
+class AddressClustersInformation(AddressesInformation):
+    """Get the addresses displayed in a viewport of a map, with the same
+    filtering than AddressesInformation.
+
+    The addresses are aggregated by the database in clusters (a grid is used,
+    the size of its cells depends on the level of zoom) ; the addresses are
+    returned individually at high levels of zoom or when there are only a few
+    of them.
+    Notice that the addresses without position are ignored (they are not
+    localized here ; see the job "Localize the addresses").
+
+    GET arguments:
+        - "id": ID of an EntityFilter (optional).
+        - "south", "west", "north" & "east": bounds of the viewport (degrees).
+        - "zoom": level of zoom of the map (0 => the whole world in a tile
+          of 256 pixels).
+    """
+    # From this level of zoom, the addresses are not aggregated
+    max_cluster_zoom = 15
+
+    # Number of cells of the grid per tile (in each dimension)
+    cells_per_tile = 4
+
+    # Under this number of addresses in the viewport, the addresses are not aggregated
+    max_addresses = 200
+
+    def get_viewport(self, request):
+        GET = request.GET
+        south, west, north, east = (
+            get_from_GET_or_404(GET, key, cast=float)
+            for key in ('south', 'west', 'north', 'east')
+        )
+
+        if south > north:
+            raise Http404('The south bound must be lower than the north bound.')
+
+        return south, west, north, east
+
+    def get_geoaddresses(self, request):
+        user = request.user
+        south, west, north, east = self.get_viewport(request)
+
+        # NB: the viewport crosses the anti-meridian when west > east
+        longitude_q = (
+            Q(longitude__gte=west) | Q(longitude__lte=east)
+            if west > east else
+            Q(longitude__gte=west, longitude__lte=east)
+        )
+        address_q = Q()
+        for owners in self.get_owner_querysets(self.get_efilter(), user):
+            address_q |= Q(address__in=addresses_from_persons(owners, user).values('pk'))
+
+        return GeoAddress.objects.filter(
+            longitude_q, address_q, latitude__gte=south, latitude__lte=north,
+        )
+
+    def get_clusters(self, geoaddresses, zoom):
+        # NB: a very negative level would make "2 ** zoom" underflow to 0
+        zoom = min(max(zoom, 0), self.max_cluster_zoom)
+        size = 360.0 / (2 ** zoom) / self.cells_per_tile
+
+        def cell(field):
+            return Floor(F(field) / Value(size, output_field=FloatField()))
+
+        return [
+            {
+                'count': count,
+                'latitude': latitude,
+                'longitude': longitude,
+            } for count, latitude, longitude in geoaddresses.annotate(
+                cell_x=cell('longitude'), cell_y=cell('latitude'),
+            ).order_by().values('cell_x', 'cell_y').annotate(
+                address_count=Count('pk'),
+                mean_latitude=Avg('latitude'),
+                mean_longitude=Avg('longitude'),
+            ).values_list('address_count', 'mean_latitude', 'mean_longitude')
+        ]
+
+    def get_info(self, request):
+        zoom = get_from_GET_or_404(request.GET, 'zoom', cast=int)
+        geoaddresses = self.get_geoaddresses(request)
+
+        if zoom < self.max_cluster_zoom and geoaddresses.count() > self.max_addresses:
+            return {'clusters': self.get_clusters(geoaddresses, zoom), 'addresses': []}
+
+        addresses = [
+            *Address.objects.filter(
+                pk__in=geoaddresses.values('address_id'),
+            ).select_related('geoaddress', 'object'),
+        ]
+        CremeEntity.populate_real_entities([address.object for address in addresses])
+
+        return {
+            'clusters': [],
+            'addresses': [address_as_dict(address) for address in addresses],
+        }
+
+
 class NeighboursInformation(BaseAddressesInformation):
     efilter_id_arg = 'filter_id'
 
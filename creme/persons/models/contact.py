@@ -29,6 +29,7 @@ from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext_lazy
 
+from creme.creme_core.core.bulk_save import bulk_save_receivers
 from creme.creme_core.core.exceptions import SpecificProtectedError
 from creme.creme_core.models import CREME_REPLACE_NULL, CremeEntity, Language
 from creme.creme_core.models.fields import PhoneField
@@ -208,7 +209,10 @@ class AbstractContact(CremeEntity, PersonWithAddressesMixin):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
+        self._sync_with_user()
 
+    def _sync_with_user(self) -> None:
+        "Copy the names & the email to the related user (if it exists)."
         rel_user = self.is_user
         if rel_user:
             rel_user._disable_sync_with_contact = True
@@ -255,6 +259,21 @@ class AbstractContact(CremeEntity, PersonWithAddressesMixin):
         )
 
 
+def _sync_users_in_bulk(model, contacts):
+    for contact in contacts:
+        if contact.is_user_id:
+            contact._sync_with_user()
+
+
+# NB: save() only synchronises the related user ; so the contacts can be
+#     modified with grouped queries (see creme_core.utils.db.has_specific_save_logic()).
+bulk_save_receivers.register_fields(
+    AbstractContact.save,
+    fields=('is_user', 'last_name', 'first_name', 'email'),
+    handler=_sync_users_in_bulk,
+)
+
+
 class Contact(AbstractContact):
     class Meta(AbstractContact.Meta):
         swappable = 'PERSONS_CONTACT_MODEL'
@@ -0,0 +1,106 @@
+from functools import partial
+from unittest.mock import patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from creme.creme_core.core.batch_process import BatchAction
+from creme.creme_core.creme_jobs import batch_process_type, deletor_type
+from creme.creme_core.models import DeletionCommand, HistoryLine, Job
+from creme.creme_core.models.history import TYPE_EDITION
+
+from ..models import Sector
+from .base import (
+    Contact,
+    Organisation,
+    _BaseTestCase,
+    skipIfCustomContact,
+    skipIfCustomOrganisation,
+)
+
+
+class BulkSaveTestCase(_BaseTestCase):
+    "The persons are saved with grouped queries by the jobs."
+    @skipIfCustomContact
+    def test_batch_process_contact(self):
+        user = self.login()
+        user_contact = user.linked_contact
+        other_contact = Contact.objects.create(
+            user=user, first_name='Misato', last_name='Katsuragi',
+        )
+
+        actions = [{'field_name': 'last_name', 'operator_name': 'upper', 'value': ''}]
+        self.assertTrue(batch_process_type._can_bulk_update(
+            Contact, [BatchAction(Contact, **action) for action in actions],
+        ))
+
+        job = Job.objects.create(
+            type_id=batch_process_type.id,
+            user=user,
+            data={
+                'ctype': ContentType.objects.get_for_model(Contact).id,
+                'actions': actions,
+            },
+        )
+
+        with patch.object(
+            batch_process_type, '_process_page', side_effect=AssertionError,
+        ):
+            batch_process_type.execute(job)
+
+        self.assertEqual('KATSURAGI', self.refresh(other_contact).last_name)
+
+        # The related user is synchronised
+        last_name = self.refresh(user_contact).last_name
+        self.assertEqual(last_name.upper(), last_name)
+        self.assertEqual(last_name, self.refresh(user).last_name)
+
+    @skipIfCustomContact
+    @skipIfCustomOrganisation
+    def test_delete_sector(self):
+        user = self.login()
+        sector1, sector2del = Sector.objects.all()[:2]
+
+        contact = Contact.objects.create(
+            user=user, first_name='Shinji', last_name='Ikari', sector=sector2del,
+        )
+        create_orga = partial(Organisation.objects.create, user=user, sector=sector2del)
+        orga1 = create_orga(name='Nerv')
+        orga2 = create_orga(name='Seele', is_managed=True)
+
+        get_field = Contact._meta.get_field
+        self.assertTrue(deletor_type._can_replace_in_bulk(get_field('sector')))
+        self.assertTrue(
+            deletor_type._can_replace_in_bulk(Organisation._meta.get_field('sector'))
+        )
+        self.assertTrue(
+            deletor_type._can_replace_in_bulk(Organisation._meta.get_field('legal_form'))
+        )
+
+        response = self.assertPOST200(
+            reverse('creme_config__delete_instance', args=('persons', 'sector', sector2del.id)),
+            data={
+                'replace_persons__contact_sector': sector1.id,
+                'replace_persons__organisation_sector': sector1.id,
+            },
+        )
+        self.assertNoFormError(response)
+
+        job = self.get_object_or_fail(Job, type_id=deletor_type.id)
+
+        with patch.object(deletor_type, '_replace', side_effect=AssertionError):
+            deletor_type.execute(job)
+
+        self.assertDoesNotExist(sector2del)
+
+        dcom = self.get_object_or_fail(DeletionCommand, job=job)
+        self.assertEqual(3, dcom.updated_count)
+
+        for entity in (contact, orga1, orga2):
+            self.assertEqual(sector1.id, self.refresh(entity).sector_id)
+
+            hline = HistoryLine.objects.filter(entity=entity.id).order_by('-id').first()
+            self.assertEqual(TYPE_EDITION, hline.type)
+            self.assertListEqual(
+                [['sector', sector2del.id, sector1.id]], hline.modifications,
+            )
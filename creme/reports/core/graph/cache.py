@@ -0,0 +1,164 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from __future__ import annotations
+
+import json
+import logging
+from hashlib import sha256
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, Q
+from django.utils.translation import get_language
+
+from creme.creme_core.core import model_versions
+from creme.creme_core.models import (
+    EntityFilter,
+    EntityFilterCondition,
+    SetCredentials,
+    UserRole,
+)
+from creme.creme_core.utils.queries import QSerializer
+
+if TYPE_CHECKING:
+    from creme.reports.models import AbstractReportGraph
+
+logger = logging.getLogger(__name__)
+
+
+class GraphResultsCache:
+    """Cache for the results of the graphs (see AbstractReportGraph.fetch()).
+
+    The key of a result is built with:
+        - the graph (ID, modification date, abscissa & ordinate) & its report
+          (modification date, filter).
+        - the Q narrowing the entities (e.g. entities linked to the current
+          entity) & the order.
+        - the credentials of the user (super-users share their results ; other
+          users get their own results).
+        - the language.
+        - the versions of the models the result depends on (see
+          ReportGraphHand.dependencies & creme_core.core.model_versions).
+    Notice that changes which do not send signals (e.g. QuerySet.update())
+    are only visible when the cached results expire.
+    """
+    key_prefix = 'reports-graph-'
+
+    # Models used by all the graphs (filters & credentials)
+    common_dependencies: tuple[type[Model], ...] = (
+        EntityFilter, EntityFilterCondition, SetCredentials, UserRole,
+    )
+
+    def __init__(self, cache, timeout: int | None = None):
+        self.cache = cache
+        self.timeout = (
+            settings.REPORTS_GRAPHS_CACHE_TIMEOUT if timeout is None else timeout
+        )
+
+    def get_versions(self, models: Iterable[type[Model]]) -> list[str]:
+        return (
+            model_versions.get_model_versions()
+            or model_versions.ModelVersions(self.cache)
+        ).get_versions(models)
+
+    @staticmethod
+    def credentials_fingerprint(user) -> list:
+        "Users with the same fingerprint see the same entities."
+        return ['*'] if user.is_superuser else [user.id, user.role_id]
+
+    def build_key(self,
+                  graph: AbstractReportGraph,
+                  user,
+                  extra_q: Q | None,
+                  order: str,
+                  ) -> str | None:
+        """Build the cache key of a result.
+        @return: A string, or None if the result cannot be cached.
+        """
+        if extra_q is None:
+            q_data = ''
+        else:
+            try:
+                q_data = QSerializer().dumps(extra_q)
+            except (TypeError, ValueError) as e:
+                logger.warning('GraphResultsCache: the Q cannot be serialized (%s)', e)
+                return None
+
+        report = graph.linked_report
+        models = sorted(
+            {*graph.hand.dependencies, *self.common_dependencies, get_user_model()},
+            key=lambda m: m._meta.label_lower,
+        )
+        key_data = json.dumps(
+            [
+                graph.id, graph.modified,
+                graph.abscissa_cell_value, graph.abscissa_type, graph.abscissa_parameter,
+                graph.ordinate_type, graph.ordinate_cell_key,
+                report.id, report.modified, report.filter_id,
+                q_data, order,
+                self.credentials_fingerprint(user),
+                get_language(),
+                self.get_versions(models),
+            ],
+            cls=DjangoJSONEncoder,
+        )
+
+        return self.key_prefix + sha256(key_data.encode()).hexdigest()
+
+    def fetch(self,
+              graph: AbstractReportGraph,
+              user,
+              extra_q: Q | None,
+              order: str,
+              fetch_method: Callable[[], tuple[list[str], list]],
+              ) -> tuple[list[str], list]:
+        """Get the result from the cache, or compute it & store it.
+        @param fetch_method: Function (without argument) which computes the result.
+        @return: see <ReportGraphHand.fetch()>.
+        """
+        key = self.build_key(graph=graph, user=user, extra_q=extra_q, order=order)
+        if key is None:
+            return fetch_method()
+
+        result = self.cache.get(key)
+        if result is None:
+            result = fetch_method()
+            self.cache.set(key, result, self.timeout)
+
+        return result
+
+
+def _get_graph_results_cache_alias() -> str:
+    return settings.REPORTS_GRAPHS_CACHE
+
+
+model_versions.register_cache(_get_graph_results_cache_alias)
+
+
+def get_graph_results_cache() -> GraphResultsCache | None:
+    """Get the cache for the results of the graphs.
+    @return A GraphResultsCache instance, or None if the cache is disabled
+            (see settings.REPORTS_GRAPHS_CACHE).
+    """
+    alias = settings.REPORTS_GRAPHS_CACHE
+
+    return GraphResultsCache(caches[alias]) if alias else None
@@ -27,6 +27,7 @@ from django.db.models import Max, Min, Q, QuerySet
 from django.utils.formats import get_format
 from django.utils.translation import gettext_lazy as _
 
+from creme.creme_core.core.entity_cell import EntityCellCustomField
 from creme.creme_core.core.enumerable import enumerable_registry
 from creme.creme_core.models import CremeEntity, CustomFieldEnumValue, Relation
 from creme.reports.constants import AbscissaGroup
@@ -36,6 +37,8 @@ from .aggregator import AGGREGATORS_MAP, ReportGraphAggregator
 from .lv_url import ListViewURLBuilder
 
 if TYPE_CHECKING:
+    from django.db.models import Model
+
     from creme.reports.models import AbstractReportGraph
 
 logger = logging.getLogger(__name__)
@@ -152,6 +155,19 @@ class ReportGraphHand:
     def verbose_abscissa(self) -> str:
         raise NotImplementedError
 
+    @property
+    def dependencies(self) -> list[type[Model]]:
+        """Models of the instances used to compute the values ; the cached
+        results are refreshed when these instances change (see GraphResultsCache).
+        """
+        dependencies = [self._graph.model]
+
+        cell = self._y_calculator.cell
+        if isinstance(cell, EntityCellCustomField):
+            dependencies.append(cell.custom_field.value_class)
+
+        return dependencies
+
     @property
     def ordinate(self) -> ReportGraphAggregator:
         return self._y_calculator
@@ -559,6 +575,16 @@ class RGHForeignKey(_RGHRegularField):
                 ],
             )
 
+    @property
+    def dependencies(self):
+        dependencies = super().dependencies
+        field = self._field
+
+        if field is not None:
+            dependencies.append(field.remote_field.model)
+
+        return dependencies
+
 
 @RGRAPH_HANDS_MAP(AbscissaGroup.RELATION)
 class RGHRelation(ReportGraphHand):
@@ -606,6 +632,11 @@ class RGHRelation(ReportGraphHand):
                 ],
             )
 
+    @property
+    def dependencies(self):
+        # NB: CremeEntity is used for the labels (related entities)
+        return [*super().dependencies, Relation, CremeEntity]
+
     @property
     def verbose_abscissa(self):
         rtype = self._rtype
@@ -686,6 +717,16 @@ class _RGHCustomField(ReportGraphHand):
 
             yield date.strftime(date_format), [value or 0, build_url(qdict)]
 
+    @property
+    def dependencies(self):
+        dependencies = super().dependencies
+        cfield = self._cfield
+
+        if cfield is not None:
+            dependencies.append(cfield.value_class)
+
+        return dependencies
+
     @property
     def verbose_abscissa(self):
         cfield = self._cfield
@@ -911,3 +952,7 @@ class RGHCustomFK(_RGHCustomField):
                 str(instance),
                 [y_value_func(entities_filter(**kwargs)), build_url(kwargs)],
             )
+
+    @property
+    def dependencies(self):
+        return [*super().dependencies, CustomFieldEnumValue]
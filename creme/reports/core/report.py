@@ -19,7 +19,8 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Iterable, Iterator
+from collections import defaultdict
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
@@ -32,7 +33,13 @@ from django.utils.translation import gettext_lazy as _
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.core.function_field import function_field_registry
 from creme.creme_core.gui.field_printers import field_printers_registry
-from creme.creme_core.models import CremeEntity, CustomField, RelationType
+from creme.creme_core.models import (
+    CremeEntity,
+    CustomField,
+    Relation,
+    RelationType,
+)
+from creme.creme_core.utils.db import populate_related
 from creme.creme_core.utils.meta import FieldInfo
 
 from .. import constants
@@ -56,6 +63,9 @@ class ReportHand:
     "Class which computes values of a report column (ie reports.models.Field)."
     verbose_name = 'OVERLOADME'
 
+    # Related instances (see prefetch()) ; key: ID of entity
+    _related_instances_map: dict[int, list[Model]] | None = None
+
     class ValueError(Exception):
         pass
 
@@ -82,6 +92,25 @@ class ReportHand:
     def _get_related_instances(self, entity: CremeEntity, user) -> QuerySet:
         raise NotImplementedError
 
+    def _get_related_ids_map(self,
+                             entities: Sequence[CremeEntity],
+                             ) -> dict[int, list[int]] | None:
+        """Get the IDs of the related instances of several entities with
+        grouped queries (see _get_related_instances()) ; used by prefetch().
+        @return: A dictionary <ID of entity: IDs of the related instances>,
+                 or None if the hand cannot group the queries.
+        """
+        return None
+
+    def _get_related_model(self) -> type[Model]:
+        "Model of the instances returned by _get_related_instances()."
+        raise NotImplementedError
+
+    def _get_prefetched_related_instances(self, entity: CremeEntity) -> list[Model] | None:
+        "@return: The (filtered) related instances, or None if they have not been prefetched."
+        instances_map = self._related_instances_map
+        return None if instances_map is None else instances_map.get(entity.id)
+
     def _get_filtered_related_entities(self, entity: CremeEntity, user) -> QuerySet:
         related_entities = EntityCredentials.filter(
             user=user,
@@ -128,11 +157,16 @@ class ReportHand:
         """Used as _get_value() method by subclasses which manage
         sub-reports (extended sub-report case).
         """
+        # NB: the QuerySet is only evaluated by aggregates (if entities have been prefetched)
         related_entities = self._get_filtered_related_entities(entity, user)
+        prefetched = self._get_prefetched_related_instances(entity)
         gen_values = self._handle_report_values
 
         # "(None,)" : even if sub-scope if empty, with must generate empty columns for this line
-        return [gen_values(e, user, related_entities) for e in related_entities or (None,)]
+        return [
+            gen_values(e, user, related_entities)
+            for e in (related_entities if prefetched is None else prefetched) or (None,)
+        ]
 
     def _get_value_flattened_subreport(self,
                                        entity: CremeEntity,
@@ -142,8 +176,13 @@ class ReportHand:
         """Used as _get_value() method by subclasses which manage
         sub-reports (flattened sub-report case).
         """
+        related_entities = self._get_prefetched_related_instances(entity)
+
         return self._generate_flattened_report(
-            self._get_filtered_related_entities(entity, user), user, scope,
+            self._get_filtered_related_entities(entity, user)
+            if related_entities is None else
+            related_entities,
+            user, scope,
         )
 
     def _get_value_no_subreport(self,
@@ -154,13 +193,16 @@ class ReportHand:
         """Used as _get_value() method by subclasses which manage
         sub-reports (no sub-report case).
         """
-        qs = self._get_related_instances(entity, user)
         extract = self._related_model_value_extractor
+        instances = self._get_prefetched_related_instances(entity)
+
+        if instances is None:
+            instances = self._get_related_instances(entity, user)
 
-        if issubclass(qs.model, CremeEntity):
-            qs = EntityCredentials.filter(user, qs)
+            if issubclass(instances.model, CremeEntity):
+                instances = EntityCredentials.filter(user, instances)
 
-        return ', '.join(str(extract(instance)) for instance in qs)
+        return ', '.join(str(extract(instance)) for instance in instances)
 
     def _get_value_single(self,
                           entity: CremeEntity,
@@ -207,6 +249,54 @@ class ReportHand:
         """
         return None
 
+    def prefetch(self, entities: Sequence[CremeEntity], user) -> None:
+        """Retrieve with grouped queries the data needed to compute the values
+        of several entities, before get_value() is called for each of them
+        (so the number of queries does not depend on the number of entities).
+        The data are kept until the next call ; the values of the entities which
+        have not been prefetched are still computed (with their own queries).
+        @param entities: Sequence of CremeEntities (e.g. a page of the report).
+        @param user: User instance ; used to compute credentials.
+        """
+        self._related_instances_map = None
+
+        if not self._support_subreport:
+            return
+
+        ids_map = self._get_related_ids_map(entities)
+        if ids_map is None:
+            return
+
+        sub_report = self._report_field.sub_report
+        model = self._get_related_model()
+        instances = model._default_manager.filter(
+            pk__in={rel_id for rel_ids in ids_map.values() for rel_id in rel_ids},
+        )
+
+        if issubclass(model, CremeEntity):
+            instances = EntityCredentials.filter(user, instances)
+
+            if sub_report and sub_report.filter is not None:
+                instances = sub_report.filter.filter(instances)
+
+        # NB: the order of the instances is kept
+        instances = [*instances]
+        positions = {instance.pk: i for i, instance in enumerate(instances)}
+        self._related_instances_map = {
+            entity.id: [
+                instances[i]
+                for i in sorted(
+                    positions[rel_id]
+                    for rel_id in ids_map.get(entity.id, ())
+                    if rel_id in positions
+                )
+            ] for entity in entities
+        }
+
+        if sub_report:
+            for column in sub_report.columns:
+                column.prefetch(instances, user)
+
     def get_value(self,
                   entity: CremeEntity | None,
                   user,
@@ -367,6 +457,8 @@ class RHForeignKey(RHRegularField):
                 self._value_extractor = lambda fk_instance, user: str(fk_instance)
 
         self._qs = qs
+        # Key: ID of the referenced instance (see prefetch())
+        self._fk_instances: dict[int, Model | None] = {}
         super().__init__(
             report_field,
             support_subreport=True,
@@ -376,13 +468,39 @@ class RHForeignKey(RHRegularField):
     # NB: cannot rename to _get_related_instances() because forbidden entities
     #     are filtered instead of outputting '??'
     def _get_fk_instance(self, entity: CremeEntity) -> CremeEntity | None:
+        fk_id = getattr(entity, self._fk_attr_name)
+        if fk_id is None:
+            return None
+
         try:
-            rel_entity = self._qs.get(pk=getattr(entity, self._fk_attr_name))
+            return self._fk_instances[fk_id]
+        except KeyError:
+            pass
+
+        try:
+            rel_entity = self._qs.get(pk=fk_id)
         except ObjectDoesNotExist:
             rel_entity = None
 
         return rel_entity
 
+    def prefetch(self, entities, user):
+        super().prefetch(entities, user)
+
+        fk_ids = {getattr(entity, self._fk_attr_name) for entity in entities}
+        fk_ids.discard(None)
+        instances = self._qs.in_bulk(fk_ids)
+        self._fk_instances = {fk_id: instances.get(fk_id) for fk_id in fk_ids}
+
+        sub_report = self._report_field.sub_report
+        field_info = self._field_info
+
+        if sub_report:
+            for column in sub_report.columns:
+                column.prefetch([*instances.values()], user)
+        elif len(field_info) > 1:
+            populate_related([*instances.values()], [field_info[1].name])
+
     def _get_value_flattened_subreport(self, entity, user, scope):
         fk_entity = self._get_fk_instance(entity)
 
@@ -428,6 +546,20 @@ class RHManyToManyField(RHRegularField):
     def _get_related_instances(self, entity, user):
         return getattr(entity, self._field_info[0].name).all()
 
+    def _get_related_ids_map(self, entities):
+        m2m_field = self._field_info[0]
+        ids_map = defaultdict(list)
+
+        for entity_id, rel_id in m2m_field.remote_field.through._default_manager.filter(
+            **{f'{m2m_field.m2m_field_name()}__in': [entity.id for entity in entities]},
+        ).values_list(m2m_field.m2m_field_name(), m2m_field.m2m_reverse_field_name()):
+            ids_map[entity_id].append(rel_id)
+
+        return ids_map
+
+    def _get_related_model(self):
+        return self._field_info[0].remote_field.model
+
     def get_linkable_ctypes(self):
         m2m_model = self._field_info[0].remote_field.model
 
@@ -450,6 +582,9 @@ class RHCustomField(ReportHand):
 
         super().__init__(report_field, title=cf.name)
 
+    def prefetch(self, entities, user):
+        CremeEntity.populate_custom_values(entities, [self._cfield])
+
     def _get_value_single_on_allowed(self, entity, user, scope):
         cvalue = entity.get_custom_value(self._cfield)
         # TODO: use a EntityCellCustomField & remove __str__ methods of CustomFieldValue models ?
@@ -489,6 +624,26 @@ class RHRelation(ReportHand):
             relations__object_entity=entity.id,
         )
 
+    def _get_related_ids_map(self, entities):
+        ids_map = defaultdict(list)
+
+        for entity_id, rel_id in Relation.objects.filter(
+            type=self._rtype.symmetric_type_id,
+            object_entity__in=[entity.id for entity in entities],
+        ).values_list('object_entity_id', 'subject_entity_id'):
+            ids_map[entity_id].append(rel_id)
+
+        return ids_map
+
+    def _get_related_model(self):
+        return self._related_model
+
+    def prefetch(self, entities, user):
+        if self._report_field.sub_report:
+            super().prefetch(entities, user)
+        else:
+            CremeEntity.populate_relations(entities, [self._rtype.id])
+
     # TODO: add a feature in base class to retrieved efficiently real entities ??
     # TODO: extract algorithm that retrieve efficiently real entity from
     #       CremeEntity.get_related_entities()
@@ -528,6 +683,9 @@ class RHFunctionField(ReportHand):
 
         super().__init__(report_field, title=str(funcfield.verbose_name))
 
+    def prefetch(self, entities, user):
+        self._funcfield.populate_entities(entities, user)
+
     def _get_value_single_on_allowed(self, entity, user, scope):
         return self._funcfield(entity, user).for_csv()
 
@@ -702,6 +860,21 @@ class RHRelated(ReportHand):
     def _get_related_instances(self, entity, user):
         return getattr(entity, self._attr_name).filter(is_deleted=False)
 
+    def _get_related_ids_map(self, entities):
+        fk = self._related_field.field
+        ids_map = defaultdict(list)
+
+        for entity_id, rel_id in self._related_field.related_model._default_manager.filter(
+            **{f'{fk.name}__in': [entity.id for entity in entities]},
+            is_deleted=False,
+        ).values_list(fk.attname, 'pk'):
+            ids_map[entity_id].append(rel_id)
+
+        return ids_map
+
+    def _get_related_model(self):
+        return self._related_field.related_model
+
     def get_linkable_ctypes(self):
         return (
             ContentType.objects.get_for_model(self._related_field.related_model),
@@ -0,0 +1,140 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2022  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+
+from creme.creme_core.creme_jobs.base import JobType
+from creme.creme_core.models import (
+    BrickHomeLocation,
+    BrickMypageLocation,
+    InstanceBrickConfigItem,
+    JobResult,
+)
+
+from .core.graph.cache import get_graph_results_cache
+from .core.graph.fetcher import GraphFetcher
+
+logger = logging.getLogger(__name__)
+
+
+class _GraphsCacheWarmerType(JobType):
+    id = JobType.generate_id('reports', 'graphs_cache_warmer')
+    verbose_name = _('Pre-compute the graphs of the home pages')
+    periodic = JobType.PERIODIC
+
+    def _iter_fetchers_n_users(self):
+        "Generator of tuples (GraphFetcher, users which display the graph)."
+        from .bricks import ReportGraphChartInstanceBrick
+        from .models import AbstractReportGraph
+
+        active_users = [
+            *get_user_model().objects.filter(is_active=True, is_team=False),
+        ]
+        users_per_brick_id = defaultdict(dict)
+
+        for brick_id in BrickHomeLocation.objects.values_list('brick_id', flat=True):
+            users_per_brick_id[brick_id].update((user.id, user) for user in active_users)
+
+        users_per_id = {user.id: user for user in active_users}
+        for brick_id, user_id in BrickMypageLocation.objects.filter(
+            user__isnull=False,
+        ).values_list('brick_id', 'user_id'):
+            user = users_per_id.get(user_id)
+            if user is not None:
+                users_per_brick_id[brick_id][user_id] = user
+
+        ibci_ids = {
+            InstanceBrickConfigItem.id_from_brick_id(brick_id): users
+            for brick_id, users in users_per_brick_id.items()
+        }
+
+        for ibci in InstanceBrickConfigItem.objects.filter(
+            id__in=[ibci_id for ibci_id in ibci_ids.keys() if ibci_id is not None],
+            brick_class_id=ReportGraphChartInstanceBrick.id_,
+        ):
+            graph = ibci.entity.get_real_entity()
+
+            if isinstance(graph, AbstractReportGraph) and not graph.is_deleted:
+                get_data = ibci.get_extra_data
+                fetcher = graph.fetcher_registry.get(
+                    graph=graph,
+                    fetcher_dict={key: get_data(key) for key in GraphFetcher.DICT_KEYS},
+                )
+
+                if not fetcher.error:
+                    yield fetcher, ibci_ids[ibci.id].values()
+
+    def _execute(self, job):
+        results_cache = get_graph_results_cache()
+
+        if results_cache is None:
+            JobResult.objects.create(
+                job=job,
+                messages=[
+                    gettext(
+                        'The cache of graphs is disabled '
+                        '(see the setting "REPORTS_GRAPHS_CACHE").'
+                    ),
+                ],
+            )
+            return
+
+        for fetcher, users in self._iter_fetchers_n_users():
+            graph = fetcher.graph
+            order = 'ASC' if graph.asc else 'DESC'
+            fingerprints = set()
+
+            for user in users:
+                # NB: the users with the same credentials share the results
+                fingerprint = tuple(results_cache.credentials_fingerprint(user))
+                if fingerprint in fingerprints:
+                    continue
+
+                fingerprints.add(fingerprint)
+
+                try:
+                    fetcher.fetch(user=user, order=order)
+                except Exception as e:
+                    logger.exception('Error when computing the graph id=%s', graph.id)
+                    JobResult.objects.create(
+                        job=job,
+                        messages=[
+                            gettext('The graph «{graph}» cannot be computed').format(
+                                graph=graph,
+                            ),
+                            gettext('Original error: {}').format(e),
+                        ],
+                    )
+                    break
+
+    def get_description(self, job):
+        return [
+            gettext(
+                'The graphs displayed on the home pages are computed & stored '
+                'in the cache of graphs, so these pages are displayed faster.'
+            ),
+        ]
+
+
+graphs_cache_warmer_type = _GraphsCacheWarmerType()
+jobs = (graphs_cache_warmer_type,)
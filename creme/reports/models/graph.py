@@ -43,6 +43,7 @@ from ..core.graph import (
     abscissa_constraints,
     ordinate_constraints,
 )
+from ..core.graph.cache import get_graph_results_cache
 from ..graph_fetcher_registry import graph_fetcher_registry
 
 if TYPE_CHECKING:
@@ -188,8 +189,22 @@ class AbstractReportGraph(CremeEntity):
               extra_q: models.Q | None = None,
               order: str = 'ASC',
               ) -> tuple[list[str], list]:
+        """Get the values of the graph ; they are stored in the cache of
+        results if it's enabled (see settings.REPORTS_GRAPHS_CACHE).
+        @return: see <ReportGraphHand.fetch()>.
+        """
         assert order == 'ASC' or order == 'DESC'
 
+        results_cache = get_graph_results_cache()
+        if results_cache is None:
+            return self._fetch(user=user, extra_q=extra_q, order=order)
+
+        return results_cache.fetch(
+            graph=self, user=user, extra_q=extra_q, order=order,
+            fetch_method=lambda: self._fetch(user=user, extra_q=extra_q, order=order),
+        )
+
+    def _fetch(self, user, extra_q, order):
         report = self.linked_report
         entities = EntityCredentials.filter(
             user=user,
@@ -21,7 +21,7 @@ from __future__ import annotations
 import logging
 # import warnings
 from itertools import chain
-from typing import TYPE_CHECKING, Iterator
+from typing import TYPE_CHECKING, Iterator, Sequence
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -33,6 +33,7 @@ from django.utils.translation import gettext_lazy as _
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.core.entity_filter import EF_USER
 from creme.creme_core.core.field_tags import FieldTag
+from creme.creme_core.core.paginator import FlowPaginator
 from creme.creme_core.models import (
     CremeEntity,
     CremeModel,
@@ -59,6 +60,9 @@ class AbstractReport(CremeEntity):
     creation_label = _('Create a report')
     save_label     = _('Save the report')
 
+    # Number of entities retrieved (& prefetched, see ReportHand.prefetch()) at once
+    fetch_page_size = 256
+
     _columns: list[Field] | None = None
 
     class Meta:
@@ -157,33 +161,69 @@ class AbstractReport(CremeEntity):
         if extra_q is not None:
             entities = entities.filter(extra_q)
 
-        if limit_to:
-            entities = entities[:limit_to]
+        # NB: used by aggregates
+        scope = entities[:limit_to] if limit_to else entities
 
+        # NB: the PK is used as last ordering field to get stable pages.
+        ordering = [*self.ct.model_class()._meta.ordering, 'id']
+        paginator = FlowPaginator(
+            queryset=entities.order_by(*ordering),
+            key=ordering[0],
+            per_page=max(2, min(self.fetch_page_size, limit_to or self.fetch_page_size)),
+        )
         fields = self.filtered_columns
-
-        for entity in entities:
-            yield [
-                field.get_value(entity, scope=entities, user=user)
-                for field in fields
-            ]
-
-    # TODO: transform into generator (--> StreamResponse)
-    def fetch_all_lines(self,
-                        limit_to: int | None = None,
-                        extra_q: models.Q | None = None,
-                        user=None) -> list[list[str]]:
+        count = 0
+
+        for page in paginator.pages():
+            page_entities = page.object_list
+
+            if limit_to:
+                page_entities = page_entities[:limit_to - count]
+
+            for field in fields:
+                field.prefetch(page_entities, user=user)
+
+            for entity in page_entities:
+                yield [
+                    field.get_value(entity, scope=scope, user=user)
+                    for field in fields
+                ]
+
+            count += len(page_entities)
+
+            if limit_to and count >= limit_to:
+                break
+
+    def iter_all_lines(self,
+                       limit_to: int | None = None,
+                       extra_q: models.Q | None = None,
+                       user=None) -> Iterator[list[str]]:
+        """Generator of the lines of the report (the lines of the selected
+        sub-reports are expanded) ; the entities are retrieved page by page,
+        so big reports can be exported with a bounded memory usage.
+        @param limit_to: Maximum number of lines.
+        @param extra_q: Q instance applied to the entities.
+        @param user: Lines are filtered with the credentials of this user
+               (default: a super-user).
+        """
         from ..core.report import ExpandableLine  # Lazy loading
 
-        lines = []
+        count = 0
 
         for values in self._fetch(limit_to=limit_to, extra_q=extra_q, user=user):
-            lines.extend(ExpandableLine(values).get_lines())
+            for line in ExpandableLine(values).get_lines():
+                yield line
 
-            if limit_to is not None and len(lines) >= limit_to:  # Meh
-                break  # TODO: test
+                count += 1
+                if limit_to is not None and count >= limit_to:
+                    return
 
-        return lines
+    def fetch_all_lines(self,
+                        limit_to: int | None = None,
+                        extra_q: models.Q | None = None,
+                        user=None) -> list[list[str]]:
+        "See iter_all_lines()."
+        return [*self.iter_all_lines(limit_to=limit_to, extra_q=extra_q, user=user)]
 
     def get_children_fields_flat(self) -> Iterator[Field]:
         return chain.from_iterable(
@@ -293,6 +333,12 @@ class Field(CremeModel):
 
         return children
 
+    def prefetch(self, entities: Sequence[CremeEntity], user) -> None:
+        "Retrieve the data of several entities with grouped queries (see ReportHand.prefetch())."
+        hand = self.hand
+        if hand:
+            hand.prefetch(entities, user)
+
     def get_value(self,
                   entity: CremeEntity | None,
                   user,
@@ -19,6 +19,7 @@
 import logging
 
 from django.apps import apps
+from django.conf import settings
 from django.utils.translation import gettext as _
 
 import creme.creme_core.bricks as core_bricks
@@ -30,11 +31,13 @@ from creme.creme_core.models import (
     BrickDetailviewLocation,
     CustomFormConfigItem,
     HeaderFilter,
+    Job,
     MenuConfigItem,
     SearchConfigItem,
 )
+from creme.creme_core.utils.date_period import date_period_registry
 
-from . import bricks, constants, custom_forms, get_report_model
+from . import bricks, constants, creme_jobs, custom_forms, get_report_model
 from .forms.report import FilteredCTypeSubCell, FilterSubCell
 from .menu import ReportsEntry
 
@@ -131,6 +134,19 @@ class Populator(BasePopulator):
         # ---------------------------
         SearchConfigItem.objects.create_if_needed(Report, ['name'])
 
+        # ---------------------------
+        Job.objects.get_or_create(
+            type_id=creme_jobs.graphs_cache_warmer_type.id,
+            defaults={
+                'language':    settings.LANGUAGE_CODE,
+                'periodicity': date_period_registry.get_period('hours', 1),
+                'status':      Job.STATUS_OK,
+                # The cache of graphs is disabled by default (see the setting
+                # "REPORTS_GRAPHS_CACHE"), so the job is useless.
+                'enabled': False,
+            },
+        )
+
         # ---------------------------
         # NB: no straightforward way to test that this populate script has not been already run
         if not BrickDetailviewLocation.objects.filter_for_model(Report).exists():
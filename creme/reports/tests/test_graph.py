@@ -4,8 +4,10 @@ from functools import partial
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.db.models import ProtectedError
 from django.db.models.query_utils import Q
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils.translation import gettext as _
 from parameterized import parameterized
@@ -30,6 +32,8 @@ from creme.creme_core.models import (
     FakePosition,
     FakeSector,
     FieldsConfig,
+    Job,
+    JobResult,
     Relation,
     RelationType,
     SetCredentials,
@@ -60,7 +64,9 @@ from creme.creme_core.utils.queries import QSerializer
 #     RGT_YEAR,
 # )
 from ..core.graph import AbscissaInfo, ListViewURLBuilder, OrdinateInfo
+from ..core.graph.cache import GraphResultsCache, get_graph_results_cache
 from ..core.graph.fetcher import SimpleGraphFetcher
+from ..creme_jobs import graphs_cache_warmer_type
 from .base import (
     AxisFieldsMixin,
     BaseReportsTestCase,
@@ -3226,3 +3232,150 @@ class ReportGraphTestCase(BrickTestCaseMixin,
 
         self.assertEqual(200, y_data[get_user_index(user.id)][0])
         self.assertEqual(0,   y_data[get_user_index(other_user.id)][0])  # Not 300
+
+    def _create_positions_graph(self, user):
+        report = self._create_simple_contacts_report(user=user)
+
+        return ReportGraph.objects.create(
+            user=user, linked_report=report,
+            name='Contacts by position',
+            abscissa_cell_value='position', abscissa_type=ReportGraph.Group.FK,
+            ordinate_type=ReportGraph.Aggregator.COUNT,
+        )
+
+    def test_results_cache01(self):
+        "Cache disabled."
+        self.assertIsNone(get_graph_results_cache())
+
+        user = self.login()
+        rgraph = self._create_positions_graph(user)
+
+        rgraph.fetch(user)  # NB: warm up (ContentType...)
+        with CaptureQueriesContext(connection) as ctxt1:
+            rgraph.fetch(user)
+
+        with CaptureQueriesContext(connection) as ctxt2:
+            rgraph.fetch(user)
+
+        self.assertTrue(ctxt1.captured_queries)
+        self.assertEqual(len(ctxt1.captured_queries), len(ctxt2.captured_queries))
+
+    def test_results_cache02(self):
+        user = self.login()
+        lord = FakePosition.objects.create(title='Lord')
+
+        create_contact = partial(FakeContact.objects.create, user=user, last_name='Stark')
+        create_contact(first_name='Robb', position=lord)
+        create_contact(first_name='Bran', position=lord)
+
+        rgraph = self._create_positions_graph(user)
+
+        with override_settings(REPORTS_GRAPHS_CACHE='default'):
+            results_cache = get_graph_results_cache()
+            self.assertIsInstance(results_cache, GraphResultsCache)
+            results_cache.cache.clear()
+
+            x1, y1 = rgraph.fetch(user)
+            lord_index = x1.index(lord.title)
+            self.assertEqual(2, y1[lord_index][0])
+
+            with self.assertNumQueries(0):
+                x2, y2 = rgraph.fetch(user)
+            self.assertListEqual(x1, x2)
+            self.assertListEqual(y1, y2)
+
+            # Other parameters => other results
+            x_desc, __ = rgraph.fetch(user, order='DESC')
+            self.assertListEqual([*reversed(x1)], x_desc)
+
+            __, y_xtra = rgraph.fetch(user, extra_q=Q(first_name='Bran'))
+            self.assertEqual(1, y_xtra[lord_index][0])
+
+            # Dependencies
+            create_contact(first_name='Sansa', position=lord)
+            __, y3 = rgraph.fetch(user)
+            self.assertEqual(3, y3[lord_index][0])
+
+            new_position = FakePosition.objects.create(title='Queen in the North')
+            x4, __ = rgraph.fetch(user)
+            self.assertIn(new_position.title, x4)
+
+    def test_results_cache03(self):
+        "Credentials: the regular users do not share the results of super-users."
+        user = self.login(is_superuser=False, allowed_apps=['creme_core', 'reports'])
+        SetCredentials.objects.create(
+            role=self.role,
+            value=EntityCredentials.VIEW,
+            set_type=SetCredentials.ESET_OWN,
+        )
+
+        lord = FakePosition.objects.create(title='Lord')
+        create_contact = partial(FakeContact.objects.create, last_name='Stark', position=lord)
+        create_contact(user=user, first_name='Robb')
+        create_contact(user=self.other_user, first_name='Bran')
+
+        rgraph = self._create_positions_graph(self.other_user)
+
+        with override_settings(REPORTS_GRAPHS_CACHE='default'):
+            get_graph_results_cache().cache.clear()
+
+            x1, y1 = rgraph.fetch(self.other_user)
+            self.assertEqual(2, y1[x1.index(lord.title)][0])
+
+            x2, y2 = rgraph.fetch(user)
+            self.assertEqual(1, y2[x2.index(lord.title)][0])
+
+    def test_results_cache_job01(self):
+        user = self.login()
+        lord = FakePosition.objects.create(title='Lord')
+        FakeContact.objects.create(
+            user=user, first_name='Robb', last_name='Stark', position=lord,
+        )
+
+        rgraph = self._create_positions_graph(user)
+        ibci = SimpleGraphFetcher(graph=rgraph).create_brick_config_item()
+        BrickHomeLocation.objects.create(brick_id=ibci.brick_id, order=1)
+
+        job = self.get_object_or_fail(Job, type_id=graphs_cache_warmer_type.id)
+        self.assertFalse(job.enabled)
+        self.assertListEqual(
+            [
+                _(
+                    'The graphs displayed on the home pages are computed & stored '
+                    'in the cache of graphs, so these pages are displayed faster.'
+                ),
+            ],
+            job.description,
+        )
+
+        with override_settings(REPORTS_GRAPHS_CACHE='default'):
+            get_graph_results_cache().cache.clear()
+            graphs_cache_warmer_type.execute(job)
+
+            self.assertFalse(JobResult.objects.filter(job=job))
+
+            with self.assertNumQueries(0):
+                x, y = rgraph.fetch(user)
+
+        self.assertEqual(1, y[x.index(lord.title)][0])
+
+    def test_results_cache_job02(self):
+        "Cache disabled."
+        self.login()
+
+        job = self.get_object_or_fail(Job, type_id=graphs_cache_warmer_type.id)
+        graphs_cache_warmer_type.execute(job)
+
+        jresults = JobResult.objects.filter(job=job)
+        self.assertEqual(1, len(jresults))
+
+        jresult = jresults[0]
+        self.assertListEqual(
+            [
+                _(
+                    'The cache of graphs is disabled '
+                    '(see the setting "REPORTS_GRAPHS_CACHE").'
+                ),
+            ],
+            jresult.messages,
+        )
@@ -1,10 +1,12 @@
 from datetime import date, datetime
 from decimal import Decimal
 from functools import partial
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils.encoding import smart_str
 from django.utils.formats import get_format, number_format  # date_format
@@ -51,8 +53,10 @@ from creme.creme_core.models import (
     FakeMailingList,
     FakeOrganisation,
     FakePosition,
+    FakeSector,
     FieldsConfig,
     HeaderFilter,
+    Language,
     Relation,
     RelationType,
     SetCredentials,
@@ -3565,3 +3569,78 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
             ],
             report.fetch_all_lines(),
         )
+
+    def test_fetch_prefetch(self):
+        "The number of queries does not depend on the number of entities."
+        user = self.login()
+        self._aux_test_fetch_persons(create_contacts=False, report_4_contact=False)
+
+        cfield = CustomField.objects.create(
+            content_type=self.ct_contact, name='Size', field_type=CustomField.INT,
+        )
+
+        report = Report.objects.create(user=user, name='Contacts', ct=self.ct_contact)
+        create_field = partial(Field.objects.create, report=report, type=RFT_FIELD)
+        create_field(name='last_name',       order=1)
+        create_field(name='image',           order=2)
+        create_field(name='sector__title',   order=3)
+        create_field(name='languages__name', order=4)
+        create_field(name=str(cfield.id),          order=5, type=RFT_CUSTOM)
+        create_field(name=FAKE_REL_SUB_EMPLOYED_BY, order=6, type=RFT_RELATION)
+        create_field(name='get_pretty_properties', order=7, type=RFT_FUNCTION)
+        create_field(
+            name=FAKE_REL_SUB_EMPLOYED_BY, order=8, type=RFT_RELATION,
+            sub_report=self.report_orga,
+        )
+
+        sectors = FakeSector.objects.all()
+        languages = [*Language.objects.all()[:2]]
+        self.assertEqual(2, len(languages))
+
+        def create_contacts(count):
+            for i in range(count):
+                contact = FakeContact.objects.create(
+                    user=user, last_name=f'Stark #{count}-{i}',
+                    sector=sectors[i % 2],
+                    image=FakeImage.objects.create(user=user, name=f'Image #{count}-{i}'),
+                )
+                contact.languages.set(languages)
+                cfield.value_class.objects.create(
+                    custom_field=cfield, entity=contact, value=i,
+                )
+                Relation.objects.create(
+                    user=user, subject_entity=contact, object_entity=self.starks,
+                    type_id=FAKE_REL_SUB_EMPLOYED_BY,
+                )
+
+        def count_queries():
+            fresh_report = self.refresh(report)
+            fresh_report.filtered_columns  # NOQA
+
+            with CaptureQueriesContext(connection) as context:
+                lines = fresh_report.fetch_all_lines()
+
+            return lines, len(context)
+
+        create_contacts(2)
+        self.refresh(report).fetch_all_lines()  # Fill the caches (ContentTypes...)
+        lines2, queries_count2 = count_queries()
+        self.assertEqual(2, len(lines2))
+        self.assertListEqual(
+            [
+                'Stark #2-0', 'Image #2-0', sectors[0].title,
+                f'{languages[0]}, {languages[1]}', '0',
+                self.starks.name, '', f'{_("Name")}: {self.starks.name}',
+            ],
+            lines2[0],
+        )
+
+        create_contacts(4)
+        lines6, queries_count6 = count_queries()
+        self.assertEqual(6, len(lines6))
+        self.assertEqual(queries_count2, queries_count6)
+
+        # Pagination
+        with patch.object(Report, 'fetch_page_size', 4):
+            self.assertListEqual(lines6, self.refresh(report).fetch_all_lines())
+            self.assertListEqual(lines6[:5], self.refresh(report).fetch_all_lines(limit_to=5))
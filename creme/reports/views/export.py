@@ -20,6 +20,7 @@ from __future__ import annotations
 
 import logging
 
+from django.conf import settings
 from django.forms.forms import BaseForm
 from django.urls import reverse
 from django.utils.encoding import smart_str
@@ -135,8 +136,19 @@ class Export(generic.base.EntityRelatedMixin, generic.CheckedView):
 
         return form
 
+    def get_streaming(self):
+        return settings.MASS_EXPORT_STREAMING
+
+    def iter_rows(self, *, report, q_filter):
+        "Generator of all the exported rows (the header, & then the lines)."
+        yield [
+            smart_str(column.title) for column in report.get_children_fields_flat()
+        ]
+
+        for line in report.iter_all_lines(extra_q=q_filter, user=self.request.user):
+            yield [smart_str(value) for value in line]
+
     def get(self, request, *args, **kwargs):
-        user = request.user
         report = self.get_related_entity()
         form = self.get_form(report=report, request=request)
 
@@ -146,15 +158,9 @@ class Export(generic.base.EntityRelatedMixin, generic.CheckedView):
         if writer is None:
             raise ConflictError('Unknown extension')
 
-        writerow = writer.writerow
-
-        writerow([
-            smart_str(column.title) for column in report.get_children_fields_flat()
-        ])
-
-        for line in report.fetch_all_lines(extra_q=q_filter, user=user):
-            writerow([smart_str(value) for value in line])
-
-        writer.save(smart_str(report.name), user)
-
-        return writer.response
+        return writer.export(
+            rows=self.iter_rows(report=report, q_filter=q_filter),
+            filename=smart_str(report.name),
+            user=request.user,
+            streaming=self.get_streaming(),
+        )
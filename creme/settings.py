@@ -76,6 +76,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 # - the paginator only allows to go to the next & the previous pages (& the main query is faster).
 FAST_QUERY_MODE_THRESHOLD = 100000
 
+# Way to write the lines of history in the DB:
+#  - 'creme.creme_core.models.history.ImmediateHistoryWriter': each line is
+#    saved immediately, with its own query.
+#  - 'creme.creme_core.models.history.BufferedHistoryWriter': the lines created
+#    in a transaction are inserted with grouped queries when the transaction is
+#    committed (the batch jobs, the imports... are faster). Notice that the lines
+#    are not visible before the commit.
+HISTORY_WRITER = 'creme.creme_core.models.history.ImmediateHistoryWriter'
+
 # JOBS #########################################################################
 # Maximum number of not finished jobs each user can have at the same time.
 #  When this number is reached for a user, he must wait one of his
@@ -95,6 +104,30 @@ MAX_JOBS_PER_USER = 2
 # periodicity can be precisely managed).
 MAX_USER_JOBS = 5
 
+# Maximum number of items in the cache used by the jobs for the data which
+# are cached per request in the views (configuration of fields, settings...).
+# The least recently used items are removed when this size is reached
+# (None means "no limit").
+JOBS_CACHE_MAX_SIZE = 1000
+
+# Number of processes used by the job which empties the trash ; the entities
+# which do not depend on each other (no reference, no relationship) are
+# deleted concurrently when this number is greater than 1.
+# Notice that it needs the "fork" method to start processes (i.e. not Windows).
+TRASH_CLEANER_WORKERS = 1
+
+# Number of worker processes started in advance by the job manager. Django is
+# set up only once by these processes, so the jobs start faster (especially the
+# short ones). When all the workers are busy, a new process is spawned for the
+# job, like when the pool is disabled (i.e. with a size of 0).
+JOBMANAGER_POOL_SIZE = 0
+# A worker is replaced by a new one after having run this number of jobs
+# (0 means "no limit")...
+JOBMANAGER_POOL_MAX_JOBS = 100
+# ... or when it uses more memory than this value, in MB (0 means "no limit").
+# Notice that the used memory can only be retrieved on Linux currently.
+JOBMANAGER_POOL_MAX_MEMORY = 0
+
 # 'security' period for pseudo-periodic jobs : they will be run at least with
 # this periodicity, even if they do not receive a new request (in order to reduce
 # the effects of an hypothetical redis problem).
@@ -130,6 +163,16 @@ JOBMANAGER_BROKER = 'redis://@localhost:6379/0'
 AUTHENTICATION_BACKENDS = ['creme.creme_core.auth.backend.EntityBackend']
 AUTH_USER_MODEL = 'creme_core.CremeUser'
 
+# Name of the cache (see the Django's setting "CACHES") used to store the data
+# needed by the credentials (roles, credentials' filters, teams), in order to
+# avoid some queries in each request.
+# BEWARE: the cache must be shared by all the processes (workers of the web
+#         server, job manager...), so do not use the "local-memory" cache
+#         (i.e. the default cache of Django) in production ; use "memcached" or
+#         "redis" for example.
+# An empty string means "no cache".
+CREDENTIALS_CACHE = ''
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -485,7 +528,13 @@ EXPORT_BACKENDS = [
     'creme.creme_core.backends.csv_export.CSVExportBackend',
     'creme.creme_core.backends.csv_export.SemiCSVExportBackend',
     'creme.creme_core.backends.xls_export.XLSExportBackend',
+    'creme.creme_core.backends.xls_export.XLSXExportBackend',
 ]
+# If True, the mass-export view (& the export of reports) sends the exported
+# lines progressively, with a constant memory usage, for the backends which
+# support it (CSV).
+# The other backends (XLSX...) write their file progressively anyway.
+MASS_EXPORT_STREAMING = False
 
 # EMAILS [internal] ############################################################
 
@@ -673,6 +722,14 @@ MENU_ICON_MAX_SIZE = 3145728  # 3 Mega bytes
 # Lines number in common blocks
 BLOCK_SIZE = 10
 
+# Name of the cache (see the Django's setting "CACHES") used to store the
+# rendered blocks ; only the blocks with the attribute "cache_timeout" are
+# stored. The cached blocks are refreshed when the instances of their
+# dependencies are saved/deleted ; the cache must be shared by all the
+# processes (see CREDENTIALS_CACHE).
+# An empty string means "no cache".
+BRICKS_CACHE = ''
+
 # Maximum number of items in the menu entry "Recent entities"
 MAX_LAST_ITEMS = 9
 
@@ -683,6 +740,30 @@ HIDDEN_VALUE = '??'
 PAGE_SIZES = [10, 25, 50, 100, 200]  # Available page sizes  (list of integers)
 DEFAULT_PAGE_SIZE_IDX = 1  # Index (0-based, in PAGE_SIZES) of the default size of pages.
 
+# Strategy used to count the entities of the list-views (the count is performed
+# for each page, & it can be slow with big tables):
+#  - 'creme.creme_core.gui.listview.count.ExactCount': exact count each time.
+#  - 'creme.creme_core.gui.listview.count.CachedCount': the exact count is
+#    stored in the cache of Django (per filter, search & user) during
+#    LISTVIEW_COUNT_CACHE_TIMEOUT seconds ; the total can be a bit outdated.
+#  - 'creme.creme_core.gui.listview.count.EstimatedCount': the estimation of
+#    the query planner is used for big counts (see FAST_QUERY_MODE_THRESHOLD),
+#    & the total is displayed as approximate. PostgreSQL only (the count is
+#    exact with the other DBRMS).
+LISTVIEW_COUNT_STRATEGY = 'creme.creme_core.gui.listview.count.ExactCount'
+LISTVIEW_COUNT_CACHE_TIMEOUT = 60  # In seconds
+
+# Global search
+# Index of words used by the search to avoid the scanning of the tables ;
+# an empty string means "no index".
+# The built-in index stores the words in a table of the DB:
+#   SEARCH_INDEX = 'creme.creme_core.core.search_index.TableSearchIndex'
+# Notice that the searched words are then matched with the beginning of the
+# indexed words (e.g. "kusa" finds "Kusanagi", but "nagi" does not).
+# The index of the existing entities must be built with the command
+# "python creme/manage.py creme_search_index" when it's set up.
+SEARCH_INDEX = ''
+
 # Initial value of the checkbox "Is private?" in the creation forms of
 # HeaderFilter (views of list) & EntityFilters.
 FILTERS_INITIAL_PRIVATE = False
@@ -1258,6 +1339,17 @@ REPORTS_GRAPH_MODEL  = 'reports.ReportGraph'
 REPORTS_REPORT_FORCE_NOT_CUSTOM = False
 REPORTS_GRAPH_FORCE_NOT_CUSTOM  = False
 
+# Alias of the cache (see CACHES) where the results of the graphs are stored,
+# in order to avoid the computing of the graphs at each display. The cached
+# results are refreshed when the instances they use are saved/deleted ; the
+# cache must be shared by all the processes (see CREDENTIALS_CACHE), including
+# the job manager if the job which pre-computes the graphs of the home pages
+# is enabled.
+# An empty string means "no cache".
+REPORTS_GRAPHS_CACHE = ''
+# Number of seconds during which a result is stored.
+REPORTS_GRAPHS_CACHE_TIMEOUT = 3600
+
 # ACTIVITIES -------------------------------------------------------------------
 ACTIVITIES_ACTIVITY_MODEL = 'activities.Activity'
 ACTIVITIES_ACTIVITY_FORCE_NOT_CUSTOM = False
@@ -1324,6 +1416,15 @@ BILLING_EXPORTERS = [
     #   https://wkhtmltopdf.org/  => uses Qt WebKit
 ]
 
+# The files generated by the exporters are stored in "MEDIA_ROOT/billing/cache/",
+# & they are re-used while the documents are not modified.
+BILLING_EXPORT_CACHE = True
+
+# Number of processes used by the job which exports several documents in a ZIP
+# file. Notice that the processes are forked (so more than 1 process is only
+# possible on POSIX systems).
+BILLING_EXPORT_WORKERS = 1
+
 # OPPORTUNITIES ----------------------------------------------------------------
 OPPORTUNITIES_OPPORTUNITY_MODEL = 'opportunities.Opportunity'
 OPPORTUNITIES_OPPORTUNITY_FORCE_NOT_CUSTOM = False
@@ -1355,10 +1456,14 @@ EMAILCAMPAIGN_PASSWORD  = ''
 EMAILCAMPAIGN_PORT      = 25
 EMAILCAMPAIGN_USE_TLS   = True
 
-# Emails are sent by chunks, and sleep between 2 chunks.
+# The rate of sending is limited: EMAILCAMPAIGN_SIZE emails at most are sent
+# every EMAILCAMPAIGN_SLEEP_TIME seconds (0 means "no limit").
 EMAILCAMPAIGN_SIZE = 40
 EMAILCAMPAIGN_SLEEP_TIME = 2
 
+# Number of SMTP connections used concurrently to send the emails of a campaign.
+EMAILCAMPAIGN_CONNECTIONS = 1
+
 # Sketch -----------------------------------------------------------------------
 SKETCH_ENABLE_DEMO_BRICKS = False
 
@@ -1396,6 +1501,22 @@ CREME_GET_EMAIL_SSL_CERTFILE = ''
 # (e.g. the input 'ini' used .ini files) ; used files are deleted.
 CRUDITY_FILESYS_FETCHER_DIR = ''
 
+# The command "crudity_watch_files" processes the files of CRUDITY_FILESYS_FETCHER_DIR
+# as soon as they are written (with inotify on Linux ; the directory is scanned
+# periodically on the other systems). If you use it, you can disable the job
+# "Synchronize externals data sent to Creme" when you use only the fetcher 'filesystem'.
+# While the command runs, the job ignores the directory (the command holds a
+# lock file in the temporary directory of the system), so a file is not
+# processed twice. BEWARE: this lock is not available on Windows, and it works
+# only if the command & the job run on the same machine ; in the other cases
+# you must disable the job when you use the command.
+#  - Number of threads which process the files.
+CRUDITY_FILESYS_WATCHER_WORKERS = 1
+#  - Maximum number of files waiting to be processed.
+CRUDITY_FILESYS_WATCHER_QUEUE_SIZE = 1024
+#  - Number of seconds between 2 scans of the directory (when inotify is not available).
+CRUDITY_FILESYS_WATCHER_POLL_INTERVAL = 5
+
 # CRUDITY_BACKENDS configures the backends (it's a list of dict)
 # Here a template of a crudity backend configuration:
 # CRUDITY_BACKENDS = [